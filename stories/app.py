@@ -5,120 +5,287 @@ Created on Aug 12, 2024
 
 """
 import uvicorn
-from fastapi import FastAPI, Depends, status, Form
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, status, Form, Header, WebSocket, WebSocketDisconnect
 from datetime import date, datetime
-from fastapi.responses import JSONResponse, Response
+from typing import List
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 
 from game.storiesGameEngine import StoriesGameEngine
 from game.storiesGame import StoriesGame
 
 from server.gameManager import StoriesGameManager, Game, GameInfo, CardInfo, PlayerInfo, GameID, DrawInfo
+from server.gameManager import CommandBatch, BatchResult
 from server.playerManager import StoriesPlayer, StoriesPlayerManager
+from game.mongoClientRegistry import MongoClientRegistry
+from server.shardRouter import ShardRoutingMiddleware
+from server.gameEventStream import GameEventStream
+from game.gameSerializer import GameSerializer
 
 gameManager = StoriesGameManager()
 playerManager = StoriesPlayerManager()
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app:FastAPI):
+    """The shared MongoDB clients and the game command executor live as long as the app
+    """
+    MongoClientRegistry.get_client()
+    MongoClientRegistry.get_async_client()
+    sweeper = asyncio.create_task(sweep_games())
+    rebalancer = None
+    if gameManager.shard_router is not None:
+        await asyncio.to_thread(gameManager.shard_router.register)
+        rebalancer = asyncio.create_task(rebalance_games())
+    yield
+    sweeper.cancel()
+    if rebalancer is not None:
+        rebalancer.cancel()
+        await asyncio.to_thread(gameManager.shard_router.unregister)
+    await asyncio.to_thread(gameManager.executor.shutdown)
+    await asyncio.to_thread(gameManager.games.hibernate_all)
+    await MongoClientRegistry.aclose()
+
+async def sweep_games():
+    """Periodically hibernates idle games
+    """
+    while True:
+        await asyncio.sleep(gameManager.games.sweep_interval)
+        await asyncio.to_thread(gameManager.games.sweep)
+
+async def rebalance_games():
+    """Keeps this shard registered and hibernates games that have moved to another shard
+    """
+    while True:
+        await asyncio.sleep(gameManager.shard_router.refresh_interval)
+        await asyncio.to_thread(gameManager.shard_router.coordinator.register, gameManager.shard_router.shard_id, gameManager.shard_router.url)
+        await asyncio.to_thread(gameManager.rebalance_games)
+
+def json_response(content, status_code:int=status.HTTP_200_OK)->Response:
+    """Serializes the dict result of a game command once, with orjson if it is installed.
+    """
+    body = GameSerializer.dumpb(content)
+    return Response(content=body, status_code=status_code, media_type="application/json")
+
+def conditional_response(etag:str|None, content)->Response:
+    """The response to a conditional GET: 304 Not Modified if the content is None, otherwise the content with its ETag.
+        If the ETag is None, there is no such game and the content is returned as is.
+    """
+    if etag is None:
+        return json_response(content)
+    if content is None:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag" : etag})
+    response = json_response(content)
+    response.headers["ETag"] = etag
+    return response
+
+app = FastAPI(lifespan=lifespan)
+if gameManager.shard_router is not None:
+    # requests for games owned by another shard are forwarded to it
+    app.add_middleware(ShardRoutingMiddleware, router=gameManager.shard_router)
 
 @app.get("/")
 def hello_world():
     return "Welcome to Stories!"
 
 @app.get("/info/{initials}", status_code=200)
-def info(initials:str, response: Response)->StoriesPlayer:
-    playerinfo = playerManager.getUserByInitials(initials)
+async def info(initials:str, response: Response)->StoriesPlayer:
+    playerinfo = await playerManager.getUserByInitialsAsync(initials)
     if playerinfo is None:
         response.status_code = status.HTTP_404_NOT_FOUND
     return playerinfo
 
 @app.post("/player/",  status_code=201)
-def create_player(player:StoriesPlayer)->StoriesPlayer:
+async def create_player(player:StoriesPlayer)->StoriesPlayer:
     print(player)
-    return playerManager.create_player(player)
+    return await playerManager.create_player_async(player)
 
 @app.post("/add/", status_code=200)
-def add_player(playerInfo:PlayerInfo)->PlayerInfo:
+async def add_player(playerInfo:PlayerInfo)->PlayerInfo:
     """Adds an existing player to a given game
     """
-    return gameManager.add_player_to_game(playerInfo)
+    return await gameManager.add_player_to_game_async(playerInfo)
+
+@app.post("/add_players/", status_code=200)
+async def add_players(playerInfos:List[PlayerInfo])->List[PlayerInfo]:
+    """Adds several existing players to a given game in one call, dealing all their hands at once
+    """
+    return await gameManager.add_players_to_game_async(playerInfos)
 
-@app.post('/create/', status_code=201)
-def createGame(gameInfo:GameInfo, response: Response)->Game:
+@app.post('/create/', status_code=201, response_model_exclude={"seed"})
+async def createGame(gameInfo:GameInfo, response: Response)->Game:
     """Create a new StoriesGame and returns the server Game instance
     """
-    theGame = gameManager.create_game(gameInfo)
+    theGame = await gameManager.create_game_async(gameInfo)
     if theGame.errorNumber != 0:
         response.status_code = status.HTTP_404_NOT_FOUND
         response.body = theGame.errorText
     return theGame
 
 @app.get("/game/{gameId}", status_code=200)
-def getGame(gameId:str, response:Response):
-    game = gameManager.get_game(gameId)
+async def getGame(gameId:str, response:Response):
+    game = await gameManager.executor.run_async(gameId, gameManager.get_game, gameId)
     if game is None:
         response.status_code = status.HTTP_404_NOT_FOUND
+    else:
+        game.pop("seed", None)    # the seed predicts every draw, it is only kept in the persisted Game
     return game
 
 @app.get("/status/{gameId}", status_code=200)
-def getGameStatus(gameId:str, response:Response):
-    game_status = gameManager.get_game_status(gameId)
-    print(f"game_status: {game_status}")
-    if game_status is None:
-        response.status_code = status.HTTP_404_NOT_FOUND
-    return game_status
+async def getGameStatus(gameId:str, since:int|None=None, if_none_match:str|None=Header(default=None)):
+    """The game status, or 304 if it matches the If-None-Match ETag.
+        With ?since=<version> only what changed since that status version is returned, if it is known.
+    """
+    etag,game_status = await gameManager.executor.run_async(gameId, gameManager.get_game_status_if_changed, gameId, if_none_match, since)
+    return conditional_response(etag, game_status)
 
 @app.get("/list/{gameId}/{initials}", status_code=200)
-def list_cards(gameId, initials:str,  response:Response):
-    cards = gameManager.list_cards(gameId, initials)
-    if cards is None:
-        response.status_code = status.HTTP_404_NOT_FOUND
-    return cards
+async def list_cards(gameId, initials:str):
+    cards = await gameManager.executor.run_async(gameId, gameManager.list_cards, gameId, initials)
+    status_code = status.HTTP_404_NOT_FOUND if cards is None else status.HTTP_200_OK
+    return json_response(cards, status_code=status_code)
 
 @app.post('/play/', status_code=201)
-def play_card(card_info:CardInfo):
-    result = gameManager.play_card(card_info.game_id, card_info.card_number, card_info.action_args)
+async def play_card(card_info:CardInfo):
+    result = await gameManager.executor.run_async(card_info.game_id, gameManager.play_card, card_info.game_id, card_info.card_number, card_info.action_args)
     return result
 
 @app.get('/draw/{gameId}/{initials}', status_code=200)
-def draw_card(gameId, initials:str,  response:Response):
-    card = gameManager.draw_card(gameId, initials)
+async def draw_card(gameId, initials:str,  response:Response):
+    card = await gameManager.executor.run_async(gameId, gameManager.draw_card, gameId, initials)
     return card
 
 @app.post("/draw/", status_code=201)
-def draw_type(drawInfo:DrawInfo):
-    card = gameManager.draw_card_type(drawInfo)
+async def draw_type(drawInfo:DrawInfo):
+    card = await gameManager.executor.run_async(drawInfo.game_id, gameManager.draw_card_type, drawInfo)
     return card
 
 @app.get('/discard/{gameId}/{initials}/{card_number}', status_code=200)
-def discard(gameId, initials:str, card_number:int, response:Response):
-    result_code,message = gameManager.discard_card(gameId, initials, card_number)
+async def discard(gameId, initials:str, card_number:int, response:Response):
+    result_code,message = await gameManager.executor.run_async(gameId, gameManager.discard_card, gameId, initials, card_number)
     if result_code > 0:
         response.status_code = status.HTTP_404_NOT_FOUND
     return message
 
 @app.get("/read/{gameId}/{initials}", status_code=200)
-def read_story(gameId, initials:str,  response:Response):
-    thestory = gameManager.read_story(gameId, initials)
-    return thestory
+async def read_story(gameId, initials:str, since:int|None=None, if_none_match:str|None=Header(default=None)):
+    """A player's story, or 304 if it matches the If-None-Match ETag.
+        With ?since=<version> only the lines that changed since that story version are returned.
+    """
+    etag,thestory = await gameManager.executor.run_async(gameId, gameManager.read_story_if_changed, gameId, initials, if_none_match, since)
+    return conditional_response(etag, thestory)
+
+@app.get("/events/{gameId}", status_code=200)
+async def stream_events(gameId:str, offset:int|None=None, last_event_id:str|None=Header(default=None)):
+    """The game's events as server-sent events, instead of polling /status, /read and /list.
+        To resume, give the offset of the last event received with ?offset=<offset>
+        or the Last-Event-ID header, which browsers send when they reconnect.
+    """
+    bus = await gameManager.executor.run_async(gameId, gameManager.get_event_bus, gameId)
+    if bus is None:
+        return json_response({"error_code" : 1, "message" : f"invalid GameId: {gameId}"}, status_code=status.HTTP_404_NOT_FOUND)
+    stream = gameManager.open_event_stream(bus, offset if offset is not None else last_event_id)
+    async def event_source():
+        try:
+            async for event in stream.events():
+                yield GameEventStream.to_SSE(event)
+        finally:
+            stream.close()
+    return StreamingResponse(event_source(), media_type="text/event-stream", headers={"Cache-Control" : "no-cache", "X-Accel-Buffering" : "no"})
+
+@app.websocket("/events/{gameId}/ws")
+async def websocket_events(websocket:WebSocket, gameId:str, offset:int|None=None):
+    """The game's events as JSON WebSocket messages. To resume, give the offset of the last event received with ?offset=<offset>
+    """
+    bus = await gameManager.executor.run_async(gameId, gameManager.get_event_bus, gameId)
+    if bus is None:
+        await websocket.close(code=1008, reason=f"invalid GameId: {gameId}")
+        return
+    await websocket.accept()
+    stream = gameManager.open_event_stream(bus, offset)
+    try:
+        async for event in stream.events():
+            if event is None:
+                await websocket.send_text(GameSerializer.dumps({"type" : "heartbeat", "offset" : stream.last_offset}))
+            else:
+                await websocket.send_text(event.to_JSON())
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        stream.close()
 
 @app.put("/next/", status_code=201)
-def nextPlayer(gameID:GameID):
-    return gameManager.next_player(gameID)
+async def nextPlayer(gameID:GameID):
+    return await gameManager.executor.run_async(gameID.game_id, gameManager.next_player, gameID)
+
+@app.post("/commands/", status_code=200)
+async def execute_commands(batch:CommandBatch, response:Response)->BatchResult:
+    """Executes an ordered list of commands for a game, for example a whole turn, in one request.
+        No other command for the game runs until the batch is done.
+    """
+    batch_result = await gameManager.executor.run_async(batch.game_id, gameManager.execute_commands, batch)
+    if batch_result.executed == 0 and batch_result.return_code != 0:
+        response.status_code = status.HTTP_404_NOT_FOUND
+    return batch_result
 
 @app.post("/end/", status_code=201)
-def endGame(gameID:GameID):
-    return gameManager.end_game(gameID)
+async def endGame(gameID:GameID):
+    return await gameManager.end_game_async(gameID)
+
+@app.get("/metrics/db", status_code=200)
+def get_db_metrics():
+    """MongoDB connection pool metrics
+    """
+    return MongoClientRegistry.get_pool_metrics()
+
+@app.get("/metrics/games", status_code=200)
+def get_game_metrics():
+    """Game hibernation and restore statistics
+    """
+    return gameManager.get_game_stats()
+
+@app.get("/metrics/commands", status_code=200)
+def get_command_metrics():
+    """Command queue depth and wait times, summarized over all games
+    """
+    return gameManager.get_command_stats()
+
+@app.get("/metrics/commands/{gameId}", status_code=200)
+def get_game_command_metrics(gameId:str):
+    """Command queue depth and wait times of a game
+    """
+    return gameManager.get_command_stats(gameId)
+
+@app.get("/metrics/shards", status_code=200)
+def get_shard_metrics():
+    """This shard's id, the shard members and the number of requests handled locally and forwarded
+    """
+    return gameManager.get_shard_stats()
+
+@app.get("/metrics/events", status_code=200)
+def get_event_metrics():
+    """The number of games with event logs and of event stream subscribers
+    """
+    return gameManager.get_event_stats()
+
+@app.get("/metrics/events/{gameId}", status_code=200)
+def get_game_event_metrics(gameId:str):
+    """The event log offset and number of event stream subscribers of a game
+    """
+    return gameManager.get_event_stats(gameId)
 
 @app.get("/help/{game_id}")
-def get_general_help(game_id):
-    return gameManager.get_help(game_id)
+async def get_general_help(game_id):
+    return await gameManager.executor.run_async(game_id, gameManager.get_help, game_id)
 
 @app.get("/help/{game_id}/{card_or_command}")
-def get_help(game_id, card_or_command:str):
-    return gameManager.get_help(game_id, card_or_command)
+async def get_help(game_id, card_or_command:str):
+    return await gameManager.executor.run_async(game_id, gameManager.get_help, game_id, card_or_command)
 
 @app.get("/help/{game_id}/{card_or_command}/{action_type}")
-def get_action_help(game_id, card_or_command:str, action_type:str):
-    return gameManager.get_help(game_id, card_or_command, action_type)
+async def get_action_help(game_id, card_or_command:str, action_type:str):
+    return await gameManager.executor.run_async(game_id, gameManager.get_help, game_id, card_or_command, action_type)
 
 
 
@@ -5,8 +5,13 @@ from .__version__ import __author__, __author_email__, __license__
 from .__version__ import __copyright__
 
 __all__ = [
+    'cardCatalog',
     'cardDeck',
+    'cardPack',
+    'cardRenderer',
+    'cardStore',
     'chatManager',
+    'commandRegistry',
     'commandResult',
     'conversionUtils',
     'dataManager',
@@ -14,8 +19,12 @@ __all__ = [
     'gameConstants',
     'storiesGameEngine',
     'gameEngineCommands',
+    'gameEventBus',
     'gameParameters',
+    'gameRandom',
     'gameRunner',
+    'gameSerializer',
+    'gameSnapshot',
     'gameState',
     'gameUtils',
     'gptProvider',
@@ -23,6 +32,7 @@ __all__ = [
     'openAIGPTProvider',
     'promptRunner',
     'logger',
+    'mongoClientRegistry',
     'player',
     'storiesObject',
     'storiesGame',
@@ -32,20 +42,28 @@ __all__ = [
     'storyCardLoader',
     'team'
 ]
+from .gameSerializer import GameSerializer, SerializerSchema
 from .storiesObject import StoriesObject
 from .gameConstants import GameConstants, GameParametersType, GenreFilenames
 from .gameConstants import GenreType, CardType, ActionType
 from .environment import Environment
+from .mongoClientRegistry import MongoClientRegistry, PoolMetrics
 
+from .cardStore import CardStore
 from .storyCard import StoryCard
 from .cardDeck import CardDeck
+from .cardPack import CardPack
+from .cardRenderer import CardRenderer
 from .storyCardHand import StoryCardHand
 from .storyCardList import StoryCardList
 from .commandResult import CommandResult
+from .commandRegistry import CommandRegistry, CommandSpec
 
 from .storiesGameEngine import StoriesGameEngine
 from .gameEngineCommands import GameEngineCommands
+from .gameEventBus import GameEventBus, GameEvent
 from .gameParameters import GameParameters
+from .gameRandom import GameRandom
 from .gameRunner import GameRunner
 from .gameState import GameState
 from .gameUtils import GameUtils
@@ -55,6 +73,8 @@ from .logger import Logger
 from .conversionUtils import ConversionUtils
 from .dataManager import DataManager
 from .storyCardLoader import StoryCardLoader
+from .cardCatalog import CardCatalog
+from .gameSnapshot import GameSnapshot
 
 from .storiesGame import StoriesGame
 from .chatManager import ChatManager
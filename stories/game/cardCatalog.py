@@ -0,0 +1,273 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+
+from game.gameConstants import GenreType, GameParametersType, CardType
+from game.gameParameters import GameParameters
+from game.commandResult import CommandResult
+from game.environment import Environment
+from game.dataManager import DataManager
+from game.storyCard import StoryCard
+from game.cardStore import CardStore
+from game.storyCardLoader import StoryCardLoader
+from game.cardDeck import CardDeck
+from game.gameRandom import GameRandom
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List, Tuple
+import copy, hashlib, json
+
+class CardCatalog(object):
+    """A read-only catalog of every story card for a given (source, genre, game_parameters_type)
+        along with the game parameters and story card template they were loaded with.
+
+        Catalogs are loaded once per process and shared by all games. The card attributes are stored
+        in a CardStore and the StoryCard instances in a catalog are views of it. They are never modified,
+        character names are replaced by a game's CharacterAlias when the cards are rendered:
+        each game gets a CardDeck that is a cheap per-game view of the catalog (arrays of the numbers of
+        the cards selected for the game, the cards not yet drawn, and active flags).
+        A card's number is its index in the catalog.
+
+        Every load is assigned a new version number, which is local to the process. A catalog also has a digest,
+        a hash of its cards and story card template that is the same in every process loading the same data,
+        so a game saved by one process can be restored by another, see get_catalog_digest().
+        If the genre data changes, invalidate() or reload() the affected catalogs. Games already in progress keep
+        the catalog they were created with.
+    """
+    MAX_SUPERSEDED = 4    # the number of reloaded or invalidated catalogs kept for restoring hibernated games
+
+    _catalogs:Dict[Tuple[str,GenreType,GameParametersType], "CardCatalog"] = {}
+    _superseded:OrderedDict[str, "CardCatalog"] = OrderedDict()    # reloaded or invalidated catalogs by digest, oldest first
+    _lock = Lock()         # guards _catalogs, _superseded and _version
+    _load_lock = Lock()    # serializes loading so a catalog is loaded only once
+    _version = 0    # last version number assigned
+
+    def __init__(self, source:str, genre:GenreType, game_parameters_type:GameParametersType, version:int,\
+                 game_parameters:dict, story_card_template:dict, cards:List[StoryCard]):
+        """Use CardCatalog.get_catalog() rather than this constructor
+        """
+        self._source = source
+        self._genre = genre
+        self._game_parameters_type = game_parameters_type
+        self._version = version
+        self._game_parameters = game_parameters        # the raw parameters dict, copied for each game
+        self._story_card_template = story_card_template
+        #
+        # the card attributes are stored once in a CardStore, the catalog cards are views of it
+        #
+        self._store = CardStore.from_cards(genre, cards, character_names=True)
+        self._cards:Tuple[StoryCard] = tuple(StoryCard.view(self._store, index, card.number) for index,card in enumerate(cards))
+        #
+        # catalog indexes of the cards of each CardType
+        #
+        cards_by_type:Dict[CardType,List[int]] = {ct : [] for ct in CardType}
+        for card in self._cards:
+            cards_by_type[card.card_type].append(card.number)
+        self._cards_by_type:Dict[CardType,Tuple[int]] = {ct : tuple(indexes) for ct,indexes in cards_by_type.items()}
+        self._maximum_counts:Dict[str,int] = {c["card_type"] : c["maximum_count"] for c in story_card_template["card_types"]}
+        digest = hashlib.blake2b(self._store.digest().encode("ascii"), digest_size=16)
+        digest.update(json.dumps(story_card_template, sort_keys=True).encode("utf-8"))
+        self._digest = digest.hexdigest()
+
+    @property
+    def key(self)->Tuple[str,GenreType,GameParametersType]:
+        return (self._source, self._genre, self._game_parameters_type)
+
+    @property
+    def source(self)->str:
+        return self._source
+
+    @property
+    def genre(self)->GenreType:
+        return self._genre
+
+    @property
+    def game_parameters_type(self)->GameParametersType:
+        return self._game_parameters_type
+
+    @property
+    def version(self)->int:
+        return self._version
+
+    @property
+    def digest(self)->str:
+        """A hash of the cards and the story card template, the same in every process that loads the same data
+        """
+        return self._digest
+
+    @property
+    def story_card_template(self)->dict:
+        """The story card template. This is shared by all games and must not be modified.
+        """
+        return self._story_card_template
+
+    @property
+    def store(self)->CardStore:
+        """The CardStore with the attributes of the catalog cards. The index of a card is its number.
+        """
+        return self._store
+
+    @property
+    def cards(self)->Tuple[StoryCard]:
+        return self._cards
+
+    @property
+    def cards_by_type(self)->Dict[CardType,Tuple[int]]:
+        return self._cards_by_type
+
+    @property
+    def maximum_counts(self)->Dict[str,int]:
+        """The maximum number of cards of each card type ("Title", "Story" etc.) dealt into a game deck
+        """
+        return self._maximum_counts
+
+    def size(self)->int:
+        return len(self._cards)
+
+    def get_card(self, number:int)->StoryCard|None:
+        return self._cards[number] if 0 <= number < len(self._cards) else None
+
+    def new_game_parameters(self)->GameParameters:
+        """Returns a new GameParameters instance for a game.
+            Each game gets its own copy since parameters can be changed with the 'set' command.
+        """
+        return GameParameters(copy.deepcopy(self._game_parameters))
+
+    def new_card_deck(self, alias:dict=None, rng:GameRandom=None)->CardDeck:
+        """Creates the per-game CardDeck view of this catalog
+            Arguments:
+                alias - the game's character_alias dict or None
+                rng - the game's GameRandom, default is a new randomly seeded GameRandom
+        """
+        return CardDeck(self.genre, self, alias=alias, rng=rng)
+
+    @staticmethod
+    def _make_key(source:str, genre:GenreType|str, game_parameters_type:GameParametersType|str)->Tuple[str,GenreType,GameParametersType]:
+        genre_type = genre if isinstance(genre, GenreType) else GenreType[genre.upper()]
+        gp_type = game_parameters_type if isinstance(game_parameters_type, GameParametersType) else GameParametersType[game_parameters_type.upper()]
+        return (source, genre_type, gp_type)
+
+    @staticmethod
+    def load(source:str, genre:GenreType|str, game_parameters_type:GameParametersType|str)->CommandResult:
+        """Loads a new CardCatalog from the given source. This does not add it to the process-wide catalogs.
+            Arguments:
+                source - 'text' or 'mongo'
+                genre - the GenreType or genre name
+                game_parameters_type - the GameParametersType or its value: "test", "prod", "custom"
+            Returns: a CommandResult. If successful the CardCatalog is in the result properties with the key "catalog"
+        """
+        source, genre_type, gp_type = CardCatalog._make_key(source, genre, game_parameters_type)
+        data_manager = DataManager(source, gp_type.value, genre_type.value)
+        if not data_manager.active:
+            return CommandResult(CommandResult.ERROR, f"Unable to load the {genre_type.value} card catalog from {source}")
+
+        result = data_manager.load_parameters(source, gp_type.value)
+        if result.is_successful():
+            result = data_manager.load_story_card_template(source, genre_type, gp_type.value)
+        if not result.is_successful():
+            return result
+        #
+        # load every card of each type. The cards dealt into each game are selected by the CardDeck
+        #
+        resource_folder = Environment.get_environment().get_resource_folder()
+        game_parameters = data_manager.game_parameters
+        loader = StoryCardLoader(source, genre_type, game_parameters, resource_folder, data_manager.story_card_template, sample=False)
+        result = loader.load_cards()
+        if result.is_successful():
+            with CardCatalog._lock:
+                CardCatalog._version += 1
+                version = CardCatalog._version
+            catalog = CardCatalog(source, genre_type, gp_type, version, game_parameters.game_parameters, \
+                                  data_manager.story_card_template, loader.deck_cards)
+            result.properties = {"catalog" : catalog, "count" : catalog.size(), "version" : version}
+            result.message = f"{catalog.size()} cards loaded for {genre_type.value} {gp_type.value} catalog, version {version}"
+        return result
+
+    @staticmethod
+    def get_catalog(source:str, genre:GenreType|str, game_parameters_type:GameParametersType|str)->"CardCatalog":
+        """Gets the shared CardCatalog for a source, genre and game parameters type, loading it on first use.
+            Raises a ValueError if the catalog could not be loaded.
+        """
+        key = CardCatalog._make_key(source, genre, game_parameters_type)
+        catalog = CardCatalog._catalogs.get(key)
+        if catalog is None:
+            with CardCatalog._load_lock:
+                catalog = CardCatalog._catalogs.get(key)
+                if catalog is None:
+                    result = CardCatalog.load(*key)
+                    if not result.is_successful():
+                        raise ValueError(result.message)
+                    catalog = result.properties["catalog"]
+                    with CardCatalog._lock:
+                        CardCatalog._catalogs[key] = catalog
+        return catalog
+
+    @staticmethod
+    def reload(source:str, genre:GenreType|str, game_parameters_type:GameParametersType|str)->CommandResult:
+        """Reloads a catalog, for example after the genre data has changed, and replaces the shared instance.
+            Returns: the CommandResult of the load. The shared catalog is not replaced if the load fails.
+        """
+        key = CardCatalog._make_key(source, genre, game_parameters_type)
+        result = CardCatalog.load(*key)
+        if result.is_successful():
+            catalog = result.properties["catalog"]
+            with CardCatalog._lock:
+                superseded = CardCatalog._catalogs.get(key)
+                if superseded is not None and superseded.digest != catalog.digest:
+                    CardCatalog._supersede(superseded)
+                CardCatalog._catalogs[key] = catalog
+        return result
+
+    @staticmethod
+    def _supersede(catalog:"CardCatalog"):
+        """Keeps a catalog that was reloaded or invalidated, dropping the oldest after MAX_SUPERSEDED.
+            Called with the _lock held.
+        """
+        CardCatalog._superseded[catalog.digest] = catalog
+        CardCatalog._superseded.move_to_end(catalog.digest)
+        while len(CardCatalog._superseded) > CardCatalog.MAX_SUPERSEDED:
+            CardCatalog._superseded.popitem(last=False)
+
+    @staticmethod
+    def get_catalog_digest(source:str, genre:GenreType|str, game_parameters_type:GameParametersType|str, digest:str)->"CardCatalog":
+        """Gets the catalog with a given digest, for example the catalog a hibernated game was created with.
+            This is the shared catalog if its content is the same. The last MAX_SUPERSEDED catalogs
+            that have been reloaded or invalidated are kept so games using them can be restored.
+            Raises a ValueError if no such catalog is available.
+        """
+        catalog = CardCatalog.get_catalog(source, genre, game_parameters_type)
+        if catalog.digest != digest:
+            with CardCatalog._lock:
+                catalog = CardCatalog._superseded.get(digest)
+            if catalog is None or catalog.key != CardCatalog._make_key(source, genre, game_parameters_type):
+                raise ValueError(f"Card catalog {digest} is not available for {source} {genre} {game_parameters_type}")
+        return catalog
+
+    @staticmethod
+    def invalidate(source:str=None, genre:GenreType|str=None, game_parameters_type:GameParametersType|str=None)->int:
+        """Removes shared catalogs so they are reloaded on next use.
+            Arguments that are None match every catalog, so invalidate() with no arguments removes all of them.
+            Returns: the number of catalogs removed
+        """
+        genre_type = genre if genre is None or isinstance(genre, GenreType) else GenreType[genre.upper()]
+        gp_type = game_parameters_type if game_parameters_type is None or isinstance(game_parameters_type, GameParametersType) \
+                  else GameParametersType[game_parameters_type.upper()]
+        with CardCatalog._lock:
+            keys = [k for k in CardCatalog._catalogs if (source is None or k[0] == source) and \
+                    (genre_type is None or k[1] is genre_type) and (gp_type is None or k[2] is gp_type)]
+            for key in keys:
+                CardCatalog._supersede(CardCatalog._catalogs.pop(key))
+        return len(keys)
+
+    @staticmethod
+    def catalogs()->Dict[Tuple[str,GenreType,GameParametersType], "CardCatalog"]:
+        """Returns a copy of the currently loaded catalogs
+        """
+        with CardCatalog._lock:
+            return dict(CardCatalog._catalogs)
+
+    def __str__(self)->str:
+        return f"CardCatalog {self._source} {self._genre.value} {self._game_parameters_type.value} version {self._version}: {self.size()} cards"
@@ -3,91 +3,132 @@ Created on Dec 9, 2023
 
 @author: don_bacon
 '''
-import json
 from game.storiesObject import StoriesObject
+from game.gameSerializer import GameSerializer
 from game.storyCard import StoryCard
+from game.characterAlias import CharacterAlias
 from game.gameUtils import GameUtils
+from game.gameRandom import GameRandom
 from game.gameConstants import GenreType, CardType, ActionType
 
 from typing import List, Dict
+from array import array
+from bisect import bisect_left
 
 class CardDeck(StoriesObject):
     """Class representing a deck of game cards a player draws or is given.
     
     """
 
-    def __init__(self, genre:GenreType, story_card_template:dict, alias:dict=None):
+    def __init__(self, genre:GenreType, catalog, alias:dict=None, rng:GameRandom=None):
         '''
         CardDeck constructor
         Arguments:
             genre - the GenreType
-            story_card_template - a dict consisting of a story_card_template and all the loaded StoryCards
+            catalog - the shared CardCatalog this deck is dealt from
             alias - character_alias dict or None
+            rng - the game's GameRandom used to select, shuffle and draw the cards. Default is a new randomly seeded GameRandom.
+        A CardDeck is the per-game view of a CardCatalog: the numbers of a random selection of up to maximum_count
+        catalog cards of each CardType (all the Action cards), piles of the cards not yet drawn, and active flags,
+        all stored as arrays. The StoryCards themselves belong to the catalog and are shared by every game.
         '''
         #
         #
+        story_card_template = catalog.story_card_template
+        self._catalog = catalog
+        self._genre = genre
         self._deck = story_card_template
         self._story_card_template = story_card_template
-        self._deck_cards:List[StoryCard] =  story_card_template["cards"]    # only the deck StoryCards
         self._card_types_list:List[str] = story_card_template["card_types_list"]
         self._card_types = story_card_template["card_types"]
         self._card_type_counts = {}
+        self._type_indexes:Dict[str,range] = {}    # the deck indexes of each CardType value
         self._commands = story_card_template["commands"]
         self._command_details = story_card_template["command_details"]
-        
-        #
-        # count the cards and CardTypes
-        #
-        total_count = 0
-        for ct in self._card_types:    # List[Dict]  all CardTypes including ActionCards
-            count = ct["maximum_count"]
-            self._card_type_counts[ct["card_type"]] = count
-            total_count += count
-        self._ncards = total_count
+        self._catalog_cards = catalog.cards
+        self._rng = rng if rng is not None else GameRandom()
         #
-        # replace character names with alias
+        # character names are replaced with their alias when the cards are rendered
         #
         self.character_alias = alias if alias is not None else {}
+        self._deck_numbers = self._select_cards()    # catalog numbers of the deck cards
+        self._ncards = len(self._deck_numbers)
                 
         self._deck_name = genre.value
-        self._cards_index = GameUtils.shuffle(self.size())    # returns an empty list if size==0
-        self._next_index = 0
-        self._next_card_number = self._ncards
+        self._active = bytearray(b'\x01') * self._ncards    # active flag for each deck card
+        self._undealt = bytearray(self._ncards)              # 1 if the deck card is in a pile waiting to be drawn
+        self._piles:Dict[str,array] = {}                     # deck indexes of the undealt cards by CardType value
+        self._remaining:Dict[str,int] = {}                   # the number of undealt active cards of each CardType value
+        self._total_remaining = 0
+        self._type_queues:Dict[str,array] = None      # shuffled undealt deck indexes by CardType value, created by draw_type
+        self._action_queues:Dict[str,array] = None    # shuffled undealt Action card deck indexes by ActionType value
+        self.shuffle()
+        self._next_card_number = catalog.size()    # numbers of new cards (for example COMPOSE) follow the catalog card numbers
     
+    def _select_cards(self)->array:
+        """Selects the cards for this deck: a random sample of maximum_count catalog cards
+            of each story element CardType and all the Action cards, grouped by CardType and in catalog order within a type.
+        """
+        maximum_counts = self._catalog.maximum_counts
+        selected:List[int] = []
+        for card_type,indexes in self._catalog.cards_by_type.items():
+            count = len(indexes) if card_type is CardType.ACTION else min(len(indexes), maximum_counts.get(card_type.value, len(indexes)))
+            self._type_indexes[card_type.value] = range(len(selected), len(selected) + count)
+            selected.extend(sorted(indexes[i] for i in GameUtils.shuffle(len(indexes), self._rng)[:count]))
+            self._card_type_counts[card_type.value] = count
+        return array('i', selected)
         
-    def shuffle(self) -> List[int]:
-        """ Returns a random sample of the integers from 0 to size-1, where size is the #cards in the deck
-            @see GameUtils.shuffle()
+    def shuffle(self, card_types:List[str]=None):
+        """Starts a new pass through the deck: the active cards of each CardType are put back in its pile.
+            Cards are drawn from a random position in the pile, so the piles don't need to be shuffled.
+            Arguments:
+                card_types - the CardType values of the piles to refill, default is all of them.
+                             The undealt cards of the other piles are left as they are.
         """
-        self._cards_index = GameUtils.shuffle(self._size)
+        active = self._active
+        undealt = self._undealt
+        for card_type in (self._type_indexes.keys() if card_types is None else card_types):
+            pile = array('i', [ind for ind in self._type_indexes[card_type] if active[ind]])
+            for ind in pile:
+                undealt[ind] = 1
+            self._piles[card_type] = pile
+            self._total_remaining += len(pile) - self._remaining.get(card_type, 0)
+            self._remaining[card_type] = len(pile)
+        self._type_queues = None    # the draw_type queues are created again with the refilled piles
         
     def size(self)->int:
         """Returns the number of StoryCards in the main deck (deck_cards)
         """
-        return len(self._deck_cards)
+        return self._ncards
     
     @property
     def genre(self)->GenreType:
         return self._genre
     
     @property
-    def next_index(self):
-        return self._next_index
+    def remaining(self)->Dict[str,int]:
+        """The number of cards of each CardType value that can still be drawn in this pass through the deck
+        """
+        return dict(self._remaining)
     
-    @next_index.setter
-    def next_index(self, value):
-        self._next_index = value
+    @property
+    def rng(self)->GameRandom:
+        """The GameRandom of the game this deck belongs to
+        """
+        return self._rng
     
     @property
-    def cards_index(self):
-        return self._cards_index
+    def catalog(self):
+        """The CardCatalog this deck was created from
+        """
+        return self._catalog
     
-    @cards_index.setter
-    def cards_index(self, value):
-        self._cards_index = value
+    @property
+    def catalog_version(self)->int:
+        return self._catalog.version
     
     @property
-    def deck(self)->List[StoryCard]:
+    def deck(self)->dict:
         return self._deck
     
     @property
@@ -112,7 +153,14 @@ class CardDeck(StoriesObject):
     
     @property
     def deck_cards(self)->List[StoryCard]:
-        return self._deck_cards
+        catalog_cards = self._catalog_cards
+        return [catalog_cards[number] for number in self._deck_numbers]
+    
+    @property
+    def deck_numbers(self)->array:
+        """The catalog numbers of the deck cards
+        """
+        return self._deck_numbers
     
     @property
     def card_type_counts(self)->Dict[str,int]:
@@ -126,47 +174,34 @@ class CardDeck(StoriesObject):
     def character_alias(self, alias:dict|None):
         self._character_alias = alias
         #
-        # replace the names in all the story cards
+        # the CharacterAlias and its rendered texts are shared by all games with the same aliases
         #
-        if alias is not None:
-            for card in self.deck_cards:
-                card.text = CardDeck.replace_names(card.text, alias)
+        self._alias = CharacterAlias.get(alias)
+    
+    @property
+    def alias(self)->CharacterAlias|None:
+        """The CharacterAlias used to render the card texts, None if the game uses the standard character names
+        """
+        return self._alias
     
     def update_character_alias(self, names:List[str]):
-        # prior to update, character_alias = {'Michael': 'Don', 'Nick': 'Brian', 'Samantha': 'Cheryl', 'Vivian': 'Beth'} for example
         # characters - ['Michael', 'Nick', 'Samantha', 'Vivian']
-        # card.text character names are the character_alias
-        characters = self._deck["characters"]
+        # card texts have the character names, the new aliases apply the next time the cards are rendered
+        characters = CharacterAlias.CHARACTERS
         if len(names) == len(characters):
-            alias = {}
-            for ind in range(len(names)):
-                alias[self.character_alias[characters[ind]]] = names[ind]
-            self._character_alias = alias
+            self.character_alias = dict(zip(characters, names))
 
     def draw(self, omit_type:CardType=None)->StoryCard:
-        """Draw a card from the deck. If no cards remaining, re-shuffle and reset the next_index
+        """Draw a card from the deck.
             Arguments:
                 omit_type - if not None, this will omit drawing a story card of that type.
                     For example, if all players have played a Title, we don't want
                     to draw a card of that type. Same with Opening.
             Returns:
-                the next StoryCard.
-            Inactive StoryCards are skipped. When the last card is drawn,
-            the indexes are re-shuffled and the next_index is reset to 0.
+                a random StoryCard, or None if the deck has no active cards other than omit_type
+            @see draw_new()
         """
-        next_card = None
-        while next_card is None:
-            if self.next_index < self.size():    # draw the next card
-                nxt = self._cards_index[self.next_index]
-                next_card = self._deck_cards[nxt]
-                
-                self.next_index = self.next_index + 1
-                if (not next_card.active) or ( omit_type is not None and next_card.card_type is omit_type):
-                    next_card = None
-            else:
-                self.next_index = 0
-                self.shuffle()
-        return next_card
+        return self.draw_new([omit_type] if omit_type is not None else None)
     
     def draw_type(self, card_type:CardType, action_type:ActionType|None) -> StoryCard:
         """Draw a card of a specific type and ActionType if CardType is ACTION.
@@ -175,36 +210,42 @@ class CardDeck(StoriesObject):
                 card_type - the CardType to draw
                 action_type - if type_to_draw is CardType.ACTION, this is the ACTION_TYPE to draw
             Returns:
-                The specified StoryCard from the deck, or None if there are no remaining
-                cards of this type_to_draw/action_type
-            Notes This function does NOT change the value of next_index.
-            Also it does check if the drawn card is not active.
+                A random undealt StoryCard of this card_type/action_type from the deck, or None if there are no remaining
+                cards of this type_to_draw/action_type in this pass through the deck
+            Notes This function does NOT change the order of the main deck.
+            The card drawn is deactivated so it won't be drawn again.
+            Each CardType and ActionType has its own shuffled queue of the undealt deck indexes, created when
+            the piles are refilled, so a draw takes constant time.
         """
-        next_card = None
-        card = None
-        next_index = self.next_index
-        next_ind = self._cards_index[next_index]   # start looking through the deck at the next index
-        while next_ind < self.size():
-            card = self._deck_cards[next_ind]
-            if card.active:
-                if action_type is not None:
-                    if card.card_type is CardType.ACTION:
-                        if card.action_type is action_type:
-                            next_card = card
-                            break
-                        else:
-                            next_index += 1
-                            next_ind = self._cards_index[next_index]
-                elif card.card_type is card_type:
-                    next_card = card
-                    break
-
-            next_index += 1
-            next_ind = self._cards_index[next_index]
-                
-        if next_card is not None:    # remove from the deck by deactivating so it won't be drawn
-            next_card.active = False
-        return next_card
+        if self._type_queues is None:
+            self._create_type_queues()
+        queue = self._action_queues.get(action_type.value) if action_type is not None else self._type_queues.get(card_type.value)
+        undealt = self._undealt
+        while queue:
+            ind = queue.pop()
+            if undealt[ind]:    # else it was dealt, or drawn from the queue of its CardType or ActionType
+                undealt[ind] = 0
+                self._active[ind] = 0
+                card = self._catalog_cards[self._deck_numbers[ind]]
+                self._remaining[card.card_type.value] -= 1
+                self._total_remaining -= 1
+                return card
+        return None
+    
+    def _create_type_queues(self):
+        """Deals the indexes of the undealt deck cards in random order into a queue for each CardType,
+            and for the Action cards a queue for each ActionType.
+        """
+        self._type_queues = {}
+        self._action_queues = {}
+        undealt = self._undealt
+        for ind in GameUtils.shuffle(self.size(), self._rng):
+            if not undealt[ind]:
+                continue
+            card = self._catalog_cards[self._deck_numbers[ind]]
+            self._type_queues.setdefault(card.card_type.value, array('i')).append(ind)
+            if card.card_type is CardType.ACTION and card.action_type is not None:
+                self._action_queues.setdefault(card.action_type.value, array('i')).append(ind)
 
     def draw_new(self, types_to_omit:List[CardType]=None)->StoryCard:
         """Draw a card from the story card main deck, skipping the optional list of CardType to omit.
@@ -212,23 +253,44 @@ class CardDeck(StoriesObject):
                 types_to_omit - if not None, this will omit drawing a story card having a card_type in types_to_omit
                     For example, if all players have played a Title, we don't want
                     to draw a card of that type. Same with Opening.
+            Returns:
+                a random undealt StoryCard of a CardType that is not omitted,
+                or None if the deck has no active cards of those types.
+            Each pass through the deck deals every active card once. The CardType is picked in proportion
+            to the remaining counts and the card is picked at random from the pile of that type,
+            so cards of omitted types are not drawn and discarded, they stay in their pile.
+            When no undealt cards of the other types remain, only their piles are refilled for a new pass.
         """
-        next_card:StoryCard = None
-        while next_card is None:
-            if self.next_index < self.size():    # draw the next card
-                nxt = self._cards_index[self.next_index]
-                next_card = self._deck_cards[nxt]
-                if not next_card.active:    # skip it if not active
-                    continue
-                self.next_index = self.next_index + 1
-                if next_card.card_type in types_to_omit:
-                    # keep on drawing until we get a card whose card_type is not one to omit
-                    next_card = None
-            else:
-                self.next_index = 0
-                self.shuffle()
-                
-        return next_card
+        remaining = self._remaining
+        omitted = [card_type.value for card_type in types_to_omit] if types_to_omit else ()
+        total = self._total_remaining - sum(remaining[card_type] for card_type in omitted)
+        if total == 0:
+            self.shuffle([card_type for card_type in remaining.keys() if card_type not in omitted])
+            total = self._total_remaining - sum(remaining[card_type] for card_type in omitted)
+            if total == 0:
+                return None    # no active cards that are not omitted
+        rng = self._rng
+        pick = int(rng.random() * total)
+        for card_type,count in remaining.items():
+            if card_type not in omitted:
+                if pick < count:
+                    break
+                pick -= count
+        pile = self._piles[card_type]
+        undealt = self._undealt
+        while True:
+            # swap a random card of the pile with the last one and remove it
+            last = len(pile) - 1
+            pos = int(rng.random() * (last + 1))
+            ind = pile[pos]
+            pile[pos] = pile[last]
+            pile.pop()
+            if undealt[ind]:    # else it was drawn by draw_type
+                break
+        undealt[ind] = 0
+        remaining[card_type] -= 1
+        self._total_remaining -= 1
+        return self._catalog_cards[self._deck_numbers[ind]]
     
     def draw_cards(self, ncards:int)->List[StoryCard]:
         """Draw cards from this deck.
@@ -241,13 +303,61 @@ class CardDeck(StoriesObject):
         assert(ncards > 0)
         card_list = []
         for _ in range(ncards):
-            card_list.append(self.draw())
+            card = self.draw()
+            if card is None:
+                break
+            card_list.append(card)
         return card_list
     
     def deal(self, ncards:int)->List[StoryCard]:
         """Deal n-cards for a player
         """
         return self.draw_cards(ncards)
+
+    def deal_hands(self, nhands:int, ncards:int)->List[List[StoryCard]]:
+        """Deals the hands of several players at once.
+            Arguments:
+                nhands - the number of hands (players)
+                ncards - the number of cards in each hand
+            Returns:
+                a List of nhands List[StoryCard]. The cards are dealt round-robin, one to each hand in turn,
+                so if the deck runs out of active cards the last hands have one card less than the first ones.
+            The cards are drawn from the undealt cards of every type the same as draw_cards(nhands * ncards),
+            but in a single pass: a partial shuffle of the undealt deck indexes, then the piles are rebuilt once.
+        """
+        needed = nhands * ncards
+        drawn:List[int] = []
+        while len(drawn) < needed:
+            if self._total_remaining == 0:
+                self.shuffle()
+                if self._total_remaining == 0:
+                    break    # no active cards
+            drawn.extend(self._draw_indexes(needed - len(drawn)))
+        catalog_cards = self._catalog_cards
+        deck_numbers = self._deck_numbers
+        return [[catalog_cards[deck_numbers[ind]] for ind in drawn[hand::nhands]] for hand in range(nhands)]
+
+    def _draw_indexes(self, count:int)->List[int]:
+        """Draws up to count random undealt cards of every type from this pass through the deck.
+            Returns: the deck indexes of the cards drawn
+        """
+        undealt = self._undealt
+        indexes = [ind for pile in self._piles.values() for ind in pile if undealt[ind]]
+        count = min(count, len(indexes))
+        rng = self._rng
+        last = len(indexes)
+        for i in range(count):    # the drawn indexes are swapped to the start of the list
+            pos = i + int(rng.random() * (last - i))
+            indexes[i], indexes[pos] = indexes[pos], indexes[i]
+        drawn = indexes[:count]
+        for ind in drawn:
+            undealt[ind] = 0
+        for card_type,pile in self._piles.items():
+            pile = array('i', [ind for ind in pile if undealt[ind]])
+            self._piles[card_type] = pile
+            self._total_remaining -= self._remaining[card_type] - len(pile)
+            self._remaining[card_type] = len(pile)
+        return drawn
     
     
     @staticmethod
@@ -256,31 +366,57 @@ class CardDeck(StoriesObject):
             Arguments:
                 line - a line of text that may or may not reference a character name.
                 alias - a dict of character aliases. The len must be 4 (since there are 4 characters)
+            @see CharacterAlias
+        """
+        alias = CharacterAlias.get(aliases)
+        return alias.replace(line) if alias is not None else line
+    
+    def deactivate(self, cards:List[StoryCard])->int:
+        """Removes cards from the deck, for example the cards a player discards, so they are not dealt again.
+            Arguments:
+                cards - the StoryCards to deactivate. Cards that are not deck cards, for example new cards, are ignored.
+            Returns: the number of cards deactivated
         """
-        newline = line
-        if len(aliases) > 0:
-            for key in aliases.keys():
-                character = key
-                alias = aliases[key]
-                if character in line:
-                    newline = newline.replace(character, alias)
-        return newline
+        active = self._active
+        undealt = self._undealt
+        deck_numbers = self._deck_numbers
+        ncards = 0
+        for card in cards:
+            indexes = self._type_indexes.get(card.card_type.value)
+            if indexes is None:
+                continue
+            ind = bisect_left(deck_numbers, card.number, indexes.start, indexes.stop)    # deck numbers are sorted within a CardType
+            if ind < indexes.stop and deck_numbers[ind] == card.number and active[ind]:
+                active[ind] = 0
+                if undealt[ind]:
+                    undealt[ind] = 0
+                    self._remaining[card.card_type.value] -= 1
+                    self._total_remaining -= 1
+                ncards += 1
+        return ncards
+
+    def remaining_cards(self)->List[StoryCard]:
+        """Returns: the cards that can still be drawn in this pass through the deck, by CardType
+        """
+        catalog_cards = self._catalog_cards
+        return [catalog_cards[self._deck_numbers[ind]] for pile in self._piles.values() for ind in pile if self._undealt[ind]]
     
     def get_cards_by_type(self, card_type:str)->List[str]:
         cards = []
-        for story_card in self._deck_cards:
+        for story_card in self.deck_cards:
             if story_card.card_type.value.startswith(card_type):
-                cards.append(story_card.text)
+                cards.append(story_card.render(self._alias))
         return cards
     
     def get_story_cards_by_type(self,  card_type:str)->List[StoryCard]:
-        cards = [sc for sc in self._deck_cards if sc.card_type.value.startswith(card_type)]
+        cards = [sc for sc in self.deck_cards if sc.card_type.value.startswith(card_type)]
         return cards
     
     def _find_card_index(self, card_type:CardType, action_type:ActionType)->int:
         card = None
-        for ind in range(self.size()):   # story_card in self._deck_cards:
-            story_card = self.deck_cards[ind]
+        deck_cards = self.deck_cards
+        for ind in range(self.size()):
+            story_card = deck_cards[ind]
             if story_card.card_type is card_type:
                 if action_type is None or story_card.action_type is action_type:
                     card = story_card
@@ -308,11 +444,14 @@ class CardDeck(StoriesObject):
         self._next_card_number = num
     
     def to_dict(self):
-        cards = [x.to_dict() for x in self.deck_cards]
+        cards = [x.to_dict(self._alias) for x in self.deck_cards]
         deck_dict = {"cards" : cards}
         return deck_dict
     
     def to_JSON(self):
-        return json.dumps(self.to_dict(), indent=2)
+        return GameSerializer.dumps(self.to_dict(), indent=2)
+    
+    def __repr__(self)->str:
+        return f"CardDeck(genre={self._genre.value!r}, size={self._ncards})"
 
     
\ No newline at end of file
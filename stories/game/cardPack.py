@@ -0,0 +1,243 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+
+from game.gameConstants import GameConstants, GenreType, CardType
+from game.commandResult import CommandResult
+from game.environment import Environment
+from array import array
+from typing import Dict, List
+import argparse, mmap, os, struct, sys
+
+class CardPack(object):
+    """
+        A genre's story cards compiled into a single binary file, so loading the cards doesn't parse the genre text files.
+        The pack is built from the 5 genre text files with CardPack.build() or from the command line:
+            python -m game.cardPack --genre all
+        and is saved in the genre resource folder, for example resources/genres/horror/horror.pack.
+        The pack is memory-mapped and card texts are sliced from it as they are needed.
+        A pack is stale if any of its genre text files has been modified since the pack was built,
+        CardPack.open() then returns None and the text files are read instead.
+
+        Format (little-endian):
+            header:     b"STCP", format version (uint16), number of card types (uint16), number of cards (uint32),
+                        the latest modification time of the genre text files in nanoseconds (uint64)
+            type table: for each CardType, its code in CardStore.CARD_TYPES (uint8), 3 pad bytes,
+                        the index of its first card and its number of cards (uint32 each)
+            offsets:    number of cards + 1 offsets (uint32) of the card texts in the text blob
+            text blob:  the UTF-8 card texts, in card type order and in the order they appear in the text files
+    """
+    MAGIC = b"STCP"
+    FORMAT_VERSION = 1
+    _HEADER = struct.Struct("<4sHHIQ")
+    _TYPE_ENTRY = struct.Struct("<BxxxII")
+    _CARD_TYPES:List[CardType] = list(CardType)
+
+    def __init__(self, path:str):
+        """Opens and memory-maps a pack file.
+            Raises a ValueError if the file is not a card pack or its format is not supported.
+        """
+        self._path = path
+        with open(path, "rb") as fp:
+            self._mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        data = self._mmap
+        if len(data) < CardPack._HEADER.size:
+            self.close()
+            raise ValueError(f"Invalid card pack {path}")
+        magic, format_version, ntypes, ncards, self._source_mtime = CardPack._HEADER.unpack_from(data)
+        if magic != CardPack.MAGIC or format_version != CardPack.FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Invalid card pack {path}, format {format_version}")
+        offset = CardPack._HEADER.size
+        self._types:Dict[CardType,range] = {}    # the card indexes of each CardType
+        for _ in range(ntypes):
+            code, first, count = CardPack._TYPE_ENTRY.unpack_from(data, offset)
+            self._types[CardPack._CARD_TYPES[code]] = range(first, first + count)
+            offset += CardPack._TYPE_ENTRY.size
+        self._offsets = array('I')
+        self._offsets.frombytes(data[offset:offset + 4 * (ncards + 1)])
+        if sys.byteorder == "big":
+            self._offsets.byteswap()
+        self._blob = offset + 4 * (ncards + 1)    # position of the text blob
+        self._ncards = ncards
+
+    @staticmethod
+    def pack_path(genre:GenreType, resource_folder:str=None)->str:
+        """Returns: the path of a genre's pack, for example <resource folder>/genres/horror/horror.pack
+        """
+        resource_folder = Environment.get_environment().get_resource_folder() if resource_folder is None else resource_folder
+        return f"{resource_folder}/genres/{genre.value}/{genre.value}.pack"
+
+    @staticmethod
+    def source_paths(genre:GenreType, resource_folder:str)->Dict[CardType,str]:
+        """Returns: the path of the text file of each CardType of a genre
+        """
+        filenames = GameConstants.get_genre_filenames(genre)
+        return {card_type : f"{resource_folder}/genres/{genre.value}/{filename}" for card_type,filename in filenames.items()}
+
+    @staticmethod
+    def text_files_mtime(genre:GenreType, resource_folder:str)->int:
+        """Returns: the latest modification time of a genre's text files in nanoseconds
+        """
+        return max(os.stat(path).st_mtime_ns for path in CardPack.source_paths(genre, resource_folder).values())
+
+    @staticmethod
+    def read_story_file(filepath:str)->List[str]:
+        """Reads the card texts of a genre text file.
+            Blank lines and lines starting with "--" (comments) are skipped, a line ending with "\\" continues on the next line.
+            Returns: the card texts, each one ends with a newline
+        """
+        with open(filepath) as fp:
+            lines = []
+            continue_line = False
+            cline = ""
+            for line in fp:
+                line = line.lstrip().rstrip()    # delete left padding and trailing \n
+                if line=="" or line.startswith("--"):    # skip comment lines
+                    continue
+                if line.endswith('\\'):    # continues on next line
+                    line = line.removesuffix('\\')
+                    if continue_line:
+                        cline = f"{cline}\n{line}"
+                    else:
+                        continue_line = True
+                        cline = line
+                else:
+                    if continue_line:
+                        cline = f"{cline}\n{line}\n"
+                        lines.append(cline)
+                        continue_line = False
+                    else:
+                        lines.append(f"{line}\n")
+        return lines
+
+    @staticmethod
+    def compile(genre:GenreType, resource_folder:str)->bytes:
+        """Compiles a genre's text files.
+            Returns: the pack bytes
+        """
+        source_mtime = CardPack.text_files_mtime(genre, resource_folder)
+        type_table = bytearray()
+        offsets = array('I', [0])
+        blob = bytearray()
+        source_paths = CardPack.source_paths(genre, resource_folder)
+        for card_type,path in source_paths.items():
+            texts = CardPack.read_story_file(path)
+            type_table += CardPack._TYPE_ENTRY.pack(CardPack._CARD_TYPES.index(card_type), len(offsets) - 1, len(texts))
+            for text in texts:
+                blob += text.encode("utf-8")
+                offsets.append(len(blob))
+        if sys.byteorder == "big":
+            offsets.byteswap()
+        header = CardPack._HEADER.pack(CardPack.MAGIC, CardPack.FORMAT_VERSION, len(source_paths), len(offsets) - 1, source_mtime)
+        return header + bytes(type_table) + offsets.tobytes() + bytes(blob)
+
+    @staticmethod
+    def build(genre:GenreType, resource_folder:str=None, path:str=None)->CommandResult:
+        """Compiles a genre's text files and saves the pack.
+            Arguments:
+                genre - the GenreType
+                resource_folder - the base resource folder, default is the Environment resource folder
+                path - the pack file, default is CardPack.pack_path(genre)
+            Returns: a CommandResult, the pack path and number of cards are in the result properties
+        """
+        resource_folder = Environment.get_environment().get_resource_folder() if resource_folder is None else resource_folder
+        path = CardPack.pack_path(genre, resource_folder) if path is None else path
+        try:
+            data = CardPack.compile(genre, resource_folder)
+            temp_path = f"{path}.tmp"
+            with open(temp_path, "wb") as fp:
+                fp.write(data)
+            os.replace(temp_path, path)    # a pack being read is not overwritten
+        except OSError as ex:
+            return CommandResult(CommandResult.ERROR, f"Unable to build the {genre.value} card pack: {str(ex)}", exception=ex)
+        ncards = CardPack._HEADER.unpack_from(data)[3]
+        result = CommandResult(CommandResult.SUCCESS, f"{ncards} {genre.value} cards compiled to {path}, {len(data)} bytes")
+        result.properties = {"path" : path, "count" : ncards}
+        return result
+
+    @staticmethod
+    def open(genre:GenreType, resource_folder:str=None, path:str=None)->'CardPack|None':
+        """Opens a genre's pack.
+            Returns: the CardPack, or None if there is no pack, it is invalid, or it is older than the genre text files.
+        """
+        resource_folder = Environment.get_environment().get_resource_folder() if resource_folder is None else resource_folder
+        path = CardPack.pack_path(genre, resource_folder) if path is None else path
+        try:
+            pack = CardPack(path)
+        except (OSError, ValueError):
+            return None
+        try:
+            current = pack.source_mtime >= CardPack.text_files_mtime(genre, resource_folder)
+        except OSError:    # the text files are not available, the pack is all there is
+            current = True
+        if not current:
+            pack.close()
+            return None
+        return pack
+
+    @property
+    def path(self)->str:
+        return self._path
+
+    @property
+    def source_mtime(self)->int:
+        return self._source_mtime
+
+    @property
+    def card_types(self)->List[CardType]:
+        return list(self._types.keys())
+
+    def size(self)->int:
+        return self._ncards
+
+    def count(self, card_type:CardType)->int:
+        return len(self._types.get(card_type, ()))
+
+    def text(self, index:int)->str:
+        """Returns: the text of the card at an index of the pack
+        """
+        offsets = self._offsets
+        return self._mmap[self._blob + offsets[index]:self._blob + offsets[index + 1]].decode("utf-8")
+
+    def texts(self, card_type:CardType)->List[str]:
+        """Returns: the texts of the cards of a CardType, in the order they appear in the text file
+        """
+        indexes = self._types.get(card_type)
+        if not indexes:
+            return []
+        offsets = self._offsets
+        start = self._blob + offsets[indexes.start]
+        data = self._mmap[start:self._blob + offsets[indexes.stop]].decode("utf-8")
+        # slice the decoded texts by character position, UTF-8 offsets are byte positions
+        if len(data) == offsets[indexes.stop] - offsets[indexes.start]:    # all ASCII
+            base = offsets[indexes.start]
+            return [data[offsets[i] - base:offsets[i + 1] - base] for i in indexes]
+        return [self.text(i) for i in indexes]
+
+    def close(self):
+        self._mmap.close()
+
+    def __enter__(self)->'CardPack':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __str__(self)->str:
+        return f"CardPack {self._path}: {self._ncards} cards, " + ", ".join(f"{card_type.value} {len(indexes)}" for card_type,indexes in self._types.items())
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile genre text files into card packs")
+    parser.add_argument("--genre", help="Story genre", type=str, choices=["horror","romance","noir","all"], default="all")
+    args = parser.parse_args()
+    resource_folder = Environment.get_environment().get_resource_folder()
+    genres = [GenreType[args.genre.upper()]] if args.genre != "all" else \
+             [genre for genre in GenreType if os.path.isdir(f"{resource_folder}/genres/{genre.value}")]
+    for genre in genres:
+        print(CardPack.build(genre, resource_folder).message)
+
+if __name__ == '__main__':
+    main()
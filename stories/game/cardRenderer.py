@@ -0,0 +1,81 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+
+from game.gameSerializer import GameSerializer
+from typing import Iterable, List
+import io, threading
+
+class CardRenderer(object):
+    """
+        Renders lists of card lines as text, numbered text or JSON in a single pass.
+        The lines are written to a StringIO buffer that is reused by each thread, instead of
+        concatenating a new string for every card, so rendering time is linear in the number of cards.
+        The lines are the rendered cards, for example StoryCard.to_line() or StoryCard.render(),
+        and each one should end with a newline.
+    """
+    _local = threading.local()    # the buffer of each thread, not set while it is in use
+
+    @staticmethod
+    def _acquire()->io.StringIO:
+        """Takes the current thread's buffer, empty, or a new one if it is in use by another rendering
+        """
+        buffer = CardRenderer._local.__dict__.pop("buffer", None)
+        if buffer is None:
+            return io.StringIO()
+        buffer.seek(0)
+        buffer.truncate()
+        return buffer
+
+    @staticmethod
+    def _release(buffer:io.StringIO)->str:
+        """Returns: the buffer contents. The buffer is given back to the thread for the next rendering.
+        """
+        value = buffer.getvalue()
+        CardRenderer._local.buffer = buffer
+        return value
+
+    @staticmethod
+    def text(lines:Iterable[str])->str:
+        """Returns: the lines as a single str
+        """
+        buffer = CardRenderer._acquire()
+        write = buffer.write
+        for line in lines:
+            write(line)
+        return CardRenderer._release(buffer)
+
+    @staticmethod
+    def numbered(lines:Iterable[str], start:int=1, separator:str=". ", tags:Iterable[str]=None)->str:
+        """Returns: the lines as a single str, each one prefixed with its number
+            Arguments:
+                lines - the lines to number
+                start - the number of the first line
+                separator - the text between the number and the line
+                tags - an optional prefix for each line, for example "*" to highlight the last card drawn
+        """
+        buffer = CardRenderer._acquire()
+        write = buffer.write
+        if tags is None:
+            for n,line in enumerate(lines, start):
+                write(f"{n}{separator}{line}")
+        else:
+            for n,(tag,line) in enumerate(zip(tags, lines), start):
+                write(f"{tag}{n}{separator}{line}")
+        return CardRenderer._release(buffer)
+
+    @staticmethod
+    def numbered_lines(lines:Iterable[str], start:int=1, separator:str=". ", tags:Iterable[str]=None)->List[str]:
+        """Returns: the lines each prefixed with its number, as a List[str]. @see numbered()
+        """
+        if tags is None:
+            return [f"{n}{separator}{line}" for n,line in enumerate(lines, start)]
+        return [f"{tag}{n}{separator}{line}" for n,(tag,line) in enumerate(zip(tags, lines), start)]
+
+    @staticmethod
+    def to_JSON(lines:List[str]|List[dict], indent:int=None, key:str="cards")->str:
+        """Returns: the lines as a JSON object with a single key, for example {"cards" : [...]}
+        """
+        return GameSerializer.dumps({key : lines}, indent=indent)
@@ -0,0 +1,86 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+
+from game.gameConstants import GenreType, CardType, ActionType
+from array import array
+from typing import Dict, List, Tuple
+import hashlib, sys
+
+class CardStore(object):
+    """
+        The attributes of a set of story cards as parallel arrays (a struct of arrays) indexed by card:
+        interned texts, CardType and ActionType codes, argument bounds, story element flags and sort keys.
+        A StoryCard is a small view of one index of a CardStore. The cards of a CardCatalog share one CardStore,
+        which is never modified once the catalog is loaded, so the card data is stored once per process
+        rather than as an object per attribute per card.
+        If character_names is True the texts have the standard character names, which are replaced
+        by a game's CharacterAlias when a card is rendered.
+    """
+    CARD_TYPES:Tuple[CardType] = tuple(CardType)
+    CARD_TYPE_VALUES:Tuple[str] = tuple(card_type.value for card_type in CARD_TYPES)    # CardType.value is slow to look up when rendering
+    ACTION_TYPES:Tuple[ActionType] = tuple(ActionType)
+    _CARD_TYPE_CODES:Dict[CardType,int] = {card_type : code for code,card_type in enumerate(CARD_TYPES)}
+    _ACTION_TYPE_CODES:Dict[ActionType,int] = {action_type : code for code,action_type in enumerate(ACTION_TYPES)}
+
+    def __init__(self, genre:GenreType, character_names:bool=False):
+        self.genre = genre
+        self.character_names = character_names
+        self.texts:List[str] = []
+        self.card_types = array('B')       # index into CARD_TYPES
+        self.action_types = array('b')     # index into ACTION_TYPES, -1 if None
+        self.min_arguments = array('B')
+        self.max_arguments = array('B')
+        self.story_elements = bytearray()
+        self.sort_keys = array('i')
+
+    @staticmethod
+    def from_cards(genre:GenreType, cards:list, character_names:bool=False)->'CardStore':
+        """Creates a CardStore with the attributes of a list of StoryCards, in the same order
+        """
+        store = CardStore(genre, character_names)
+        for card in cards:
+            store.append(card.card_type, card.text, card.action_type, card.min_arguments, card.max_arguments, card.story_element, card.sort_key)
+        return store
+
+    def append(self, card_type:CardType, text:str, action_type:ActionType|None, min_arguments:int, max_arguments:int, story_element:bool, sort_key:int)->int:
+        """Adds a card.
+            Returns: the index of the card
+        """
+        self.texts.append(sys.intern(text) if type(text) is str else text)
+        self.card_types.append(CardStore._CARD_TYPE_CODES[card_type])
+        self.action_types.append(CardStore._ACTION_TYPE_CODES[action_type] if action_type is not None else -1)
+        self.min_arguments.append(min_arguments)
+        self.max_arguments.append(max_arguments)
+        self.story_elements.append(1 if story_element else 0)
+        self.sort_keys.append(sort_key)
+        return len(self.texts) - 1
+
+    def size(self)->int:
+        return len(self.texts)
+
+    def card_type(self, index:int)->CardType:
+        return CardStore.CARD_TYPES[self.card_types[index]]
+
+    def action_type(self, index:int)->ActionType|None:
+        code = self.action_types[index]
+        return CardStore.ACTION_TYPES[code] if code >= 0 else None
+
+    def digest(self)->str:
+        """Returns: a hash of the card attributes, the same in every process that loads the same cards
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for values in (self.card_types, self.action_types, self.min_arguments, self.max_arguments, self.sort_keys):
+            digest.update(values.tobytes())
+        digest.update(self.story_elements)
+        digest.update("\0".join(self.texts).encode("utf-8"))
+        return digest.hexdigest()
+
+    def nbytes(self)->int:
+        """Returns: the approximate memory used by the arrays and texts, in bytes
+        """
+        return sum(sys.getsizeof(a) for a in (self.texts, self.card_types, self.action_types, self.min_arguments, \
+                                             self.max_arguments, self.story_elements, self.sort_keys)) \
+               + sum(sys.getsizeof(text) for text in set(self.texts))
@@ -0,0 +1,87 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+
+from collections import OrderedDict
+from functools import lru_cache
+from threading import Lock
+from typing import Dict
+import re
+
+class CharacterAlias(object):
+    """
+        A set of character aliases, for example {"Michael" : "Don", "Nick" : "Brian", "Samantha" : "Cheryl", "Vivian" : "Beth"},
+        applied to story card texts when they are rendered.
+        The character names are replaced in a single pass of one compiled regular expression, so an alias that is also
+        a character name is not replaced again. The rendered texts are memoized, up to MAX_TEXTS of them for each alias set.
+        Card texts are not modified, so the catalog cards can be shared by every game and changing a game's aliases
+        is just a matter of using a different CharacterAlias.
+        Use CharacterAlias.get() so that games with the same aliases share an instance and its rendered texts.
+    """
+    CHARACTERS = ("Michael", "Nick", "Samantha", "Vivian")    # the character names in the story card texts
+    MAX_TEXTS = 1024      # rendered texts memoized for each alias set
+    MAX_ALIASES = 256     # alias sets kept by get()
+    _aliases:OrderedDict = OrderedDict()    # CharacterAlias by frozenset of the alias items, least recently used first
+    _lock = Lock()        # guards _aliases
+
+    def __init__(self, alias:Dict[str,str]):
+        """
+            Arguments:
+                alias - a dict of the alias of each character name. Names that map to themselves are ignored.
+        """
+        self._alias = {name : alias_name for name,alias_name in alias.items() if name != alias_name}
+        self._create_pattern()
+
+    def _create_pattern(self):
+        names = self._alias
+        if len(names) > 0:
+            # longest names first so that a name that is a prefix of another one doesn't hide it
+            pattern = re.compile("|".join(re.escape(name) for name in sorted(names.keys(), key=len, reverse=True)))
+            self._replace = lru_cache(maxsize=CharacterAlias.MAX_TEXTS)(lambda text: pattern.sub(lambda m: names[m.group(0)], text))
+        else:
+            self._replace = None
+
+    @staticmethod
+    def get(alias:Dict[str,str]|None)->'CharacterAlias|None':
+        """Gets the shared CharacterAlias for an alias dict.
+            Returns: None if alias is None, empty or maps every character to itself.
+        """
+        if alias is None or all(name == alias_name for name,alias_name in alias.items()):
+            return None
+        key = frozenset(alias.items())
+        with CharacterAlias._lock:
+            character_alias = CharacterAlias._aliases.get(key)
+            if character_alias is None:
+                character_alias = CharacterAlias(alias)
+                CharacterAlias._aliases[key] = character_alias
+                if len(CharacterAlias._aliases) > CharacterAlias.MAX_ALIASES:
+                    CharacterAlias._aliases.popitem(last=False)
+            else:
+                CharacterAlias._aliases.move_to_end(key)
+        return character_alias
+
+    @property
+    def alias(self)->Dict[str,str]:
+        return dict(self._alias)
+
+    def replace(self, text:str)->str:
+        """Returns: the text with each character name replaced by its alias
+        """
+        return self._replace(text) if self._replace is not None else text
+
+    def cache_info(self):
+        """Returns: the functools cache info of the rendered texts: hits, misses, maxsize and currsize
+        """
+        return self._replace.cache_info() if self._replace is not None else None
+
+    def __getstate__(self)->dict:
+        return {"alias" : self._alias}
+
+    def __setstate__(self, state:dict):
+        self._alias = state["alias"]
+        self._create_pattern()
+
+    def __str__(self)->str:
+        return f"CharacterAlias {self._alias}"
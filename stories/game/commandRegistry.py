@@ -0,0 +1,235 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+
+from game.commandResult import CommandResult
+from game.gameConstants import GameConstants
+from threading import Lock
+from typing import Callable, Dict, List
+import ast, inspect, logging, sys, time
+
+class CommandSpec(object):
+    """
+        The compiled form of a game engine command: the handler function, its positional parameters
+        with the function that converts each argument, and whether it takes *args or **kwargs.
+    """
+
+    def __init__(self, name:str, function:Callable, argument_types:tuple=()):
+        self.name = name
+        self.function = function
+        self.implemented = function is not None
+        self.parameters:List[str] = []
+        self.required = 0
+        self.varargs = False
+        self.kwargs = False
+        if function is not None:
+            for parameter in list(inspect.signature(function).parameters.values())[1:]:    # skip self
+                if parameter.kind is inspect.Parameter.VAR_POSITIONAL:
+                    self.varargs = True
+                elif parameter.kind is inspect.Parameter.VAR_KEYWORD:
+                    self.kwargs = True
+                else:
+                    self.parameters.append(parameter.name)
+                    if parameter.default is inspect.Parameter.empty:
+                        self.required += 1
+        self.converters = [argument_types[i] if i < len(argument_types) else CommandRegistry.auto for i in range(len(self.parameters))]
+        self.count = 0
+        self.errors = 0
+        self.seconds = 0.0
+
+class CommandRegistry(object):
+    """
+        Maps each command in GameConstants.COMMANDS to the method of the same name of a game engine class.
+        A command string is split into tokens, the arguments are converted to the declared type of each parameter
+        and the method is called directly. The registry for a class is built once and shared.
+
+        Tokens are separated by white space. Single or double quotes group words into one argument,
+        for example: log_message "a message with spaces"
+        Arguments without a declared type are ints if they are all digits and strings otherwise.
+        The 'update' command takes keyword arguments in the form key=value,key=value,
+        for example: update player dwb player_role='team_lead',player_email='dwb@gmail.com'
+    """
+    _lock = Lock()
+    _registries:Dict[type,'CommandRegistry'] = {}
+    logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def auto(token:str)->int|str:
+        return int(token) if token.isdigit() else token
+
+    @staticmethod
+    def boolean(token:str)->bool:
+        return token.lower() not in ("false", "no", "off", "0")
+
+    @staticmethod
+    def signed_int(token:str)->int:
+        return int(token)
+
+    # the declared argument types of commands that do not use the default conversion
+    ARGUMENT_TYPES = {
+        "add" : (str, str, str, str, str, str),
+        "draw" : (str, str, str),
+        "end" : (str,),
+        "find" : (str, str),
+        "game_status" : (signed_int,),
+        "help" : (str, str),
+        "info" : (str,),
+        "insert" : (signed_int, signed_int),
+        "list" : (str, str, str, str),
+        "ln" : (str, str, str, str),
+        "lnj" : (str, str, str),
+        "ls" : (str, str, str, str),
+        "publish" : (boolean, str, str),
+        "rank" : (str,),
+        "re_read" : (str, str),
+        "read" : (boolean, str, str),
+        "replace" : (signed_int, signed_int),
+        "rn" : (str, str),
+        "save" : (str,),
+        "show" : (str,),
+        "start" : (str,),
+        "status" : (str,),
+        "team_info" : (str,),
+        "update" : (str, str)
+    }
+
+    def __init__(self, engine_class:type):
+        self.engine_class = engine_class
+        self.commands:Dict[str,CommandSpec] = {name : CommandSpec(name, getattr(engine_class, name, None), CommandRegistry.ARGUMENT_TYPES.get(name, ())) \
+                                               for name in GameConstants.COMMANDS}
+
+    @staticmethod
+    def get_registry(engine_class:type)->'CommandRegistry':
+        """Gets the shared CommandRegistry of a game engine class, building it on first use
+        """
+        registry = CommandRegistry._registries.get(engine_class)
+        if registry is None:
+            with CommandRegistry._lock:
+                registry = CommandRegistry._registries.get(engine_class)
+                if registry is None:
+                    registry = CommandRegistry(engine_class)
+                    CommandRegistry._registries[engine_class] = registry
+        return registry
+
+    @staticmethod
+    def tokenize(txt:str)->List[str]:
+        """Splits a command string into tokens. A quote starts a quoted section only if it has a closing quote,
+            so apostrophes are kept as is. Quotes around a whole token are removed.
+        """
+        tokens = []
+        token = []
+        quoted = False    # True if the whole token is one quoted section
+        i, n = 0, len(txt)
+        while i < n:
+            c = txt[i]
+            if c.isspace():
+                if token:
+                    tokens.append("".join(token[1:-1]) if quoted else "".join(token))
+                    token, quoted = [], False
+                i += 1
+            elif c in "\"'" and (end := txt.find(c, i+1)) > 0:
+                quoted = len(token) == 0 and (end+1 == n or txt[end+1].isspace())
+                token.extend(txt[i:end+1])
+                i = end + 1
+            else:
+                token.append(c)
+                i += 1
+        if token:
+            tokens.append("".join(token[1:-1]) if quoted else "".join(token))
+        return tokens
+
+    @staticmethod
+    def parse_kwargs(txt:str)->dict:
+        """Parses keyword arguments in the form key=value,key=value. Values are Python literals
+            (quoted strings, numbers, True/False), anything else is a string.
+        """
+        kwargs = {}
+        for item in CommandRegistry._split_commas(txt):
+            if "=" not in item:
+                raise ValueError(f"Invalid keyword argument {item}")
+            key, value = item.split("=", 1)
+            try:
+                kwargs[key.strip()] = ast.literal_eval(value.strip())
+            except (ValueError, SyntaxError):
+                kwargs[key.strip()] = value.strip()
+        return kwargs
+
+    @staticmethod
+    def _split_commas(txt:str)->List[str]:
+        items, start, quote = [], 0, None
+        for i,c in enumerate(txt):
+            if quote is not None:
+                if c == quote:
+                    quote = None
+            elif c in "\"'":
+                quote = c
+            elif c == ",":
+                items.append(txt[start:i])
+                start = i + 1
+        items.append(txt[start:])
+        return [item for item in items if item.strip()]
+
+    def bind(self, txt:str, addl_args:list=None)->tuple|CommandResult:
+        """Parses a command string and converts its arguments.
+            Returns: a tuple (CommandSpec, args, kwargs), or a CommandResult with the error
+        """
+        tokens = CommandRegistry.tokenize(txt)
+        if len(tokens) == 0:
+            return CommandResult(CommandResult.ERROR, message='Invalid command: ""', done_flag=False)
+        name = tokens[0]
+        spec = self.commands.get(name)
+        if spec is None:
+            return CommandResult(CommandResult.ERROR, message=f'Invalid command: "{name}"', done_flag=False)
+        if not spec.implemented:
+            return CommandResult(CommandResult.ERROR, message=f'"{name}" is not implemented', done_flag=False)
+        tokens = tokens[1:]
+        kwargs = {}
+        try:
+            if spec.kwargs:
+                # update requires 3 arguments: what (for example 'player'), target (for example 'dwb')
+                # and keyword arguments, for example role='team_lead',name='Donnie'
+                if len(tokens) != len(spec.parameters) + 1:
+                    return CommandResult(CommandResult.ERROR, message=f'Invalid {name} command: "{txt}"', done_flag=False)
+                kwargs = CommandRegistry.parse_kwargs(tokens[-1])
+                tokens = tokens[:-1]
+            nparams = len(spec.parameters)
+            args = [convert(token) for convert,token in zip(spec.converters, tokens)]
+            if len(tokens) > nparams:
+                args.extend(CommandRegistry.auto(token) for token in tokens[nparams:])
+        except ValueError as ex:
+            return CommandResult(CommandResult.ERROR, message=f'"{txt}" : Invalid argument, {str(ex)}', done_flag=False, exception=ex)
+        if addl_args:
+            args.extend(addl_args)
+        if len(args) < spec.required or (len(args) > nparams and not spec.varargs):
+            message = f'"{txt}" : {name} takes {spec.required} to {nparams} arguments, {len(args)} given'
+            return CommandResult(CommandResult.ERROR, message=message, done_flag=False)
+        return spec, args, kwargs
+
+    def execute(self, engine, txt:str, addl_args:list=None)->CommandResult:
+        """Parses and runs a command on a game engine.
+            Returns: the CommandResult of the command. Exceptions raised by the command are returned as an error result.
+        """
+        bound = self.bind(txt, addl_args)
+        if isinstance(bound, CommandResult):
+            return bound
+        spec, args, kwargs = bound
+        start = time.perf_counter()
+        try:
+            command_result = spec.function(engine, *args, **kwargs)
+        except Exception as ex:
+            spec.errors += 1
+            message = f'"{txt}" : Invalid command format or syntax\n exception: {str(ex)}'
+            command_result = CommandResult(CommandResult.ERROR,  message=message,  done_flag=False, exception=ex)
+            logging.error(message)
+            print(message, file=sys.stderr)
+        spec.count += 1
+        spec.seconds += time.perf_counter() - start
+        return command_result
+
+    def stats(self)->dict:
+        """Returns: the number of calls, errors and average time in microseconds of each command that has been used
+        """
+        return {name : {"count" : spec.count, "errors" : spec.errors, "average_us" : round(spec.seconds * 1e6 / spec.count, 1)} \
+                for name,spec in self.commands.items() if spec.count > 0}
@@ -4,8 +4,9 @@ Created on Dec 7, 2023
 @author: don_bacon
 '''
 from game.storiesObject import StoriesObject
+from game.gameSerializer import GameSerializer
 from typing import List
-import json
+from enum import Enum
 
 class CommandResult(StoriesObject):
     """Encapsulates the result of a command executed by a game square or the CareersGameEngine
@@ -107,21 +108,34 @@ class CommandResult(StoriesObject):
         return True if self.return_code == CommandResult.SUCCESS else False
     
     def to_dict(self):
-        d = {"return_code" : self.return_code, "done_flag" : self.done_flag, "message" : self.message }
-        if self.json_message is not None:
-            d["json_message"] = self.json_message
-        if self.next_action is not None:
-            d["next_action"] = self.next_action
-        if self.exception is not None:
-            d["exception"] = str(self.exception)
-        
-        return d
+        return GameSerializer.to_dict(self)
+    
+    @staticmethod
+    def to_serializable(value):
+        """Converts a property value to JSON serializable types. Game objects such as StoryCard and Player
+            are converted with their to_dict() method, other objects with str()
+        """
+        if value is None or isinstance(value, (str, int, float, bool)):
+            return value
+        if isinstance(value, dict):
+            return {str(k) : CommandResult.to_serializable(v) for k,v in value.items()}
+        if isinstance(value, (list, tuple, set)):
+            return [CommandResult.to_serializable(v) for v in value]
+        if hasattr(value, "to_dict"):
+            return CommandResult.to_serializable(value.to_dict())
+        if isinstance(value, Enum):
+            return value.value
+        return str(value)
         
     def to_JSON(self):
-        jstr = json.dumps(self.to_dict())
-        return jstr
+        return GameSerializer.dumps(self.to_dict())
     
     @staticmethod
     def successfull_result(message=""):
         return CommandResult(CommandResult.SUCCESS, message, True)
-        
\ No newline at end of file
+
+GameSerializer.register(CommandResult, {"return_code" : "return_code", "done_flag" : "done_flag", "message" : "message",
+                                        "json_message" : "json_message", "next_action" : "next_action",
+                                        "exception" : lambda result: str(result.exception) if result.exception is not None else None,
+                                        "properties" : lambda result: CommandResult.to_serializable(result.properties)},
+                        optional=("json_message", "next_action", "exception", "properties"), summary=("return_code", "done_flag", "message"))
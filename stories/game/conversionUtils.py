@@ -7,6 +7,7 @@ import json
 import argparse
 from game.environment import Environment
 from game.gameConstants import GenreFilenames, GenreType, CardType
+from game.cardPack import CardPack
 
 class ConversionUtils(object):
     """Convert genre text file to JSON format
@@ -31,26 +32,15 @@ class ConversionUtils(object):
         print(f"loading {self.genre_file_path}")
     
     def convert(self):
+        """The card texts are read the same way as the text source and CardPack, see CardPack.read_story_file()
+        """
         print(f"converting {self.genre_file_path} to JSON file {self.json_file_path}")
-        index = f'"cardType" : "{self.cardType}"'
-        json_text = '{' + f'{index},\n "cards" : ['
-        num = 1
-        with open(self.genre_file_path) as fp:
-            for line in fp:
-                line = line.lstrip().rstrip()           # delete left padding
-                if line=="" or line.startswith("--"):   # skip comment lines
-                    continue
-                line = line.replace('"', '\\"')     # embedded quotes must be escaped twice, as in \\" 
-                json_line = '{' + f'"line": {num}, "content":"{line}"' + '}'
-                json_text = f"{json_text}\n{json_line},"
-                num += 1
-        json_text = json_text[:-1]
-        json_text = json_text + "\n] }"
+        lines = CardPack.read_story_file(self.genre_file_path)
+        cards = [{"line" : num, "content" : line.removesuffix("\n")} for num,line in enumerate(lines, start=1)]
+        json_text = json.dumps({"cardType" : self.cardType, "cards" : cards}, indent=1)
         print(json_text)
-        fp.close()
-        fp = open(self.json_file_path, "w")
-        fp.write(json_text)
-        fp.close()
+        with open(self.json_file_path, "w") as fp:
+            fp.write(json_text)
         
 
 if __name__ == '__main__':
@@ -6,10 +6,9 @@ Created on Aug 15, 2024
 
 from typing import List
 import json
-import pymongo
 import argparse
-import dotenv
 from datetime import datetime
+from bson.binary import Binary
 from game.gameConstants import GameParametersType, GenreType
 from game.gameParameters import GameParameters
 from game.commandResult import CommandResult
@@ -17,6 +16,7 @@ from game.environment import Environment
 from game.cardDeck import CardDeck
 from game.storyCard import StoryCard
 from game.storyCardLoader import StoryCardLoader
+from game.mongoClientRegistry import MongoClientRegistry
 
 class DataManager(object):
     """
@@ -58,13 +58,13 @@ class DataManager(object):
     def mongo_init(self)->CommandResult:
         """Initializes MongoDB client info using the .env project file
         """
-        config = dotenv.dotenv_values(".env")
+        config = MongoClientRegistry.get_config()
         self._db_url = config["DB_URL"]
         self._db_name = config["DB_NAME"]
         self._db_name_genres = config["DB_NAME_GENRES"]
         
         try:
-            mongo_client = pymongo.MongoClient(self._db_url)
+            mongo_client = MongoClientRegistry.get_client(self._db_url)
             self._stories_db = mongo_client[self._db_name]
             self._genres_db = mongo_client[self._db_name_genres]
             self._mongo_client = mongo_client
@@ -75,6 +75,19 @@ class DataManager(object):
         
         return result
 
+    def __getstate__(self)->dict:
+        """MongoDB handles are not saved with a hibernated game, they are restored from the shared client
+        """
+        state = self.__dict__.copy()
+        for key in ("_mongo_client", "_stories_db", "_genres_db"):
+            state.pop(key, None)
+        return state
+    
+    def __setstate__(self, state:dict):
+        self.__dict__.update(state)
+        if self._source == "mongo" and self.active:
+            self.mongo_init()
+
     def load_parameters(self, source:str, game_parameters_type:str)->CommandResult:
         """Loads stories GameParameters from a specified source.
             Arguments:
@@ -230,6 +243,36 @@ class DataManager(object):
         result.properties = {"game_story" : gs}
         return result
 
+    @staticmethod
+    def save_game_snapshot(game_id:str, snapshot:bytes) -> CommandResult:
+        """Saves a game snapshot (see GameSnapshot) to the saved_games collection, replacing an earlier save of the same game
+        """
+        result = CommandResult()
+        try:
+            collection = MongoClientRegistry.get_collection("DB_NAME", "saved_games")
+            doc = {"game_id" : game_id, "snapshot" : Binary(snapshot), "size" : len(snapshot), "savedDate" : datetime.now()}
+            collection.replace_one({"game_id" : game_id}, doc, upsert=True)
+            result.message = f"Saved game {game_id} ({len(snapshot)} bytes)"
+        except Exception as ex:
+            result = CommandResult(CommandResult.ERROR, f'MongoDB error, exception: {str(ex)}', False, exception=ex)
+        return result
+    
+    @staticmethod
+    def load_game_snapshot(game_id:str) -> CommandResult:
+        """Loads a saved game snapshot. If successful the snapshot bytes are in result.properties["snapshot"]
+        """
+        result = CommandResult()
+        try:
+            doc = MongoClientRegistry.get_collection("DB_NAME", "saved_games").find_one({"game_id" : game_id})
+            if doc is None:
+                result.return_code = CommandResult.ERROR
+                result.message = f"No saved game {game_id}"
+            else:
+                result.properties = {"snapshot" : bytes(doc["snapshot"])}
+        except Exception as ex:
+            result = CommandResult(CommandResult.ERROR, f'MongoDB error, exception: {str(ex)}', False, exception=ex)
+        return result
+
     @property
     def game_parameters(self)->GameParameters:
         return self._game_parameters
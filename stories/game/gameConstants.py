@@ -115,6 +115,19 @@ class Direction(Enum):
     LEFT  = "left"
     ANY   = "any"    # random direction
 
+class GameEventType(Enum):
+    """The events published on a game's GameEventBus
+    """
+    DRAW = "draw"                   # a player drew a card, the card itself is private to the player
+    PLAY = "play"                   # a story card was played, inserted or replaced in a story
+    DISCARD = "discard"             # a card was discarded to the game discard deck
+    PASS = "pass"                   # a card was passed to another player, the card itself is private
+    ACTION = "action"               # an action card was executed
+    NEXT_PLAYER = "next_player"     # the current player's turn is done
+    END_ROUND = "end_round"
+    END_GAME = "end_game"
+    RESYNC = "resync"               # not published. Tells a subscriber to refresh the game status and stories
+
 class GPTProviders(Enum):
     GEMINI = "gemini"
     OPENAI = "openai"
@@ -5,17 +5,21 @@ Created on Dec 22, 2023
 '''
 
 from game.gameConstants import GameConstants, ActionType, CardType, CardTypeEncoder
-from game.gameConstants import PlayMode, PlayerRole, ParameterType, Direction
+from game.gameConstants import PlayMode, PlayerRole, ParameterType, Direction, GameEventType
 from game.storiesGame import StoriesGame
 from game.commandResult import CommandResult
 from game.gameState import GameState
 from game.player import Player
 from game.team import Team
 from game.storyCard import StoryCard
+from game.characterAlias import CharacterAlias
 from game.storyCardList import StoryCardList
+from game.cardRenderer import CardRenderer
+from game.gameEventBus import GameEventBus, GameEvent
+from game.gameSerializer import GameSerializer
 
 from typing import List
-import logging, json, re
+import logging, json, re, os
 from game.gameParameters import GameParameters
 from game.gameUtils import GameUtils
 
@@ -56,6 +60,33 @@ class GameEngineCommands(object):
     @property
     def game_parameters(self)->GameParameters:
         return self._game_parameters
+    
+    @property
+    def alias(self)->CharacterAlias|None:
+        """The game's CharacterAlias, None if it uses the standard character names
+        """
+        return self._stories_game.story_card_deck.alias
+    
+    def card_text(self, card:StoryCard)->str:
+        """Returns: the text of a card with the character names replaced by the game's aliases
+        """
+        return card.render(self._stories_game.story_card_deck.alias)
+
+    @property
+    def events(self)->GameEventBus:
+        """The game's GameEventBus
+        """
+        return GameEventBus.get_bus(self._stories_game.game_id)
+
+    def _emit(self, event_type:GameEventType, **data)->GameEvent|None:
+        """Publishes an event on the game's GameEventBus. @see GameEventType
+        """
+        return self.events.publish(event_type, **data)
+
+    def _card_event(self, card:StoryCard)->dict:
+        """Returns: the public properties of a card for an event
+        """
+        return {"number" : card.number, "card_type" : card.card_type_value, "text" : self.card_text(card).rstrip("\n")}
         
     @property
     def debug(self):
@@ -70,6 +101,8 @@ class GameEngineCommands(object):
         """Parses a command string into an executable string, i.e. that can be executed with eval()
             Returns: if return_code == 0, a CommandResult with commandResult.message as the string to eval()
                 else if return_code == 1, commandResult.message has the error message
+            NOTE StoriesGameEngine now runs commands with the CommandRegistry, this is kept for comparison.
+            @see util.commandBenchmark
         """
         command_args = txt.split()
         command = command_args[0]
@@ -246,6 +279,31 @@ class GameEngineCommands(object):
             
         return result
 
+    def add_players(self, players_info:List[dict], role_names:List[str]=None)->CommandResult:
+        """Adds several players to the Game at once, the same as an 'add player' command for each one
+            but the hands of all the players are dealt in one pass. @see StoriesGame.add_players()
+            Arguments:
+                players_info - a dict for each player with the keys name, initials, login_id and email
+                role_names - the role name of each player, default is "player". A "director" is added as a player
+                             and then made the Director, the same as 'add player' followed by 'add director'.
+            Returns: a CommandResult, the Players added are in the result properties with the key "players"
+        """
+        role_names = ["player"] * len(players_info) if role_names is None else role_names
+        players = []
+        for info,role_name in zip(players_info, role_names):
+            player_role = PlayerRole.PLAYER if role_name is None else PlayerRole[role_name.upper()]
+            players.append(Player(name=info["name"], login_id=info.get("login_id"), initials=info["initials"], email=info.get("email"), \
+                                  game_id=None, player_role=player_role))
+        self._stories_game.add_players(players)
+        for player,role_name in zip(players, role_names):
+            if role_name is not None and role_name.lower() == PlayerRole.DIRECTOR.value:
+                player.player_role = PlayerRole.DIRECTOR
+        message = "[" + ",\n".join(player.to_JSON() for player in players) + "]"
+        self.log(message)
+        result = CommandResult(CommandResult.SUCCESS, message=message)
+        result.properties = {"players" : players}
+        return result
+
     def add_team(self, name, args:str) ->CommandResult:
         """Add players to a new or existing team
             Arguments:
@@ -347,6 +405,7 @@ class GameEngineCommands(object):
             next_player = self.game_state.current_player
             result.message = f"{result.message}. {next_player.player_initials}'s turn, player# {npn}."
             result.properties = {"playerId" : next_player.player_initials}
+            self._emit(GameEventType.NEXT_PLAYER, initials=next_player.player_initials, player_number=npn, previous=current_player.player_initials)
         else:
             pass
 
@@ -400,6 +459,7 @@ class GameEngineCommands(object):
                 message = f"{message} Player: {player.player_initials} has not played necessary story elements: {pm}\n "
                 return_code = CommandResult.ERROR
                     
+        self.game_state.changed(*self.game_state.players)    # the points were tallied
         if return_code is CommandResult.SUCCESS:
             message = f"The {what} is over!"
             if self.play_mode is not PlayMode.COLLABORATIVE:
@@ -409,6 +469,9 @@ class GameEngineCommands(object):
                 enddate = GameUtils.get_datetime()
                 message = f"{message} {enddate}"
                 return_code = CommandResult.TERMINATE
+            event_type = GameEventType.END_GAME if what == "game" else GameEventType.END_ROUND
+            self._emit(event_type, winner=winner.player_initials if self.play_mode is not PlayMode.COLLABORATIVE else None, \
+                       points={player.player_initials : player.points for player in self.game_state.players}, message=message)
 
         result = CommandResult(return_code, message, True)
         self.log(message)
@@ -468,8 +531,12 @@ class GameEngineCommands(object):
         """
         ncards = 0    # number of cards removed from the player's hand
         message = ""
+        discards = current_player.story_card_hand.discards
+        ndiscards = discards.size()
         for card_type in omit_types:
             ncards += current_player.story_card_hand.discard_cards(card_type)
+        if ncards > 0:    # the discarded cards are not dealt again
+            self.stories_game.story_card_deck.deactivate(discards.cards[ndiscards:])
         for i in range(ncards):
             result = self.draw_for(current_player, "new", i)
             message = f"{message}\n{result.message}"
@@ -520,8 +587,10 @@ class GameEngineCommands(object):
                 # add this drawn card to the player hand
                 player._story_card_hand.add_card(card)
                 player.card_drawn = True
-                message = f"{ordinal}. {player.player_initials} drew a {card.card_type.value} ({card.number}): {card.text}"
-                result = CommandResult(CommandResult.SUCCESS, message, properties={"number": str(card.number), "text": str(card)}  )
+                message = f"{ordinal}. {player.player_initials} drew a {card.card_type.value} ({card.number}): {self.card_text(card)}"
+                result = CommandResult(CommandResult.SUCCESS, message, properties={"number": str(card.number), "text": card.to_line(self.alias)}  )
+                self.game_state.changed()
+                self._emit(GameEventType.DRAW, initials=player.player_initials, card_type=card.card_type_value)
             
         return result
 
@@ -536,9 +605,11 @@ class GameEngineCommands(object):
             result = CommandResult(CommandResult.ERROR, message, False)
             
         else:
-            message = f"You are discarding card# {card_number}. {card_discarded.text}"
+            message = f"You are discarding card# {card_number}. {self.card_text(card_discarded)}"
             self.stories_game.add_to_discard(card_discarded)
             result = CommandResult(CommandResult.SUCCESS, message, True)
+            self.game_state.changed()
+            self._emit(GameEventType.DISCARD, initials=player.player_initials, **self._card_event(card_discarded))
         return result
     
     def play(self, card_id:int|str, *args) ->CommandResult:
@@ -683,11 +754,14 @@ class GameEngineCommands(object):
             result = CommandResult(CommandResult.ERROR, message, False)
         else:
             if as_player is not None:
-                message = f"{as_player.player_initials} played card# {card_played.number}. {card_played.text}"
+                message = f"{as_player.player_initials} played card# {card_played.number}. {self.card_text(card_played)}"
             else:
-                message = f"{player.player_initials} played card# {card_played.number}. {card_played.text}"
+                message = f"{player.player_initials} played card# {card_played.number}. {self.card_text(card_played)}"
             result = CommandResult(CommandResult.SUCCESS, message, True)
             result.properties = {"story_card_played" : card_played}
+            initials = as_player.player_initials if as_player is not None else player.player_initials
+            self.game_state.changed()
+            self._emit(GameEventType.PLAY, initials=initials, story=player.player_initials, **self._card_event(card_played))
         return result
     
     def _get_director(self)->CommandResult:
@@ -788,8 +862,10 @@ class GameEngineCommands(object):
                 result = CommandResult(CommandResult.ERROR, message, False)
         else:
             card_played = player.play_card(story_card, line_number)
-            message = f"You played {card_played.number}. {card_played.text} {how} line# {line_number}"
+            message = f"You played {card_played.number}. {self.card_text(card_played)} {how} line# {line_number}"
             result = CommandResult(CommandResult.SUCCESS, message, True)
+            self.game_state.changed()
+            self._emit(GameEventType.PLAY, initials=player.player_initials, story=player.player_initials, line=line_number, how=how, **self._card_event(card_played))
             
         return result
     
@@ -838,7 +914,7 @@ class GameEngineCommands(object):
         elif direction is Direction.RIGHT:
             npn = self._game_state.get_previous_player_number(player)
         else:    # random direction
-            roll = GameUtils.roll(1)   # returns 1-element List[int] random 1 though 6
+            roll = GameUtils.roll(1, self._stories_game.rng)   # returns 1-element List[int] random 1 though 6
             npn = self._game_state.get_next_player_number(player) if roll[0] <=3 else self._game_state.get_previous_player_number(player)
         
         if player.number == npn:    # nothing to do
@@ -851,6 +927,8 @@ class GameEngineCommands(object):
             
         next_player:Player = self.game_state.players[npn]
         next_player.add_card(story_card)
+        self.game_state.changed()
+        self._emit(GameEventType.PASS, initials=player.player_initials, to=next_player.player_initials)
         return CommandResult(CommandResult.SUCCESS, f"Card #{card_number} removed from {player.player_initials}'s hand and given to {next_player.player_initials}")
 
     def list(self, what='hand', initials:str='me', how='numbered', display_format='text') ->CommandResult:
@@ -858,10 +936,11 @@ class GameEngineCommands(object):
             Arguments: what - 'hand', 'story'
                 initials - a player's initials, defaults to the current player "me"
                 how - 'numbered' for a numbered list, 'regular', the default, for no numbering
-                display_format - 'text' or 'json'
+                display_format - 'text', 'json' or 'dict'
                 
             Returns: CommandResult.message. If display_format == 'text', this is the stringified list of str(card) in the player's hand or story
             If 'json', the message contains the to_JSON with no indent.
+            If 'dict', the message is empty and CommandResult.properties has the list as a dict with a "cards" key.
             By default when what=="hand", the lines are sorted by CardType: ACTION, TITLE, OPENING, OPENING_STORY, STORY, CLOSING, and number
             
         """
@@ -870,6 +949,8 @@ class GameEngineCommands(object):
         return_code = CommandResult.SUCCESS
         if what == 'hand':
             message = self._list(player.story_card_hand, how, sort_list=True, display_format=display_format)
+            if display_format == 'dict':
+                return CommandResult(return_code, "", properties=message)
         elif what == 'story':
             result = self.read(how, initials, display_format)
             return result
@@ -885,51 +966,55 @@ class GameEngineCommands(object):
                story_card_hand - a player's StoryCardHand
                how - "numbered" to number the entries (1 through #cards)
                sort_list - if True the list will be sorted by CardType.
-               display_format - 'text' or 'json'
-            Returns: the list as a string
+               display_format - 'text', 'json' or 'dict'
+            Returns: the list as a string, or a dict if display_format is 'dict'
             The card with the number == last_card_drawn_number is highlighted with an "*"
+            The list is cached by the StoryCardHand until the hand changes.
             @see StoryCardHand.sort()
+            @see StoryCardHand.rendering()
         """
         last_drawn = story_card_hand.last_card_drawn_number
+        alias = self.alias
+        return story_card_hand.rendering((how, sort_list, display_format, last_drawn, alias), \
+                                         lambda: self._render_list(story_card_hand, how, sort_list, display_format, last_drawn, alias))
+    
+    def _render_list(self, story_card_hand, how:str, sort_list:bool, display_format:str, last_drawn:int, alias:CharacterAlias|None):
         if sort_list:
-            cards = story_card_hand.sort()    # StoryCardList
+            cards = story_card_hand.sort()    # List[StoryCard]
         else:
             cards = story_card_hand.cards.cards
         if how=="numbered":
-            n = 1
             if display_format == 'text':
-                card_text = ""
-                for card in cards:
-                    tag = "*" if card.number == last_drawn else ""
-                    card_text = card_text + f"{tag}{n}. {str(card)}"
-                    n += 1
+                tags = ("*" if card.number == last_drawn else "" for card in cards)
+                card_text = CardRenderer.numbered((card.to_line(alias) for card in cards), tags=tags)
             elif display_format == 'json':
-                card_text = GameEngineCommands.to_JSON(cards, last_drawn, numbered=True)
+                card_text = GameEngineCommands.to_JSON(cards, last_drawn, numbered=True, alias=alias)
+            elif display_format == 'dict':
+                card_text = GameEngineCommands.to_dict(cards, last_drawn, numbered=True, alias=alias)
             else:
                 card_text = f"I don't understand what '{display_format}' is"
                 
         else:    # not numbered
             if display_format == 'text':
-                card_text = str(story_card_hand.cards)
+                card_text = CardRenderer.text(card.to_line(alias) for card in story_card_hand.cards)
             elif display_format == 'json':
-                card_text = GameEngineCommands.to_JSON(cards, last_drawn, numbered=False)
+                card_text = GameEngineCommands.to_JSON(cards, last_drawn, numbered=False, alias=alias)
+            elif display_format == 'dict':
+                card_text = GameEngineCommands.to_dict(cards, last_drawn, numbered=False, alias=alias)
             else:
                 card_text = f"I don't understand what '{display_format}' is"           
             
         return card_text
     
     @staticmethod
-    def to_JSON(cards:List[StoryCard], last_drawn:int, numbered:bool=True):
-        cards_list = []
-        n = 1
-        for story_card in cards:
-            tag = "*" if story_card.number == last_drawn else " "
-            card_text = f"{tag}{n}. {story_card.card_type.value}: {story_card.number}. {story_card.text}"
-            cards_list.append(card_text.strip())
-            n += 1
-        cards_dict = {"cards" : cards_list}
-        message = json.dumps(cards_dict)
-        return message
+    def to_JSON(cards:List[StoryCard], last_drawn:int, numbered:bool=True, alias:CharacterAlias|None=None):
+        return CardRenderer.to_JSON(GameEngineCommands.to_dict(cards, last_drawn, numbered, alias)["cards"])
+    
+    @staticmethod
+    def to_dict(cards:List[StoryCard], last_drawn:int, numbered:bool=True, alias:CharacterAlias|None=None)->dict:
+        tags = ("*" if story_card.number == last_drawn else "" for story_card in cards)
+        lines = (f"{story_card.card_type_value}: {story_card.number}. {story_card.render(alias)}" for story_card in cards)
+        return {"cards" : [line.strip() for line in CardRenderer.numbered_lines(lines, tags=tags)]}
     
     def _get_card_number_from_list(self, player, ordinal, sort_list=True):
         """Returns the number of the card in the players hand at a given ordinal position (starting with 1)
@@ -1005,19 +1090,11 @@ class GameEngineCommands(object):
             return_code = CommandResult.SUCCESS if card is not None else CommandResult.ERROR
             
         elif show_what=="all":    # show story cards by card_type
-            n = 1
-            for card_type in ["Action", "Title", "Opening", "Opening/Story", "Story", "Closing"]:
-                cards = self.stories_game.get_story_cards_by_type(card_type)
-                for card in cards:
-                    message = f"{message}{n}. {card}"
-                    n += 1
+            card_types = ["Action", "Title", "Opening", "Opening/Story", "Story", "Closing"]
+            message = CardRenderer.numbered(str(card) for card_type in card_types for card in self.stories_game.get_story_cards_by_type(card_type))
         
         elif show_what=="deck":    # show all cards in the deck in the order they appear in the deck
-            n = 1
-            cards = self.stories_game.get_cards()
-            for card in cards:
-                message = f"{message}{n}. {card}"
-                n += 1
+            message = CardRenderer.numbered(self.stories_game.get_cards())
             
         elif show_what.startswith("param"):
             message = str(self.game_parameters)
@@ -1030,34 +1107,70 @@ class GameEngineCommands(object):
             card_type = what.title()     # just in case
             cards = self.stories_game.get_cards_by_type(card_type)    # what must be a valid card_type.value
             if len(cards) > 0:   # List[str]
-                n = 1
-                for card in cards:
-                    message = f"{message}{n}.  {card}"
-                    n += 1
+                message = CardRenderer.numbered(cards, separator=".  ")
         result = CommandResult(return_code, message)
         
         return result
         
-    def read(self, numbered:bool, initials:str=None, display_format='text', indent=0)->CommandResult:
+    def read(self, numbered:bool, initials:str=None, display_format='text', indent=0, since:int=None)->CommandResult:
         """Display a player's story in a readable format.
             Arguments:
                 numbered - if True number the lines starting at 1 with the first story card.
                         The Title and Closing line(s) are not numbered.
                 initials - the player's initials if other than the current player
                 display_format - "text", "json" or "dict"
+                since - a story version. If given and display_format is "dict", the properties have only the lines
+                        that changed since that version, see StoryCardList.changes_since()
+            Returns: CommandResult with the story cards as a dict in properties. The message is the story as text or JSON,
+                    it is empty for "dict" unless the story could not be read.
+                    The dict and the message are cached by the story's StoryCardList until the story changes,
+                    so the properties must not be modified. @see StoryCardList.rendering()
                 
             In a COLLABORATIVE game mode the Director maintains the common story.
             In TEAM Play, the player's team lead maintains the story for the team.
         """
+        player, return_code, message = self._get_story_player(initials)
+        alias = self.alias
+        story_cards = player.story_card_hand.my_story_cards
+        if since is not None and display_format == "dict":
+            changes = story_cards.changes_since(since, alias)
+            if changes is not None:
+                return CommandResult(return_code, message, properties=changes)
+        props = story_cards.rendering(("dict", alias), lambda: story_cards.to_dict(how="full", alias=alias))    # key is "cards" 
+        if display_format == "text":
+            message = story_cards.rendering(("text", bool(numbered), alias), lambda: story_cards.to_string(numbered, alias))
+        elif display_format == "json":
+            message = story_cards.rendering(("json", indent, alias), lambda: story_cards.to_JSON(indent=indent, alias=alias))
+
+        return CommandResult(return_code, message, properties=props)
+    
+    def story_etag(self, initials:str=None)->str:
+        """Returns: the entity tag of the story read by a player, for HTTP conditional requests.
+            It has the game's epoch, the initials of the player whose story it is and the story version.
+            @see GameState.etag()
+        """
+        player = self._get_story_player(initials)[0]
+        return f'"{self.game_state.epoch}.{player.player_initials}.{player.story_card_hand.my_story_cards.version}"'
+    
+    def story_version(self, initials:str=None)->int:
+        """Returns: the version of the story read by a player, see StoryCardList.version
+        """
+        return self._get_story_player(initials)[0].story_card_hand.my_story_cards.version
+    
+    def _get_story_player(self, initials:str=None)->tuple:
+        """Gets the player whose story a player reads: the player, the Director in a COLLABORATIVE game
+            or the player's team lead in a TEAM game.
+            Returns: a tuple of the Player, the CommandResult return code and message
+        """
         player = self.game_state.current_player if initials is None else self.get_player(initials)
         self.log(f"read: player initials: {player.player_initials}, play_mode: {self._play_mode.value} ")
         return_code = CommandResult.SUCCESS
+        message = ""
         if self._play_mode is PlayMode.COLLABORATIVE:
             result = self._get_director()
             if result.is_successful():
                 player = result.properties["director"]
                 self.log(f"director: {player.player_initials}")
-                message = player.story_card_hand.my_story_cards.to_string(numbered)
             else:
                 message = result.message
                 return_code = CommandResult.ERROR
@@ -1067,18 +1180,10 @@ class GameEngineCommands(object):
             result = self._get_team_lead(team_name)
             if result.is_successful():
                 player = result.properties["team_lead"]
-                message = player.story_card_hand.my_story_cards.to_string(numbered)
             else:
                 message = f"{result.message}\nA team lead is required for team games. Please add one to team '{team_name}'"   
                 return_code = CommandResult.WARNING
-        
-        props = player.story_card_hand.my_story_cards.to_dict(how="full")    # key is "cards" 
-        if display_format == "text":
-            message = player.story_card_hand.my_story_cards.to_string(numbered)
-        elif display_format == "json" or display_format == "dict":
-            message = player.story_card_hand.my_story_cards.to_JSON(indent=indent)
-
-        return CommandResult(return_code, message, properties=props)
+        return player, return_code, message
     
     def publish(self, numbered:bool=True, initials:str=None, display_format='dict')->CommandResult:
         """Publish a story to MongoDB, associated with this gameID and player_initials.
@@ -1093,6 +1198,7 @@ class GameEngineCommands(object):
                 display_format - "text", "json" or "dict"  Default value is "dict"
             Note that the default output format is a dictionary as the story is persisted to MongoDB.
             The "re_read" command converts and displays in "read" format.
+            The story dict and its JSON are cached until the story changes.
         """
         result = self._get_director()
         if result.is_successful():    # in a COLABORATIVE game, publish as the game's Director
@@ -1103,39 +1209,59 @@ class GameEngineCommands(object):
         game_id = self.stories_game.game_id
         result =  self.read(numbered, initials=player_id, display_format=display_format, indent=2)
         if result.return_code == CommandResult.SUCCESS:
-            story = result.properties
-            story["game_id"] = game_id
-            story["initials"] = player_id
-            self.stories_game.data_manager.add_game_story(game_id, player_id, story)
+            story_cards = player.story_card_hand.my_story_cards
+            key = ("published", game_id, player_id, self.alias)
+            story = story_cards.rendering(key) or dict(result.properties, game_id=game_id, initials=player_id)    # read properties are shared
+            self.stories_game.data_manager.add_game_story(game_id, player_id, dict(story))    # the database adds its ids to the story
+            story_cards.rendering(key, lambda: story)    # re_read uses the published story until the story changes
+            result.properties = story
+            if display_format == "dict":
+                result.message = story_cards.rendering(("published_json", game_id, player_id, self.alias), lambda: GameSerializer.dumps(story, indent=2))
             
         return result
 
     def re_read(self, game_id, initials:str=None)->CommandResult:        
+        """Displays a published story, see publish().
+            If the player published their story in this game and it has not changed since,
+            the story is rendered from the cache rather than read from the database.
+        """
         player = self.game_state.current_player if initials is None else self.get_player(initials)
         player_id = player.player_initials
+        story_cards = player.story_card_hand.my_story_cards
+        published = story_cards.rendering(("published", game_id, player_id, self.alias))
+        if published is not None:
+            message = story_cards.rendering(("re_read", game_id, player_id, self.alias), lambda: CardRenderer.text(card["text"] for card in published["cards"]))
+            return CommandResult(CommandResult.SUCCESS, message, properties={"game_story" : published})
         result = self.stories_game.data_manager.get_game_story(game_id, player_id)
         if result.is_successful():
             gs = result.properties["game_story"]    # Dict
             # need to reformat the json to a readable story
             # and return that in result.message
             cards = gs["cards"]
-            message = ""
-            for card in cards:
-                message = f'{message}{card["text"]}'    # assume each line terminated with a newline
-            result.message = message
+            result.message = CardRenderer.text(card["text"] for card in cards)    # assume each line terminated with a newline
         return result
 
-    def save_game(self, gamefile_base_name:str, game_id:str, how='json', source='mongo') -> CommandResult:
+    def save_game(self, gamefile_base_name:str, game_id:str, how='json', source='mongo', snapshot:bytes=None) -> CommandResult:
         """Save the complete serialized game state so it can be restarted at a later time.
             Arguments:
-                how - serialization format to use: 'json', 'jsonpickle' or 'pkl' (pickle)
+                how - serialization format to use: 'snapshot', 'json', 'jsonpickle' or 'pkl' (pickle)
+                source - where to save a snapshot: 'mongo' (the saved_games collection) or 'text' (a file)
+                snapshot - the game snapshot bytes, required if how is 'snapshot'. @see GameSnapshot
             NOTE that the game state is automatically saved in pkl format after each player's turn.
-            NOTE saving in JSON format saves only the GameState; pkl and jsonpickle persist StoriesGame
+            NOTE saving in JSON format saves only the GameState; snapshot, pkl and jsonpickle persist StoriesGame
         """
-        extension = 'pkl' if how=='pkl' else 'json'
+        extension = {'pkl' : 'pkl', 'snapshot' : 'snapshot'}.get(how, 'json')
         filename = f'{gamefile_base_name}.{extension}'      # folder/filename
         result = CommandResult()
-        if how=="json":
+        if how=="snapshot":
+            if source == "mongo":
+                result = self.stories_game.data_manager.save_game_snapshot(game_id, snapshot)
+            else:
+                with open(f"{filename}.tmp", "wb") as fp:
+                    fp.write(snapshot)
+                os.replace(f"{filename}.tmp", filename)
+                result.message = f"Saved game {game_id} to {filename} ({len(snapshot)} bytes)"
+        elif how=="json":
             result.message = "save game (JSON) not yet implemented - but soon!"
         elif how=='pkl':
             result.message = "save game (pkl) not yet implemented - but soon!"
@@ -1227,9 +1353,10 @@ class GameEngineCommands(object):
                 TODO - test STEAL_LINES, TRADE_LINES  for individual, team and collaborative play
         """
         action_type = action_card.action_type        # ActionType
+        initials = player.player_initials            # player is reused by STIR_POT
         num_args = len(args)
         
-        message = f'{player.player_initials} Playing  {action_card.action_type}: {action_card.text}'
+        message = f'{player.player_initials} Playing  {action_card.action_type}: {self.card_text(action_card)}'
         min_args = action_card.min_arguments
         max_args = action_card.max_arguments
 
@@ -1284,7 +1411,7 @@ class GameEngineCommands(object):
             if insert_mode:
                 index = int(card_id[1:])
                 action_card_played = target_player.play_card(action_card, insert_after_line=index-1)
-                message = f"You played {action_card_played.number}. {action_card_played.text}" if action_card_played is not None \
+                message = f"You played {action_card_played.number}. {self.card_text(action_card_played)}" if action_card_played is not None \
                           else f"Line number {index} is invalid"
             else:
                 story_card = self._get_card(player, card_id)
@@ -1292,7 +1419,7 @@ class GameEngineCommands(object):
                 play_result:CommandResult = self._play_card(target_player, story_card, as_player=player)
                 if play_result.is_successful():
                     story_card_played = play_result.properties["story_card_played"]
-                    message = f"You played {action_card_played.number}. {action_card_played.text} and {story_card_played.number}. {story_card_played.text}"
+                    message = f"You played {action_card_played.number}. {self.card_text(action_card_played)} and {story_card_played.number}. {self.card_text(story_card_played)}"
                 else:
                     message = play_result.message
                     return_code = play_result.return_code
@@ -1325,7 +1452,7 @@ class GameEngineCommands(object):
             result = self.play(card_number)
             if result.return_code is CommandResult.SUCCESS:
                 self.stories_game.story_card_deck.next_card_number = card_number + 1
-            message = f"You played {action_card.number}. {action_card.text} {result.message}"
+            message = f"You played {action_card.number}. {self.card_text(action_card)} {result.message}"
                 
         elif action_type is ActionType.STEAL_LINES:
             # Steal a story card played by another player
@@ -1408,7 +1535,7 @@ class GameEngineCommands(object):
             if self.game_parameters.automatic_draw:
                 message = ""
                 for player in self.game_state.players:
-                    card = player.story_card_hand.cards.pick_any()
+                    card = player.story_card_hand.cards.pick_any(self._stories_game.rng)
                     result:CommandResult = self.pass_card(card.number, Direction.LEFT, initials=player.player_initials)
                     if not result.is_successful():
                         return result
@@ -1451,15 +1578,24 @@ class GameEngineCommands(object):
                     story_card = story_cards.get(story_line_number)
                     regstr = f"\\b{names[0]}\\b|^{names[0]}"
                     regx = re.compile(regstr, re.IGNORECASE)
-                    m = regx.subn(names[1], story_card.text)
-                    
-                    story_card.text = m[0]
+                    m = regx.subn(names[1], self.card_text(story_card))
+                    #
+                    # the StoryCard may be shared with other games through the CardCatalog
+                    # so the changed text goes on a copy that replaces the story line.
+                    # The text already has the game's aliases, the copy is rendered without them.
+                    #
+                    story_card = story_card.copy(text=m[0])
+                    story_cards.replace_card(story_line_number, story_card)
                     
             if return_code == CommandResult.SUCCESS:
                 action_card_played = player.play_card(action_card)
-                message = f"You played {action_card_played.number}. {action_card_played.text} on {story_card.number}. {story_card.text}"
+                message = f"You played {action_card_played.number}. {self.card_text(action_card_played)} on {story_card.number}. {self.card_text(story_card)}"
             
         result = CommandResult(return_code, message)
+        if result.is_successful():
+            self.game_state.changed()
+            self._emit(GameEventType.ACTION, initials=initials, action_type=action_type.value, args=[str(arg) for arg in args], \
+                       **self._card_event(action_card))
         return result
     
     def _log_error(self, message)->CommandResult:
@@ -0,0 +1,209 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+
+from game.gameConstants import GameEventType
+from game.gameSerializer import GameSerializer
+from collections import deque
+from threading import Lock
+from typing import Callable, Dict, List, Tuple
+import itertools, time
+
+class GameEvent(object):
+    """
+        An event published on a GameEventBus. The offset is the event's position in the game's event log,
+        starting at 1, and is used by subscribers to resume where they left off.
+        The data is a JSON-serializable dict. The event is serialized once, however many subscribers it is sent to.
+    """
+    __slots__ = ("_offset", "_event_type", "_data", "_time", "_json")
+
+    def __init__(self, offset:int, event_type:GameEventType, data:dict):
+        self._offset = offset
+        self._event_type = event_type
+        self._data = data
+        self._time = time.time()
+        self._json:str = None
+
+    @property
+    def offset(self)->int:
+        return self._offset
+
+    @property
+    def event_type(self)->GameEventType:
+        return self._event_type
+
+    @property
+    def data(self)->dict:
+        return self._data
+
+    @property
+    def time(self)->float:
+        return self._time
+
+    def to_dict(self)->dict:
+        return {"offset" : self._offset, "type" : self._event_type.value, "time" : round(self._time, 3), **self._data}
+
+    def to_JSON(self)->str:
+        if self._json is None:
+            self._json = GameSerializer.dumps(self.to_dict())
+        return self._json
+
+    def __str__(self)->str:
+        return self.to_JSON()
+
+class GameEventBus(object):
+    """
+        The events of one game, published by GameEngineCommands as commands complete.
+        The most recent events are kept in a log of a fixed capacity so that a subscriber that joins late,
+        or reconnects, can resume from the offset of the last event it received.
+        Subscribers are callables that are called with each GameEvent as it is published, in offset order,
+        and with None when the bus is closed. They are called on the publishing thread, while the bus is locked,
+        so they must not block: a server subscriber hands the event to its event loop, see GameEventStream.
+        There is one bus per game_id for the life of the process, use GameEventBus.get_bus().
+    """
+    DEFAULT_CAPACITY = 1000
+
+    _buses:Dict[str, "GameEventBus"] = {}
+    _lock = Lock()    # guards _buses
+
+    def __init__(self, game_id:str, capacity:int=DEFAULT_CAPACITY):
+        """Use GameEventBus.get_bus() rather than this constructor
+        """
+        self._game_id = game_id
+        self._capacity = capacity
+        self._events:deque = deque(maxlen=capacity)    # GameEvent, the most recent capacity events
+        self._offset = 0                               # the offset of the last event published
+        self._subscribers:Dict[int, Callable[[GameEvent|None], None]] = {}
+        self._subscription_ids = itertools.count(1)
+        self._closed = False
+        self._lock = Lock()    # guards the log and the subscribers
+
+    @property
+    def game_id(self)->str:
+        return self._game_id
+
+    @property
+    def capacity(self)->int:
+        return self._capacity
+
+    @property
+    def offset(self)->int:
+        """The offset of the last event published, 0 if there are none
+        """
+        return self._offset
+
+    @property
+    def first_offset(self)->int:
+        """The offset of the oldest event in the log
+        """
+        with self._lock:
+            return self._events[0].offset if len(self._events) > 0 else self._offset + 1
+
+    @property
+    def closed(self)->bool:
+        return self._closed
+
+    def subscriber_count(self)->int:
+        return len(self._subscribers)
+
+    def publish(self, event_type:GameEventType, **data)->GameEvent|None:
+        """Adds an event to the log and calls the subscribers with it.
+            Arguments:
+                event_type - the GameEventType
+                data - the event properties, which must be JSON-serializable
+            Returns: the GameEvent, or None if the bus is closed
+        """
+        with self._lock:
+            if self._closed:
+                return None
+            self._offset += 1
+            event = GameEvent(self._offset, event_type, data)
+            self._events.append(event)
+            for subscriber in list(self._subscribers.values()):
+                subscriber(event)
+        return event
+
+    def events_since(self, offset:int)->List[GameEvent]|None:
+        """Returns: the events after a given offset, or None if some of them are no longer in the log
+            or the offset is not one of this bus, for example after the server restarted.
+        """
+        with self._lock:
+            return self._events_since(offset)
+
+    def _events_since(self, offset:int)->List[GameEvent]|None:
+        if offset > self._offset or offset < 0:
+            return None
+        if offset == self._offset:
+            return []
+        first = self._events[0].offset if len(self._events) > 0 else self._offset + 1
+        if offset < first - 1:
+            return None
+        return list(itertools.islice(self._events, offset - first + 1, None))
+
+    def subscribe(self, subscriber:Callable[[GameEvent|None], None], offset:int=None)->Tuple[int, List[GameEvent]|None]:
+        """Adds a subscriber that is called with each event published from now on.
+            Arguments:
+                subscriber - a non-blocking callable, called with each GameEvent and with None when the bus is closed
+                offset - the offset of the last event the subscriber has received, to resume from.
+                    The default, None, is to receive new events only.
+            Returns: a tuple of the subscription id, for unsubscribe(), and the events after offset.
+                The events are None if they are not all in the log, the subscriber should refresh its state
+                and continue with the new events.
+                Taking the events and subscribing is atomic, so no event is missed or received twice.
+        """
+        with self._lock:
+            subscription_id = next(self._subscription_ids)
+            if self._closed:
+                subscriber(None)
+            else:
+                self._subscribers[subscription_id] = subscriber
+            events = [] if offset is None else self._events_since(offset)
+        return subscription_id, events
+
+    def unsubscribe(self, subscription_id:int)->bool:
+        with self._lock:
+            return self._subscribers.pop(subscription_id, None) is not None
+
+    def close(self):
+        """Closes the bus, the subscribers are called with None and removed. The log can still be read.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            subscribers = list(self._subscribers.values())
+            self._subscribers.clear()
+            for subscriber in subscribers:
+                subscriber(None)
+
+    def stats(self)->dict:
+        return {"game_id" : self._game_id, "offset" : self._offset, "logged" : len(self._events),
+                "subscribers" : len(self._subscribers), "closed" : self._closed}
+
+    @staticmethod
+    def get_bus(game_id:str, create:bool=True)->"GameEventBus|None":
+        """Returns: the GameEventBus of a game, created if it doesn't exist and create is True
+        """
+        with GameEventBus._lock:
+            bus = GameEventBus._buses.get(game_id)
+            if bus is None and create:
+                bus = GameEventBus(game_id)
+                GameEventBus._buses[game_id] = bus
+            return bus
+
+    @staticmethod
+    def remove(game_id:str)->bool:
+        """Closes and removes the GameEventBus of a game that is over
+        """
+        with GameEventBus._lock:
+            bus = GameEventBus._buses.pop(game_id, None)
+        if bus is not None:
+            bus.close()
+        return bus is not None
+
+    @staticmethod
+    def buses()->Dict[str, "GameEventBus"]:
+        with GameEventBus._lock:
+            return dict(GameEventBus._buses)
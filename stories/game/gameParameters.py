@@ -4,8 +4,8 @@ Created on Dec 9, 2023
 @author: don_bacon
 '''
    
+from game.gameSerializer import GameSerializer
 from typing import Dict, List
-import json
 
 class GameParameters(object):
     '''
@@ -141,6 +141,6 @@ class GameParameters(object):
         return str(self._game_parameters)
     
     def to_JSON(self, indent=2):
-        return json.dumps(self._game_parameters, indent=indent)
+        return GameSerializer.dumps(self._game_parameters, indent=indent)
     
     
\ No newline at end of file
@@ -0,0 +1,116 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+
+from typing import List
+import os, random
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class GameRandom(object):
+    """
+        The random number generator of a single game, used for the card deck shuffles and draws, dice rolls and random picks.
+        Each game has its own seeded generator, so games don't contend for the random module's generator
+        and a game created with the same seed deals the same cards in the same order.
+        The seed is recorded in the GameState, the generator state is saved with the game,
+        so a restored game continues the same sequence.
+        The generator is a NumPy PCG64 Generator if numpy is installed, which creates permutations in bulk,
+        otherwise a random.Random instance. NumPy floats are generated BATCH_SIZE at a time,
+        because a single NumPy draw costs more than a random.Random draw.
+    """
+    BATCH_SIZE = 256    # floats generated at a time by a NumPy generator
+
+    def __init__(self, seed:int=None):
+        """
+            Arguments:
+                seed - the seed of the generator, default is a random 64-bit seed.
+        """
+        self._seed = int.from_bytes(os.urandom(8), "little") if seed is None else seed
+        self._create_generator()
+
+    def _create_generator(self):
+        if numpy is not None:
+            self._generator = numpy.random.Generator(numpy.random.PCG64(self._seed))
+            self._numpy = True
+            self._batch:List[float] = []    # the floats not yet used, last one first
+        else:
+            self._generator = random.Random(self._seed)
+            self._numpy = False
+
+    @property
+    def seed(self)->int:
+        return self._seed
+
+    @property
+    def numpy(self)->bool:
+        """True if the generator is NumPy-backed
+        """
+        return self._numpy
+
+    def random(self)->float:
+        """Returns: a random float in [0.0, 1.0)
+        """
+        if self._numpy:
+            if not self._batch:
+                self._batch = self._generator.random(GameRandom.BATCH_SIZE).tolist()
+            return self._batch.pop()
+        return self._generator.random()
+
+    def randrange(self, size:int)->int:
+        """Returns: a random integer from 0 to size-1
+        """
+        return int(self._generator.integers(size)) if self._numpy else self._generator.randrange(size)
+
+    def permutation(self, size:int)->List[int]:
+        """Returns a random permutation of the integers from 0 to size-1, an empty List if size==0
+        """
+        if size <= 0:
+            return []
+        if self._numpy:
+            return self._generator.permutation(size).tolist()
+        indexes = list(range(size))
+        self._generator.shuffle(indexes)
+        return indexes
+
+    def shuffle_list(self, items:List)->List:
+        """Returns: a shuffled copy of items
+        """
+        return [items[ind] for ind in self.permutation(len(items))]
+
+    def choices(self, population:List, k:int=1)->List:
+        """Returns: k elements of population chosen with replacement
+        """
+        if self._numpy:
+            return [population[ind] for ind in self._generator.integers(len(population), size=k).tolist()]
+        return self._generator.choices(population, k=k)
+
+    def __getstate__(self)->dict:
+        if self._numpy:
+            state = {"bit_generator" : self._generator.bit_generator.state, "batch" : list(self._batch)}
+        else:
+            version, internal_state, gauss_next = self._generator.getstate()
+            state = {"version" : version, "state" : list(internal_state), "gauss_next" : gauss_next}
+        return {"seed" : self._seed, "numpy" : self._numpy, "state" : state}
+
+    def __setstate__(self, state:dict):
+        """Restores the generator state. A state saved by the other kind of generator
+            (for example a NumPy generator restored where numpy is not installed) can't be restored,
+            the generator is then reseeded with the saved seed.
+        """
+        self._seed = state["seed"]
+        self._create_generator()
+        if state.get("numpy") == self._numpy and state.get("state") is not None:
+            if self._numpy:
+                self._generator.bit_generator.state = state["state"]["bit_generator"]
+                self._batch = list(state["state"]["batch"])
+            else:
+                saved = state["state"]
+                self._generator.setstate((saved["version"], tuple(saved["state"]), saved["gauss_next"]))
+
+    def __str__(self)->str:
+        return f"GameRandom seed {self._seed} {'numpy' if self._numpy else 'random'}"
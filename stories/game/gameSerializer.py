@@ -0,0 +1,145 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+
+from datetime import date, datetime
+from enum import Enum
+from operator import attrgetter
+from threading import Lock
+from typing import Any, Callable, Dict, Tuple
+import json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class SerializerSchema(object):
+    """
+        The compiled fields of a class for GameSerializer: the dict key of each field and the function that gets its value.
+    """
+    __slots__ = ("cls", "fields", "optional", "summary")
+
+    def __init__(self, cls:type, fields:Dict[str, str|Callable], optional:Tuple[str]=(), summary:Tuple[str]=()):
+        """
+            Arguments:
+                cls - the class
+                fields - the dict key of each field and the name of its attribute or property, or a function of the object
+                optional - the keys of fields that are left out if their value is None
+                summary - the keys of the cheap scalar fields shown by repr()
+        """
+        self.cls = cls
+        self.fields:Tuple[Tuple[str, Callable]] = tuple((key, attrgetter(getter) if isinstance(getter, str) else getter) for key,getter in fields.items())
+        self.optional = tuple(optional)
+        self.summary:Tuple[Tuple[str, Callable]] = tuple((key, getter) for key,getter in self.fields if key in summary)
+
+    def to_dict(self, obj)->dict:
+        d = {key : getter(obj) for key,getter in self.fields}
+        for key in self.optional:
+            if d[key] is None:
+                del d[key]
+        return d
+
+    def repr(self, obj)->str:
+        values = ", ".join(f"{key}={getter(obj)!r}" for key,getter in self.summary)
+        return f"{type(obj).__name__}({values})"
+
+class GameSerializer(object):
+    """
+        Serializes game objects to JSON, with orjson if it is installed and the json module otherwise.
+        The output of either is compact, or indented by the number of spaces given, and the text is not ASCII-escaped.
+        orjson only indents by 2 spaces, the json module is used for any other indent.
+        Classes register a SerializerSchema once, when their module is loaded, and their to_dict() uses it.
+        Values that are not JSON types are converted with their to_dict() method or schema,
+        Enums to their value, dates to ISO format and other objects with str().
+        repr() of a registered class shows only its summary fields, so it is cheap enough for log lines.
+    """
+    _lock = Lock()
+    _schemas:Dict[type, SerializerSchema] = {}
+
+    @staticmethod
+    def register(cls:type, fields:Dict[str, str|Callable], optional:Tuple[str]=(), summary:Tuple[str]=())->SerializerSchema:
+        """Registers the fields of a class. @see SerializerSchema
+        """
+        schema = SerializerSchema(cls, fields, optional, summary)
+        with GameSerializer._lock:
+            GameSerializer._schemas[cls] = schema
+        return schema
+
+    @staticmethod
+    def get_schema(cls:type)->SerializerSchema|None:
+        """Returns: the schema of a class or its nearest registered base class, None if there is none
+        """
+        schema = GameSerializer._schemas.get(cls)
+        if schema is None:
+            for base in cls.__mro__[1:]:
+                schema = GameSerializer._schemas.get(base)
+                if schema is not None:
+                    with GameSerializer._lock:
+                        GameSerializer._schemas[cls] = schema
+                    break
+        return schema
+
+    @staticmethod
+    def to_dict(obj)->dict:
+        """Returns: the registered fields of an object as a dict
+            Raises a TypeError if neither the object's class nor a base class is registered
+        """
+        schema = GameSerializer.get_schema(type(obj))
+        if schema is None:
+            raise TypeError(f"{type(obj).__name__} is not registered with GameSerializer")
+        return schema.to_dict(obj)
+
+    @staticmethod
+    def repr(obj)->str:
+        """Returns: the class name and summary fields of an object, for example Player(initials='DWB', number=0)
+        """
+        schema = GameSerializer.get_schema(type(obj))
+        if schema is None:
+            return f"<{type(obj).__name__} object at {id(obj):#x}>"
+        return schema.repr(obj)
+
+    @staticmethod
+    def default(value:Any)->Any:
+        """Converts a value that is not a JSON type
+        """
+        if hasattr(value, "to_dict"):
+            return value.to_dict()
+        schema = GameSerializer.get_schema(type(value))
+        if schema is not None:
+            return schema.to_dict(value)
+        if isinstance(value, Enum):
+            return value.value
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, (set, tuple, frozenset)):
+            return list(value)
+        return str(value)
+
+    @staticmethod
+    def dumpb(value:Any, indent:int=None)->bytes:
+        """Returns: the value as UTF-8 encoded JSON, indented by indent spaces if indent is > 0
+        """
+        if orjson is not None and (not indent or indent == 2):
+            option = orjson.OPT_INDENT_2 if indent else 0
+            return orjson.dumps(value, default=GameSerializer.default, option=option | orjson.OPT_NON_STR_KEYS)
+        return GameSerializer._dumps(value, indent).encode("utf-8")
+
+    @staticmethod
+    def dumps(value:Any, indent:int=None)->str:
+        """Returns: the value as JSON, indented by indent spaces if indent is > 0
+        """
+        if orjson is not None and (not indent or indent == 2):
+            return GameSerializer.dumpb(value, indent).decode("utf-8")
+        return GameSerializer._dumps(value, indent)
+
+    @staticmethod
+    def _dumps(value:Any, indent:int=None)->str:
+        if indent:
+            return json.dumps(value, default=GameSerializer.default, ensure_ascii=False, indent=indent)
+        return json.dumps(value, default=GameSerializer.default, ensure_ascii=False, separators=(",", ":"))
+
+    @staticmethod
+    def loads(text:str|bytes)->Any:
+        return orjson.loads(text) if orjson is not None else json.loads(text)
@@ -0,0 +1,269 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+
+from game.storiesGameEngine import StoriesGameEngine
+from game.gameEngineCommands import GameEngineCommands
+from game.storiesGame import StoriesGame
+from game.gameState import GameState
+from game.player import Player
+from game.team import Team
+from game.storyCard import StoryCard
+from game.storyCardList import StoryCardList
+from game.storyCardHand import StoryCardHand
+from game.cardDeck import CardDeck
+from game.cardCatalog import CardCatalog
+from game.characterAlias import CharacterAlias
+from game.gameRandom import GameRandom
+from game.gameParameters import GameParameters
+from game.dataManager import DataManager
+from game.environment import Environment
+from game import gameConstants
+from game.gameConstants import GameConstants
+from array import array
+from collections import deque
+from datetime import datetime
+from enum import Enum
+import io, logging, pickle, struct
+
+class GameSnapshot(object):
+    """
+        A compact, versioned binary snapshot of a complete StoriesGameEngine: the GameState, players, teams,
+        hands and stories, the CardDeck piles and active flags, the discard deque, the game parameters
+        and the game's GameRandom.
+
+        The shared CardCatalog is not included. Catalog cards are saved by card number, lists of catalog cards
+        (the deck, hands and stories) as arrays of card numbers. The catalog is identified by its source, genre,
+        game parameters type and digest, a hash of its content, so another process loading the same cards can restore
+        the game. Restoring a game does not read the genre files or database again and the restored game shares the catalog cards. Cards that are not in the catalog, for example a card
+        whose character names were changed, are saved by value.
+
+        Format: b"STGS" + format version (uint16) + flags (uint16) + payload.
+        The payload is a tuple: (source, genre, game_parameters_type, catalog_digest, character_alias, objects, root)
+        where objects is a table of (class name, state) for each game object, and references to objects are by table index.
+        It contains only builtin types (tuples, lists, dicts, str, bytes, numbers and None) and is pickled with
+        a fixed protocol, which every Python version reads, and loaded without importing any classes.
+
+        Bump FORMAT_VERSION when the saved state of a game object changes. Snapshots of another format version
+        are not loaded.
+    """
+    MAGIC = b"STGS"
+    FORMAT_VERSION = 1
+    PICKLE_PROTOCOL = 4
+    _HEADER = struct.Struct("<4sHH")
+
+    # value tags
+    _OBJECT, _CARD, _CARD_ARRAY, _INT_ARRAY, _TUPLE, _DEQUE, _ENUM, _DATETIME, _BYTEARRAY, _SET, \
+        _CATALOG, _CATALOG_CARDS, _TEMPLATE, _TEMPLATE_ITEM, _ENVIRONMENT, _LOGGER, _ARRAY, _RANGE, _CHARACTER_ALIAS = range(19)
+
+    # classes that are saved in the object table
+    _CLASSES = {cls.__name__ : cls for cls in (StoriesGameEngine, GameEngineCommands, StoriesGame, GameState, Player, Team, \
+                StoryCard, StoryCardList, StoryCardHand, CardDeck, GameParameters, DataManager, GameConstants, GameRandom)}
+
+    class _PayloadUnpickler(pickle.Unpickler):
+        """Loads a payload of builtin types, a snapshot can't make it import or call anything
+        """
+        def find_class(self, module:str, name:str):
+            raise pickle.UnpicklingError(f"Invalid game snapshot: {module}.{name}")
+
+    class _Encoder(object):
+        def __init__(self, catalog:CardCatalog):
+            self.catalog = catalog
+            self.cards = catalog.cards
+            self.ncards = len(self.cards)
+            self.objects = []
+            self.object_ids = {}        # object table index by object id
+            template = catalog.story_card_template
+            self.template_ids = {id(value) : key for key,value in template.items() if isinstance(value, (list, dict))}
+            self.template_ids[id(template)] = None
+
+        def card(self, card:StoryCard)->tuple|None:
+            """Returns the reference to a catalog card, or None if the card is not a catalog card
+            """
+            number = card.number
+            if isinstance(number, int) and 0 <= number < self.ncards:
+                if self.cards[number] is card:
+                    return (GameSnapshot._CARD, number)
+            return None
+
+        def card_array(self, cards:list)->tuple|None:
+            """Saves a list of catalog cards as an array of card numbers.
+                Returns None if any of the cards is not a catalog card.
+            """
+            refs = [self.card(card) if isinstance(card, StoryCard) else None for card in cards]
+            if None in refs:
+                return None
+            return (GameSnapshot._CARD_ARRAY, array('i', [ref[1] for ref in refs]).tobytes())
+
+        def encode(self, value):
+            if value is None or isinstance(value, (bool, int, float, str, bytes)):
+                return value
+            if isinstance(value, Enum):
+                return (GameSnapshot._ENUM, type(value).__name__, value.value)
+            if isinstance(value, list):
+                if len(value) > 0:
+                    if isinstance(value[0], StoryCard):
+                        encoded = self.card_array(value)
+                        if encoded is not None:
+                            return encoded
+                    elif all(type(v) is int for v in value):
+                        return (GameSnapshot._INT_ARRAY, array('q', value).tobytes())
+                if id(value) in self.template_ids:
+                    return (GameSnapshot._TEMPLATE_ITEM, self.template_ids[id(value)])
+                return [self.encode(v) for v in value]
+            if isinstance(value, dict):
+                if id(value) in self.template_ids:
+                    key = self.template_ids[id(value)]
+                    return (GameSnapshot._TEMPLATE,) if key is None else (GameSnapshot._TEMPLATE_ITEM, key)
+                return {self.encode(k) : self.encode(v) for k,v in value.items()}
+            if isinstance(value, StoryCard):
+                ref = self.card(value)
+                if ref is not None:
+                    return ref
+            if type(value).__name__ in GameSnapshot._CLASSES:
+                return (GameSnapshot._OBJECT, self.add_object(value))
+            if isinstance(value, tuple):
+                if value is self.cards:
+                    return (GameSnapshot._CATALOG_CARDS,)
+                return (GameSnapshot._TUPLE, [self.encode(v) for v in value])
+            if isinstance(value, deque):
+                return (GameSnapshot._DEQUE, [self.encode(v) for v in value])
+            if isinstance(value, datetime):
+                return (GameSnapshot._DATETIME, value.isoformat())
+            if isinstance(value, bytearray):
+                return (GameSnapshot._BYTEARRAY, bytes(value))
+            if isinstance(value, array):
+                return (GameSnapshot._ARRAY, value.typecode, value.tobytes())
+            if isinstance(value, range):
+                return (GameSnapshot._RANGE, value.start, value.stop, value.step)
+            if isinstance(value, CharacterAlias):
+                return (GameSnapshot._CHARACTER_ALIAS, value.alias)
+            if isinstance(value, (set, frozenset)):
+                return (GameSnapshot._SET, [self.encode(v) for v in value])
+            if value is self.catalog:
+                return (GameSnapshot._CATALOG,)
+            if isinstance(value, Environment):
+                return (GameSnapshot._ENVIRONMENT,)
+            if isinstance(value, logging.Logger):
+                return (GameSnapshot._LOGGER, value.name)
+            raise TypeError(f"Game snapshot does not support {type(value).__name__}")
+
+        def add_object(self, obj)->int:
+            index = self.object_ids.get(id(obj))
+            if index is None:
+                index = len(self.objects)
+                self.object_ids[id(obj)] = index
+                self.objects.append(None)    # reserve the slot, the state may refer back to this object
+                state = (obj.__getstate__() if hasattr(obj, "__getstate__") else obj.__dict__) or {}
+                self.objects[index] = (type(obj).__name__, {k : self.encode(v) for k,v in state.items()})
+            return index
+
+    class _Decoder(object):
+        def __init__(self, catalog:CardCatalog, objects:list):
+            self.catalog = catalog
+            self.cards = catalog.cards
+            self.template = catalog.story_card_template
+            self.encoded_objects = objects
+            # create every object first so references between objects can be resolved
+            self.objects = [GameSnapshot._CLASSES[class_name].__new__(GameSnapshot._CLASSES[class_name]) for class_name,_ in objects]
+
+        def restore_objects(self):
+            for obj,(class_name, encoded_state) in zip(self.objects, self.encoded_objects):
+                state = {k : self.decode(v) for k,v in encoded_state.items()}
+                if hasattr(type(obj), "__setstate__"):
+                    obj.__setstate__(state)
+                else:
+                    obj.__dict__.update(state)
+
+        def decode(self, value):
+            if isinstance(value, tuple):
+                tag = value[0]
+                if tag == GameSnapshot._OBJECT:
+                    return self.objects[value[1]]
+                elif tag == GameSnapshot._CARD:
+                    return self.cards[value[1]]
+                elif tag == GameSnapshot._CARD_ARRAY:
+                    cards = self.cards
+                    return [cards[n] for n in array('i', value[1])]
+                elif tag == GameSnapshot._INT_ARRAY:
+                    return array('q', value[1]).tolist()
+                elif tag == GameSnapshot._ENUM:
+                    return getattr(gameConstants, value[1])(value[2])
+                elif tag == GameSnapshot._TUPLE:
+                    return tuple(self.decode(v) for v in value[1])
+                elif tag == GameSnapshot._DEQUE:
+                    return deque(self.decode(v) for v in value[1])
+                elif tag == GameSnapshot._DATETIME:
+                    return datetime.fromisoformat(value[1])
+                elif tag == GameSnapshot._BYTEARRAY:
+                    return bytearray(value[1])
+                elif tag == GameSnapshot._ARRAY:
+                    return array(value[1], value[2])
+                elif tag == GameSnapshot._RANGE:
+                    return range(value[1], value[2], value[3])
+                elif tag == GameSnapshot._CHARACTER_ALIAS:
+                    return CharacterAlias.get(value[1])    # shared with the other games using the same aliases
+                elif tag == GameSnapshot._SET:
+                    return set(self.decode(v) for v in value[1])
+                elif tag == GameSnapshot._CATALOG:
+                    return self.catalog
+                elif tag == GameSnapshot._CATALOG_CARDS:
+                    return self.cards
+                elif tag == GameSnapshot._TEMPLATE:
+                    return self.template
+                elif tag == GameSnapshot._TEMPLATE_ITEM:
+                    return self.template[value[1]]
+                elif tag == GameSnapshot._ENVIRONMENT:
+                    return Environment.get_environment()
+                elif tag == GameSnapshot._LOGGER:
+                    return logging.getLogger(value[1])
+                raise ValueError(f"Invalid game snapshot tag {tag}")
+            elif isinstance(value, list):
+                return [self.decode(v) for v in value]
+            elif isinstance(value, dict):
+                return {self.decode(k) : self.decode(v) for k,v in value.items()}
+            return value
+
+    @staticmethod
+    def dumps(game_engine:StoriesGameEngine)->bytes:
+        """Creates a snapshot of a game engine.
+            Arguments:
+                game_engine - the StoriesGameEngine to save. It must have a StoriesGame, see StoriesGameEngine.create()
+            Returns: the snapshot bytes
+            Raises a TypeError if the game contains a value that can't be saved.
+        """
+        card_deck = game_engine.stories_game.story_card_deck
+        catalog:CardCatalog = card_deck.catalog
+        alias = card_deck.character_alias
+        encoder = GameSnapshot._Encoder(catalog)
+        root = encoder.add_object(game_engine)
+        source, genre, game_parameters_type = catalog.key
+        payload = (source, genre.value, game_parameters_type.value, catalog.digest, alias, encoder.objects, root)
+        return GameSnapshot._HEADER.pack(GameSnapshot.MAGIC, GameSnapshot.FORMAT_VERSION, 0) + pickle.dumps(payload, GameSnapshot.PICKLE_PROTOCOL)
+
+    @staticmethod
+    def loads(data:bytes)->StoriesGameEngine:
+        """Restores a game engine from a snapshot.
+            Arguments:
+                data - the snapshot bytes
+            Raises a ValueError if the data is not a snapshot, the snapshot format is not supported,
+            or its card catalog is not available.
+        """
+        if len(data) < GameSnapshot._HEADER.size:
+            raise ValueError("Invalid game snapshot")
+        magic, format_version, _ = GameSnapshot._HEADER.unpack_from(data)
+        if magic != GameSnapshot.MAGIC:
+            raise ValueError("Invalid game snapshot")
+        if format_version != GameSnapshot.FORMAT_VERSION:
+            raise ValueError(f"Unsupported game snapshot format {format_version}")
+        try:
+            payload = GameSnapshot._PayloadUnpickler(io.BytesIO(memoryview(data)[GameSnapshot._HEADER.size:])).load()
+        except (EOFError, TypeError, ValueError, pickle.UnpicklingError) as ex:
+            raise ValueError(f"Invalid game snapshot: {str(ex)}")
+        source, genre, game_parameters_type, digest, alias, objects, root = payload
+        catalog = CardCatalog.get_catalog_digest(source, genre, game_parameters_type, digest)
+        decoder = GameSnapshot._Decoder(catalog, objects)
+        decoder.restore_objects()
+        return decoder.objects[root]
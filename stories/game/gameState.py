@@ -5,16 +5,18 @@ Created on Dec 8, 2023
 '''
 
 from datetime import datetime
-import json
 from game.player import Player
 from game.team import Team
 from game.storiesObject import StoriesObject
+from game.gameSerializer import GameSerializer
 from game.gameConstants import GameParametersType, CardType, PlayerRole, GenreType, PlayMode
 from typing import List, Dict
+import os
 
 class GameState(StoriesObject):
     """Maintains the global state of a Stories game instance.
-    
+    The game status, to_dict(), has a version that is incremented when the game changes, see changed().
+    Clients that poll the status use the version to get only what changed, see changes_since() and etag().
     """
 
 
@@ -51,6 +53,29 @@ class GameState(StoriesObject):
         self._round = 0    # the current round number
         self._genre:GenreType = GenreType.UNASSIGNED
         self._play_mode:PlayMode = PlayMode.UNASSIGNED
+        self._seed:int = None    # the seed of the game's GameRandom
+        self._version:int = 0    # the status version, see changed()
+        self._reset_versions()
+    
+    def __getstate__(self)->dict:
+        state = dict(self.__dict__)
+        for name in ("_epoch", "_base", "_fields_version", "_player_versions", "_teams_version"):
+            state.pop(name, None)    # the changes are tracked again when the game is restored
+        return state
+    
+    def __setstate__(self, state:dict):
+        self.__dict__.update(state)
+        self._version += 1
+        self._reset_versions()
+    
+    def _reset_versions(self):
+        """Starts a new epoch, the status versions before the current version are not known
+        """
+        self._epoch = os.urandom(4).hex()
+        self._base = self._version
+        self._fields_version = self._version
+        self._player_versions:List[int] = [self._version] * len(self._players)
+        self._teams_version = self._version
     
     @property
     def game_id(self):
@@ -223,6 +248,7 @@ class GameState(StoriesObject):
         self.current_player.can_roll = True
         if npn == 0:
             self.increment_turns()
+        self.changed(fields=True)
 
         return self.current_player_number
 
@@ -255,12 +281,14 @@ class GameState(StoriesObject):
         """
         aplayer.number = self.number_of_players()     # starts at 0
         self._players.append(aplayer)
+        self.changed(aplayer, fields=True)
         return aplayer.number
 
     def add_team(self, team:Team)->bool:
         added = team.name not in self._teams
         if added:
             self._teams[team.name] = team
+            self.changed(teams=True)
         return added
     
     def get_player_by_initials(self, initials):
@@ -303,23 +331,78 @@ class GameState(StoriesObject):
         return players
 
     def to_JSON(self, indent=2):
-        gs = self.to_dict()
-        return json.dumps(gs, indent=indent) if indent>0 else json.dumps(gs)
+        return GameSerializer.dumps(self.to_dict(), indent=indent)
+    
+    @property
+    def seed(self)->int:
+        return self._seed
+    
+    @seed.setter
+    def seed(self, value:int):
+        self._seed = value
+    
+    @property
+    def version(self)->int:
+        """The status version, incremented every time the game changes
+        """
+        return self._version
+    
+    def changed(self, *players:Player, fields:bool=False, teams:bool=False)->int:
+        """Increments the status version after the game changes, for example a player is added, a card is drawn or played,
+            or the turn or round ends. The version of the parts of the status that changed is kept for changes_since().
+            Arguments:
+                players - the players whose to_dict() changed
+                fields - True if the status fields, the status without the players and teams, changed
+                teams - True if the teams changed
+            Returns: the status version
+        """
+        self._version += 1
+        player_versions = self._player_versions
+        player_versions.extend([self._version] * (len(self._players) - len(player_versions)))
+        for player in players:
+            player_versions[player.number] = self._version
+        if fields:
+            self._fields_version = self._version
+        if teams:
+            self._teams_version = self._version
+        return self._version
+    
+    def etag(self)->str:
+        """Returns: the entity tag of the current game status, for HTTP conditional requests.
+            It includes the epoch so that a restored game doesn't match a tag from before it was saved.
+        """
+        return f'"{self._epoch}.{self._version}"'
+    
+    @property
+    def epoch(self)->str:
+        """A random tag that identifies the game status versions since the game was created or restored
+        """
+        return self._epoch
+    
+    def changes_since(self, version:int)->dict|None:
+        """Returns: the status fields, players and teams that changed since a version, with the current "version" and "since",
+            or None if the changes since that version are not known, for example the game was restored since.
+            The players are a list of the changed players' to_dict().
+        """
+        if version < self._base or version > self._version:
+            return None
+        changes = {"version" : self._version, "since" : version}
+        if self._fields_version > version:
+            changes.update(self._status_fields())
+        players = [player.to_dict() for player,player_version in zip(self._players, self._player_versions) if player_version > version]
+        if len(players) > 0:
+            changes["players"] = players
+        if self._teams_version > version:
+            changes["teams"] = [team.to_dict() for team in self._teams.values()]
+        return changes
+    
+    def _status_fields(self)->dict:
+        """Returns: the game status without the players and teams, the fields registered with GameSerializer
+        """
+        return GameSerializer.to_dict(self)
     
     def to_dict(self) -> dict:
-        gs = {"game_id" : self._game_id, "game_parameters_type" : self.game_parameters_type.value, \
-              "number_of_players" : self.number_of_players(), "current_player_number" : self.current_player_number }
-        gs["turns"] = self.turns
-        gs["turn_number"] = self.turn_number
-
-        gs["total_points"] = self.total_points
-        gs["elapsed_time"] = self.get_elapsed_time()
-        if self.winning_player is not None:
-            gs["winning_player"] = self.winning_player.player_initials
-        gs["game_complete"] = self.game_complete
-        gs["genre"] = self.genre.value
-        gs["play_mode"] = self.play_mode.value
-
+        gs = self._status_fields()
         players = []
         for player in self.players:
             players.append(player.to_dict())
@@ -333,4 +416,10 @@ class GameState(StoriesObject):
             
         return gs
 
-        
\ No newline at end of file
+GameSerializer.register(GameState, {"game_id" : "game_id", "game_parameters_type" : lambda gs: gs.game_parameters_type.value,
+                                    "number_of_players" : lambda gs: gs.number_of_players(), "current_player_number" : "current_player_number",
+                                    "turns" : "turns", "turn_number" : "turn_number", "total_points" : "total_points",
+                                    "elapsed_time" : lambda gs: gs.get_elapsed_time(),
+                                    "winning_player" : lambda gs: gs.winning_player.player_initials if gs.winning_player is not None else None,
+                                    "game_complete" : "game_complete", "genre" : lambda gs: gs.genre.value, "play_mode" : lambda gs: gs.play_mode.value},
+                        optional=("winning_player",), summary=("game_id", "turn_number", "current_player_number"))
@@ -6,6 +6,7 @@ Created on Dec 8, 2023
 import random, math
 from datetime import datetime
 from typing import List
+from game.gameRandom import GameRandom
 
 class GameUtils(object):
     """
@@ -16,28 +17,32 @@ class GameUtils(object):
         self.params = params
     
     @staticmethod
-    def shuffle(size:int) -> List[int]:
+    def shuffle(size:int, rng:GameRandom=None) -> List[int]:
         """Returns a random sample of the integers from 0 to size-1.
             This represents a shuffle of indexes of some list.
             For example, shuffle(5) could return [0, 4, 1, 2, 3]
             Returns an empty List if size==0
+            Arguments:
+                size - the number of indexes
+                rng - the game's GameRandom, default is the random module
         """
-        return random.sample(list(range(0, size)), size) if size>0 else []
+        if rng is not None:
+            return rng.permutation(size)
+        return random.sample(range(size), size) if size>0 else []
 
     @staticmethod
-    def shuffle_list(lines:List) -> List:
+    def shuffle_list(lines:List, rng:GameRandom=None) -> List:
         """Shuffle List elements
+            Returns: a shuffled copy of lines
         """
-        nlines = len(lines)
-        new_list = []
-        line_indexes = GameUtils.shuffle(nlines)
-        for ind in range(nlines):
-            new_list.append(lines[line_indexes[ind]])
-        return new_list
+        if rng is not None:
+            return rng.shuffle_list(lines)
+        return random.sample(lines, len(lines))
        
     @staticmethod
-    def roll(number_of_dice)->List[int]:
-        return random.choices(population=[1,2,3,4,5,6],k=number_of_dice)
+    def roll(number_of_dice, rng:GameRandom=None)->List[int]:
+        population = [1,2,3,4,5,6]
+        return rng.choices(population, k=number_of_dice) if rng is not None else random.choices(population=population,k=number_of_dice)
     
     @staticmethod
     def roll_dice(number_of_faces=6, origin=1, number_of_dice=1)->List[int]:
@@ -5,11 +5,11 @@ Created on Aug 28, 2024
 '''
 
 import json
-import pymongo
 import argparse
 from typing import List
 from game.commandResult import CommandResult
 from game.gameConstants import GenreType
+from game.mongoClientRegistry import MongoClientRegistry
 
 class Install(object):
     '''
@@ -33,20 +33,13 @@ class Install(object):
     def mongo_init(self)->CommandResult:
         """Initializes MongoDB client info using the .env project file
         """
-        env_file = f'{self._env.package_base}/.env'
-        params = {}
-        with open(env_file, "r") as efp:
-            for line in efp:
-                if len(line)>0:
-                    tokens = line.split("=")
-                    params[tokens[0]] = tokens[1].rstrip()
-        efp.close()
+        params = MongoClientRegistry.get_config()
         self._db_url = params["DB_URL"]
         self._db_name = params["DB_NAME"]
         self._db_name_genres = params["DB_NAME_GENRES"]
         
         try:
-            mongo_client = pymongo.MongoClient(self._db_url)
+            mongo_client = MongoClientRegistry.get_client(self._db_url)
             self._stories_db = mongo_client[self._db_name]
             self._genres_db = mongo_client[self._db_name_genres]
             self._mongo_client = mongo_client
@@ -0,0 +1,250 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+
+from threading import Lock, local
+from typing import Callable, Dict
+import time
+import dotenv
+import pymongo
+from pymongo import monitoring
+from pymongo.database import Database
+from pymongo.collection import Collection
+from pymongo.asynchronous.database import AsyncDatabase
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Collects connection pool metrics for a MongoClient.
+        An instance is registered as an event listener on each client created by the MongoClientRegistry.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._local = local()       # checkout start time of the current thread, used if events have no duration
+        self.pools_created = 0
+        self.pools_cleared = 0
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.checked_out = 0        # connections currently checked out
+        self.max_checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.total_wait_ms = 0.0    # total time spent waiting for a connection
+        self.max_wait_ms = 0.0
+
+    def pool_created(self, event):
+        with self._lock:
+            self.pools_created += 1
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pools_cleared += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+
+    def connection_check_out_started(self, event):
+        self._local.start = time.perf_counter()
+
+    def connection_check_out_failed(self, event):
+        wait_ms = self._wait_ms(event)
+        with self._lock:
+            self.checkout_failures += 1
+            self.total_wait_ms += wait_ms
+
+    def connection_checked_out(self, event):
+        wait_ms = self._wait_ms(event)
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def _wait_ms(self, event)->float:
+        """The checkout wait time in milliseconds. pymongo 4.7 and later report it as the event duration,
+            for earlier versions it is timed from the check out started event on the same thread.
+        """
+        start = getattr(self._local, "start", None)
+        self._local.start = None
+        duration = getattr(event, "duration", None)
+        if duration is not None:
+            return duration * 1000.0
+        return 0.0 if start is None else (time.perf_counter() - start) * 1000.0
+
+    def to_dict(self)->dict:
+        with self._lock:
+            return {"checked_out" : self.checked_out, "max_checked_out" : self.max_checked_out,
+                    "checkouts" : self.checkouts, "checkout_failures" : self.checkout_failures,
+                    "connections_created" : self.connections_created, "connections_closed" : self.connections_closed,
+                    "pools_created" : self.pools_created, "pools_cleared" : self.pools_cleared,
+                    "total_wait_ms" : round(self.total_wait_ms, 3), "max_wait_ms" : round(self.max_wait_ms, 3),
+                    "average_wait_ms" : round(self.total_wait_ms / self.checkouts, 3) if self.checkouts > 0 else 0.0}
+
+class MongoClientRegistry(object):
+    """A process-wide registry of pooled MongoClients, one per database URL.
+        Managers, loaders and the install script get database and collection handles from here
+        rather than creating their own MongoClient.
+        Connection info and pool sizing come from the .env file in the project root folder:
+            DB_URL, DB_NAME, DB_NAME_GENRES, DB_NAME_HISTORY
+            MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, MONGO_MAX_IDLE_TIME_MS, MONGO_WAIT_QUEUE_TIMEOUT_MS
+        The FastAPI app opens the registry on startup and closes it on shutdown (see app.py lifespan).
+        Use configure() to change the pool settings or to supply a client factory, for example mongomock.MongoClient.
+        Async request handlers use get_async_client() and get_async_database() which share the pool settings
+        and metrics with the synchronous clients.
+    """
+    _lock = Lock()
+    _clients:Dict[str,pymongo.MongoClient] = {}
+    _async_clients:Dict[str,pymongo.AsyncMongoClient] = {}
+    _metrics:Dict[str,PoolMetrics] = {}
+    _config:dict = None
+    _client_factory:Callable = pymongo.MongoClient
+    _async_client_factory:Callable = pymongo.AsyncMongoClient
+    _pool_options = {"maxPoolSize" : 50, "minPoolSize" : 0, "maxIdleTimeMS" : 300000, "waitQueueTimeoutMS" : 10000}
+
+    @staticmethod
+    def configure(client_factory:Callable=None, config:dict=None, async_client_factory:Callable=None, **pool_options):
+        """Configures the registry. Existing clients are closed so new ones pick up the settings.
+            Arguments:
+                client_factory - a callable that creates a MongoClient given a URL and keyword pool options,
+                                 for example pymongo.MongoClient (the default) or mongomock.MongoClient
+                async_client_factory - the same for async clients, pymongo.AsyncMongoClient by default
+                config - connection settings (DB_URL, DB_NAME etc.) used instead of the .env file
+                pool_options - MongoClient pool settings: maxPoolSize, minPoolSize, maxIdleTimeMS, waitQueueTimeoutMS
+        """
+        MongoClientRegistry.close()
+        with MongoClientRegistry._lock:
+            if client_factory is not None:
+                MongoClientRegistry._client_factory = client_factory
+            if async_client_factory is not None:
+                MongoClientRegistry._async_client_factory = async_client_factory
+            if config is not None:
+                MongoClientRegistry._config = dict(config)
+            MongoClientRegistry._pool_options = {**MongoClientRegistry._pool_options, **pool_options}
+
+    @staticmethod
+    def get_config()->dict:
+        """Returns the connection settings, loading them from the .env file on first use
+        """
+        with MongoClientRegistry._lock:
+            if MongoClientRegistry._config is None:
+                config = dotenv.dotenv_values(".env")
+                options = MongoClientRegistry._pool_options
+                for key,option in [("MONGO_MAX_POOL_SIZE","maxPoolSize"), ("MONGO_MIN_POOL_SIZE","minPoolSize"), \
+                                   ("MONGO_MAX_IDLE_TIME_MS","maxIdleTimeMS"), ("MONGO_WAIT_QUEUE_TIMEOUT_MS","waitQueueTimeoutMS")]:
+                    if config.get(key):
+                        options[option] = int(config[key])
+                MongoClientRegistry._config = config
+            return MongoClientRegistry._config
+
+    @staticmethod
+    def get_client(db_url:str=None)->pymongo.MongoClient:
+        """Gets the shared MongoClient for a database URL, creating it on first use.
+            Arguments:
+                db_url - the MongoDB URL. If None, the DB_URL from the configuration is used.
+            Raises a pymongo ConfigurationError or InvalidURI if the client can't be created.
+        """
+        url = db_url if db_url is not None else MongoClientRegistry.get_config()["DB_URL"]
+        client = MongoClientRegistry._clients.get(url)
+        if client is None:
+            with MongoClientRegistry._lock:
+                client = MongoClientRegistry._clients.get(url)
+                if client is None:
+                    metrics = MongoClientRegistry._metrics.setdefault(url, PoolMetrics())
+                    client = MongoClientRegistry._client_factory(url, event_listeners=[metrics], **MongoClientRegistry._pool_options)
+                    MongoClientRegistry._clients[url] = client
+                    MongoClientRegistry._metrics[url] = metrics
+        return client
+
+    @staticmethod
+    def get_async_client(db_url:str=None)->pymongo.AsyncMongoClient:
+        """Gets the shared AsyncMongoClient for a database URL, creating it on first use.
+            An AsyncMongoClient is bound to the event loop it is first used on,
+            so this should only be called from the server's event loop.
+        """
+        url = db_url if db_url is not None else MongoClientRegistry.get_config()["DB_URL"]
+        client = MongoClientRegistry._async_clients.get(url)
+        if client is None:
+            with MongoClientRegistry._lock:
+                client = MongoClientRegistry._async_clients.get(url)
+                if client is None:
+                    metrics = MongoClientRegistry._metrics.setdefault(url, PoolMetrics())
+                    client = MongoClientRegistry._async_client_factory(url, event_listeners=[metrics], **MongoClientRegistry._pool_options)
+                    MongoClientRegistry._async_clients[url] = client
+        return client
+
+    @staticmethod
+    def _database_name(db_name:str)->str:
+        return MongoClientRegistry.get_config().get(db_name, db_name) if db_name.startswith("DB_NAME") else db_name
+
+    @staticmethod
+    def get_database(db_name:str, db_url:str=None)->Database:
+        """Gets a database handle from the shared client.
+            Arguments:
+                db_name - the database name, or one of the configuration keys: "DB_NAME", "DB_NAME_GENRES", "DB_NAME_HISTORY"
+                db_url - the MongoDB URL. If None, the DB_URL from the configuration is used.
+        """
+        return MongoClientRegistry.get_client(db_url)[MongoClientRegistry._database_name(db_name)]
+
+    @staticmethod
+    def get_collection(db_name:str, collection_name:str, db_url:str=None)->Collection:
+        return MongoClientRegistry.get_database(db_name, db_url)[collection_name]
+
+    @staticmethod
+    def get_async_database(db_name:str, db_url:str=None)->AsyncDatabase:
+        """Gets an async database handle from the shared async client. @see get_database()
+        """
+        return MongoClientRegistry.get_async_client(db_url)[MongoClientRegistry._database_name(db_name)]
+
+    @staticmethod
+    def get_pool_metrics()->Dict[str,dict]:
+        """Returns the connection pool metrics of each client keyed by database URL.
+            Credentials are removed from the URLs.
+        """
+        with MongoClientRegistry._lock:
+            metrics = dict(MongoClientRegistry._metrics)
+        return {url.split("@")[-1] : m.to_dict() for url,m in metrics.items()}
+
+    @staticmethod
+    def close():
+        """Closes the synchronous clients and discards the async clients.
+            Use aclose() from the event loop to also close the async clients.
+            Clients are created again on next use.
+        """
+        with MongoClientRegistry._lock:
+            clients = list(MongoClientRegistry._clients.values())
+            MongoClientRegistry._clients.clear()
+            MongoClientRegistry._async_clients.clear()
+            MongoClientRegistry._metrics.clear()
+        for client in clients:
+            client.close()
+
+    @staticmethod
+    async def aclose():
+        """Closes all the clients, async and synchronous
+        """
+        with MongoClientRegistry._lock:
+            async_clients = list(MongoClientRegistry._async_clients.values())
+            MongoClientRegistry._async_clients.clear()
+        for client in async_clients:
+            await client.close()
+        MongoClientRegistry.close()
@@ -9,9 +9,9 @@ from game.gameConstants import CardType, PlayerRole, PlayMode, PlayerLevel, Play
 from game.storyCardHand import StoryCardHand
 from game.storyCard import StoryCard
 from game.commandResult import CommandResult
+from game.gameSerializer import GameSerializer
 
 from typing import Dict, List
-import json
 
 class Player(StoriesObject):
     """
@@ -331,14 +331,10 @@ class Player(StoriesObject):
         return f"story elements played: {msg}"
 
     def to_dict(self):
-        pdict = {"name" : self.player_name, "number" : self.number, "initials" : self.player_initials}
-        pdict['game_id'] = self.game_id
-        pdict['points'] = self.points
-        pdict['role'] = self.player_role.value
-        return pdict
+        return GameSerializer.to_dict(self)
 
     def to_JSON(self):
-        return json.dumps(self.to_dict(), indent=2)
+        return GameSerializer.dumps(self.to_dict(), indent=2)
 
     def _load(self, player_dict:dict):
         """Loads game state player info from a previously saved game
@@ -349,4 +345,7 @@ class Player(StoriesObject):
         self.login_id = player_dict["login_id"]
         self.player_email = player_dict["email"]
         self.player_role = PlayerRole[player_dict["email"].upper()]
-        
+
+GameSerializer.register(Player, {"name" : "player_name", "number" : "number", "initials" : "player_initials", "game_id" : "game_id",
+                                 "points" : "points", "role" : lambda player: player.player_role.value},
+                        summary=("initials", "number", "game_id"))
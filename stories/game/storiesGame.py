@@ -12,6 +12,8 @@ from game.cardDeck import CardDeck
 from game.storyCard import StoryCard
 from game.gameState import GameState
 from game.dataManager import DataManager
+from game.cardCatalog import CardCatalog
+from game.gameRandom import GameRandom
 from collections import deque
 from datetime import datetime
 from typing import List
@@ -33,8 +35,11 @@ class StoriesGame(StoriesObject):
 
 
     def __init__(self, installationId:str, genre:str, total_points:int=20, game_id:str=None, game_parameters_type="prod",\
-                  play_mode:PlayMode=PlayMode.INDIVIDUAL, data_source='mongo'):
+                  play_mode:PlayMode=PlayMode.INDIVIDUAL, data_source='mongo', seed:int=None):
         """
+            Arguments:
+                seed - the seed of the game's GameRandom, default is a random seed.
+                       A game created with the same seed and commands plays the same way.
         """
         self._installation_id = installationId
         self._play_mode = play_mode    # INDIVIDUAL, TEAM, or COLLABORATIVE PlayMode
@@ -44,11 +49,15 @@ class StoriesGame(StoriesObject):
         self._resource_folder = self._env.get_resource_folder()     # base resource folder for example, "/Compile/stories/resources"
         self._data_source = data_source
         #
-        # load game parameters, story cards and the story card template from the specified source
+        # game parameters, story cards and the story card template come from the shared CardCatalog,
+        # which is loaded from the specified source once per process.
+        # The DataManager persists game stories and results.
         #
-        self._data_manager = DataManager(data_source, game_parameters_type, genre, load_all=True)
+        self._data_manager = DataManager(data_source, game_parameters_type, genre, load_all=False)
+        self._card_catalog = CardCatalog.get_catalog(data_source, genre, game_parameters_type)
         
-        self._game_parameters = self._data_manager.game_parameters
+        self._game_parameters = self._card_catalog.new_game_parameters()
+        self._rng = GameRandom(seed)    # shuffles, draws and random picks of this game
         
         self._genre = GenreType[genre.upper()]
         self._game_id = game_id
@@ -65,6 +74,7 @@ class StoriesGame(StoriesObject):
         self._game_state = GameState(self._game_id, total_points, self._game_parameters_type)
         self._game_state.genre = self._genre
         self._game_state.play_mode = self._play_mode
+        self._game_state.seed = self._rng.seed
         self.game_duration = 0
         self.round_durations:List[int] = []
 
@@ -81,8 +91,7 @@ class StoriesGame(StoriesObject):
         TODO if game mode is COLLABORATIVE, remove action types from the template: STEAL_LINES, TRADE_LINES, CALL_IN_FAVORS
         """
         alias = self.game_parameters.character_alias if character_alias is None else character_alias
-        story_card_template = self._data_manager.story_card_template
-        self._story_card_deck = CardDeck(self.genre, story_card_template, alias=alias)
+        self._story_card_deck = self._card_catalog.new_card_deck(alias=alias, rng=self._rng)
         self._story_discard_deck = deque()      # empty deque for discards. Player discards added to the right
         
     def set_character_alias(self, names:List[str]):
@@ -95,6 +104,12 @@ class StoriesGame(StoriesObject):
     def add_to_discard(self, card:StoryCard):
         self._story_discard_deck.append(card)   # add to the right
     
+    @property
+    def rng(self)->GameRandom:
+        """The random number generator of this game
+        """
+        return self._rng
+    
     @property
     def game_parameters(self) -> GameParameters:
         return self._game_parameters
@@ -110,6 +125,10 @@ class StoriesGame(StoriesObject):
     def data_manager(self)->DataManager:
         return self._data_manager
     
+    @property
+    def card_catalog(self)->CardCatalog:
+        return self._card_catalog
+    
     def check_errors(self)->bool:
         """A convenience method that returns True if checking for errors,
             usually after a player's turn, False otherwise.
@@ -175,15 +194,26 @@ class StoriesGame(StoriesObject):
             Note that in COLLABORATIVE game play, all players initially are assigned the role of PLAYER.
             A DIRECTOR must be added later with "add director <name> <initials>" command.
         """
-        player_number = self.game_state.add_player(player)    # sets the player.number, starting at 0
-        player.player_role = PlayerRole.PLAYER
-        player.my_game = self
-        player.play_mode = self.play_mode
-        # the game deals new cards to the player
-        cards = self._story_card_deck.draw_cards(self.deal_size)
-        player.story_card_hand.add_cards(cards)
-        player.game_id = self._game_id
-        return player_number
+        return self.add_players([player])[0]
+    
+    def add_players(self, players:List[Player])->List[int]:
+        """Adds new Players to the game, the same as add_player() for each one,
+            but the hands of all the players are dealt at once. @see CardDeck.deal_hands()
+            Returns: the player number of each player
+            The players are added before the hands are dealt, so no cards are taken from the deck if adding a player fails.
+        """
+        player_numbers = []
+        for player in players:
+            player_numbers.append(self.game_state.add_player(player))    # sets the player.number, starting at 0
+            player.player_role = PlayerRole.PLAYER
+            player.my_game = self
+            player.play_mode = self.play_mode
+            player.game_id = self._game_id
+        # the game deals new cards to the players
+        hands = self._story_card_deck.deal_hands(len(players), self.deal_size)
+        for player,cards in zip(players, hands):
+            player.story_card_hand.add_cards(cards)
+        return player_numbers
         
     def start(self, what:str="game") ->bool:
         """
@@ -266,20 +296,16 @@ class StoriesGame(StoriesObject):
             Note that remaining cards are the cards not yet drawn by players.
             Output Format for each card is the stringified StoryCard: <ordinal>. <card_type> <card_number> : <text>
             @see StoryCard.__str__()
+            @see CardDeck.remaining_cards()
         """
-        indexes = self._story_card_deck.cards_index    # List[int]
-        deck_cards = self._story_card_deck.deck_cards
-        cards = []
-        next_index = self._story_card_deck.next_index
-        for _ in range(next_index, len(indexes)):
-            ind = indexes[next_index]
-            story_card = deck_cards[ind]
-            cards.append(str(story_card))
-            next_index += 1
-        return cards
+        alias = self._story_card_deck.alias
+        return [story_card.to_line(alias) for story_card in self._story_card_deck.remaining_cards()]
     
     def to_JSON(self)->str:
         """Implement the to_JSON abstract method
         """
         return self._game_state.to_JSON()
+    
+    def __repr__(self)->str:
+        return f"StoriesGame(game_id={self._game_id!r})"
     
\ No newline at end of file
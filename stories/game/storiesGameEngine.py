@@ -13,8 +13,11 @@ from game.gameUtils import GameUtils
 from game.gameConstants import CardType, ActionType, PlayMode, PlayerRole, ParameterType, Direction
 from game.gameEngineCommands import GameEngineCommands
 from game.gameParameters import GameParameters
+from game.dataManager import DataManager
+from game.commandRegistry import CommandRegistry
 
 from datetime import datetime
+from typing import List
 import os, logging, sys
 from threading import Lock
 
@@ -157,8 +160,29 @@ class StoriesGameEngine(object):
         cmd_result.message = messages
         return cmd_result
 
+    def execute_commands(self, commands:List[str], aplayer:Player, stop_on_error:bool=True) -> List[CommandResult]:
+        """Executes a list of commands in order for a given Player.
+            Arguments:
+                commands - the command strings, for example ["draw new", "play last", "next"]
+                aplayer - a Player reference. If None, admin_player is used.
+                stop_on_error - if True, commands after the first one that fails (an ERROR or TERMINATE result) are not executed
+            Returns: the CommandResult of each command executed
+        """
+        player = self._admin_player if aplayer is None else aplayer
+        results = []
+        for command in commands:
+            logging.debug(f'{player.player_initials}: {command}')
+            cmd_result = self._evaluate(command)
+            if cmd_result is None:    # some commands are not implemented yet
+                cmd_result = CommandResult(CommandResult.ERROR, f'"{command}" did not return a result', False)
+            player.add_command(command)    # adds to player's command history
+            results.append(cmd_result)
+            if stop_on_error and cmd_result.return_code in (CommandResult.ERROR, CommandResult.TERMINATE):
+                break
+        return results
+
     def _evaluate(self, command:str, args=[]) -> CommandResult:
-        """Evaulates a command string with eval()
+        """Evaluates a command string using the CommandRegistry
             Arguments:
                 commandTxt - the command name + any arguments to evaluate.
                 args - an optional list of additional arguments
@@ -167,29 +191,27 @@ class StoriesGameEngine(object):
             To pass keyword arguments (kwargs), use a format similar to: 
             update player dwb role='team_lead',email='dwb@gmail.com'
         """
-        command_result = GameEngineCommands.parse_command_string(command, args)
-        if command_result.return_code != CommandResult.SUCCESS:     # must be an error
-            return command_result
-        
-        command = command_result.message
-        eval_command = "self." + command
-        command_result = None
-        logging.debug("_evaluate: " + eval_command)
+        logging.debug("_evaluate: " + command)
+        return CommandRegistry.get_registry(type(self)).execute(self, command, args)
         
-        try:
-            command_result = eval(eval_command)
-        except Exception as ex:
-            message = f'"{command}" : Invalid command format or syntax\n exception: {str(ex)}'
-            command_result = CommandResult(CommandResult.ERROR,  message=message,  done_flag=False, exception=ex)
-            logging.error(message)
-            print(message, file=sys.stderr)
-        return command_result
-        
-    def game_status(self, indent=2) -> CommandResult:
+    def game_status(self, indent=2, display_format="json", since:int=None) -> CommandResult:
         """Get information about the current game in progress and return in JSON format
-        """
-        message =  self.game_state.to_JSON(indent=indent) if self.game_state is not None else "Undefined GameState"
-        return CommandResult(CommandResult.SUCCESS, message=message)
+            Arguments:
+                indent - the JSON indent
+                display_format - "json" or "dict". If "dict" the GameState.to_dict() is returned in the CommandResult.properties
+                                 and the message is empty.
+                since - a status version. If given and display_format is "dict", the properties have only
+                        what changed since that version, when it is known. @see GameState.changes_since()
+        """
+        if self.game_state is None:
+            return CommandResult(CommandResult.SUCCESS, message="Undefined GameState")
+        if since is not None and display_format == "dict":
+            changes = self.game_state.changes_since(since)
+            if changes is not None:
+                return CommandResult(CommandResult.SUCCESS, message="", properties=changes)
+        if display_format == "dict":
+            return CommandResult(CommandResult.SUCCESS, message="", properties=self.game_state.to_dict())
+        return CommandResult(CommandResult.SUCCESS, message=self.game_state.to_JSON(indent=indent))
     
     @property
     def stories_game(self)->StoriesGame:
@@ -228,13 +250,21 @@ class StoriesGameEngine(object):
     def game_parameters(self)->GameParameters:
         return self._game_parameters
     
-    def create(self, installationId:str, genre:str, total_points:int, play_mode:PlayMode|str, source:str, game_parameters_type="test") -> CommandResult:
+    def create(self, installationId:str, genre:str, total_points:int, play_mode:PlayMode|str, source:str, game_parameters_type="test", seed:int=None) -> CommandResult:
         """Create a new StoriesGame for a given genre.
             Initialize GameEngineCommands
+            Arguments:
+                seed - the seed of the game's random number generator, default is a random seed.
+                       The seed is recorded in the GameState so that the game can be replayed.
         """
         self._installationId = installationId
         self._play_mode = PlayMode[play_mode.upper()] if isinstance(play_mode, str) else play_mode
-        self._stories_game = StoriesGame(installationId, genre, total_points, self._game_id, game_parameters_type, self._play_mode, source)
+        try:
+            self._stories_game = StoriesGame(installationId, genre, total_points, self._game_id, game_parameters_type, self._play_mode, source, seed)
+        except ValueError as ex:
+            message = f"Unable to create a {genre} game: {str(ex)}"
+            self.logger.error(message)
+            return CommandResult(CommandResult.ERROR, message=message, done_flag=False, exception=ex)
         self._game_state = self._stories_game.game_state
         self._game_state.game_id = self._game_id
         self._source = source
@@ -261,6 +291,19 @@ class StoriesGameEngine(object):
         """
         return self._gameEngineCommands.add(what, player_name, initials, login_id, email, role_name)
     
+    def add_players(self, players_info:List[dict], role_names:List[str]=None)->CommandResult:
+        """Adds several players to the Game in one call, dealing all their hands at once.
+            The equivalent 'add player' commands are added to the Administrator's command history.
+            Arguments:
+                players_info - a dict for each player with the keys name, initials, login_id and email
+                role_names - the role name of each player, default is "player"
+            @see GameEngineCommands.add_players()
+        """
+        result = self._gameEngineCommands.add_players(players_info, role_names)
+        for info in players_info:
+            self._admin_player.add_command(f"add player {info['name']} {info['initials']} {info.get('login_id')} {info.get('email')}")
+        return result
+    
     def add_team(self, name, *args)->CommandResult:
         return self._gameEngineCommands.add_team(name, *args)
     
@@ -456,10 +499,17 @@ class StoriesGameEngine(object):
         """
         return self._gameEngineCommands.show(what)
         
-    def read(self, numbered:bool=False, initials:str=None, display_format='text')->CommandResult:
+    def read(self, numbered:bool=False, initials:str=None, display_format='text', since:int=None)->CommandResult:
         """Display a player's story in a readable format.
+            If since is a story version, the "dict" format has only the lines that changed since then.
         """
-        return self._gameEngineCommands.read(numbered, initials, display_format)
+        return self._gameEngineCommands.read(numbered, initials, display_format, since=since)
+    
+    def story_etag(self, initials:str=None)->str:
+        return self._gameEngineCommands.story_etag(initials)
+    
+    def story_version(self, initials:str=None)->int:
+        return self._gameEngineCommands.story_version(initials)
     
     def rn(self, initials:str=None, display_format='text')->CommandResult:
         return self.read(True, initials, display_format)
@@ -470,21 +520,49 @@ class StoriesGameEngine(object):
     def re_read(self, game_id, initials:str=None)->CommandResult:
         return self._gameEngineCommands.re_read(game_id, initials)
     
-    def save(self, how="json") -> CommandResult:
+    def save(self, how="snapshot") -> CommandResult:
         """Save the current game state.
-            Arguments: how - save format: 'json' or 'pkl' (the default).
-            save('pkl') uses joblib.dump() to save the CareersGame instance to binary pickle format.
-            This can be reconstituted with joblib.load()
-            @see https://joblib.readthedocs.io/en/latest/index.html
-        """
-        return self._gameEngineCommands.save_game(self._game_filename_base, self.game_id, how=how)
+            Arguments: how - save format: 'snapshot' (the default), 'json' or 'pkl'.
+            save('snapshot') saves a binary GameSnapshot of the complete game, including the state of the game's GameRandom,
+            to the saved_games Mongo collection or, for a text source game, to the games folder.
+            The game can be restarted with load(game_id, source).
+        """
+        snapshot = None
+        if how == "snapshot":
+            from game.gameSnapshot import GameSnapshot
+            try:
+                snapshot = GameSnapshot.dumps(self)
+            except (TypeError, AttributeError) as ex:
+                return CommandResult(CommandResult.ERROR, f"Unable to save game {self.game_id}: {str(ex)}", exception=ex)
+        return self._gameEngineCommands.save_game(self._game_filename_base, self.game_id, how=how, source=self._source, snapshot=snapshot)
     
     def load(self, game_id:str, source='mongo') -> CommandResult:
-        """Load a previously saved game, identified by the game Id
-        
-        """
-        result = CommandResult(CommandResult.SUCCESS, "'load' command not yet implemented, any day now!")
-        return result    
+        """Load a previously saved game, identified by the game Id.
+            The game must have been saved with save(how='snapshot').
+            Arguments:
+                game_id - the game to load
+                source - 'mongo' to load from the saved_games collection, 'text' to load from the games folder
+            Returns: a CommandResult. If successful this StoriesGameEngine is the saved game.
+        """
+        from game.gameSnapshot import GameSnapshot
+        if source == "mongo":
+            result = DataManager.load_game_snapshot(game_id)
+            if not result.is_successful():
+                return result
+            snapshot = result.properties["snapshot"]
+        else:
+            filename = os.path.join(Environment.get_environment().package_base, 'games', f'{game_id}_game.snapshot')
+            try:
+                with open(filename, "rb") as fp:
+                    snapshot = fp.read()
+            except FileNotFoundError:
+                return CommandResult(CommandResult.ERROR, f"No saved game {game_id}")
+        try:
+            game_engine = GameSnapshot.loads(snapshot)
+        except (ValueError, KeyError, IndexError, AttributeError) as ex:
+            return CommandResult(CommandResult.ERROR, f"Unable to load game {game_id}: {str(ex)}", exception=ex)
+        self.__dict__.update(game_engine.__dict__)
+        return CommandResult(CommandResult.SUCCESS, f"Loaded game {game_id}")
 
     def status(self, initials:str=None)->CommandResult:
         return self._gameEngineCommands.status(initials)
@@ -5,11 +5,13 @@ Created on Dec 7, 2023
 '''
 
 from abc import ABC,abstractmethod
+from game.gameSerializer import GameSerializer
 import jsonpickle
 
 class StoriesObject(ABC):
     """Abstract Base class for object that have a JSON representation.
     """
+    __slots__ = ()    # so that subclasses can use __slots__
 
 
     def __init__(self, params):
@@ -26,11 +28,14 @@ class StoriesObject(ABC):
     
     def json_pickle(self):
         """A complete JSON representation of this object using jsonpickle.
+            This is expensive, use it for debugging only.
         """
         return jsonpickle.encode(self, indent=2)
         
     def __repr__(self):
-        return self.json_pickle()
+        """The class name and summary fields registered with GameSerializer
+        """
+        return GameSerializer.repr(self)
     
     def __str__(self)->str:
         return self.to_JSON()
@@ -6,7 +6,9 @@ Created on Dec 9, 2023
 
 from game.gameConstants import GenreType, CardType, ActionType, GameConstants
 from game.storiesObject import StoriesObject
-import json
+from game.cardStore import CardStore
+from game.characterAlias import CharacterAlias
+from game.gameSerializer import GameSerializer
 
 class StoryCard(StoriesObject):
     """Encapsulates a single genre story card
@@ -21,33 +23,72 @@ class StoryCard(StoriesObject):
     CardType.ACTION, CardType.TITLE, CardType.OPENING, CardType.OPENING_STORY, CardType.STORY, CardType.CLOSING
     """
 
+    __slots__ = ("_store", "_index", "_number", "_text", "_active")
 
     def __init__(self, genre:GenreType, cardType:CardType, text:str, number, actionType:ActionType=None, min_arguments=0, max_arguments=0, story_element=True):
         '''
         Constructor
+        A StoryCard is a view of one card of a CardStore. This creates a card with its own one card CardStore.
+        The cards of a CardCatalog are views of the catalog's shared CardStore, see StoryCard.view()
         '''
+        store = CardStore(genre)
+        store.append(cardType, text, actionType, min_arguments, max_arguments, story_element, StoryCard._sort_key(cardType, number))
+        self._store = store
+        self._index = 0
         self._number = number
-        self._genre = genre
-        self._card_type = cardType
-        self._text = text
-        self._action_type = actionType
+        self._text = store.texts[0]
         self._active = True
-        self._min_arguments = min_arguments
-        self._max_arguments = max_arguments
-        self._story_element = story_element
-        self._sort_key:int = 1000 * (GameConstants.CARD_TYPES.index(cardType) + 1) + number
+    
+    @staticmethod
+    def _sort_key(card_type:CardType, number:int)->int:
+        return 1000 * (GameConstants.CARD_TYPES.index(card_type) + 1) + number
+    
+    @staticmethod
+    def create(store:CardStore, cardType:CardType, text:str, number, actionType:ActionType=None, min_arguments=0, max_arguments=0, story_element=True)->'StoryCard':
+        """Creates a StoryCard the same as the constructor, but in an existing CardStore rather than its own one.
+            This is used to load many cards without a CardStore per card, see StoryCardLoader.
+        """
+        index = store.append(cardType, text, actionType, min_arguments, max_arguments, story_element, StoryCard._sort_key(cardType, number))
+        return StoryCard.view(store, index, number)
+    
+    @staticmethod
+    def view(store:CardStore, index:int, number:int=None, text:str=None)->'StoryCard':
+        """Creates a StoryCard for a card of a CardStore
+            Arguments:
+                store - the CardStore
+                index - the index of the card in the store
+                number - the card number, default is the index
+                text - the card text if different from the text in the store, for example with a character name changed
+        """
+        card = StoryCard.__new__(StoryCard)
+        card._store = store
+        card._index = index
+        card._number = index if number is None else number
+        card._text = store.texts[index] if text is None else text
+        card._active = True
+        return card
+    
+    @property
+    def store(self)->CardStore:
+        return self._store
     
     @property
     def sort_key(self)->int:
-        return self._sort_key
+        return self._store.sort_keys[self._index]
         
     @property
     def genre(self)->GenreType:
-        return self._genre
+        return self._store.genre
     
     @property
     def card_type(self)->CardType:
-        return self._card_type
+        return CardStore.CARD_TYPES[self._store.card_types[self._index]]
+    
+    @property
+    def card_type_value(self)->str:
+        """The CardType value, for example "Opening/Story"
+        """
+        return CardStore.CARD_TYPE_VALUES[self._store.card_types[self._index]]
     
     @property
     def number(self)->int:
@@ -67,7 +108,7 @@ class StoryCard(StoriesObject):
     
     @property
     def action_type(self)->ActionType|None:
-        return self._action_type
+        return self._store.action_type(self._index)
     
     @property
     def active(self)->bool:
@@ -79,45 +120,89 @@ class StoryCard(StoriesObject):
     
     @property
     def min_arguments(self)->int:
-        return self._min_arguments
+        return self._store.min_arguments[self._index]
     
     @min_arguments.setter
     def min_arguments(self, value):
-        self._min_arguments = value
+        self._store.min_arguments[self._index] = value
         
     @property
     def max_arguments(self)->int:
-        return self._max_arguments
+        return self._store.max_arguments[self._index]
     
     @max_arguments.setter
     def max_arguments(self, value):
-        self._max_arguments = value
+        self._store.max_arguments[self._index] = value
         
     @property
     def story_element(self)->bool:
-        return self._story_element
+        return self._store.story_elements[self._index] == 1
     
     @story_element.setter
     def story_element(self, value):
-        self._story_element = value
+        self._store.story_elements[self._index] = 1 if value else 0
+    
+    def copy(self, text:str=None)->'StoryCard':
+        """Returns a copy of this StoryCard, optionally with different text.
+            Catalog cards are shared by all games, so a card's text is changed on a copy.
+            Without text the copy is a view of the same CardStore. With text it has its own CardStore
+            and the text is rendered as is: it is usually a rendering with the game's aliases already applied.
+        """
+        if text is None:
+            card = StoryCard.view(self._store, self._index, self._number)
+        else:
+            card = StoryCard(self.genre, self.card_type, text, self._number, self.action_type, self.min_arguments, self.max_arguments, self.story_element)
+        card._active = self._active
+        return card
     
-    def to_string(self)->str:
-        card_text = f"{self.text}"
-        return card_text   
+    @property
+    def character_names(self)->bool:
+        """True if the text has the standard character names, which are replaced by a game's CharacterAlias when rendered.
+            This is the case for the catalog cards. Text given to a copy of a card, or to a new card, is rendered as is.
+        """
+        return self._store.character_names and self._text is self._store.texts[self._index]
+    
+    def render(self, alias:CharacterAlias|None=None)->str:
+        """Returns: the card text with the character names replaced by their alias
+            Arguments:
+                alias - the game's CharacterAlias, None if the game uses the standard character names
+        """
+        if alias is None or not self.character_names:
+            return self._text
+        return alias.replace(self._text)
+    
+    def __getstate__(self)->dict:
+        return {"genre" : self.genre, "card_type" : self.card_type, "text" : self._text, "number" : self._number, "action_type" : self.action_type, \
+                "min_arguments" : self.min_arguments, "max_arguments" : self.max_arguments, "story_element" : self.story_element, "active" : self._active, \
+                "character_names" : self.character_names}
+    
+    def __setstate__(self, state:dict):
+        state = {k.lstrip("_") : v for k,v in state.items()}    # also accepts the attributes of StoryCards saved before CardStore
+        StoryCard.__init__(self, state["genre"], state["card_type"], state["text"], state["number"], state.get("action_type"), \
+                           state.get("min_arguments", 0), state.get("max_arguments", 0), state.get("story_element", True))
+        self._store.character_names = state.get("character_names", False)    # cards saved before CharacterAlias have the aliases in the text
+        self._active = state.get("active", True)
+    
+    def to_string(self, alias:CharacterAlias|None=None)->str:
+        return self.render(alias)
+    
+    def to_line(self, alias:CharacterAlias|None=None)->str:
+        """Returns: the card type, number and text, the same as str(card) with the character names replaced by their alias
+        """
+        return f"{CardStore.CARD_TYPE_VALUES[self._store.card_types[self._index]]}:\t{self._number}. {self.render(alias)}"
     
     def __str__(self)->str:
-        card_text = f"{self.card_type.value}:\t{self._number}. {self.text}"
-        return card_text
+        return self.to_line()
     
-    def __repr__(self)->str:    # official string representation
-        return self.to_JSON(indent=0)
+    def __repr__(self)->str:    # official string representation, cheap enough for log lines
+        return f"StoryCard(number={self._number}, card_type={self.card_type_value!r})"
     
-    def to_dict(self):
-        pdict = {"genre" : self.genre.value, "number" : self._number, "card_type" : self.card_type.value, "text" : self.text}
+    def to_dict(self, alias:CharacterAlias|None=None):
+        pdict = {"genre" : self.genre.value, "number" : self._number, "card_type" : self.card_type_value, "text" : self.render(alias)}
         if self.action_type is not None:
             pdict["action_type"] = self.action_type.value
         return pdict
 
     def to_JSON(self, indent=2):
-        return json.dumps(self.to_dict(), indent=indent)
+        return GameSerializer.dumps(self.to_dict(), indent=indent)
         
\ No newline at end of file
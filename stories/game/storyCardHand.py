@@ -3,16 +3,20 @@ Created on Dec 18, 2023
 
 @author: don_bacon
 '''
-import json
+from bisect import bisect_left, bisect_right
 from game.storiesObject import StoriesObject
+from game.gameSerializer import GameSerializer
 from game.storyCard import StoryCard
 from game.storyCardList import StoryCardList
-from typing import List, Dict
+from typing import Callable, List, Dict
 from game.gameConstants import CardType
 
 class StoryCardHand(StoriesObject):
     '''
     Represents the story element cards in a player's hand
+    The hand is also kept sorted by sort_key as cards are added and removed, along with cached renderings
+    of the hand listing that are discarded when the hand changes. Change the hand with the StoryCardHand methods
+    (add_card, add_cards, play_card, remove_card, discard_cards) so that these stay consistent.
     '''
 
     def __init__(self):
@@ -23,6 +27,22 @@ class StoryCardHand(StoriesObject):
         self._discards:StoryCardList = StoryCardList()
         self._my_story_cards:StoryCardList = StoryCardList()    # the cards in the player's current story
         self._last_card_drawn_number:int = -1     # the card number of the most recent card drawn or -1 if no draws yet
+        self._sorted_cards:List[StoryCard] = []   # the cards in my hand sorted by sort_key
+        self._sort_keys:List[int] = []            # the sort_key of each of the _sorted_cards
+        self._renderings:Dict[tuple,object] = {}  # renderings of the hand, see rendering()
+    
+    def __getattr__(self, name:str):
+        # the sorted hand is not saved, it is created on first use after a game is restored
+        if name in ("_sorted_cards", "_sort_keys", "_renderings"):
+            self._sort_hand()
+            return self.__dict__[name]
+        raise AttributeError(f"'StoryCardHand' object has no attribute '{name}'")
+    
+    def __getstate__(self)->dict:
+        state = dict(self.__dict__)
+        for name in ("_sorted_cards", "_sort_keys", "_renderings"):
+            state.pop(name, None)
+        return state
     
     @property
     def cards(self) ->StoryCardList:
@@ -36,12 +56,51 @@ class StoryCardHand(StoriesObject):
         """
         return self._my_story_cards
     
-    def sort(self)->StoryCardList:
-        """Sorts the cards (in a player's hand) by CardType and number
+    def sort(self)->List[StoryCard]:
+        """Returns the cards (in a player's hand) sorted by CardType and number.
+            The sorted order is kept as cards are added and removed, the list returned must not be modified.
+        """
+        return self._sorted_cards
+    
+    def _sort_hand(self):
+        """Sorts the whole hand, for example after cards of a CardType are discarded
         """
-        scards = self.cards.cards
-        scards_sorted = sorted(scards, key=lambda storyCard: storyCard.sort_key)
-        return scards_sorted
+        self._sorted_cards = sorted(self._cards.cards, key=lambda storyCard: storyCard.sort_key)
+        self._sort_keys = [card.sort_key for card in self._sorted_cards]
+        self._renderings = {}
+    
+    def _add_sorted(self, card:StoryCard):
+        """Adds a card to the sorted hand after the cards with the same sort_key, the same order as a stable sort
+        """
+        sort_key = card.sort_key
+        ind = bisect_right(self._sort_keys, sort_key)
+        self._sort_keys.insert(ind, sort_key)
+        self._sorted_cards.insert(ind, card)
+        self._renderings = {}
+    
+    def _remove_sorted(self, card:StoryCard):
+        sort_key = card.sort_key
+        ind = bisect_left(self._sort_keys, sort_key)
+        while ind < len(self._sort_keys) and self._sort_keys[ind] == sort_key:
+            if self._sorted_cards[ind] is card:
+                del self._sort_keys[ind]
+                del self._sorted_cards[ind]
+                break
+            ind += 1
+        self._renderings = {}
+    
+    def rendering(self, key:tuple, render:Callable[[],object]):
+        """Returns a rendering of the hand, for example the numbered listing, that is cached until the hand changes.
+            Arguments:
+                key - identifies the rendering, for example the format and the other values it depends on
+                render - function that creates the rendering if it isn't cached
+            The rendering is shared by the callers so it must not be modified.
+        """
+        value = self._renderings.get(key)
+        if value is None:
+            value = render()
+            self._renderings[key] = value
+        return value
     
     @property
     def discards(self)->StoryCardList:
@@ -62,6 +121,8 @@ class StoryCardHand(StoriesObject):
         cards_removed = self._cards.discard_cards(card_type)
         for card in cards_removed:
             self._discards.add_card(card)
+        if len(cards_removed) > 0:
+            self._sort_hand()
         return len(cards_removed)
     
     def story_size(self):
@@ -84,6 +145,7 @@ class StoryCardHand(StoriesObject):
         """Add a StoryCard to my hand.
         """
         self._cards.add_card(card)
+        self._add_sorted(card)
         self.last_card_drawn_number = card.number
     
     @property
@@ -95,7 +157,9 @@ class StoryCardHand(StoriesObject):
         self._last_card_drawn_number = number
         
     def add_cards(self, cards:List[StoryCard]):
-        for card in cards: self._cards.add_card(card)
+        for card in cards:
+            self._cards.add_card(card)
+            self._add_sorted(card)
         
     def card_type_counts(self)->Dict[str,int]:
         """Returns a Dict[str, int] of card_type counts of cards in _cards (i.e. the player's hand)
@@ -126,6 +190,12 @@ class StoryCardHand(StoriesObject):
         type_ind = -1
         if ind >= 0:
             card = self._cards.get(ind)    # card in my hand
+            #
+            # removed from the hand first: a replaced story card is also removed from the hand,
+            # which would leave ind pointing at another card
+            #
+            self._cards.remove(ind)
+            self._remove_sorted(card)
             if insert_after_line is not None:
                 #
                 # insert this card after the insert_after_line
@@ -136,8 +206,7 @@ class StoryCardHand(StoriesObject):
                     type_ind = self._my_story_cards.find_first(card.card_type)
                     if type_ind >= 0:
                         # replace the new card in the story
-                        current_card:StoryCard  = self._my_story_cards[type_ind]
-                        self._my_story_cards.cards[type_ind] = card
+                        current_card:StoryCard  = self._my_story_cards.replace_card(type_ind, card)
                         self.discards.add_card(current_card)
                         self.remove_card(current_card.number)
                     elif card.card_type is CardType.TITLE:
@@ -163,8 +232,6 @@ class StoryCardHand(StoriesObject):
                     else:
                         self._my_story_cards.add_card(card)
                     #self._my_story_cards.add_card(card)
-                    
-            self._cards.remove(ind)
         return card
     
     def get_card(self, card_number:str|int)->StoryCard|None:
@@ -196,6 +263,7 @@ class StoryCardHand(StoriesObject):
         if ind >= 0:
             card = self._cards.get(ind)
             self._cards.remove(ind)
+            self._remove_sorted(card)
             if card.number == self.last_card_drawn_number:
                 self.last_card_drawn_number = -1
         return card
@@ -214,6 +282,9 @@ class StoryCardHand(StoriesObject):
         """
         return self._my_story_cards.to_dict()
     
+    def __repr__(self)->str:
+        return f"StoryCardHand(size={self.hand_size()}, story_size={self._my_story_cards.size()})"
+    
     def to_JSON(self, indent=2):
-        return json.dumps(self.to_dict(), indent)
+        return GameSerializer.dumps(self.to_dict(), indent=indent)
     
\ No newline at end of file
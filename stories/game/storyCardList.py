@@ -5,15 +5,22 @@ Created on Dec 26, 2023
 '''
 
 from game.storyCard import StoryCard
+from game.characterAlias import CharacterAlias
+from game.cardRenderer import CardRenderer
+from game.gameRandom import GameRandom
 from game.storiesObject import StoriesObject
 from game.gameConstants import CardType, ActionType
-from typing import List, Dict
-import json, random
+from typing import Callable, List, Dict
+import random
 from collections.abc import Iterator
 
 class StoryCardList(StoriesObject):
     '''
     Encapsulates a List[StoryCard]
+    Along with the ordered list of cards it keeps the position of each card number and the number of cards of each CardType,
+    so finding or removing a card by number doesn't scan the list. Use the StoryCardList methods to change the list
+    (add_card, insert_card, replace_card, remove, discard) so that these stay consistent.
+    Every change also increments the list's version and discards its cached renderings, see rendering().
     '''
 
     def __init__(self):
@@ -21,6 +28,12 @@ class StoryCardList(StoriesObject):
         Constructor
         '''
         self._cards:List[StoryCard] = []    # empty List for now, cards added with add_cards()
+        self._numbers:List[int] = []          # the card numbers of _cards
+        self._positions:Dict[int,int] = {}    # the index in _cards of each card number, the first one if a number is in the list more than once
+        self._type_counts:Dict[str,int] = {card_type.value : 0 for card_type in CardType}    # the number of cards of each CardType value
+        self._version:int = 0                 # incremented every time the list changes
+        self._renderings:Dict[tuple,object] = {}    # renderings of the current version, see rendering()
+        self._line_versions:List[int] = []    # the version each line last changed at, see changes_since()
     
     def __iter__(self)->Iterator:
         it = iter(self._cards)
@@ -32,19 +45,104 @@ class StoryCardList(StoriesObject):
     def __len__(self)->int:
         return len(self._cards)
     
+    def __getattr__(self, name:str):
+        # the index is not saved, it is created on first use after a game is restored
+        if name in ("_numbers", "_positions", "_type_counts"):
+            self._reindex()
+            return self.__dict__[name]
+        raise AttributeError(f"'StoryCardList' object has no attribute '{name}'")
+    
+    def __getstate__(self)->dict:
+        return {"_cards" : self._cards, "_version" : self._version}
+    
+    def __setstate__(self, state:dict):
+        self._cards = state["_cards"]    # the index is created on first use, the cards may not be restored yet
+        self._version = state["_version"]
+        self._renderings = {}
+        self._line_versions = [self._version] * len(self._cards)    # every line is as of the version the list was saved at
+    
     @property
     def cards(self)->List[StoryCard]:
+        """The cards in order. This should not be modified directly, see the StoryCardList methods.
+        """
         return self._cards
     
     def size(self)->int:
         return len(self._cards)
     
+    @property
+    def version(self)->int:
+        """The version of the list, incremented every time a card is added, inserted, replaced or removed
+        """
+        return self._version
+    
+    def _changed(self, start:int, stop:int=None):
+        """Increments the version after the list is changed and discards the cached renderings.
+            Arguments:
+                start, stop - the lines that changed, stop defaults to the end of the list.
+                A card inserted or removed changes the line numbers of the cards after it.
+        """
+        self._version += 1
+        if self._renderings:
+            self._renderings = {}
+        ncards = len(self._cards)
+        line_versions = self._line_versions
+        del line_versions[ncards:]
+        line_versions.extend([self._version] * (ncards - len(line_versions)))
+        stop = ncards if stop is None else stop
+        line_versions[start:stop] = [self._version] * (stop - start)
+    
+    def changes_since(self, version:int, alias:CharacterAlias|None=None)->dict|None:
+        """Returns: the lines that changed since a version of the list, as a dict with the current "version", "since",
+            "size" - the number of lines, and "cards" - the to_dict() of the changed cards with their "line" number (starting at 0),
+            or None if the version is later than the current version.
+        """
+        if version > self._version:
+            return None
+        cards = [dict(card.to_dict(alias), line=line) for line,(card,line_version) in enumerate(zip(self._cards, self._line_versions)) \
+                 if line_version > version]
+        return {"version" : self._version, "since" : version, "size" : len(self._cards), "cards" : cards}
+    
+    def rendering(self, key:tuple, render:Callable[[],object]=None):
+        """Returns a rendering of the list, for example the story as text, that is cached until the list changes.
+            Arguments:
+                key - identifies the rendering, for example the format and the other values it depends on
+                render - function that creates the rendering if it isn't cached. If None, only a cached rendering is returned.
+            Returns: the rendering, or None if render is None and the rendering isn't cached.
+            The rendering is shared by the callers so it must not be modified.
+        """
+        value = self._renderings.get(key)
+        if value is None and render is not None:
+            value = render()
+            self._renderings[key] = value
+        return value
+    
+    def _reindex(self):
+        """Rebuilds the card numbers, their positions and the CardType counts
+        """
+        self._numbers = [card.number for card in self._cards]
+        self._type_counts = {card_type.value : 0 for card_type in CardType}
+        for card in self._cards:
+            self._type_counts[card.card_type.value] += 1
+        self._index()
+    
+    def _index(self):
+        """Rebuilds the card number positions after the list is changed other than at the end.
+            The positions are added last to first so that the first position of a number is kept.
+        """
+        ncards = len(self._numbers)
+        self._positions = dict(zip(reversed(self._numbers), range(ncards - 1, -1, -1)))
+    
     def add_cards(self, cards_to_add:List[StoryCard]):
         for card in cards_to_add:
-            self._cards.append(card)
+            self.add_card(card)
     
     def add_card(self, card:StoryCard):
+        self._positions.setdefault(card.number, len(self._cards))
         self._cards.append(card)
+        self._numbers.append(card.number)
+        self._type_counts[card.card_type.value] += 1
+        self._changed(len(self._cards) - 1)
     
     def insert_card(self, line_number:int, story_card:StoryCard):
         """Insert a card after a given line number.
@@ -53,34 +151,47 @@ class StoryCardList(StoriesObject):
             self.add_card(story_card)
         else:
             #
-            # create a new List[StoryCard] with the given card
-            # after the card at the given line number.
+            # insert the card at the given line number,
+            # the following cards move down one position
             # 
             self._cards.insert(line_number, story_card)
+            self._numbers.insert(line_number, story_card.number)
+            self._index()
+            self._type_counts[story_card.card_type.value] += 1
+            self._changed(line_number)
+    
+    def replace_card(self, index:int, story_card:StoryCard)->StoryCard:
+        """Replaces the card at the given index.
+            Returns: the StoryCard replaced
+            Raises an IndexError if the index is invalid
+        """
+        current_card = self._cards[index]
+        index = index if index >= 0 else index + len(self._cards)
+        self._cards[index] = story_card
+        self._numbers[index] = story_card.number
+        self._index()
+        self._type_counts[current_card.card_type.value] -= 1
+        self._type_counts[story_card.card_type.value] += 1
+        self._changed(index, index + 1)
+        return current_card
         
-    def discard_cards(self, card_type:CardType|str)->int:
+    def discard_cards(self, card_type:CardType|str)->List[StoryCard]:
         """Removes all the cards of a given type
             Arguments:
-                card_type - the CardType of cards to remove
-            Returns: List[StoryCard] of cards removed
+                card_type - the CardType of cards to remove, or its name
+            Returns: the List[StoryCard] of cards removed, empty if there are none
         """
         cardtype = card_type if isinstance(card_type, CardType)  else CardType[card_type.upper()]
-        cards_removed:List[StoryCard] = []
         #
-        # first append cards of this card type to discards
+        # StoryCards are shared with the game's CardCatalog so cards are not
+        # flagged inactive here, the caller deactivates them in the game's CardDeck.
         #
-        ncards = 0
-        for card in self._cards:
-            if card.card_type is cardtype:
-                card.active = False     # virtual remove from cards
-                cards_removed.append(card)
-                ncards += 1             # number of inactive cards
-        #
-        # remove the inactive cards from cards
-        #
-        for _ in range(ncards):
-            ind = self.find_inactive()
-            del self._cards[ind]
+        cards_removed:List[StoryCard] = []
+        if self._type_counts[cardtype.value] > 0:
+            cards_removed = [card for card in self._cards if card.card_type is cardtype]
+            self._cards = [card for card in self._cards if card.card_type is not cardtype]
+            self._reindex()
+            self._changed(0)
 
         return cards_removed
     
@@ -89,16 +200,19 @@ class StoryCardList(StoriesObject):
         card = None
         if card_ind >= 0:
             card = self._cards[card_ind]
-            del self._cards[card_ind]
+            self.remove(card_ind)
         return card
 
     def find_card(self, card_number:int)->StoryCard|None:
-        return self._cards[self.index_of(card_number)] if self.card_exists(card_number) else None
+        ind = self._positions.get(card_number)
+        return self._cards[ind] if ind is not None else None
     
     def find_first(self, card_type:CardType, action_type:ActionType=None)->int:
         """Finds the index of first instance of a given CardType in cards
             and returns its index, or -1 if not found
         """
+        if self._type_counts[card_type.value] == 0:
+            return -1
         ind = 0
         index = -1
         for card in self._cards:
@@ -131,20 +245,13 @@ class StoryCardList(StoriesObject):
     def card_exists(self, card_number:int)->bool:
         """Returns True if the designated card exists, false otherwise
         """
-        for card in self._cards:
-            if card.number == card_number:return True
-        return False
+        return card_number in self._positions
     
     def index_of(self, card_number:int)->int:
         """Returns the index of the card with the designated number in the cards list 0<= index < len(cards)
             or -1 if a card with that number does not exist.
         """
-        ind = -1
-        for i in range(len(self.cards)):
-            if card_number == self._cards[i].number:
-                ind = i
-                break
-        return ind
+        return self._positions.get(card_number, -1)
     
     def get(self, index)->StoryCard|None:
         """Gets the StoryCard at a given index.
@@ -154,13 +261,15 @@ class StoryCardList(StoriesObject):
         ncards = len(self._cards)
         return self._cards[index] if (ncards > 0 and index >= 0 and index < ncards) else None
     
-    def pick_any(self)->StoryCard:
+    def pick_any(self, rng:GameRandom=None)->StoryCard:
         """
             Select a card at random from this StoryCardList
+            Arguments:
+                rng - the game's GameRandom, default is the random module
         """
         card = None
         if self.size() > 0:
-            index = random.randint(0, self.size()-1)
+            index = rng.randrange(self.size()) if rng is not None else random.randint(0, self.size()-1)
             card = self.get(index)
         return card
 
@@ -168,62 +277,52 @@ class StoryCardList(StoriesObject):
         """Removes the card at the given index.
             Raises an IndexError if the index is invalid
         """
+        card = self._cards[index]
+        index = index if index >= 0 else index + len(self._cards)
         del self._cards[index]
+        number = self._numbers.pop(index)
+        if index == len(self._numbers):    # the last card, the other positions don't change
+            if self._positions.get(number) == index:
+                del self._positions[number]
+        else:
+            self._index()
+        self._type_counts[card.card_type.value] -= 1
+        self._changed(index)
     
     def card_type_counts(self)->Dict[str,int]:
-        counts = {}
-        for card_type in CardType:
-            counts[card_type.value] = 0
-            
-        for card in self._cards:
-            card_type = card.card_type.value
-            n = counts[card_type]
-            counts.update( {card_type : n+1} )
-        return counts
+        return dict(self._type_counts)
     
-    def to_dict(self, how="full")->dict:
+    def type_count(self, card_type:CardType)->int:
+        """Returns: the number of cards of a CardType
+        """
+        return self._type_counts[card_type.value]
+    
+    def to_dict(self, how="full", alias:CharacterAlias|None=None)->dict:
         """Returns the cards as a Dict
             Arguments:
                 how = "full" to include all StoryCard attributes
                       "condensed" to create a str representation of each card
+                alias - the game's CharacterAlias used to render the card texts
         """
         if how == "full":
-            cards = [x.to_dict() for x in self._cards]
+            cards = [x.to_dict(alias) for x in self._cards]
         else:
-            cards = []
-            i = 1
-            for card in self._cards:
-                cards.append(f"{i}. {card.card_type.value}: {card.number}. {card.text}")
-                i+=1
+            cards = CardRenderer.numbered_lines(f"{card.card_type_value}: {card.number}. {card.render(alias)}" for card in self._cards)
         deck_dict = {"cards" : cards}
         return deck_dict
     
-    def to_string(self, numbered:bool=False)->str:
-        """
+    def to_string(self, numbered:bool=False, alias:CharacterAlias|None=None)->str:
+        """Returns the card texts as a str, optionally numbered, rendered with the game's CharacterAlias
         """
-        if self.size() == 0: card_text = ""
-        else:
-            card_text_list = []
-            n = 0
-            for card in self._cards:
-                if numbered:
-                    txt = f"{n}. ({card.card_type.value}) {card.number}. {card.text}" 
-                else:
-                    txt = card.text
-                    
-                card_text_list.append(txt)
-                n += 1
-            card_text = "".join(card_text_list)
-        return card_text
+        if numbered:
+            return CardRenderer.numbered((f"({card.card_type_value}) {card.number}. {card.render(alias)}" for card in self._cards), start=0)
+        return CardRenderer.text(card.render(alias) for card in self._cards)
     
     def __str__(self)->str:
-        card_text = ""
-        for card in self._cards:
-            card_text = card_text + f"{card}"
-        return card_text
+        return CardRenderer.text(str(card) for card in self._cards)
     
     def __repr__(self)->str:
-        return self.to_JSON(indent=2)
+        return f"StoryCardList(size={len(self._cards)}, version={self.version})"
     
-    def to_JSON(self, indent=2):
-        return json.dumps(self.to_dict(), indent=indent)
+    def to_JSON(self, indent=2, alias:CharacterAlias|None=None):
+        return CardRenderer.to_JSON(self.to_dict(alias=alias)["cards"], indent=indent)
@@ -5,27 +5,35 @@ Created on Aug 20, 2024
 '''
 
 from game.gameConstants import GenreType, GameConstants, CardType, ActionType
-import pymongo
 from typing import Dict, List
 from game.storyCard import StoryCard
+from game.cardStore import CardStore
 from game.gameParameters import GameParameters
 from game.gameUtils import GameUtils
+from game.cardPack import CardPack
 from game.commandResult import CommandResult
+from game.mongoClientRegistry import MongoClientRegistry
 
 class StoryCardLoader(object):
     '''
     Loads the story cards for a given genre from text files
-    or the MongoDB genres database
+    or the MongoDB genres database.
+    The text source reads the genre's compiled CardPack if there is a current one, see CardPack.
     '''
 
 
-    def __init__(self, source:str, genre:GenreType, game_parameters:GameParameters, resource_folder:str, story_card_template:dict):
+    def __init__(self, source:str, genre:GenreType, game_parameters:GameParameters, resource_folder:str, story_card_template:dict, sample:bool=True, use_pack:bool=True):
         '''
         Constructor
+            sample - if True (the default) a random selection of maximum_count cards of each card type is loaded,
+                     otherwise every card is loaded in the order it appears in the source. @see CardCatalog
+            use_pack - if True (the default) the text source loads the cards from the genre's CardPack if it is current
         '''
         self._resource_folder = resource_folder
         self._genre = genre
         self._source = source
+        self._sample = sample
+        self._use_pack = use_pack
         self._genres_folder = f"{self._resource_folder}/genres/{genre.value}"   # for example "/Compile/stories/resources/genres/horror"
         #
         #
@@ -33,6 +41,7 @@ class StoryCardLoader(object):
         self._game_parameters = game_parameters
 
         self._deck_cards:List[StoryCard] = []       # only the deck StoryCards
+        self._store = CardStore(genre)              # the attributes of the loaded cards
         
         self._deck_name = genre.value
         self._deck = self.initialize_story_card_deck()
@@ -130,38 +139,30 @@ class StoryCardLoader(object):
         db_name = self.game_parameters.db_name_genres
         result = CommandResult(CommandResult.SUCCESS)
         try:
-            mongo_client = pymongo.MongoClient(db_url)
-            genres_db = mongo_client[db_name]
-
+            genres_db = MongoClientRegistry.get_database(db_name, db_url)
+            contents = self.find_card_contents(genres_db[self.genre.value])
         except Exception as ex:
             message = f'MongoDB error, exception: {str(ex)}'
             result.message = message
             result.return_code = CommandResult.ERROR
             return result
         
-        collection = genres_db[self.genre.value]
         total_count = 0
         number = 0
         for ct in CardType:
             max_count = self._card_type_counts[ct.value]
-            query = {"cardType":ct.value}
-            docs = collection.find_one(query)
-            if docs is not None:
-                carddocs = docs["cards"]    # dict line:int, content:str
-                count = 0
-                lines = []
-                for cd in carddocs:
-                    content = cd["content"] + "\n"
-                    lines.append(content)
+            lines = contents.get(ct.value, [])
+            if self._sample:
                 lines = GameUtils.shuffle_list(lines)
-                for line in lines:
-                    story_card = StoryCard(self.genre, ct, line, number)
-                    self._deck_cards.append(story_card)
-                    number+=1
-                    count+=1
-                    if count >= max_count:
-                        break
-                total_count += count
+            count = 0
+            for content in lines:
+                story_card = StoryCard.create(self._store, ct, content + "\n", number)
+                self._deck_cards.append(story_card)
+                number+=1
+                count+=1
+                if self._sample and count >= max_count:
+                    break
+            total_count += count
                 
         action_cards_count = self.load_action_cards(number)
         total_count += action_cards_count
@@ -169,8 +170,25 @@ class StoryCardLoader(object):
                 
         return result
     
+    def card_contents_pipeline(self)->List[dict]:
+        """The aggregation pipeline that finds the card texts of every CardType in one round trip.
+            The genre collection has a document for each CardType: {"cardType" : <CardType value>, "cards" : [{"line" : int, "content" : str}]}
+            Only the content of the cards is projected, the result is a document {"cardType" : str, "contents" : [str]} for each CardType.
+            All the cards are fetched: the shared CardCatalog loads every card and each game's CardDeck selects its own cards,
+            so a sample taken on the server would be the same for every game. When sampling, load_cards_db samples the contents.
+        """
+        card_types = [ct.value for ct in CardType if ct is not CardType.ACTION]
+        return [{"$match" : {"cardType" : {"$in" : card_types}}},
+                {"$project" : {"_id" : 0, "cardType" : 1, "contents" : "$cards.content"}}]
+
+    def find_card_contents(self, collection)->Dict[str,List[str]]:
+        """Finds the card texts of every CardType with one aggregation. @see card_contents_pipeline()
+            Returns: the card contents (without a trailing newline) by CardType value
+        """
+        return {doc["cardType"] : doc.get("contents", []) for doc in collection.aggregate(self.card_contents_pipeline())}
+
     def load_cards_text(self)->CommandResult:
-        """Loads game story cards from genre text files.
+        """Loads game story cards from genre text files, or from the genre's CardPack if it is current.
             Arguments:
             Returns CommandResult
             The list of StoryCard returned in self._deck_cards
@@ -180,12 +198,16 @@ class StoryCardLoader(object):
         number = 0
         lines = []
         result = CommandResult(CommandResult.SUCCESS)
+        pack = CardPack.open(self.genre, self.resource_folder) if self._use_pack else None
         for card_type in filenames.keys():
             filepath = f"{self.resource_folder}/genres/{self.genre.value}/{filenames[card_type]}"
             count = 0
             max_count = self._card_type_counts[card_type.value]
             # print(filepath)
-            lines = self.read_story_file(filepath, shuffle=True)
+            if pack is not None:
+                lines = GameUtils.shuffle_list(pack.texts(card_type)) if self._sample else pack.texts(card_type)
+            else:
+                lines = self.read_story_file(filepath, shuffle=self._sample)
             #
             # create a random list max_count long so every game is unique
             #
@@ -193,16 +215,18 @@ class StoryCardLoader(object):
                 #
                 # create a StoryCard instance for this card type
                 #
-                storyCard = StoryCard(self.genre, card_type, line, number)
+                storyCard = StoryCard.create(self._store, card_type, line, number)
                 self._deck_cards.append(storyCard)
                 number+=1
                 count+=1
-                if count >= max_count:
+                if self._sample and count >= max_count:
                     break
                 
             self._card_type_counts[card_type.value] = count
             total_count += count
             
+        if pack is not None:
+            pack.close()
         action_cards_count = self.load_action_cards(number)
         total_count += action_cards_count
         result.properties = {"count" : total_count}
@@ -222,7 +246,7 @@ class StoryCardLoader(object):
             min_arguments = action.get("min_arguments", 0)
             story_element = action.get("story_element", 0)==1
             for _ in range(qty):
-                storyCard = StoryCard(self.genre, card_type, text, number, action_type, min_arguments, max_arguments, story_element)
+                storyCard = StoryCard.create(self._store, card_type, text, number, action_type, min_arguments, max_arguments, story_element)
                 self._deck_cards.append(storyCard)
                 number+=1
             count += qty
@@ -231,29 +255,9 @@ class StoryCardLoader(object):
         return count
 
     def read_story_file(self, filepath, shuffle=False)->List[str]:
-        with open(filepath) as fp:
-            lines = []
-            continue_line = False
-            cline = ""
-            for line in fp:
-                line = line.lstrip().rstrip()    # delete left padding and trailing \n
-                if line=="" or line.startswith("--"):    # skip comment lines
-                    continue
-                if line.endswith('\\'):    # continues on next line
-                    line = line.removesuffix('\\')
-                    if continue_line:
-                        cline = f"{cline}\n{line}"
-                    else:
-                        continue_line = True
-                        cline = line
-                else:
-                    if continue_line:
-                        cline = f"{cline}\n{line}\n"
-                        lines.append(cline)
-                        continue_line = False
-                    else:
-                        lines.append(f"{line}\n")
-        fp.close()
+        """Reads the card texts of a genre text file, optionally shuffled. @see CardPack.read_story_file()
+        """
+        lines = CardPack.read_story_file(filepath)
         if shuffle:
             lines = GameUtils.shuffle_list(lines)
         return lines
@@ -7,8 +7,8 @@ Created on July 19, 2024
 from game.player import Player
 from game.storiesObject import StoriesObject
 from game.gameConstants import PlayerRole
+from game.gameSerializer import GameSerializer
 from typing import List, Dict
-import json
 
 class Team(StoriesObject):
     """Encapsulates a stories game team. 
@@ -61,21 +61,15 @@ class Team(StoriesObject):
             team_members.append(pdict)
         return team_members
     
-    def __repr__(self)->str:    # official string representation
-        return self.to_JSON(indent=0)
-    
     def __str__(self)->str:
         members = str(self.get_member_info())
         team_text = f"Team {self.name}: {members}"
         return team_text
     
     def to_dict(self)->Dict:
-        team_members = self.get_member_info()
-        team_dict = {"name":self.name}
-        team_dict["members"] = team_members
-        return team_dict
+        return GameSerializer.to_dict(self)
 
     def to_JSON(self):
-        return json.dumps(self.to_dict(), indent=2)
-        
-    
\ No newline at end of file
+        return GameSerializer.dumps(self.to_dict(), indent=2)
+
+GameSerializer.register(Team, {"name" : "name", "members" : lambda team: team.get_member_info()}, summary=("name",))
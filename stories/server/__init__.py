@@ -6,11 +6,23 @@ from .__version__ import __copyright__
 
 
 __all__ = [
+    'asyncDataManager',
+    'gameCache',
+    'gameEventStream',
+    'gameExecutor',
     'gameManager',
+    'gameSnapshotStore',
     'playerManager',
+    'shardRouter',
     'historyManager'
 ]
 
-from .gameManager import StoriesGameManager, Game, GameInfo
+from .asyncDataManager import AsyncDataManager
+from .gameSnapshotStore import GameSnapshotStore, DirectorySnapshotStore, MongoSnapshotStore
+from .gameCache import GameCache
+from .shardRouter import HashRing, ShardCoordinator, StaticCoordinator, LocalCoordinator, ShardRouter, ShardRoutingMiddleware
+from .gameExecutor import GameExecutor, GameMailbox
+from .gameEventStream import GameEventStream
+from .gameManager import StoriesGameManager, Game, GameInfo, CommandBatch, BatchResult
 from .playerManager import StoriesPlayer, StoriesPlayerManager
 from .historyManager import HistoryManager, PlayerGameHistory
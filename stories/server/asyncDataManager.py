@@ -0,0 +1,118 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+
+from datetime import datetime
+from typing import Dict, List
+from game.commandResult import CommandResult
+from game.mongoClientRegistry import MongoClientRegistry
+
+class AsyncDataManager(object):
+    """
+        Async access to the stories database players, games and game_stories collections
+        for the FastAPI request handlers. Uses the shared AsyncMongoClient from the MongoClientRegistry,
+        so an instance must be used from the server event loop.
+        @see game.dataManager.DataManager for the synchronous equivalent used by the game engine.
+    """
+
+    def __init__(self, db_name:str="DB_NAME", db_url:str=None):
+        """
+            Arguments:
+                db_name - the stories database name or configuration key, default is "DB_NAME"
+                db_url - the MongoDB URL. If None, the DB_URL from the configuration is used.
+        """
+        self._db_name = db_name
+        self._db_url = db_url
+
+    @property
+    def stories_db(self):
+        """The async stories database. The handle is not cached because the registry
+            creates a new client if it has been closed.
+        """
+        return MongoClientRegistry.get_async_database(self._db_name, self._db_url)
+
+    async def find_player(self, initials:str)->dict|None:
+        """Finds a player by their initials, trying upper case if there is no exact match.
+            Returns: the players record as a dict, or None if not found
+        """
+        collection = self.stories_db["players"]
+        info = await collection.find_one({"initials": initials})
+        if info is None:
+            info = await collection.find_one({"initials": initials.upper()})
+            if info is not None:
+                info["initials"] = initials.upper()
+        return info
+
+    async def find_players(self, initials:List[str])->Dict[str,dict]:
+        """Finds several players with one query, trying upper case initials the same as find_player().
+            Returns: the players records by the initials given, players that are not found are not included
+        """
+        collection = self.stories_db["players"]
+        records = await collection.find({"initials": {"$in" : initials + [pid.upper() for pid in initials]}}).to_list(None)
+        return AsyncDataManager.match_players(initials, records)
+
+    @staticmethod
+    def match_players(initials:List[str], records)->Dict[str,dict]:
+        """Matches players records to the initials they were queried with, an exact match first, then upper case.
+            Returns: the players records by the initials given
+        """
+        by_initials = {record["initials"] : record for record in records}
+        players = {}
+        for pid in initials:
+            info = by_initials.get(pid) or by_initials.get(pid.upper())
+            if info is not None:
+                players[pid] = info
+        return players
+
+    async def insert_player(self, player:dict):
+        await self.stories_db["players"].insert_one(player)
+
+    async def find_game(self, game_id:str)->dict|None:
+        return await self.stories_db["games"].find_one({"game_id" : game_id})
+
+    async def insert_game(self, game:dict):
+        await self.stories_db["games"].insert_one(game)
+
+    async def update_game(self, game_id:str) ->CommandResult:
+        """Update the endDate in a given game to current date/time
+        """
+        result = CommandResult()
+        collection = self.stories_db["games"]
+        query = {"game_id" : game_id}
+        theGame = await collection.find_one(query)
+        if theGame is not None:
+            theGame["endDate"] = datetime.now()
+            del theGame["_id"]    # _id is an immutable field
+            replaced = await collection.replace_one(query, theGame)     # filter, replacement
+            result.message = f"{game_id} matched {replaced.matched_count}, replaced {replaced.modified_count}"
+        else:
+            result.return_code = CommandResult.WARNING
+            result.message = f"Unable to load game {game_id}"
+        return result
+
+    async def add_game_story(self, game_id:str, player_id:str, story:dict) -> CommandResult:
+        result = CommandResult()
+        collection = self.stories_db["game_stories"]
+        query = {"game_id" : game_id, "initials" : player_id}
+        gs = await collection.find_one(query)
+        if gs is None:
+            story["id"] = f"{game_id}_{player_id}"
+            story["game_id"] = game_id
+            story["initials"] = player_id
+            await collection.insert_one(story)
+        else:    # replace the existing one
+            replaced = await collection.replace_one(query, story)
+            result.message = f"{game_id} matched {replaced.matched_count}, replaced {replaced.modified_count}"
+        return result
+
+    async def get_game_story(self, game_id:str, player_id:str) -> CommandResult:
+        result = CommandResult()
+        query = {"game_id" : game_id, "initials" : player_id}
+        gs = await self.stories_db["game_stories"].find_one(query)    # the MongoDB record as a Dict, or None if not found
+        if gs is None:
+            result.return_code = CommandResult.ERROR
+            result.message = f"Story not found for {game_id} and {player_id}"
+        result.properties = {"game_story" : gs}
+        return result
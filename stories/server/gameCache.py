@@ -0,0 +1,336 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+
+from game.storiesGameEngine import StoriesGameEngine
+from game.gameSnapshot import GameSnapshot
+from server.gameSnapshotStore import GameSnapshotStore
+from server.gameExecutor import GameExecutor
+from collections import OrderedDict
+from collections.abc import Iterator
+from concurrent.futures import Future
+from threading import Lock
+from typing import Callable, Dict
+import logging, time
+
+class GameCache(object):
+    """
+        The live StoriesGameEngines of a StoriesGameManager by game_id.
+        Games that have not been used for idle_ttl seconds are hibernated: the engine is saved
+        to a GameSnapshotStore and released. When the number of live games exceeds max_games, or their total
+        snapshot size exceeds memory_budget, the least recently used games are hibernated as well.
+        A hibernated game is restored transparently the next time its game_id is looked up,
+        so GameCache can be used like a dict: "game_id in games", "games[game_id]".
+        Snapshot sizes are used as the measure of the memory a game holds in addition to the shared card catalog.
+        The lock only guards the in-memory maps: snapshot store I/O and (de)serialization are done outside it,
+        so a slow restore or hibernation delays the requests of that game only. While a game is being restored
+        or hibernated its game_id has a pending Future, other threads that look it up wait for it.
+        game_ids not found in the store are remembered for negative_ttl seconds so that unknown games
+        don't cost a store lookup each time.
+        If the GameCache has a GameExecutor, sweep() hibernates and measures each game in the game's mailbox,
+        so a game is never saved while one of its commands is running.
+    """
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, store:GameSnapshotStore, idle_ttl:float=1800, max_games:int=0, memory_budget:int=0, \
+                 sweep_interval:float=60, min_idle:float=5, negative_ttl:float=5):
+        """
+            Arguments:
+                store - the GameSnapshotStore for hibernated games
+                idle_ttl - hibernate games not used for this many seconds, 0 to disable
+                max_games - the maximum number of live games, 0 for no limit
+                memory_budget - the maximum total snapshot size in bytes of the live games, 0 for no limit
+                sweep_interval - the minimum number of seconds between sweeps triggered by adding a game
+                min_idle - games used in the last min_idle seconds are never hibernated to stay within limits
+                negative_ttl - the number of seconds a game_id not found in the store is remembered as not found.
+                    The store can be shared with other shards, so this is kept short.
+        """
+        self._store = store
+        self.idle_ttl = idle_ttl
+        self.max_games = max_games
+        self.memory_budget = memory_budget
+        self.sweep_interval = sweep_interval
+        self.min_idle = min_idle
+        self.negative_ttl = negative_ttl
+        self._lock = Lock()            # guards the maps below, never held during store I/O
+        self._sweep_lock = Lock()      # one sweep at a time
+        self._games:OrderedDict[str,StoriesGameEngine] = OrderedDict()    # least recently used first
+        self._last_access:Dict[str,float] = {}
+        self._sizes:Dict[str,int] = {}          # snapshot size of each live game
+        self._measured:Dict[str,float] = {}     # when each size was measured
+        self._pending:Dict[str,Future] = {}     # the games being restored or hibernated
+        self._not_found:Dict[str,float] = {}    # when each game_id was not found in the store
+        self._last_sweep = time.monotonic()
+        self.executor:GameExecutor|None = None    # if set, sweep() hibernates and measures games in their mailbox
+        self._stats = {"ttl_evictions" : 0, "lru_evictions" : 0, "hibernate_failures" : 0, \
+                       "restores" : 0, "restore_failures" : 0, "restore_ms_total" : 0.0, "restore_ms_max" : 0.0}
+
+    @staticmethod
+    def from_config(config:dict)->'GameCache':
+        """Creates a GameCache using the settings in the project .env file:
+            GAME_SNAPSHOT_STORE - "directory" (the default) or "mongo"
+            GAME_SNAPSHOT_LOCATION - the snapshot folder or collection name
+            GAME_IDLE_TTL, GAME_MAX_LIVE, GAME_MEMORY_BUDGET, GAME_SWEEP_INTERVAL
+        """
+        store = GameSnapshotStore.create(config.get("GAME_SNAPSHOT_STORE") or "directory", config.get("GAME_SNAPSHOT_LOCATION") or None)
+        return GameCache(store, idle_ttl=float(config.get("GAME_IDLE_TTL") or 1800), max_games=int(config.get("GAME_MAX_LIVE") or 0), \
+                         memory_budget=int(config.get("GAME_MEMORY_BUDGET") or 0), sweep_interval=float(config.get("GAME_SWEEP_INTERVAL") or 60))
+
+    @property
+    def store(self)->GameSnapshotStore:
+        return self._store
+
+    def __contains__(self, game_id:str)->bool:
+        with self._lock:
+            if game_id in self._games or game_id in self._pending:
+                return True
+            if self._is_not_found(game_id):
+                return False
+        if self._store.exists(game_id):
+            return True
+        with self._lock:
+            if game_id in self._games or game_id in self._pending:    # added while the store was checked
+                return True
+            self._set_not_found(game_id)
+        return False
+
+    def __getitem__(self, game_id:str)->StoriesGameEngine:
+        game_engine = self.get(game_id)
+        if game_engine is None:
+            raise KeyError(game_id)
+        return game_engine
+
+    def __setitem__(self, game_id:str, game_engine:StoriesGameEngine):
+        with self._lock:
+            self._games[game_id] = game_engine
+            self._games.move_to_end(game_id)
+            self._last_access[game_id] = time.monotonic()
+            self._not_found.pop(game_id, None)
+        if time.monotonic() - self._last_sweep >= self.sweep_interval or (self.max_games > 0 and len(self._games) > self.max_games):
+            self.sweep()
+
+    def __delitem__(self, game_id:str):
+        if game_id not in self:
+            raise KeyError(game_id)
+        self._wait(game_id)
+        with self._lock:
+            self._forget(game_id)
+        self._store.delete(game_id)
+        with self._lock:
+            self._set_not_found(game_id)
+
+    def __len__(self)->int:
+        """The number of live games
+        """
+        return len(self._games)
+
+    def __iter__(self)->Iterator:
+        """Iterates over the game_ids of the live games
+        """
+        with self._lock:
+            return iter(list(self._games.keys()))
+
+    def _is_not_found(self, game_id:str)->bool:
+        not_found = self._not_found.get(game_id)
+        return not_found is not None and time.monotonic() - not_found < self.negative_ttl
+
+    def _set_not_found(self, game_id:str):
+        if len(self._not_found) >= 10000:
+            self._not_found.clear()
+        self._not_found[game_id] = time.monotonic()
+
+    def _wait(self, game_id:str):
+        """Waits until a game is not being restored or hibernated
+        """
+        while True:
+            with self._lock:
+                pending = self._pending.get(game_id)
+            if pending is None:
+                return
+            pending.result()
+
+    def get(self, game_id:str, default=None)->StoriesGameEngine|None:
+        """Gets a game, restoring it if it has been hibernated.
+            Returns: the StoriesGameEngine or default if there is no such game or it could not be restored
+        """
+        while True:
+            with self._lock:
+                game_engine = self._games.get(game_id)
+                if game_engine is not None:
+                    self._games.move_to_end(game_id)
+                    self._last_access[game_id] = time.monotonic()
+                    return game_engine
+                pending = self._pending.get(game_id)
+                if pending is None:
+                    if self._is_not_found(game_id):
+                        return default
+                    pending = Future()
+                    self._pending[game_id] = pending
+                    break
+            pending.result()    # restored or hibernated by another thread, look again
+        game_engine = self._restore(game_id, pending)
+        return game_engine if game_engine is not None else default
+
+    def _restore(self, game_id:str, pending:Future)->StoriesGameEngine|None:
+        """Loads a hibernated game. Called with the pending Future of the game set, without the lock.
+        """
+        start = time.perf_counter()
+        game_engine = None
+        snapshot = None
+        missing = False
+        try:
+            snapshot = self._store.load(game_id)
+            missing = snapshot is None
+            if snapshot is not None:
+                try:
+                    game_engine = GameSnapshot.loads(snapshot)
+                except (ValueError, KeyError, IndexError, AttributeError) as ex:
+                    self.logger.error(f"Unable to restore game {game_id}: {str(ex)}")
+                else:
+                    self._store.delete(game_id)    # before the game is live, so it can't be hibernated again meanwhile
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000.0
+            with self._lock:
+                if game_engine is not None:
+                    self._games[game_id] = game_engine
+                    self._last_access[game_id] = time.monotonic()
+                    self._sizes[game_id] = len(snapshot)
+                    self._measured[game_id] = time.monotonic()
+                    self._stats["restores"] += 1
+                    self._stats["restore_ms_total"] += elapsed
+                    self._stats["restore_ms_max"] = max(self._stats["restore_ms_max"], elapsed)
+                elif missing:
+                    self._set_not_found(game_id)
+                elif snapshot is not None:
+                    self._stats["restore_failures"] += 1
+                del self._pending[game_id]
+            pending.set_result(game_engine)
+        if game_engine is not None:
+            self.logger.info(f"Restored game {game_id} in {elapsed:.2f} ms")
+        return game_engine
+
+    def _forget(self, game_id:str):
+        self._games.pop(game_id, None)
+        self._last_access.pop(game_id, None)
+        self._sizes.pop(game_id, None)
+        self._measured.pop(game_id, None)
+
+    def hibernate(self, game_id:str, snapshot:bytes=None)->bool:
+        """Saves a live game to the snapshot store and releases it.
+            The game must not be running a command, call it in the game's GameExecutor mailbox.
+            Returns: True if the game was hibernated
+        """
+        with self._lock:
+            game_engine = self._games.get(game_id)
+            if game_engine is None or game_id in self._pending:
+                return False
+            pending = Future()
+            self._pending[game_id] = pending
+            self._games.pop(game_id)    # lookups wait for the pending Future
+        hibernated = False
+        try:
+            self._store.save(game_id, snapshot if snapshot is not None else GameSnapshot.dumps(game_engine))
+            hibernated = True
+        except Exception as ex:
+            self.logger.error(f"Unable to hibernate game {game_id}: {str(ex)}")
+        finally:
+            with self._lock:
+                if hibernated:
+                    self._forget(game_id)
+                    self._not_found.pop(game_id, None)
+                else:
+                    self._games[game_id] = game_engine
+                    self._stats["hibernate_failures"] += 1
+                del self._pending[game_id]
+            pending.set_result(None)
+        return hibernated
+
+    def _in_mailbox(self, game_id:str, fn:Callable, *args):
+        """Runs fn(*args) in the game's GameExecutor mailbox, after the commands of the game queued before it.
+            Without a GameExecutor fn is called directly.
+        """
+        return self.executor.run(game_id, fn, *args) if self.executor is not None else fn(*args)
+
+    def _measure(self)->int:
+        """Updates the snapshot sizes of games used since they were last measured.
+            Returns: the total snapshot size of the live games
+        """
+        with self._lock:
+            game_ids = [game_id for game_id in self._games if self._measured.get(game_id, -1) < self._last_access.get(game_id, 0)]
+        for game_id in game_ids:
+            self._in_mailbox(game_id, self._measure_game, game_id)
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def _measure_game(self, game_id:str):
+        """Updates the snapshot size of a live game
+        """
+        with self._lock:
+            game_engine = self._games.get(game_id)
+        if game_engine is None:
+            return
+        measured = time.monotonic()
+        size = len(GameSnapshot.dumps(game_engine))
+        with self._lock:
+            if self._games.get(game_id) is game_engine:
+                self._sizes[game_id] = size
+                self._measured[game_id] = measured
+
+    def sweep(self)->int:
+        """Hibernates games idle longer than idle_ttl, then the least recently used games
+            until the live games are within max_games and memory_budget.
+            Returns: the number of games hibernated, 0 if another thread is sweeping
+        """
+        if not self._sweep_lock.acquire(blocking=False):
+            return 0
+        hibernated = 0
+        try:
+            now = time.monotonic()
+            self._last_sweep = now
+            if self.idle_ttl > 0:
+                with self._lock:
+                    idle = [gid for gid in self._games if now - self._last_access[gid] >= self.idle_ttl]
+                for game_id in idle:
+                    if self._in_mailbox(game_id, self.hibernate, game_id):
+                        with self._lock:
+                            self._stats["ttl_evictions"] += 1
+                        hibernated += 1
+            total_size = self._measure() if self.memory_budget > 0 else 0
+            with self._lock:
+                game_ids = list(self._games.keys())    # least recently used first
+            for game_id in game_ids:
+                with self._lock:
+                    if game_id not in self._games:
+                        continue
+                    over_count = self.max_games > 0 and len(self._games) > self.max_games
+                    over_budget = self.memory_budget > 0 and total_size > self.memory_budget
+                    if not (over_count or over_budget) or now - self._last_access[game_id] < self.min_idle:
+                        break
+                    size = self._sizes.get(game_id, 0)
+                if self._in_mailbox(game_id, self.hibernate, game_id):
+                    total_size -= size
+                    with self._lock:
+                        self._stats["lru_evictions"] += 1
+                    hibernated += 1
+        finally:
+            self._sweep_lock.release()
+        if hibernated > 0:
+            self.logger.info(f"Hibernated {hibernated} games, {len(self._games)} live")
+        return hibernated
+
+    def hibernate_all(self)->int:
+        """Hibernates every live game, for example when the server shuts down
+        """
+        return sum(1 for game_id in list(self._games.keys()) if self.hibernate(game_id))
+
+    def stats(self)->dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["live_games"] = len(self._games)
+            stats["live_snapshot_bytes"] = sum(self._sizes.values())
+            stats["restore_ms_average"] = round(stats["restore_ms_total"] / stats["restores"], 3) if stats["restores"] > 0 else 0.0
+            stats["restore_ms_total"] = round(stats["restore_ms_total"], 3)
+            stats["restore_ms_max"] = round(stats["restore_ms_max"], 3)
+        return stats
@@ -0,0 +1,167 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+
+from game.gameEventBus import GameEventBus, GameEvent
+from game.gameConstants import GameEventType
+from collections import deque
+from typing import AsyncIterator
+import asyncio, logging
+
+class GameEventStream(object):
+    """
+        Delivers the events of one game to one WebSocket or server-sent events (SSE) client.
+        Events are published on the threads that run game commands and handed to the server event loop,
+        where they wait in a queue of at most max_queued events until the client takes them.
+        A client that falls that far behind is not waited for: the stream ends with a RESYNC event giving the offset
+        of the last event delivered, and the client reconnects with that offset to resume from the game's event log.
+        A client that resumes from an offset no longer in the log first gets a RESYNC event with the current offset,
+        it should refresh the game status and stories and then continue with the events that follow.
+        Use from the server event loop only.
+    """
+    logger = logging.getLogger(__name__)
+
+    DEFAULT_MAX_QUEUED = 256
+    DEFAULT_HEARTBEAT = 15.0    # seconds
+
+    LAGGING = "lagging"     # the client fell behind
+    CLOSED = "closed"       # the game is over
+    STOPPED = "stopped"     # the server closed the stream
+
+    def __init__(self, bus:GameEventBus, offset:int=None, max_queued:int=DEFAULT_MAX_QUEUED):
+        """
+            Arguments:
+                bus - the game's GameEventBus
+                offset - the offset of the last event the client received, to resume from.
+                    The default, None, is to receive new events only.
+                max_queued - the maximum number of events waiting to be sent to the client
+        """
+        self._bus = bus
+        self._offset = offset
+        self._max_queued = max_queued
+        self._loop:asyncio.AbstractEventLoop = None
+        self._backlog:deque = deque()       # the events after the resume offset, sent first
+        self._queue:deque = deque()         # GameEvent, or None when the bus is closed
+        self._ready = asyncio.Event()       # set when the queue is not empty or the stream has ended
+        self._subscription_id:int = None
+        self._end_reason:str = None
+        self._last_offset = offset if offset is not None else bus.offset    # the offset of the last event delivered
+
+    @property
+    def game_id(self)->str:
+        return self._bus.game_id
+
+    @property
+    def last_offset(self)->int:
+        """The offset of the last event delivered, to resume from
+        """
+        return self._last_offset
+
+    @property
+    def end_reason(self)->str|None:
+        """Why the stream ended, LAGGING, CLOSED or STOPPED, None while it is open
+        """
+        return self._end_reason
+
+    def open(self):
+        """Subscribes to the game's events. The events after the resume offset, if any, are queued first.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._subscription_id, backlog = self._bus.subscribe(self._publish, self._offset)
+        if backlog is None:
+            self._last_offset = self._bus.offset
+            self._backlog.append(self.resync_event("expired"))
+        else:
+            self._backlog.extend(backlog)
+
+    def close(self, reason:str=STOPPED):
+        if self._end_reason is None:
+            self._end_reason = reason
+        if self._subscription_id is not None:
+            self._bus.unsubscribe(self._subscription_id)
+            self._subscription_id = None
+        self._ready.set()
+
+    def resync_event(self, reason:str)->GameEvent:
+        """Returns: a RESYNC event with the offset to resume from
+            Arguments:
+                reason - "expired" if the events after the resume offset are no longer in the log, or LAGGING
+        """
+        return GameEvent(self._last_offset, GameEventType.RESYNC, {"game_id" : self.game_id, "reason" : reason})
+
+    def _publish(self, event:GameEvent|None):
+        """The bus subscriber, called on the publishing thread
+        """
+        try:
+            self._loop.call_soon_threadsafe(self._enqueue, event)
+        except RuntimeError:    # the event loop is closed
+            pass
+
+    def _enqueue(self, event:GameEvent|None):
+        if self._end_reason is not None:
+            return
+        if event is None:
+            self._queue.append(None)
+        elif len(self._queue) >= self._max_queued:
+            self.logger.info(f"Event stream of game {self.game_id} is {self._max_queued} events behind, ending it at offset {self._last_offset}")
+            self._queue.clear()
+            self.close(GameEventStream.LAGGING)
+            return
+        else:
+            self._queue.append(event)
+        self._ready.set()
+
+    async def events(self, heartbeat:float=DEFAULT_HEARTBEAT)->AsyncIterator[GameEvent|None]:
+        """Yields the events as they are published, and None every heartbeat seconds if there are none,
+            so the caller can keep an idle connection alive.
+            Ends when the game is over, the client falls behind or close() is called.
+            If the client fell behind, the last event is a RESYNC event.
+        """
+        if self._loop is None:
+            self.open()
+        try:
+            while len(self._backlog) > 0:
+                event = self._backlog.popleft()
+                if event.event_type is not GameEventType.RESYNC:
+                    self._last_offset = event.offset
+                yield event
+            while True:
+                while len(self._queue) > 0:
+                    event = self._queue.popleft()
+                    if event is None:
+                        self.close(GameEventStream.CLOSED)
+                        return
+                    self._last_offset = event.offset
+                    yield event
+                if self._end_reason is not None:
+                    if self._end_reason == GameEventStream.LAGGING:
+                        yield self.resync_event(GameEventStream.LAGGING)
+                    return
+                self._ready.clear()
+                try:
+                    await asyncio.wait_for(self._ready.wait(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            self.close()
+
+    @staticmethod
+    def to_SSE(event:GameEvent|None)->str:
+        """Returns: an event in the text/event-stream format, or a comment for a heartbeat
+        """
+        if event is None:
+            return ": heartbeat\n\n"
+        return f"id: {event.offset}\nevent: {event.event_type.value}\ndata: {event.to_JSON()}\n\n"
+
+    @staticmethod
+    def parse_offset(offset:int|str|None)->int|None:
+        """Returns: a resume offset, for example the Last-Event-ID header of an SSE client, None if it is not a number
+        """
+        if offset is None:
+            return None
+        try:
+            return int(offset)
+        except ValueError:
+            return None
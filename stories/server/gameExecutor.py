@@ -0,0 +1,183 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import deque
+from threading import Lock, local
+from typing import Callable, Dict
+import asyncio, logging, time
+
+class GameMailbox(object):
+    """
+        The pending commands of one game and their queue and timing metrics.
+        At most one command of a game runs at a time.
+    """
+
+    def __init__(self, game_id:str):
+        self.game_id = game_id
+        self.pending:deque = deque()    # (Future, submit time, fn, args, kwargs)
+        self.running = False            # True while a worker is draining the mailbox
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_depth = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self.run_ms_total = 0.0
+        self.run_ms_max = 0.0
+
+    def stats(self)->dict:
+        return {"game_id" : self.game_id, "depth" : len(self.pending) + (1 if self.running else 0), "max_depth" : self.max_depth,
+                "submitted" : self.submitted, "completed" : self.completed, "failed" : self.failed,
+                "wait_ms_average" : round(self.wait_ms_total / self.completed, 3) if self.completed > 0 else 0.0,
+                "wait_ms_max" : round(self.wait_ms_max, 3),
+                "run_ms_average" : round(self.run_ms_total / self.completed, 3) if self.completed > 0 else 0.0,
+                "run_ms_max" : round(self.run_ms_max, 3)}
+
+class GameExecutor(object):
+    """
+        Runs the commands of each game strictly in the order they are submitted, while different games
+        run in parallel on a shared pool of worker threads. Each game has a GameMailbox: submitting a command
+        to an idle game schedules a worker to drain its mailbox, commands submitted while the game is busy
+        are queued behind it. This serializes access to a game's GameState, CardDeck and player hands
+        without a global lock.
+        A command that submits another command for the same game, for example a StoriesGameManager
+        method calling another, runs it immediately rather than waiting for itself.
+    """
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, max_workers:int=8, batch_size:int=16):
+        """
+            Arguments:
+                max_workers - the number of worker threads shared by all games
+                batch_size - the maximum number of commands a worker runs for one game before
+                             giving other games a turn
+        """
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="game")
+        self._lock = Lock()
+        self._mailboxes:Dict[str,GameMailbox] = {}
+        self._current = local()    # the game_id of the command running in this thread
+        self._shutdown = False
+
+    @staticmethod
+    def from_config(config:dict)->'GameExecutor':
+        """Creates a GameExecutor using the GAME_EXECUTOR_WORKERS setting in the project .env file
+        """
+        return GameExecutor(max_workers=int(config.get("GAME_EXECUTOR_WORKERS") or 8))
+
+    def submit(self, game_id:str, fn:Callable, *args, **kwargs)->Future:
+        """Queues a command for a game.
+            Returns: a Future for the result of fn(*args, **kwargs)
+        """
+        future = Future()
+        if getattr(self._current, "game_id", None) == game_id:
+            self._call(future, fn, args, kwargs)    # already running a command of this game
+            return future
+        with self._lock:
+            mailbox = self._mailboxes.get(game_id)
+            if mailbox is None:
+                mailbox = GameMailbox(game_id)
+                self._mailboxes[game_id] = mailbox
+            mailbox.pending.append((future, time.perf_counter(), fn, args, kwargs))
+            mailbox.submitted += 1
+            mailbox.max_depth = max(mailbox.max_depth, len(mailbox.pending) + (1 if mailbox.running else 0))
+            if not mailbox.running:
+                mailbox.running = True
+                self._pool.submit(self._drain, mailbox)
+        return future
+
+    def run(self, game_id:str, fn:Callable, *args, **kwargs):
+        """Runs a command for a game and waits for its result. Exceptions raised by fn are raised here.
+        """
+        return self.submit(game_id, fn, *args, **kwargs).result()
+
+    async def run_async(self, game_id:str, fn:Callable, *args, **kwargs):
+        """Runs a command for a game without blocking the event loop.
+        """
+        return await asyncio.wrap_future(self.submit(game_id, fn, *args, **kwargs))
+
+    def _call(self, future:Future, fn:Callable, args:tuple, kwargs:dict):
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as ex:
+                future.set_exception(ex)
+
+    def _drain(self, mailbox:GameMailbox):
+        """Runs the queued commands of a game. After batch_size commands the mailbox is
+            rescheduled so that other games have a turn.
+        """
+        self._current.game_id = mailbox.game_id
+        try:
+            count = 0
+            while True:
+                with self._lock:
+                    if len(mailbox.pending) == 0:
+                        mailbox.running = False
+                        return
+                    if count == self.batch_size and not self._shutdown:
+                        self._pool.submit(self._drain, mailbox)
+                        return
+                    future, submitted, fn, args, kwargs = mailbox.pending.popleft()
+                start = time.perf_counter()
+                self._call(future, fn, args, kwargs)
+                end = time.perf_counter()
+                count += 1
+                wait_ms, run_ms = (start - submitted) * 1000.0, (end - start) * 1000.0
+                with self._lock:
+                    mailbox.completed += 1
+                    if future.cancelled() or future.exception() is not None:
+                        mailbox.failed += 1
+                    mailbox.wait_ms_total += wait_ms
+                    mailbox.wait_ms_max = max(mailbox.wait_ms_max, wait_ms)
+                    mailbox.run_ms_total += run_ms
+                    mailbox.run_ms_max = max(mailbox.run_ms_max, run_ms)
+        finally:
+            self._current.game_id = None
+
+    def is_busy(self, game_id:str)->bool:
+        """Returns: True if a command of the game is running or queued
+        """
+        with self._lock:
+            mailbox = self._mailboxes.get(game_id)
+            return mailbox is not None and (mailbox.running or len(mailbox.pending) > 0)
+
+    def remove(self, game_id:str)->bool:
+        """Discards the mailbox and metrics of a game that has ended.
+            Returns: False if the game still has commands running or queued
+        """
+        with self._lock:
+            mailbox = self._mailboxes.get(game_id)
+            if mailbox is not None and (mailbox.running or len(mailbox.pending) > 0):
+                return False
+            self._mailboxes.pop(game_id, None)
+            return True
+
+    def stats(self, game_id:str=None)->dict:
+        """Returns: the queue and timing metrics of a game, or a summary of all games if game_id is None.
+            Times are in milliseconds: wait is the time a command is queued, run is the time it takes to run.
+        """
+        with self._lock:
+            if game_id is not None:
+                mailbox = self._mailboxes.get(game_id)
+                return mailbox.stats() if mailbox is not None else {}
+            games = [mailbox.stats() for mailbox in self._mailboxes.values()]
+        busiest = sorted(games, key=lambda s: (s["depth"], s["wait_ms_max"]), reverse=True)
+        return {"workers" : self.max_workers, "games" : len(games),
+                "busy_games" : sum(1 for s in games if s["depth"] > 0),
+                "queued_commands" : sum(max(0, s["depth"] - 1) for s in games),
+                "completed" : sum(s["completed"] for s in games), "failed" : sum(s["failed"] for s in games),
+                "wait_ms_max" : max((s["wait_ms_max"] for s in games), default=0.0),
+                "busiest" : busiest[:10]}
+
+    def shutdown(self, wait:bool=True):
+        """Stops the workers after the queued commands have run
+        """
+        with self._lock:
+            self._shutdown = True
+        self._pool.shutdown(wait=wait)
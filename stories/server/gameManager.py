@@ -5,15 +5,12 @@ Created on Aug 12, 2024
 '''
 
 from fastapi.encoders import jsonable_encoder
-import pymongo
 from bson.objectid import ObjectId
 from typing import Dict, List
-import json
-import dotenv
+import asyncio
 import string
 from uuid import uuid4
 from pydantic import Field, BaseModel
-from pymongo import MongoClient
 from datetime import datetime
 
 #from .playerManager import StoriesPlayer, StoriesPlayerManager
@@ -24,6 +21,14 @@ from game.player import Player
 from game.commandResult import CommandResult
 from game.gameConstants import PlayerRole, ActionType
 from game.dataManager import DataManager
+from game.cardCatalog import CardCatalog
+from game.gameEventBus import GameEventBus
+from game.mongoClientRegistry import MongoClientRegistry
+from server.asyncDataManager import AsyncDataManager
+from server.gameCache import GameCache
+from server.gameExecutor import GameExecutor
+from server.shardRouter import ShardRouter
+from server.gameEventStream import GameEventStream
 
 class Game(BaseModel):
     """Persisted stories Games
@@ -33,6 +38,8 @@ class Game(BaseModel):
     genre:str = Field(...)    # GenreType - horror, noir, romance
     gameParametersType:str = Field(...)    # test, prod, or custom
     playMode:str = Field(...)     # collaborative, team, or individual
+    # the seed of the game's random number generator, recorded so that the game can be replayed
+    seed:int|None = Field(default=None)
     installation_id:str = Field(...)
     createdBy: str = Field(default=None)
     createdDate: datetime = Field(default=datetime.now())
@@ -49,6 +56,8 @@ class GameInfo(BaseModel):
     genre:str = Field(...)    # GenreType - horror, noir, romance
     gameParametersType:str = Field(...)    # test, prod, or custom
     playMode:str = Field(...)     # collaborative, team, or individual
+    # the seed of the game's random number generator, a game created with the same seed deals the same cards
+    seed:int|None = Field(default=None)
     # the initials of an individual player (individual play), or
     # the team lead (team play), or
     # the player initiating a collaborative game
@@ -96,6 +105,29 @@ class DrawInfo(BaseModel):
     card_type:str = Field(...)
     action_type:str = Field(default=None)
 
+class CommandBatch(BaseModel):
+    """An ordered list of commands for a game and player, for example a turn: ["draw new", "play last", "next"]
+    """
+    game_id:str = Field(...)
+    initials:str = Field(default=None)    # the player issuing the commands
+    commands:List[str] = Field(...)
+    stop_on_error:bool = Field(default=True)    # do not execute the commands after the first failure
+
+class CommandOutcome(BaseModel):
+    """The result of one command in a CommandBatch
+    """
+    command:str = Field(...)
+    return_code:int = Field(...)
+    message:str|None = Field(default=None)
+    properties:dict|None = Field(default=None)
+
+class BatchResult(BaseModel):
+    game_id:str = Field(...)
+    return_code:int = Field(default=0)    # the return_code of the last command executed, or 1 if the game or player is invalid
+    executed:int = Field(default=0)       # the number of commands executed
+    message:str = Field(default=None)
+    results:List[CommandOutcome] = Field(default=[])
+
 class Card(BaseModel):
     """StoryCard number, type and text
     """
@@ -109,8 +141,16 @@ class StoriesGameManager(object):
         """
             Constructor
         """
-        self.games:Dict[str,StoriesGameEngine] = {}    # StoriesGameEngine has a StoriesGame reference, dict key is game_id
-        self.config = dotenv.dotenv_values(".env")
+        self.config = MongoClientRegistry.get_config()
+        # StoriesGameEngine has a StoriesGame reference, key is game_id. Idle games are hibernated and restored on demand.
+        self.games:GameCache = GameCache.from_config(self.config)
+        # commands for a game run one at a time in the order received, different games run in parallel
+        self.executor:GameExecutor = GameExecutor.from_config(self.config)
+        self.games.executor = self.executor
+        # when running as one of several shards, the games owned by this shard. None if not sharded
+        self.shard_router:ShardRouter|None = ShardRouter.from_config(self.config)
+        # the number of game events a WebSocket or SSE client can fall behind before it must resume from its last offset
+        self.event_queue_size = int(self.config.get("GAME_EVENT_QUEUE_SIZE") or GameEventStream.DEFAULT_MAX_QUEUED)
         self.db_url = self.config["DB_URL"]
         self.db_name = self.config["DB_NAME"]    # stories DB
         result,message = self.db_init()
@@ -121,14 +161,14 @@ class StoriesGameManager(object):
             print(message)
         
         self.stories_game = None
+        self.data_manager = AsyncDataManager(self.db_name, self.db_url)    # used by the async request handlers
 
     def db_init(self)->(bool,str):
         message = None
         result = True
         try:
-            mongo_client = pymongo.MongoClient(self.db_url)
-            self.stories_db = mongo_client[self.db_name]
-            self.mongo_client = mongo_client
+            self.mongo_client = MongoClientRegistry.get_client(self.db_url)
+            self.stories_db = self.mongo_client[self.db_name]
         except Exception as ex:
             message = f'MongoDB error, exception: {str(ex)}'
             result = False
@@ -138,12 +178,36 @@ class StoriesGameManager(object):
     def create_game(self, gameInfo:GameInfo)->Game:
         #
         print(f"gameInfo: {gameInfo}")
-        game_engine = StoriesGameEngine(installationId=gameInfo.installation_id)
         player_info = self.players_collection.find_one({"initials": gameInfo.playerId})    # returns the MongoDB players record as a Dict
         
         if player_info is None:
             return Game(errorNumber=1, errorText="No such user")
         
+        theGame = self._start_game(gameInfo, player_info)
+        if theGame.startDate is not None:
+            self.games_collection.insert_one(jsonable_encoder(theGame))
+        return theGame
+    
+    async def create_game_async(self, gameInfo:GameInfo)->Game:
+        """Async version of create_game() for the request handlers.
+            Creating and starting the StoriesGame is CPU-bound and runs in a worker thread.
+        """
+        player_info = await self.data_manager.find_player(gameInfo.playerId)
+        if player_info is None:
+            return Game(errorNumber=1, errorText="No such user")
+        
+        theGame = await asyncio.to_thread(self._start_game, gameInfo, player_info)
+        if theGame.startDate is not None:
+            await self.data_manager.insert_game(jsonable_encoder(theGame))
+        return theGame
+    
+    def _start_game(self, gameInfo:GameInfo, player_info:dict)->Game:
+        """Creates and starts a new StoriesGame for the player creating the game.
+            Returns: the server Game instance. Game startDate is set if the game was started,
+            errorNumber and errorText are set if the StoriesGame could not be created.
+        """
+        game_id = self.shard_router.new_game_id(gameInfo.installation_id) if self.shard_router is not None else None
+        game_engine = StoriesGameEngine(game_id=game_id, installationId=gameInfo.installation_id)
         gameInfo.players = [player_info["initials"]]
 
         theGame = Game(installation_id=gameInfo.installation_id, genre=gameInfo.genre, \
@@ -153,7 +217,7 @@ class StoriesGameManager(object):
         #
         # create the StoriesGame and if successful, persist Game to the DB
         #
-        result = game_engine.create(gameInfo.installation_id, gameInfo.genre, 0, gameInfo.playMode, 'mongo', gameInfo.gameParametersType)
+        result = game_engine.create(gameInfo.installation_id, gameInfo.genre, 0, gameInfo.playMode, 'mongo', gameInfo.gameParametersType, gameInfo.seed)
         if result.return_code != CommandResult.SUCCESS:
             theGame.errorNumber = 2
             theGame.errorText = "Could not create a StoriesGame"
@@ -161,19 +225,22 @@ class StoriesGameManager(object):
             stories_game = game_engine.stories_game
             game_id = stories_game.game_id
             theGame.game_id = game_id
+            theGame.seed = stories_game.game_state.seed
             
             #
-            # add the initiating player to the game and assign the role, 
-            # add the Game instance to the stories game collection, and start the game
+            # add the initiating player to the game and assign the role, and start the game
             #
             self.games[game_id] = game_engine
-            self._add_player(player_info, game_id, player_role=PlayerRole[gameInfo.playerRole.upper()])
-            result = game_engine.start(what="game")
+            result = self.executor.run(game_id, self._add_player_and_start, player_info, game_id, PlayerRole[gameInfo.playerRole.upper()])
             if result.is_successful():
                 theGame.startDate = datetime.now()
-                self.games_collection.insert_one(jsonable_encoder(theGame))
         return theGame
 
+    def _add_player_and_start(self, player_info:dict, game_id:str, player_role:PlayerRole)->CommandResult:
+        game_engine = self.games[game_id]
+        self._add_player(player_info, game_id, player_role=player_role)
+        return game_engine.start(what="game")
+
     def add_player_to_game(self, playerInfo:PlayerInfo):
         player_info = self.players_collection.find_one({"initials": playerInfo.playerId})    # returns the MongoDB player record as a Dict
         #game_engine:StoriesGameEngine = self.games[playerInfo.game_id]
@@ -190,33 +257,143 @@ class StoriesGameManager(object):
         
         return playerInfo
     
-    def _add_player(self, player_info:dict, gameId:str, player_role:PlayerRole=PlayerRole.PLAYER)->CommandResult:
+    async def add_player_to_game_async(self, playerInfo:PlayerInfo):
+        """Async version of add_player_to_game(). The game is looked up, restoring it if it was hibernated,
+            and the player's hand is dealt in the game's GameExecutor mailbox.
+        """
+        player_info = await self.data_manager.find_player(playerInfo.playerId)
+        if player_info is not None:
+            player_role = PlayerRole[playerInfo.playerRole.upper()]
+            result = await self.executor.run_async(playerInfo.game_id, self._add_player, player_info, playerInfo.game_id, player_role)
+            if result is None:
+                self.executor.remove(playerInfo.game_id)
+                playerInfo.status = f"No such player {playerInfo.playerId} or game {playerInfo.game_id}"
+                playerInfo.return_code = 1
+            elif result.is_successful():
+                playerInfo.status = f"{playerInfo.playerId} added to game {playerInfo.game_id}"
+            else:
+                playerInfo.status = result.message
+                playerInfo.return_code = 1
+        else:
+            playerInfo.status = f"No such player {playerInfo.playerId} or game {playerInfo.game_id}"
+        
+        return playerInfo
+    
+    def _add_player(self, player_info:dict, gameId:str, player_role:PlayerRole=PlayerRole.PLAYER)->CommandResult|None:
         """Adds a player to the game with a given game_id
+            Returns: the CommandResult, None if there is no such game
         """
-        game_engine = self.games[gameId]
-        command = f"add player {player_info['name']} {player_info['initials']} {player_info['login_id']} {player_info['email']}"
-        result = game_engine.execute_command(command, aplayer=None)
-        if result.is_successful():
-            if player_role is PlayerRole.DIRECTOR:
-                command = f"add director {player_info['name']} {player_info['initials']}"
-                result = game_engine.execute_command(command, aplayer=None)
-        return result
+        return self._add_players([player_info], gameId, [player_role])
+    
+    def _add_players(self, players_info:List[dict], gameId:str, player_roles:List[PlayerRole]=None)->CommandResult|None:
+        """Adds players to the game with a given game_id in one call. The hands of all the players are dealt at once.
+            Arguments:
+                players_info - the MongoDB players record of each player
+                player_roles - the PlayerRole of each player, default is PlayerRole.PLAYER.
+                               A DIRECTOR is added as a player and then made the Director.
+            Returns: the CommandResult, None if there is no such game.
+            Run it in the game's GameExecutor mailbox, looking up a hibernated game restores it.
+        """
+        game_engine = self.games.get(gameId)
+        if game_engine is None:
+            return None
+        role_names = None if player_roles is None else \
+                     [PlayerRole.DIRECTOR.value if player_role is PlayerRole.DIRECTOR else PlayerRole.PLAYER.value for player_role in player_roles]
+        return game_engine.add_players(players_info, role_names)
+    
+    def add_players_to_game(self, playerInfos:List[PlayerInfo])->List[PlayerInfo]:
+        """Adds several existing players to a game in one call. The players must be added to the same game,
+            the game_id of the first PlayerInfo.
+            Returns: the PlayerInfos with their status
+        """
+        initials = [pinfo.playerId for pinfo in playerInfos]
+        records = self.players_collection.find({"initials": {"$in" : initials + [pid.upper() for pid in initials]}})
+        players = AsyncDataManager.match_players(initials, records)
+        arguments = self._players_to_add(playerInfos, players)
+        result = self.executor.run(arguments[1], self._add_players, *arguments) if arguments is not None else None
+        if result is None and arguments is not None:
+            self.executor.remove(arguments[1])
+        return self._players_status(playerInfos, players, result)
+    
+    async def add_players_to_game_async(self, playerInfos:List[PlayerInfo])->List[PlayerInfo]:
+        """Async version of add_players_to_game(). The players are found with one query
+            and all the hands are dealt in a single call in the game's GameExecutor mailbox.
+        """
+        players = await self.data_manager.find_players([pinfo.playerId for pinfo in playerInfos])
+        arguments = self._players_to_add(playerInfos, players)
+        result = await self.executor.run_async(arguments[1], self._add_players, *arguments) if arguments is not None else None
+        if result is None and arguments is not None:
+            self.executor.remove(arguments[1])
+        return self._players_status(playerInfos, players, result)
+    
+    def _players_to_add(self, playerInfos:List[PlayerInfo], players:Dict[str,dict])->tuple|None:
+        """Returns: the _add_players() arguments for the players that were found, or None if there are none.
+            The game is looked up by _add_players().
+        """
+        game_id = playerInfos[0].game_id if len(playerInfos) > 0 else None
+        found = [pinfo for pinfo in playerInfos if pinfo.playerId in players and pinfo.game_id == game_id]
+        if len(found) == 0:
+            return None
+        return ([players[pinfo.playerId] for pinfo in found], game_id, [PlayerRole[pinfo.playerRole.upper()] for pinfo in found])
+    
+    def _players_status(self, playerInfos:List[PlayerInfo], players:Dict[str,dict], result:CommandResult|None)->List[PlayerInfo]:
+        """Sets the status of each PlayerInfo after add_players_to_game()
+        """
+        for playerInfo in playerInfos:
+            if result is None or playerInfo.playerId not in players or playerInfo.game_id != playerInfos[0].game_id:
+                playerInfo.status = f"No such player {playerInfo.playerId} or game {playerInfo.game_id}"
+                playerInfo.return_code = 1
+            elif result.is_successful():
+                playerInfo.status = f"{playerInfo.playerId} added to game {playerInfo.game_id}"
+            else:
+                playerInfo.status = result.message
+                playerInfo.return_code = 1
+        return playerInfos
     
     def get_game_status(self, game_id):
         status = {}
         if game_id in self.games:
             game_engine:StoriesGameEngine = self.games[game_id]
-            result = game_engine.game_status(indent=0)
-            if result.is_successful():
-                status = json.loads(result.message)
+            result = game_engine.game_status(display_format="dict")
+            if result.is_successful() and result.properties is not None:
+                status = result.properties
         return status
     
+    def get_game_status_if_changed(self, game_id:str, if_none_match:str=None, since:int=None)->tuple:
+        """Gets the game status for a conditional request, see GameState.etag()
+            Arguments:
+                game_id - the game ID
+                if_none_match - the If-None-Match request header
+                since - a status version, to get only what changed since then if that is known
+            Returns: a tuple of the status ETag and the status with its "version".
+                The status is None if it matches if_none_match, it has not changed. The ETag is None if there is no such game.
+        """
+        if game_id not in self.games:
+            return None, {}
+        game_engine:StoriesGameEngine = self.games[game_id]
+        etag = game_engine.game_state.etag()
+        if StoriesGameManager.etag_matches(if_none_match, etag):
+            return etag, None
+        result = game_engine.game_status(display_format="dict", since=since)
+        status = result.properties if result.is_successful() and result.properties is not None else {}
+        status["version"] = game_engine.game_state.version
+        return etag, status
+    
+    @staticmethod
+    def etag_matches(if_none_match:str|None, etag:str)->bool:
+        """Returns: True if an If-None-Match header matches an ETag
+        """
+        if if_none_match is None:
+            return False
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    
     def list_cards(self, game_id:str, initials:str)->dict:
         cards = {}
         if game_id in self.games:
             game_engine:StoriesGameEngine = self.games[game_id]
-            result = game_engine.lnj(what='hand', initials=initials,  how='numbered')    # list numbered as JSON
-            cards = json.loads(result.message)
+            result = game_engine.list(what='hand', initials=initials,  how='numbered', display_format='dict')
+            cards = result.properties if result.properties is not None else {"cards" : [], "message" : result.message}
         return cards
     
     def play_card(self, game_id:str, card_number:str, action_args:str)->str:
@@ -284,6 +461,28 @@ class StoriesGameManager(object):
             
         return props
     
+    def read_story_if_changed(self, game_id:str, initials:str, if_none_match:str=None, since:int=None)->tuple:
+        """Reads the current story for a conditional request, see GameEngineCommands.story_etag()
+            Arguments:
+                game_id - the game ID
+                initials - the player's initials
+                if_none_match - the If-None-Match request header
+                since - a story version, to get only the lines that changed since then
+            Returns: a tuple of the story ETag and the story with its "version".
+                The story is None if it matches if_none_match, it has not changed. The ETag is None if there is no such game.
+        """
+        if game_id not in self.games:
+            return None, {"error_code" : 1, "message" : "invalid gameId"}
+        game_engine:StoriesGameEngine = self.games[game_id]
+        etag = game_engine.story_etag(initials)
+        if StoriesGameManager.etag_matches(if_none_match, etag):
+            return etag, None
+        result = game_engine.read(True, initials, display_format="dict", since=since)
+        story = result.properties
+        if "version" not in story:    # the whole story, which is shared with the story's cached renderings
+            story = dict(story, version=game_engine.story_version(initials))
+        return etag, story
+    
     def next_player(self, gameID:GameID)->dict:
         np = {"game_id" : gameID.game_id}
         if gameID.game_id in self.games:
@@ -298,6 +497,33 @@ class StoriesGameManager(object):
             
         return np
     
+    def execute_commands(self, batch:CommandBatch)->BatchResult:
+        """Executes a CommandBatch. Run it in the game's GameExecutor mailbox so that
+            no other command for the game runs between the commands in the batch.
+        """
+        batch_result = BatchResult(game_id=batch.game_id)
+        if batch.game_id not in self.games:
+            batch_result.return_code = CommandResult.ERROR
+            batch_result.message = f"invalid GameId: {batch.game_id}"
+            return batch_result
+        game_engine:StoriesGameEngine = self.games[batch.game_id]
+        player = None
+        if batch.initials is not None:
+            player = game_engine.game_state.get_player_by_initials(batch.initials)
+            if player is None:
+                batch_result.return_code = CommandResult.ERROR
+                batch_result.message = f"No such player {batch.initials} in game {batch.game_id}"
+                return batch_result
+        results = game_engine.execute_commands(batch.commands, player, batch.stop_on_error)
+        for command,result in zip(batch.commands, results):
+            result_dict = result.to_dict()
+            batch_result.results.append(CommandOutcome(command=command, return_code=result.return_code, \
+                                                       message=result.message, properties=result_dict.get("properties")))
+        batch_result.executed = len(results)
+        if len(results) > 0:
+            batch_result.return_code = results[-1].return_code
+        return batch_result
+    
     def end_game(self, gameID:GameID):
         game_id = gameID.game_id
         result = CommandResult()
@@ -307,6 +533,8 @@ class StoriesGameManager(object):
             theGame["endDate"] = datetime.now()
             del theGame["_id"]    # _id is an immutable field
             eng_result = game_engine.end(what="game")
+            if eng_result.return_code == CommandResult.TERMINATE:
+                GameEventBus.remove(game_id)
             query = {"game_id" : game_id}
             replaced = self.games_collection.replace_one(query, theGame)     # filter, replacement
             result.message = f"{eng_result.message}: {game_id}  matched {replaced.matched_count}, replaced {replaced.modified_count}"
@@ -316,9 +544,58 @@ class StoriesGameManager(object):
 
         return result
     
+    async def end_game_async(self, gameID:GameID)->CommandResult:
+        """Async version of end_game()
+        """
+        game_id = gameID.game_id
+        result = CommandResult()
+        eng_result = await self.executor.run_async(game_id, self._end_game, game_id)
+        self.executor.remove(game_id)
+        if eng_result is not None:
+            if eng_result.return_code == CommandResult.TERMINATE:
+                GameEventBus.remove(game_id)
+            update_result = await self.data_manager.update_game(game_id)
+            result.message = f"{eng_result.message}: {update_result.message}"
+        else:
+            result.message = f"invalid GameId: {gameID.game_id}"
+            result.return_code = CommandResult.ERROR
+
+        return result
+    
+    def _end_game(self, game_id:str)->CommandResult|None:
+        """Ends a game in its GameExecutor mailbox, so the game ended is the one in the GameCache.
+            Returns: the engine's CommandResult, None if there is no such game
+        """
+        game_engine:StoriesGameEngine = self.games.get(game_id)
+        return game_engine.end(what="game") if game_engine is not None else None
+    
+    def get_event_bus(self, game_id:str)->GameEventBus|None:
+        """The GameEventBus of a game, None if there is no such game
+        """
+        return GameEventBus.get_bus(game_id) if game_id in self.games else None
+    
+    def open_event_stream(self, bus:GameEventBus, offset:int|str|None=None)->GameEventStream:
+        """Subscribes a WebSocket or SSE client to a game's events. Call it from the server event loop.
+            Arguments:
+                bus - the game's GameEventBus, see get_event_bus()
+                offset - the offset of the last event the client received, for example its Last-Event-ID header,
+                    to resume from. The default, None, is to receive new events only.
+        """
+        stream = GameEventStream(bus, GameEventStream.parse_offset(offset), self.event_queue_size)
+        stream.open()
+        return stream
+    
+    def get_event_stats(self, game_id:str=None)->dict:
+        """The event log offset and number of subscribers of a game, or a summary of all games
+        """
+        buses = GameEventBus.buses()
+        if game_id is not None:
+            return buses[game_id].stats() if game_id in buses else {"game_id" : game_id}
+        return {"games" : len(buses), "subscribers" : sum(bus.subscriber_count() for bus in buses.values())}
+    
     def get_game(self, game_id:str)->Game:
         """Gets the Game object corresponding the given game_id
-            TODO - if the game is not active, restore the serialized StoriesGame
+            A hibernated StoriesGame is restored by the GameCache.
         """
         game:Game = None
         if game_id in self.games:
@@ -329,6 +606,35 @@ class StoriesGameManager(object):
             
         return game
     
+    def reload_card_catalog(self, genre:str, game_parameters_type:str, source:str='mongo')->CommandResult:
+        """Reloads the shared CardCatalog for a genre after its cards have changed.
+            New games use the reloaded catalog, games in progress are not affected.
+        """
+        return CardCatalog.reload(source, genre, game_parameters_type)
+    
+    def get_game_stats(self)->dict:
+        """Game hibernation and restore statistics
+        """
+        return self.games.stats()
+    
+    def get_command_stats(self, game_id:str=None)->dict:
+        """Command queue depth and wait times for a game, or a summary of all games
+        """
+        return self.executor.stats(game_id)
+    
+    def rebalance_games(self)->int:
+        """Refreshes the shard membership and hibernates the live games now owned by another shard.
+            Each game is hibernated on the GameExecutor, after the commands already queued for it,
+            so a command never runs on a game that is being saved.
+            Returns: the number of games hibernated
+        """
+        if self.shard_router is None:
+            return 0
+        return sum(1 for game_id in self.shard_router.refresh(list(self.games)) if self.executor.run(game_id, self.games.hibernate, game_id))
+    
+    def get_shard_stats(self)->dict:
+        return self.shard_router.stats() if self.shard_router is not None else {"shard_id" : None}
+    
     def get_help(self, game_id, card_or_command:str=None, action_type:str=None) ->dict:
         help = {"game_id" : game_id}
         if game_id in self.games:
@@ -0,0 +1,123 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List
+from bson.binary import Binary
+from game.mongoClientRegistry import MongoClientRegistry
+from game.environment import Environment
+import os
+
+class GameSnapshotStore(ABC):
+    """
+        Persistent storage for hibernated game snapshots, keyed by game_id.
+        @see game.gameSnapshot.GameSnapshot
+    """
+
+    @abstractmethod
+    def save(self, game_id:str, snapshot:bytes):
+        pass
+
+    @abstractmethod
+    def load(self, game_id:str)->bytes|None:
+        """Returns the snapshot of a game, or None if there isn't one
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, game_id:str):
+        pass
+
+    @abstractmethod
+    def exists(self, game_id:str)->bool:
+        pass
+
+    @abstractmethod
+    def game_ids(self)->List[str]:
+        pass
+
+    @staticmethod
+    def create(store_type:str, location:str=None)->'GameSnapshotStore':
+        """Creates a snapshot store
+            Arguments:
+                store_type - "mongo" or "directory"
+                location - the collection name for "mongo" (default is "game_snapshots"),
+                           the folder for "directory" (default is the games folder in the package base)
+        """
+        if store_type == "mongo":
+            return MongoSnapshotStore(location or "game_snapshots")
+        elif store_type == "directory":
+            return DirectorySnapshotStore(location)
+        raise ValueError(f"Invalid snapshot store type {store_type}")
+
+class DirectorySnapshotStore(GameSnapshotStore):
+    """Saves each snapshot to a <game_id>.snapshot file in a local folder
+    """
+
+    def __init__(self, folder:str=None):
+        if folder is None:
+            folder = os.path.join(Environment.get_environment().package_base, 'games', 'snapshots')
+        self._folder = folder
+        os.makedirs(folder, exist_ok=True)
+
+    def _path(self, game_id:str)->str:
+        return os.path.join(self._folder, f"{game_id}.snapshot")
+
+    def save(self, game_id:str, snapshot:bytes):
+        # write to a temporary file first so a partially written snapshot never replaces a good one
+        path = self._path(game_id)
+        with open(f"{path}.tmp", "wb") as fp:
+            fp.write(snapshot)
+        os.replace(f"{path}.tmp", path)
+
+    def load(self, game_id:str)->bytes|None:
+        try:
+            with open(self._path(game_id), "rb") as fp:
+                return fp.read()
+        except FileNotFoundError:
+            return None
+
+    def delete(self, game_id:str):
+        try:
+            os.remove(self._path(game_id))
+        except FileNotFoundError:
+            pass
+
+    def exists(self, game_id:str)->bool:
+        return os.path.exists(self._path(game_id))
+
+    def game_ids(self)->List[str]:
+        return [f[:-len(".snapshot")] for f in os.listdir(self._folder) if f.endswith(".snapshot")]
+
+class MongoSnapshotStore(GameSnapshotStore):
+    """Saves snapshots to a collection in the stories database using the shared MongoClient
+    """
+
+    def __init__(self, collection_name:str="game_snapshots", db_name:str="DB_NAME"):
+        self._collection_name = collection_name
+        self._db_name = db_name
+
+    @property
+    def collection(self):
+        return MongoClientRegistry.get_collection(self._db_name, self._collection_name)
+
+    def save(self, game_id:str, snapshot:bytes):
+        doc = {"game_id" : game_id, "snapshot" : Binary(snapshot), "size" : len(snapshot), "savedDate" : datetime.now()}
+        self.collection.replace_one({"game_id" : game_id}, doc, upsert=True)
+
+    def load(self, game_id:str)->bytes|None:
+        doc = self.collection.find_one({"game_id" : game_id})
+        return bytes(doc["snapshot"]) if doc is not None else None
+
+    def delete(self, game_id:str):
+        self.collection.delete_one({"game_id" : game_id})
+
+    def exists(self, game_id:str)->bool:
+        return self.collection.count_documents({"game_id" : game_id}, limit=1) > 0
+
+    def game_ids(self)->List[str]:
+        return [doc["game_id"] for doc in self.collection.find({}, {"game_id" : 1})]
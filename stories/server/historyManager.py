@@ -6,10 +6,10 @@ Created on Sep 2, 2024
 
 from fastapi.encoders import jsonable_encoder
 from typing import Any, List
-import json, dotenv
+import json
 from uuid import uuid4
 from pydantic import Field, BaseModel
-from pymongo import MongoClient
+from game.mongoClientRegistry import MongoClientRegistry
 from datetime import datetime
 
 class PlayerGameHistory(BaseModel):
@@ -32,8 +32,8 @@ class HistoryManager(object):
     def __init__(self):
         """Just a stub for now
         """
-        self.config = dotenv.dotenv_values(".env")
-        self.mongo_client = MongoClient(self.config["DB_URL"])
+        self.config = MongoClientRegistry.get_config()
+        self.mongo_client = MongoClientRegistry.get_client(self.config["DB_URL"])
         self.db_name = self.config["DB_NAME_HISTORY"]
         self.database = self.mongo_client[self.db_name]
         
@@ -9,9 +9,9 @@ from datetime import datetime
 from uuid import uuid4
 from typing import List
 
-import dotenv
-import pymongo
 from pydantic import BaseModel, Field
+from game.mongoClientRegistry import MongoClientRegistry
+from server.asyncDataManager import AsyncDataManager
 
 class StoriesPlayer(BaseModel):
     """Profile information for Stories players.
@@ -34,7 +34,7 @@ class StoriesPlayerManager(object):
         """
             Constructor
         """
-        self.config = dotenv.dotenv_values(".env")
+        self.config = MongoClientRegistry.get_config()
         self.db_url = self.config["DB_URL"]
         self.db_name = self.config["DB_NAME"]
         result,message = self.db_init()
@@ -42,14 +42,14 @@ class StoriesPlayerManager(object):
             self.collection = self.stories_db["players"]
         else:
             print(message)
+        self.data_manager = AsyncDataManager(self.db_name, self.db_url)    # used by the async request handlers
     
     def db_init(self)->(bool,str):
         message = None
         result = True
         try:
-            mongo_client = pymongo.MongoClient(self.db_url)
-            self.stories_db = mongo_client[self.db_name]
-            self.mongo_client = mongo_client
+            self.mongo_client = MongoClientRegistry.get_client(self.db_url)
+            self.stories_db = self.mongo_client[self.db_name]
         except Exception as ex:
             message = f'MongoDB error, exception: {str(ex)}'
             result = False
@@ -61,6 +61,11 @@ class StoriesPlayerManager(object):
         self.collection.insert_one(jsonable_encoder(player))
         return player
        
+    async def create_player_async(self, player:StoriesPlayer)->StoriesPlayer:
+        player.id = uuid4()
+        await self.data_manager.insert_player(jsonable_encoder(player))
+        return player
+       
     def getUserByUserId(self, playerId: str) -> StoriesPlayer:
         return self.collection.find_one({"_id": playerId})
     
@@ -77,6 +82,10 @@ class StoriesPlayerManager(object):
                 player = None
         return player
     
+    async def getUserByInitialsAsync(self, initials:str)->StoriesPlayer:
+        info = await self.data_manager.find_player(initials)
+        return StoriesPlayer(**info) if info is not None else None
+    
     def deleteUser(self, playerId: str):
         self.collection.delete_one({"_id": playerId})
     
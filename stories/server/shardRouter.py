@@ -0,0 +1,350 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+
+from abc import ABC, abstractmethod
+from bisect import bisect
+from typing import Dict, List
+from game.gameUtils import GameUtils
+from game.environment import Environment
+import hashlib, json, logging, os, re, time
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+class HashRing(object):
+    """
+        A consistent hash ring of shard ids. Each shard has a number of virtual nodes on the ring,
+        a key is owned by the first node at or after the hash of the key. Adding or removing a shard
+        only moves the keys of that shard.
+    """
+
+    def __init__(self, shard_ids:List[str], replicas:int=128):
+        self.replicas = replicas
+        self.shard_ids = sorted(shard_ids)
+        nodes = sorted((HashRing.hash(f"{shard_id}#{n}"), shard_id) for shard_id in self.shard_ids for n in range(replicas))
+        self._hashes = [h for h,_ in nodes]
+        self._owners = [shard_id for _,shard_id in nodes]
+
+    @staticmethod
+    def hash(key:str)->int:
+        return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+    def owner(self, key:str)->str|None:
+        """Returns: the shard_id that owns a key, None if there are no shards
+        """
+        if len(self._hashes) == 0:
+            return None
+        index = bisect(self._hashes, HashRing.hash(key))
+        return self._owners[index % len(self._owners)]
+
+class ShardCoordinator(ABC):
+    """
+        The membership of the shards: the URL of each shard by shard id.
+    """
+
+    @abstractmethod
+    def register(self, shard_id:str, url:str):
+        """Adds a shard, or confirms that it is still alive
+        """
+        pass
+
+    @abstractmethod
+    def unregister(self, shard_id:str):
+        pass
+
+    @abstractmethod
+    def members(self)->Dict[str,str]:
+        """Returns: the URL of each live shard by shard_id
+        """
+        pass
+
+    @staticmethod
+    def create(coordinator_type:str, location:str=None)->'ShardCoordinator':
+        """Creates a shard coordinator
+            Arguments:
+                coordinator_type - "static" or "local"
+                location - for "static" the shards as a comma-separated list of shard_id=url,
+                           for "local" the folder shared by the shards (default is the games/shards folder in the package base)
+        """
+        if coordinator_type == "static":
+            return StaticCoordinator(dict(member.strip().split("=", 1) for member in (location or "").split(",") if "=" in member))
+        elif coordinator_type == "local":
+            return LocalCoordinator(location)
+        raise ValueError(f"Invalid shard coordinator type {coordinator_type}")
+
+class StaticCoordinator(ShardCoordinator):
+    """A fixed set of shards, for example one container per shard
+    """
+
+    def __init__(self, shards:Dict[str,str]):
+        self._shards = dict(shards)
+
+    def register(self, shard_id:str, url:str):
+        pass
+
+    def unregister(self, shard_id:str):
+        pass
+
+    def members(self)->Dict[str,str]:
+        return dict(self._shards)
+
+class LocalCoordinator(ShardCoordinator):
+    """
+        A stand-in coordinator for shards running on one host: each shard writes a <shard_id>.json file
+        with its URL to a shared folder and refreshes it periodically. Shards that have not refreshed
+        their file for ttl seconds are no longer members.
+    """
+
+    def __init__(self, folder:str=None, ttl:float=30):
+        if folder is None:
+            folder = os.path.join(Environment.get_environment().package_base, 'games', 'shards')
+        self._folder = folder
+        self.ttl = ttl
+        os.makedirs(folder, exist_ok=True)
+
+    def _path(self, shard_id:str)->str:
+        return os.path.join(self._folder, f"{shard_id}.json")
+
+    def register(self, shard_id:str, url:str):
+        path = self._path(shard_id)
+        with open(f"{path}.tmp", "w") as fp:
+            json.dump({"shard_id" : shard_id, "url" : url, "pid" : os.getpid(), "heartbeat" : time.time()}, fp)
+        os.replace(f"{path}.tmp", path)
+
+    def unregister(self, shard_id:str):
+        try:
+            os.remove(self._path(shard_id))
+        except FileNotFoundError:
+            pass
+
+    def members(self)->Dict[str,str]:
+        shards = {}
+        now = time.time()
+        for filename in os.listdir(self._folder):
+            if filename.endswith(".json"):
+                try:
+                    with open(os.path.join(self._folder, filename), "r") as fp:
+                        member = json.load(fp)
+                except (OSError, ValueError):
+                    continue    # being replaced
+                if now - member["heartbeat"] < self.ttl:
+                    shards[member["shard_id"]] = member["url"]
+        return shards
+
+class ShardRouter(object):
+    """
+        Assigns each game to a shard, a server process, by a consistent hash of its game_id.
+        A shard creates games with game_ids that hash to itself, so any shard can accept a create request.
+        Requests for a game owned by another shard are forwarded to it by the ShardRoutingMiddleware.
+        When shards join or leave some games change owner. Use GAME_SNAPSHOT_STORE=mongo so that
+        the new owner can restore them: refresh() returns the live games this shard no longer owns
+        so they can be hibernated.
+    """
+    logger = logging.getLogger(__name__)
+    FORWARDED_HEADER = "x-stories-shard"
+
+    def __init__(self, shard_id:str, url:str, coordinator:ShardCoordinator, refresh_interval:float=10):
+        """
+            Arguments:
+                shard_id - the id of this shard
+                url - the URL other shards use to forward requests to this shard
+                coordinator - the ShardCoordinator of the shard membership
+                refresh_interval - seconds between membership refreshes
+        """
+        self.shard_id = shard_id
+        self.url = url.rstrip("/")
+        self.coordinator = coordinator
+        self.refresh_interval = refresh_interval
+        self._members:Dict[str,str] = {shard_id : self.url}
+        self._ring = HashRing([shard_id])
+        self._stats = {"local" : 0, "forwarded" : 0, "forward_errors" : 0, "redirected" : 0, "rebalanced" : 0}
+
+    @staticmethod
+    def from_config(config:dict)->'ShardRouter|None':
+        """Creates the ShardRouter for this process using the environment or the project .env file:
+            GAME_SHARD_ID - the id of this shard. If not set the server is not sharded and None is returned.
+            GAME_SHARD_URL - the URL of this shard
+            GAME_SHARD_COORDINATOR - "local" (the default) or "static"
+            GAME_SHARD_LOCATION - the coordinator folder for "local", the shard list for "static"
+            The environment is checked first so that each shard process can have its own settings.
+        """
+        setting = lambda key: os.environ.get(key) or config.get(key)
+        shard_id = setting("GAME_SHARD_ID")
+        if not shard_id:
+            return None
+        coordinator = ShardCoordinator.create(setting("GAME_SHARD_COORDINATOR") or "local", setting("GAME_SHARD_LOCATION") or None)
+        return ShardRouter(shard_id, setting("GAME_SHARD_URL") or "http://localhost:9000", coordinator)
+
+    @property
+    def members(self)->Dict[str,str]:
+        return dict(self._members)
+
+    def register(self):
+        self.coordinator.register(self.shard_id, self.url)
+        self.refresh()
+
+    def unregister(self):
+        self.coordinator.unregister(self.shard_id)
+
+    def refresh(self, live_game_ids:List[str]=None)->List[str]:
+        """Re-reads the shard membership and rebuilds the hash ring if it has changed.
+            Arguments:
+                live_game_ids - the game_ids of the live games in this shard
+            Returns: the live games that are now owned by another shard
+        """
+        members = self.coordinator.members()
+        members[self.shard_id] = self.url
+        if members != self._members:
+            self.logger.info(f"Shard {self.shard_id} members: {sorted(members.keys())}")
+            self._members = members
+            self._ring = HashRing(list(members.keys()))
+        moved = [game_id for game_id in (live_game_ids or []) if not self.is_local(game_id)]
+        self._stats["rebalanced"] += len(moved)
+        return moved
+
+    def owner(self, game_id:str)->str:
+        return self._ring.owner(game_id)
+
+    def is_local(self, game_id:str)->bool:
+        return self._ring.owner(game_id) == self.shard_id
+
+    def owner_url(self, game_id:str)->str:
+        return self._members[self._ring.owner(game_id)]
+
+    def new_game_id(self, installation_id:str, max_tries:int=1000)->str:
+        """Creates a game_id owned by this shard. The game_id format is the same as GameUtils.create_guid()
+        """
+        for _ in range(max_tries):
+            game_id = GameUtils.create_guid(installation_id)
+            if self.is_local(game_id):
+                return game_id
+        return game_id    # requests for it are forwarded to the owner
+
+    def count(self, stat:str):
+        self._stats[stat] += 1
+
+    def stats(self)->dict:
+        return {"shard_id" : self.shard_id, "members" : self.members, **self._stats}
+
+class ShardRoutingMiddleware(object):
+    """
+        ASGI middleware that forwards requests for a game owned by another shard.
+        The game_id is taken from the path, for example /status/{gameId}, or the "game_id" of a JSON request body.
+        If the body is a list, for example /add_players/, the game_id of its first item is used.
+        Requests that have already been forwarded are always handled locally.
+        Event streams, /events/{gameId}, are not forwarded: SSE clients are redirected to the owner
+        and WebSocket clients are sent a "redirect" message with the owner's URL, to connect to it directly.
+    """
+    _PATH_GAME_ID = re.compile(r"^/(?:game|status|list|draw|discard|read|help|metrics/commands|metrics/events)/([^/]+)")
+    _STREAM_GAME_ID = re.compile(r"^/events/([^/]+)")
+    _BODY_PATHS = ("/add/", "/add_players/", "/play/", "/draw/", "/next/", "/end/", "/commands/")
+
+    def __init__(self, app, router:ShardRouter, client=None, timeout:float=60):
+        """
+            Arguments:
+                app - the ASGI application
+                router - this shard's ShardRouter
+                client - the httpx.AsyncClient used to forward requests. The default is a pooled client.
+        """
+        if client is None and httpx is None:
+            raise ImportError("httpx is required to forward requests between shards")
+        self.app = app
+        self.router = router
+        self.client = client if client is not None else httpx.AsyncClient(timeout=timeout)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket") or any(name == ShardRouter.FORWARDED_HEADER.encode() for name,_ in scope["headers"]):
+            await self.app(scope, receive, send)
+            return
+        path = scope["path"]
+        match = self._STREAM_GAME_ID.match(path)
+        if match is not None and not self.router.is_local(match.group(1)):
+            await self._redirect(scope, match.group(1), receive, send)
+            return
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        body = None
+        match = self._PATH_GAME_ID.match(path)
+        game_id = match.group(1) if match is not None else None
+        if game_id is None and path in self._BODY_PATHS and scope["method"] in ("POST", "PUT"):
+            body = await self._read_body(receive)
+            game_id = self._body_game_id(body)
+        if game_id is None or self.router.is_local(game_id):
+            self.router.count("local")
+            await self.app(scope, self._replay(body, receive) if body is not None else receive, send)
+        else:
+            if body is None:
+                body = await self._read_body(receive)
+            await self._forward(scope, body, game_id, send)
+
+    @staticmethod
+    def _body_game_id(body:bytes)->str|None:
+        """Returns: the "game_id" of a JSON request body, or of the first item of a list, None if there is none
+        """
+        try:
+            value = json.loads(body)
+        except ValueError:
+            return None
+        if isinstance(value, list):
+            value = value[0] if len(value) > 0 else None
+        return value.get("game_id") if isinstance(value, dict) else None
+
+    async def _redirect(self, scope, game_id:str, receive, send):
+        url = self.router.owner_url(game_id) + scope["path"]
+        if scope.get("query_string"):
+            url += "?" + scope["query_string"].decode("latin-1")
+        self.router.count("redirected")
+        if scope["type"] == "websocket":
+            await receive()    # websocket.connect
+            await send({"type" : "websocket.accept"})
+            url = re.sub(r"^http", "ws", url)
+            await send({"type" : "websocket.send", "text" : json.dumps({"type" : "redirect", "url" : url})})
+            await send({"type" : "websocket.close", "code" : 1000})
+        else:
+            await send({"type" : "http.response.start", "status" : 307, "headers" : [(b"location", url.encode("latin-1")), (b"content-length", b"0")]})
+            await send({"type" : "http.response.body", "body" : b""})
+
+    async def _read_body(self, receive)->bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    def _replay(self, body:bytes, receive):
+        sent = False
+        async def replay():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type" : "http.request", "body" : body, "more_body" : False}
+            return await receive()
+        return replay
+
+    async def _forward(self, scope, body:bytes, game_id:str, send):
+        url = self.router.owner_url(game_id) + scope["path"]
+        if scope.get("query_string"):
+            url += "?" + scope["query_string"].decode("latin-1")
+        headers = [(name.decode("latin-1"), value.decode("latin-1")) for name,value in scope["headers"] if name not in (b"host", b"content-length")]
+        headers.append((ShardRouter.FORWARDED_HEADER, self.router.shard_id))
+        try:
+            response = await self.client.request(scope["method"], url, content=body, headers=headers)
+            self.router.count("forwarded")
+            status, content = response.status_code, response.content
+            response_headers = [(name.encode("latin-1"), value.encode("latin-1")) for name,value in response.headers.items() \
+                                if name.lower() not in ("content-length", "transfer-encoding", "connection", "content-encoding")]
+        except httpx.HTTPError as ex:
+            self.router.count("forward_errors")
+            self.router.logger.error(f"Unable to forward {scope['path']} to shard {self.router.owner(game_id)}: {str(ex)}")
+            status, content = 502, json.dumps({"message" : f"Shard {self.router.owner(game_id)} is unavailable"}).encode()
+            response_headers = [(b"content-type", b"application/json")]
+        response_headers.append((b"content-length", str(len(content)).encode()))
+        await send({"type" : "http.response.start", "status" : status, "headers" : response_headers})
+        await send({"type" : "http.response.body", "body" : content})
@@ -1,6 +1,15 @@
 from __future__ import absolute_import  # multi-line and relative/absolute imports
 
 __all__ = [
+    'cardCatalogTest',
     'cardDeckTest',
-    'chatManagerTest'
+    'chatManagerTest',
+    'commandRegistryTest',
+    'gameCacheTest',
+    'gameEventBusTest',
+    'gameExecutorTest',
+    'gameSerializerTest',
+    'gameSnapshotTest',
+    'mongoClientRegistryTest',
+    'shardRouterTest'
 ]
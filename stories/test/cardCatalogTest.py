@@ -0,0 +1,327 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+import unittest, os, pickle, tempfile
+from game.cardCatalog import CardCatalog
+from game.cardPack import CardPack
+from game.cardRenderer import CardRenderer
+from game.characterAlias import CharacterAlias
+from game.gameRandom import GameRandom
+from game.storyCardList import StoryCardList
+from game.storyCardHand import StoryCardHand
+from game.gameConstants import GenreType, GameParametersType, CardType, ActionType
+from game.environment import Environment
+
+class CardCatalogTest(unittest.TestCase):
+
+    def setUp(self):
+        print("\nSetUp the next test")
+        unittest.TestCase.setUp(self)
+        CardCatalog.invalidate()
+        self.catalog = CardCatalog.get_catalog("text", "horror", "test")
+
+    def tearDown(self):
+        unittest.TestCase.tearDown(self)
+        CardCatalog.invalidate()
+
+    def test_catalog_is_shared(self):
+        print("\ntest_catalog_is_shared ==================")
+        catalog = CardCatalog.get_catalog("text", GenreType.HORROR, GameParametersType.TEST)
+        self.assertIs(catalog, self.catalog)
+        print(catalog)
+        for number in range(catalog.size()):
+            self.assertEqual(catalog.cards[number].number, number)
+
+    def test_card_store(self):
+        print("\ntest_card_store =========================")
+        store = self.catalog.store
+        self.assertEqual(store.size(), self.catalog.size())
+        for card in self.catalog.cards:
+            self.assertIs(card.store, store)
+            self.assertEqual(store.card_type(card.number), card.card_type)
+            self.assertEqual(store.action_type(card.number), card.action_type)
+        card = self.catalog.cards[0]
+        copy = card.copy()
+        self.assertIs(copy.store, store)
+        self.assertEqual(copy.text, card.text)
+        print(f"{store.size()} cards, {store.nbytes()} bytes")
+
+    def test_card_decks(self):
+        print("\ntest_card_decks =========================")
+        deck1 = self.catalog.new_card_deck()
+        deck2 = self.catalog.new_card_deck()
+        print(deck1.card_type_counts)
+        for card_type in CardType:
+            if card_type is not CardType.ACTION:
+                self.assertLessEqual(deck1.card_type_counts[card_type.value], self.catalog.maximum_counts[card_type.value])
+        self.assertEqual(deck1.card_type_counts[CardType.ACTION.value], len(self.catalog.cards_by_type[CardType.ACTION]))
+        # the decks share the catalog StoryCards
+        catalog_ids = set(id(card) for card in self.catalog.cards)
+        self.assertTrue(all(id(card) in catalog_ids for card in deck1.deck_cards + deck2.deck_cards))
+        self.assertEqual(deck1.next_card_number, self.catalog.size())
+
+    def test_draw_type(self):
+        print("\ntest_draw_type ==========================")
+        deck = self.catalog.new_card_deck()
+        for card_type in CardType:
+            drawn = [deck.draw_type(card_type, None) for _ in range(deck.card_type_counts[card_type.value])]
+            self.assertTrue(all(card is not None and card.card_type is card_type for card in drawn))
+            self.assertEqual(len(set(card.number for card in drawn)), len(drawn))
+            self.assertIsNone(deck.draw_type(card_type, None))    # all the cards of this type have been drawn
+        self.assertEqual(sum(deck.remaining.values()), 0)
+        self.assertIsNone(deck.draw_new())
+        deck = self.catalog.new_card_deck()
+        action_types = set(card.action_type for card in deck.deck_cards if card.card_type is CardType.ACTION)
+        for action_type in ActionType:
+            card = deck.draw_type(CardType.ACTION, action_type)
+            if action_type in action_types:
+                self.assertIs(card.action_type, action_type)
+            else:
+                self.assertIsNone(card)
+
+    def test_draw_type_undealt(self):
+        print("\ntest_draw_type_undealt ==================")
+        deck = self.catalog.new_card_deck()
+        dealt = set(card.number for hand in deck.deal_hands(2, (deck.size() - 5) // 2) for card in hand)
+        drawn = [deck.draw_type(CardType.STORY, None) for _ in range(deck.size())]
+        drawn = [card for card in drawn if card is not None]
+        self.assertFalse(any(card.number in dealt for card in drawn))    # cards in players' hands are not drawn
+        deck.shuffle()
+        card = deck.draw_type(CardType.STORY, None)    # after a shuffle the dealt cards can be drawn again
+        self.assertTrue(card is None or card.number in dealt)
+
+    def test_draw_new(self):
+        print("\ntest_draw_new ===========================")
+        deck = self.catalog.new_card_deck()
+        ncards = deck.size()
+        omit = [CardType.TITLE, CardType.OPENING]
+        omitted = sum(deck.card_type_counts[card_type.value] for card_type in omit)
+        drawn = [deck.draw_new(omit) for _ in range(ncards - omitted)]
+        self.assertTrue(all(card.card_type not in omit for card in drawn))
+        self.assertEqual(len(set(card.number for card in drawn)), len(drawn))    # each card is dealt once in a pass
+        self.assertEqual(deck.remaining, {card_type.value : deck.card_type_counts[card_type.value] if card_type in omit else 0 for card_type in CardType})
+        # a new pass reshuffles the piles of the other types, the omitted cards are still undealt
+        self.assertNotIn(deck.draw_new(omit).card_type, omit)
+        self.assertEqual(deck.remaining[CardType.TITLE.value], deck.card_type_counts[CardType.TITLE.value])
+        # only omitted card types remain: draw_type draws the undealt cards of the other types, then the rest after a shuffle
+        others = [card_type.value for card_type in CardType if card_type not in omit]
+        for _ in range(2):
+            for card_type in CardType:
+                if card_type not in omit:
+                    while deck.draw_type(card_type, None) is not None:
+                        pass
+            deck.shuffle(others)
+        self.assertIsNone(deck.draw_new(omit))
+        self.assertIn(deck.draw_new().card_type, omit)
+        # the active cards are dealt again in the next pass
+        drawn = deck.draw_cards(sum(deck.card_type_counts[card_type.value] for card_type in omit) + 5)
+        self.assertTrue(all(card.card_type in omit for card in drawn))
+
+    def test_discarded_cards(self):
+        print("\ntest_discarded_cards ====================")
+        deck = self.catalog.new_card_deck()
+        hand = StoryCardHand()
+        hand.add_cards(deck.draw_cards(20))
+        titles = [card for card in hand.cards.cards if card.card_type is CardType.TITLE]
+        hand.discard_cards(CardType.TITLE)
+        self.assertEqual(deck.deactivate(hand.discards.cards), len(titles))
+        self.assertEqual(deck.deactivate(hand.discards.cards), 0)    # already inactive
+        self.assertTrue(all(card.active for card in titles))         # the shared catalog cards are not changed
+        ntitles = deck.card_type_counts[CardType.TITLE.value] - len(titles)
+        drawn = [deck.draw_new() for _ in range(2 * deck.size())]
+        self.assertFalse(any(card in titles for card in drawn))
+        deck.shuffle()
+        self.assertEqual(deck.remaining[CardType.TITLE.value], ntitles)
+
+    def test_deal_hands(self):
+        print("\ntest_deal_hands =========================")
+        deck = self.catalog.new_card_deck()
+        hands = deck.deal_hands(6, 10)
+        self.assertEqual([len(hand) for hand in hands], [10] * 6)
+        numbers = [card.number for hand in hands for card in hand]
+        self.assertEqual(len(set(numbers)), 60)
+        self.assertEqual(sum(deck.remaining.values()), deck.size() - 60)
+        self.assertTrue(all(number not in numbers for number in (card.number for card in deck.remaining_cards())))
+        # a deal larger than the rest of the pass continues with a new pass
+        hands = deck.deal_hands(2, deck.size())
+        self.assertEqual([len(hand) for hand in hands], [deck.size()] * 2)
+        self.assertEqual(len(set(card.number for card in hands[0] + hands[1])), deck.size())
+
+    def test_character_alias(self):
+        print("\ntest_character_alias ====================")
+        alias = {"Michael" : "Don", "Nick" : "Brian", "Samantha" : "Cheryl", "Vivian" : "Beth"}
+        deck = self.catalog.new_card_deck(alias=alias)
+        self.assertIs(deck.alias, CharacterAlias.get(dict(alias)))
+        self.assertTrue(all(card is self.catalog.cards[card.number] for card in deck.deck_cards))
+        cards = [card for card in self.catalog.cards if "Michael" in card.text]
+        self.assertGreater(len(cards), 0)
+        self.assertFalse(any("Michael" in card.render(deck.alias) for card in cards))
+        self.assertIn("Michael", cards[0].text)
+        deck.update_character_alias(["Nick", "Michael", "Samantha", "Vivian"])    # swapped in a single pass
+        self.assertEqual(deck.alias.replace("Michael and Nick"), "Nick and Michael")
+        self.assertEqual(cards[0].copy(text="Michael").render(deck.alias), "Michael")    # changed text is not aliased
+        self.assertEqual(cards[0].copy(text=cards[0].text).render(deck.alias), cards[0].text)    # even if it is the catalog text
+        self.assertEqual(cards[0].copy().render(deck.alias), cards[0].render(deck.alias))
+        identity = {"Michael" : "Michael", "Nick" : "Nick", "Samantha" : "Samantha", "Vivian" : "Vivian"}
+        self.assertIsNone(CharacterAlias.get(identity))
+        self.assertEqual(cards[0].render(None), cards[0].text)
+
+    def test_story_card_list(self):
+        print("\ntest_story_card_list ====================")
+        def check(cards:StoryCardList):
+            for card in cards:
+                self.assertEqual(cards.index_of(card.number), [c.number for c in cards].index(card.number))
+            self.assertEqual(sum(cards.card_type_counts().values()), cards.size())
+        cards = StoryCardList()
+        cards.add_cards(list(self.catalog.cards[0:400:20]))    # cards of every CardType
+        cards.insert_card(5, self.catalog.cards[30])
+        cards.add_card(self.catalog.cards[3])
+        cards.add_card(self.catalog.cards[40])    # the same number twice, index_of is the first one
+        check(cards)
+        self.assertEqual(cards.index_of(30), 5)
+        self.assertEqual(cards.index_of(40), 2)
+        self.assertEqual(cards.index_of(3), cards.size() - 2)
+        self.assertIs(cards.replace_card(1, self.catalog.cards[3]), self.catalog.cards[20])
+        self.assertEqual(cards.index_of(3), 1)
+        self.assertFalse(cards.card_exists(20))
+        self.assertIs(cards.discard(30), self.catalog.cards[30])
+        self.assertFalse(cards.card_exists(30))
+        cards.remove(0)
+        check(cards)
+        card_type = cards.get(0).card_type
+        count = cards.type_count(card_type)
+        self.assertEqual(len(cards.discard_cards(card_type)), count)
+        self.assertEqual(cards.find_first(card_type), -1)
+        check(cards)
+        restored = StoryCardList.__new__(StoryCardList)    # saved before the card number index
+        restored.__dict__["_cards"] = list(cards.cards)
+        self.assertEqual(restored.index_of(cards.get(2).number), 2)
+        self.assertEqual(restored.card_type_counts(), cards.card_type_counts())
+
+    def test_sorted_hand(self):
+        print("\ntest_sorted_hand ========================")
+        deck = self.catalog.new_card_deck()
+        hand = StoryCardHand()
+        hand.add_cards(deck.draw_cards(10))
+        hand.add_card(hand.cards.get(3))    # the same card twice
+        for card in deck.draw_cards(5):
+            hand.add_card(card)
+            self.assertEqual(hand.sort(), sorted(hand.cards.cards, key=lambda card: card.sort_key))
+        listing = hand.rendering(("numbered",), lambda: [card.number for card in hand.sort()])
+        self.assertIs(hand.rendering(("numbered",), lambda: None), listing)
+        for card in list(hand.cards.cards[::3]):
+            hand.play_card(card.number) if card.story_element else hand.remove_card(card.number)
+            self.assertEqual(hand.sort(), sorted(hand.cards.cards, key=lambda card: card.sort_key))
+        self.assertIsNot(hand.rendering(("numbered",), lambda: [card.number for card in hand.sort()]), listing)
+        hand.discard_cards(hand.sort()[0].card_type)
+        self.assertEqual(hand.sort(), sorted(hand.cards.cards, key=lambda card: card.sort_key))
+
+    def test_play_replaced_title(self):
+        print("\ntest_play_replaced_title ================")
+        cards = self.catalog.cards
+        title1, title2 = [cards[number] for number in self.catalog.cards_by_type[CardType.TITLE][:2]]
+        story = cards[self.catalog.cards_by_type[CardType.STORY][0]]
+        hand = StoryCardHand()
+        for card in (title1, title1, title2, story):    # the first Title twice, it is in the story and the hand
+            hand.add_card(card)
+        hand.play_card(title1.number)
+        # the second Title replaces the first one in the story, the other copy is removed from the hand
+        self.assertIs(hand.play_card(title2.number), title2)
+        self.assertEqual(hand.my_story_cards.cards, [title2])
+        self.assertEqual(hand.cards.cards, [story])
+        self.assertEqual(hand.sort(), [story])
+
+    def test_card_renderer(self):
+        print("\ntest_card_renderer ======================")
+        self.assertEqual(CardRenderer.text(["a\n", "b\n"]), "a\nb\n")
+        self.assertEqual(CardRenderer.numbered(["a\n", "b\n"], tags=["", "*"]), "1. a\n*2. b\n")
+        self.assertEqual(CardRenderer.numbered(iter(["a\n", "b\n"]), start=0, separator=".  "), "0.  a\n1.  b\n")
+        self.assertEqual(CardRenderer.numbered_lines(["a", "b"]), ["1. a", "2. b"])
+        self.assertEqual(CardRenderer.numbered([]), "")
+        # a rendering inside another one gets its own buffer
+        self.assertEqual(CardRenderer.text(CardRenderer.numbered([line]) for line in ["a\n", "b\n"]), "1. a\n1. b\n")
+        cards = StoryCardList()
+        cards.add_cards(self.catalog.cards[:40])
+        self.assertEqual(str(cards), "".join(f"{card.card_type.value}:\t{card.number}. {card.text}" for card in cards))
+        self.assertEqual(cards.to_string(numbered=True).splitlines()[0], f"0. ({cards.get(0).card_type.value}) {cards.get(0).number}. {cards.get(0).text.rstrip()}")
+        self.assertEqual(cards.to_dict(how="condensed")["cards"][1], f"2. {cards.get(1).card_type.value}: {cards.get(1).number}. {cards.get(1).text}")
+
+    def test_game_random(self):
+        print("\ntest_game_random ========================")
+        deck1 = self.catalog.new_card_deck(rng=GameRandom(42))
+        deck2 = self.catalog.new_card_deck(rng=GameRandom(42))
+        self.assertEqual(list(deck1.deck_numbers), list(deck2.deck_numbers))
+        self.assertEqual(deck1.draw_cards(20), deck2.draw_cards(20))
+        self.assertEqual(deck1.draw_type(CardType.STORY, None), deck2.draw_type(CardType.STORY, None))
+        rng = pickle.loads(pickle.dumps(deck1.rng))    # the generator state is saved, not just the seed
+        self.assertEqual(rng.seed, 42)
+        self.assertEqual(rng.permutation(50), deck1.rng.permutation(50))
+        self.assertEqual(sorted(rng.permutation(50)), list(range(50)))
+        self.assertEqual(rng.shuffle_list(["a", "b", "c"]), deck1.rng.shuffle_list(["a", "b", "c"]))
+        print(rng)
+
+    def test_card_pack(self):
+        print("\ntest_card_pack ==========================")
+        resource_folder = Environment.get_environment().get_resource_folder()
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "horror.pack")
+            result = CardPack.build(GenreType.HORROR, resource_folder, path)
+            print(result.message)
+            self.assertTrue(result.is_successful())
+            with CardPack.open(GenreType.HORROR, resource_folder, path) as pack:
+                print(pack)
+                for card_type,filepath in CardPack.source_paths(GenreType.HORROR, resource_folder).items():
+                    texts = CardPack.read_story_file(filepath)
+                    self.assertEqual(pack.texts(card_type), texts)
+                    self.assertEqual(pack.count(card_type), len(texts))
+                self.assertEqual(pack.size(), sum(pack.count(card_type) for card_type in pack.card_types))
+                self.assertEqual(pack.text(0), pack.texts(pack.card_types[0])[0])
+            # a pack older than the text files is not used
+            with open(path, "r+b") as fp:
+                fp.seek(12)
+                fp.write(bytes(8))
+            self.assertIsNone(CardPack.open(GenreType.HORROR, resource_folder, path))
+            with open(path, "wb") as fp:
+                fp.write(b"not a card pack")
+            self.assertIsNone(CardPack.open(GenreType.HORROR, resource_folder, path))
+
+    def test_reload(self):
+        print("\ntest_reload =============================")
+        version = self.catalog.version
+        result = CardCatalog.reload("text", "horror", "test")
+        self.assertTrue(result.is_successful())
+        catalog = CardCatalog.get_catalog("text", "horror", "test")
+        self.assertIsNot(catalog, self.catalog)
+        self.assertGreater(catalog.version, version)
+        self.assertEqual(CardCatalog.invalidate(genre="horror"), 1)
+        self.assertEqual(len(CardCatalog.catalogs()), 0)
+
+    def test_digest(self):
+        print("\ntest_digest =============================")
+        digest = self.catalog.digest
+        # another process loads its catalogs in another order, so their versions are different
+        CardCatalog.invalidate()
+        CardCatalog._superseded.clear()
+        CardCatalog.get_catalog("text", "noir", "test")
+        catalog = CardCatalog.get_catalog_digest("text", "horror", "test", digest)
+        self.assertIs(catalog, CardCatalog.get_catalog("text", "horror", "test"))
+        self.assertNotEqual(catalog.version, self.catalog.version)
+        self.assertRaises(ValueError, CardCatalog.get_catalog_digest, "text", "noir", "test", digest)
+        # a catalog with other cards has another digest, only the latest superseded catalogs are kept
+        catalogs = [CardCatalog("text", GenreType.HORROR, GameParametersType.TEST, 0, {}, self.catalog.story_card_template, \
+                                list(self.catalog.cards[:-n])) for n in range(1, CardCatalog.MAX_SUPERSEDED + 2)]
+        self.assertEqual(len(set(catalog.digest for catalog in catalogs + [self.catalog])), len(catalogs) + 1)
+        for superseded in catalogs:
+            CardCatalog._supersede(superseded)
+        self.assertEqual(len(CardCatalog._superseded), CardCatalog.MAX_SUPERSEDED)
+        self.assertIs(CardCatalog.get_catalog_digest("text", "horror", "test", catalogs[-1].digest), catalogs[-1])
+        self.assertRaises(ValueError, CardCatalog.get_catalog_digest, "text", "horror", "test", catalogs[0].digest)
+        # reloading the same cards doesn't keep the previous catalog
+        CardCatalog._superseded.clear()
+        CardCatalog.reload("text", "horror", "test")
+        self.assertEqual(len(CardCatalog._superseded), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+import json
+import unittest
+from game.storiesGameEngine import StoriesGameEngine
+from game.commandRegistry import CommandRegistry
+from game.commandResult import CommandResult
+
+class CommandRegistryTest(unittest.TestCase):
+
+    def setUp(self):
+        print("\nSetUp the next test")
+        unittest.TestCase.setUp(self)
+        self.registry = CommandRegistry.get_registry(StoriesGameEngine)
+
+    def test_tokenize(self):
+        print("\ntest_tokenize ===========================")
+        self.assertEqual(CommandRegistry.tokenize("  draw   new "), ["draw", "new"])
+        self.assertEqual(CommandRegistry.tokenize('log_message "hello there" \'it works\''), ["log_message", "hello there", "it works"])
+        self.assertEqual(CommandRegistry.tokenize("log_message it's mine"), ["log_message", "it's", "mine"])
+        self.assertEqual(CommandRegistry.tokenize("update player dwb player_name='Don Bacon',role=x"), \
+                         ["update", "player", "dwb", "player_name='Don Bacon',role=x"])
+        self.assertEqual(CommandRegistry.parse_kwargs("player_name='Don Bacon',points=3,flag=True,role=team_lead"), \
+                         {"player_name" : "Don Bacon", "points" : 3, "flag" : True, "role" : "team_lead"})
+
+    def test_bind(self):
+        print("\ntest_bind ===============================")
+        spec, args, kwargs = self.registry.bind("play 12 #3 last")
+        self.assertEqual((spec.name, args, kwargs), ("play", [12, "#3", "last"], {}))
+        spec, args, _ = self.registry.bind("info 0")
+        self.assertEqual(args, ["0"])    # initials are strings
+        spec, args, _ = self.registry.bind("read numbered DWB")
+        self.assertEqual(args, [True, "DWB"])
+        spec, args, _ = self.registry.bind("set automatic_draw 1")
+        self.assertEqual(args, ["automatic_draw", 1])
+        spec, args, kwargs = self.registry.bind("update player dwb player_role='team_lead',player_email='dwb@gmail.com'")
+        self.assertEqual(args, ["player", "dwb"])
+        self.assertEqual(kwargs, {"player_role" : "team_lead", "player_email" : "dwb@gmail.com"})
+        for command in ["bogus", "deal", "insert 1", "insert x 1", "show discard extra", "update player dwb", ""]:
+            result = self.registry.bind(command)
+            self.assertIsInstance(result, CommandResult, command)
+            self.assertEqual(result.return_code, CommandResult.ERROR, command)
+
+    def test_execute(self):
+        print("\ntest_execute ============================")
+        game_engine = StoriesGameEngine(installationId="CommandRegistryTest")
+        game_engine.create("CommandRegistryTest", "horror", 0, "individual", "text", "test")
+        for name,initials in [("Don","DWB"), ("Cheryl","CJL")]:
+            self.assertTrue(game_engine.execute_command(f"add player {name} {initials} {initials.lower()} {initials}@stories", aplayer=None).is_successful())
+        game_engine.start(what="game")
+        for command in ["draw new", "ln hand DWB", "game_status 0", "info 0", "lnj hand CJL", "next"]:
+            result = game_engine.execute_command(command, aplayer=None)
+            self.assertTrue(result.is_successful(), f"{command}: {result.message}")
+        self.assertTrue(self.registry.execute(game_engine, "log_message 'hello world'").is_successful())
+        result = game_engine.execute_command("insert 99999 1", aplayer=None)    # raises an exception in the command
+        self.assertEqual(result.return_code, CommandResult.ERROR)
+        stats = self.registry.stats()
+        print(stats)
+        self.assertGreaterEqual(stats["draw"]["count"], 1)
+
+    def test_execute_commands(self):
+        print("\ntest_execute_commands ===================")
+        game_engine = StoriesGameEngine(installationId="CommandRegistryTest")
+        game_engine.create("CommandRegistryTest", "horror", 0, "individual", "text", "test")
+        for name,initials in [("Don","DWB"), ("Cheryl","CJL")]:
+            game_engine.execute_command(f"add player {name} {initials} {initials.lower()} {initials}@stories", aplayer=None)
+        game_engine.start(what="game")
+        player = game_engine.game_state.get_player_by_initials("DWB")
+        results = game_engine.execute_commands(["draw new", "bogus", "next"], player)
+        self.assertEqual([result.return_code for result in results], [CommandResult.SUCCESS, CommandResult.ERROR])
+        self.assertIn("text", results[0].to_dict()["properties"])
+        results = game_engine.execute_commands(["bogus", "next"], player, stop_on_error=False)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(game_engine.game_state.current_player.player_initials, "CJL")
+
+    def test_dict_results(self):
+        print("\ntest_dict_results ===================")
+        game_engine = StoriesGameEngine(installationId="CommandRegistryTest")
+        game_engine.create("CommandRegistryTest", "horror", 0, "individual", "text", "test")
+        game_engine.execute_command("add player Don DWB dwb DWB@stories", aplayer=None)
+        game_engine.start(what="game")
+        game_engine.execute_command("draw new", aplayer=None)
+        self.assertEqual(game_engine.game_status(display_format="dict").properties, json.loads(game_engine.game_status(indent=0).message))
+        self.assertEqual(game_engine.list("hand", "DWB", "numbered", display_format="dict").properties, json.loads(game_engine.lnj("hand", "DWB").message))
+        result = game_engine.read(True, "DWB", display_format="dict")
+        self.assertEqual(result.message, "")
+        self.assertIn("cards", result.properties)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+import unittest, tempfile, threading, time
+from game.storiesGameEngine import StoriesGameEngine
+from game.cardCatalog import CardCatalog
+from server.gameCache import GameCache
+from server.gameSnapshotStore import DirectorySnapshotStore
+from server.gameExecutor import GameExecutor
+
+class SlowSnapshotStore(DirectorySnapshotStore):
+    """Counts the store lookups and makes loads slow enough for lookups to overlap
+    """
+    def __init__(self, folder:str):
+        super().__init__(folder)
+        self.exists_count = 0
+        self.load_count = 0
+
+    def exists(self, game_id:str)->bool:
+        self.exists_count += 1
+        return super().exists(game_id)
+
+    def load(self, game_id:str)->bytes|None:
+        self.load_count += 1
+        time.sleep(0.05)
+        return super().load(game_id)
+
+class GameCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        print("\nSetUp the next test")
+        unittest.TestCase.setUp(self)
+        self.folder = tempfile.TemporaryDirectory()
+        self.games = GameCache(DirectorySnapshotStore(self.folder.name), idle_ttl=0, sweep_interval=3600, min_idle=0)
+
+    def tearDown(self):
+        unittest.TestCase.tearDown(self)
+        self.folder.cleanup()
+
+    def create_game(self)->str:
+        game_engine = StoriesGameEngine(installationId="GameCacheTest")
+        result = game_engine.create("GameCacheTest", "horror", 0, "individual", "text", "test")
+        self.assertTrue(result.is_successful())
+        for name,initials in [("Don","DWB"), ("Cheryl","CJL")]:
+            game_engine.execute_command(f"add player {name} {initials} {initials.lower()} {initials}@stories", aplayer=None)
+        game_engine.start(what="game")
+        self.games[game_engine.game_id] = game_engine
+        return game_engine.game_id
+
+    def test_hibernate_restore(self):
+        print("\ntest_hibernate_restore ==================")
+        game_id = self.create_game()
+        game_engine = self.games[game_id]
+        hand = game_engine.lnj(what='hand', initials="DWB", how='numbered').message
+        self.assertTrue(self.games.hibernate(game_id))
+        self.assertEqual(len(self.games), 0)
+        self.assertIn(game_id, self.games)
+        restored = self.games[game_id]
+        self.assertIsNot(restored, game_engine)
+        self.assertEqual(restored.lnj(what='hand', initials="DWB", how='numbered').message, hand)
+        # the restored game shares the catalog cards
+        catalog = restored.stories_game.card_catalog
+        self.assertIs(catalog, game_engine.stories_game.card_catalog)
+        card = restored.game_state.players[0].story_card_hand.cards[0]
+        self.assertIs(catalog.cards[card.number], card)
+        self.assertIs(restored.stories_game.story_card_deck.alias, game_engine.stories_game.story_card_deck.alias)
+        self.assertTrue(restored.execute_command("draw new", aplayer=None).is_successful())
+        stats = self.games.stats()
+        print(stats)
+        self.assertEqual(stats["restores"], 1)
+
+    def test_sweep(self):
+        print("\ntest_sweep ==============================")
+        game_ids = [self.create_game() for _ in range(3)]
+        self.games.max_games = 2
+        self.assertEqual(self.games.sweep(), 1)
+        self.assertEqual(list(self.games), game_ids[1:])    # the least recently used game was hibernated
+        self.games.max_games = 0
+        self.games.idle_ttl = 0.01
+        time.sleep(0.02)
+        self.assertEqual(self.games.sweep(), 2)
+        self.assertEqual(self.games.stats()["ttl_evictions"], 2)
+        self.assertTrue(all(game_id in self.games for game_id in game_ids))
+
+    def test_memory_budget(self):
+        print("\ntest_memory_budget ======================")
+        for _ in range(3):
+            self.create_game()
+        self.games.memory_budget = 1
+        self.assertEqual(self.games.sweep(), 3)
+        self.assertEqual(self.games.stats()["lru_evictions"], 3)
+
+    def test_restore_after_reload(self):
+        print("\ntest_restore_after_reload ===============")
+        game_id = self.create_game()
+        digest = self.games[game_id].stories_game.card_catalog.digest
+        self.games.hibernate(game_id)
+        CardCatalog.reload("text", "horror", "test")
+        # the cards are the same so the game is restored with the reloaded catalog
+        catalog = self.games[game_id].stories_game.card_catalog
+        self.assertEqual(catalog.digest, digest)
+        self.assertIs(catalog, CardCatalog.get_catalog("text", "horror", "test"))
+
+    def test_concurrent_restore(self):
+        print("\ntest_concurrent_restore =================")
+        store = SlowSnapshotStore(self.folder.name)
+        self.games = GameCache(store, idle_ttl=0, sweep_interval=3600, min_idle=0)
+        game_id = self.create_game()
+        self.games.hibernate(game_id)
+        restored = []
+        threads = [threading.Thread(target=lambda: restored.append(self.games.get(game_id))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        self.assertIn(game_id, self.games)    # while it is being restored
+        for thread in threads:
+            thread.join()
+        self.assertEqual(store.load_count, 1)
+        self.assertTrue(all(game_engine is restored[0] for game_engine in restored))
+        # an unknown game is looked up in the store once
+        self.assertNotIn("unknown", self.games)
+        self.assertNotIn("unknown", self.games)
+        self.assertIsNone(self.games.get("unknown"))
+        self.assertEqual(store.exists_count, 1)
+        self.assertEqual(store.load_count, 1)
+
+    def test_sweep_in_mailbox(self):
+        print("\ntest_sweep_in_mailbox ===================")
+        executor = GameExecutor(max_workers=2)
+        self.games.executor = executor
+        game_id = self.create_game()
+        started, release = threading.Event(), threading.Event()
+        def command():
+            started.set()
+            release.wait(timeout=5)
+            game_engine = self.games[game_id]
+            self.assertTrue(game_engine.execute_command("draw new", aplayer=None).is_successful())
+            return game_engine.lnj(what='hand', initials="DWB", how='numbered').message
+        running = executor.submit(game_id, command)
+        self.assertTrue(started.wait(timeout=5))
+        self.games.idle_ttl = 0.01
+        time.sleep(0.02)
+        sweeper = threading.Thread(target=self.games.sweep)
+        sweeper.start()
+        sweeper.join(timeout=0.1)
+        self.assertTrue(sweeper.is_alive())    # the hibernation waits for the command
+        self.assertEqual(len(self.games), 1)
+        release.set()
+        sweeper.join()
+        hand = running.result()
+        self.assertEqual(self.games.stats()["ttl_evictions"], 1)
+        # the game was saved after the command, the restored hand has the card it drew
+        self.assertEqual(executor.run(game_id, lambda: self.games[game_id].lnj(what='hand', initials="DWB", how='numbered').message), hand)
+        executor.shutdown()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+import unittest, asyncio, threading
+from game.storiesGameEngine import StoriesGameEngine
+from game.gameEventBus import GameEventBus, GameEvent
+from game.gameConstants import GameEventType
+from server.gameEventStream import GameEventStream
+
+class GameEventBusTest(unittest.TestCase):
+
+    def setUp(self):
+        print("\nSetUp the next test")
+        unittest.TestCase.setUp(self)
+        self.bus = GameEventBus("GameEventBusTest", capacity=5)
+
+    def test_log_and_resume(self):
+        print("\ntest_log_and_resume =====================")
+        received = []
+        for n in range(8):
+            self.bus.publish(GameEventType.DRAW, initials="DWB", n=n)
+        self.assertEqual(self.bus.offset, 8)
+        self.assertEqual(self.bus.first_offset, 4)
+        self.assertEqual([event.offset for event in self.bus.events_since(5)], [6, 7, 8])
+        self.assertEqual(self.bus.events_since(8), [])
+        self.assertIsNone(self.bus.events_since(2))     # no longer in the log
+        self.assertIsNone(self.bus.events_since(9))     # not an offset of this bus
+        subscription_id, backlog = self.bus.subscribe(received.append, 6)
+        self.assertEqual([event.offset for event in backlog], [7, 8])
+        event = self.bus.publish(GameEventType.PLAY, initials="DWB", number=12)
+        self.assertEqual(received, [event])
+        self.assertEqual(event.to_dict()["type"], "play")
+        self.assertIs(event.to_JSON(), event.to_JSON())
+        self.assertTrue(self.bus.unsubscribe(subscription_id))
+        self.bus.publish(GameEventType.PASS, initials="DWB", to="CJL")
+        self.assertEqual(len(received), 1)
+        self.bus.subscribe(received.append)
+        self.bus.close()
+        self.assertIsNone(received[-1])
+        self.assertIsNone(self.bus.publish(GameEventType.END_GAME))
+
+    def test_game_events(self):
+        print("\ntest_game_events ========================")
+        game_engine = StoriesGameEngine(installationId="GameEventBusTest")
+        self.assertTrue(game_engine.create("GameEventBusTest", "horror", 0, "individual", "text", "test").is_successful())
+        for name,initials in [("Don","DWB"), ("Cheryl","CJL")]:
+            game_engine.execute_command(f"add player {name} {initials} {initials.lower()} {initials}@stories", aplayer=None)
+        game_engine.start(what="game")
+        bus = GameEventBus.get_bus(game_engine.game_id)
+        offset = bus.offset
+        player = game_engine.game_state.current_player
+        result = game_engine.draw("story")
+        self.assertTrue(result.is_successful())
+        story_card = player.story_card_hand.get_card(int(result.properties["number"]))
+        self.assertTrue(game_engine.play(story_card.number).is_successful())
+        discarded = player.story_card_hand.cards[0]
+        self.assertTrue(game_engine.discard(discarded.number).is_successful())
+        self.assertTrue(game_engine.pass_card(player.story_card_hand.cards[0].number, "left").is_successful())
+        self.assertTrue(game_engine.next().is_successful())
+        events = bus.events_since(offset)
+        types = [event.event_type for event in events]
+        self.assertEqual(types[:5], [GameEventType.DRAW, GameEventType.PLAY, GameEventType.DISCARD, GameEventType.PASS, GameEventType.NEXT_PLAYER])
+        self.assertNotIn("number", events[0].data)    # a drawn card is private
+        self.assertEqual(events[1].data["number"], story_card.number)
+        self.assertEqual(events[2].data["number"], discarded.number)
+        self.assertEqual(events[3].data["to"], "CJL")
+        self.assertEqual(events[4].data["initials"], game_engine.game_state.current_player.player_initials)
+        GameEventBus.remove(game_engine.game_id)
+        self.assertIsNone(GameEventBus.get_bus(game_engine.game_id, create=False))
+
+    def test_event_stream(self):
+        print("\ntest_event_stream =======================")
+        for n in range(3):
+            self.bus.publish(GameEventType.DRAW, n=n)
+        async def consume(stream:GameEventStream, count:int)->list:
+            events = []
+            async for event in stream.events(heartbeat=0.05):
+                events.append(event)
+                if len(events) == count:
+                    break
+            return events
+        async def run():
+            # resume from offset 1, then receive an event published on another thread
+            stream = GameEventStream(self.bus, offset=1)
+            stream.open()
+            threading.Thread(target=self.bus.publish, args=(GameEventType.PLAY,), kwargs={"n" : 3}).start()
+            events = await consume(stream, 3)
+            self.assertEqual([event.offset for event in events], [2, 3, 4])
+            stream.close()
+            self.assertEqual(stream.end_reason, GameEventStream.STOPPED)
+            self.assertEqual(self.bus.subscriber_count(), 0)
+            # an offset that is no longer in the log starts with a RESYNC
+            for n in range(5):
+                self.bus.publish(GameEventType.DRAW, n=n)
+            stream = GameEventStream(self.bus, offset=1)
+            events = await consume(stream, 2)
+            self.assertEqual(events[0].event_type, GameEventType.RESYNC)
+            self.assertEqual(events[0].offset, 9)
+            self.assertIsNone(events[1])    # heartbeat
+            stream.close()
+            # a client that falls behind is ended with a RESYNC at the last event it received
+            stream = GameEventStream(self.bus, max_queued=2)
+            stream.open()
+            for n in range(3):
+                self.bus.publish(GameEventType.DRAW, n=n)
+            await asyncio.sleep(0.05)
+            events = await consume(stream, 10)
+            self.assertEqual(stream.end_reason, GameEventStream.LAGGING)
+            self.assertEqual(len(events), 1)
+            self.assertEqual(events[0].event_type, GameEventType.RESYNC)
+            self.assertEqual(events[0].offset, 9)
+            self.assertEqual(self.bus.subscriber_count(), 0)
+            # the stream ends when the game is over
+            stream = GameEventStream(self.bus, offset=self.bus.offset)
+            stream.open()
+            self.bus.publish(GameEventType.END_GAME, winner="DWB")
+            self.bus.close()
+            events = await consume(stream, 10)
+            self.assertEqual([event.event_type for event in events], [GameEventType.END_GAME])
+            self.assertEqual(stream.end_reason, GameEventStream.CLOSED)
+            self.assertTrue(GameEventStream.to_SSE(events[0]).startswith(f"id: {events[0].offset}\nevent: end_game\ndata: "))
+        asyncio.run(run())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+import unittest, asyncio, time
+from threading import Event
+from server.gameExecutor import GameExecutor
+
+class GameExecutorTest(unittest.TestCase):
+
+    def setUp(self):
+        print("\nSetUp the next test")
+        unittest.TestCase.setUp(self)
+        self.executor = GameExecutor(max_workers=4, batch_size=2)
+
+    def tearDown(self):
+        unittest.TestCase.tearDown(self)
+        self.executor.shutdown()
+
+    def test_ordering(self):
+        print("\ntest_ordering ===========================")
+        commands = []
+        def command(n:int):
+            time.sleep(0.001)
+            commands.append(n)
+            return n
+        futures = [self.executor.submit("game1", command, n) for n in range(20)]
+        self.assertEqual([future.result() for future in futures], list(range(20)))
+        self.assertEqual(commands, list(range(20)))
+        stats = self.executor.stats("game1")
+        print(stats)
+        self.assertEqual(stats["completed"], 20)
+        self.assertEqual(stats["depth"], 0)
+        self.assertGreater(stats["max_depth"], 1)
+
+    def test_games_run_in_parallel(self):
+        print("\ntest_games_run_in_parallel ==============")
+        started = [Event(), Event()]
+        def command(n:int):
+            started[n].set()
+            return started[1-n].wait(timeout=5)    # each game waits for the other to start
+        futures = [self.executor.submit(f"game{n}", command, n) for n in range(2)]
+        self.assertTrue(all(future.result() for future in futures))
+
+    def test_busy_and_errors(self):
+        print("\ntest_busy_and_errors ====================")
+        release = Event()
+        self.executor.submit("game1", release.wait)
+        self.assertTrue(self.executor.is_busy("game1"))
+        self.assertFalse(self.executor.remove("game1"))
+        failed = self.executor.submit("game1", lambda: 1/0)
+        release.set()
+        self.assertRaises(ZeroDivisionError, failed.result)
+        self.assertFalse(self.executor.is_busy("game1"))
+        self.assertEqual(self.executor.stats()["failed"], 1)
+        self.assertTrue(self.executor.remove("game1"))
+        self.assertEqual(self.executor.stats("game1"), {})
+
+    def test_reentrant_and_async(self):
+        print("\ntest_reentrant_and_async ================")
+        def outer():
+            return self.executor.run("game1", lambda: "inner") + " outer"
+        self.assertEqual(self.executor.run("game1", outer), "inner outer")
+        result = asyncio.run(self.executor.run_async("game1", lambda x: x * 2, 21))
+        self.assertEqual(result, 42)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+import unittest, json
+from datetime import datetime
+from game import gameSerializer
+from game.gameSerializer import GameSerializer
+from game.storiesGameEngine import StoriesGameEngine
+from game.commandResult import CommandResult
+from game.gameConstants import CardType
+
+class GameSerializerTest(unittest.TestCase):
+
+    def setUp(self):
+        print("\nSetUp the next test")
+        unittest.TestCase.setUp(self)
+        self.game_engine = StoriesGameEngine(installationId="GameSerializerTest")
+        result = self.game_engine.create("GameSerializerTest", "horror", 0, "individual", "text", "test")
+        self.assertTrue(result.is_successful())
+        for name,initials in [("Don","DWB"), ("Cheryl","CJL")]:
+            self.game_engine.execute_command(f"add player {name} {initials} {initials.lower()} {initials}@stories", aplayer=None)
+        self.game_engine.start(what="game")
+        self.game_engine.execute_command("play_type story", aplayer=None)
+
+    def test_schemas(self):
+        print("\ntest_schemas ============================")
+        game_state = self.game_engine.game_state
+        player = game_state.players[0]
+        self.assertEqual(player.to_dict(), {"name" : "Don", "number" : 0, "initials" : "DWB", "game_id" : game_state.game_id, "points" : 0, "role" : "player"})
+        status = game_state.to_dict()
+        self.assertNotIn("winning_player", status)    # optional fields are left out if None
+        self.assertEqual(status["genre"], "horror")
+        self.assertEqual(status["players"][1]["initials"], "CJL")
+        self.assertEqual(CommandResult(CommandResult.ERROR, "oops").to_dict(), {"return_code" : 1, "done_flag" : True, "message" : "oops"})
+        result = CommandResult(properties={"card_type" : CardType.STORY, "player" : player})
+        self.assertEqual(result.to_dict()["properties"], {"card_type" : "Story", "player" : player.to_dict()})
+        # repr() shows the summary fields only, jsonpickle is still available
+        self.assertEqual(repr(player), f"Player(number=0, initials='DWB', game_id='{game_state.game_id}')")
+        self.assertTrue(repr(game_state).startswith("GameState(game_id="))
+        story = player.story_card_hand.my_story_cards
+        self.assertEqual(repr(story), f"StoryCardList(size={story.size()}, version={story.version})")
+        self.assertTrue(repr(story.cards[0]).startswith("StoryCard(number="))
+        self.assertIn('"py/object"', player.json_pickle())
+        # an unregistered class can't be converted with to_dict()
+        self.assertRaisesRegex(TypeError, "^datetime is not registered", GameSerializer.to_dict, datetime(2026, 10, 18))
+
+    def test_backends(self):
+        print("\ntest_backends ===========================")
+        player = self.game_engine.game_state.players[0]
+        value = {"status" : self.game_engine.game_state.to_dict(), "story" : player.story_card_hand.my_story_cards.to_dict(),
+                 "player" : player, "card_type" : CardType.TITLE, "when" : datetime(2026, 10, 18, 12, 30), "pair" : (1, 2),
+                 "text" : "Café «noir»", "empty" : [], "nested" : {}}
+        compact = GameSerializer.dumps(value)
+        indented = GameSerializer.dumps(value, indent=2)
+        self.assertEqual(json.loads(compact)["player"]["initials"], "DWB")
+        self.assertEqual(json.loads(compact)["when"], "2026-10-18T12:30:00")
+        self.assertIn("Café «noir»", compact)
+        self.assertEqual(GameSerializer.loads(indented), json.loads(compact))
+        self.assertEqual(GameSerializer.dumpb(value), compact.encode("utf-8"))
+        self.assertEqual(GameSerializer.dumps(value["story"], indent=4), json.dumps(value["story"], ensure_ascii=False, indent=4))
+        # the json module fallback writes the same text
+        saved = gameSerializer.orjson
+        gameSerializer.orjson = None
+        try:
+            self.assertEqual(GameSerializer.dumps(value), compact)
+            self.assertEqual(GameSerializer.dumps(value, indent=2), indented)
+            self.assertEqual(GameSerializer.loads(GameSerializer.dumpb(value)), json.loads(compact))
+        finally:
+            gameSerializer.orjson = saved
+
+if __name__ == '__main__':
+    unittest.main()
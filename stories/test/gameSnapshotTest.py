@@ -0,0 +1,200 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+import unittest, os, pickle
+from game.storiesGameEngine import StoriesGameEngine
+from game.gameSnapshot import GameSnapshot
+from game.cardCatalog import CardCatalog
+from game.storyCard import StoryCard
+from game.gameConstants import GenreType, CardType, PlayerRole
+
+class GameSnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        print("\nSetUp the next test")
+        unittest.TestCase.setUp(self)
+        self.game_engine = StoriesGameEngine(installationId="GameSnapshotTest")
+        result = self.game_engine.create("GameSnapshotTest", "horror", 0, "individual", "text", "test")
+        self.assertTrue(result.is_successful())
+        for name,initials in [("Don","DWB"), ("Cheryl","CJL"), ("Brian","BDB")]:
+            self.game_engine.execute_command(f"add player {name} {initials} {initials.lower()} {initials}@stories", aplayer=None)
+        self.game_engine.start(what="game")
+        self.game_engine.execute_command("draw new", aplayer=None)
+
+    def hands(self, game_engine:StoriesGameEngine)->list:
+        return [game_engine.lnj(what='hand', initials=player.player_initials, how='numbered').message for player in game_engine.game_state.players]
+
+    def test_round_trip(self):
+        print("\ntest_round_trip =========================")
+        # a card that is not in the catalog is saved as an object
+        self.game_engine.game_state.players[0].add_card(StoryCard(GenreType.HORROR, CardType.STORY, "A card of my own.\n", 1000))
+        snapshot = GameSnapshot.dumps(self.game_engine)
+        print(f"snapshot size {len(snapshot)}")
+        restored = GameSnapshot.loads(snapshot)
+        self.assertEqual(self.hands(restored), self.hands(self.game_engine))
+        self.assertEqual(restored.game_state.current_player.player_initials, self.game_engine.game_state.current_player.player_initials)
+        self.assertIs(restored.stories_game.card_catalog, self.game_engine.stories_game.card_catalog)
+        self.assertIs(restored.game_state.players[0].my_game, restored.stories_game)
+        # the game's GameRandom is saved with the game, so both games draw the same cards
+        self.assertIs(restored.stories_game.story_card_deck.rng, restored.stories_game.rng)
+        for _ in range(20):
+            self.assertIs(restored.stories_game.story_card_deck.draw(), self.game_engine.stories_game.story_card_deck.draw())
+
+    def test_seeded_replay(self):
+        print("\ntest_seeded_replay ======================")
+        def play(seed:int)->StoriesGameEngine:
+            game_engine = StoriesGameEngine(installationId="GameSnapshotTest")
+            self.assertTrue(game_engine.create("GameSnapshotTest", "horror", 0, "individual", "text", "test", seed=seed).is_successful())
+            for name,initials in [("Don","DWB"), ("Cheryl","CJL")]:
+                game_engine.execute_command(f"add player {name} {initials} {initials.lower()} {initials}@stories", aplayer=None)
+            game_engine.start(what="game")
+            game_engine.execute_command("draw new", aplayer=None)
+            return game_engine
+        game1 = play(2026)
+        game2 = play(2026)
+        self.assertEqual(game1.game_state.seed, 2026)
+        self.assertNotIn("seed", game1.game_state.to_dict())    # the seed predicts the draws, it is not in the status
+        self.assertEqual(list(game1.stories_game.story_card_deck.deck_numbers), list(game2.stories_game.story_card_deck.deck_numbers))
+        self.assertEqual(self.hands(game1), self.hands(game2))
+        self.assertNotEqual(list(play(2027).stories_game.story_card_deck.deck_numbers), list(game1.stories_game.story_card_deck.deck_numbers))
+
+    def test_add_players(self):
+        print("\ntest_add_players ========================")
+        game_engine = StoriesGameEngine(installationId="GameSnapshotTest")
+        game_engine.create("GameSnapshotTest", "horror", 0, "collaborative", "text", "test")
+        players_info = [{"name" : name, "initials" : initials, "login_id" : initials.lower(), "email" : f"{initials}@stories"} \
+                        for name,initials in [("Don","DWB"), ("Cheryl","CJL"), ("Brian","BDB"), ("Beth","BSB")]]
+        result = game_engine.add_players(players_info, ["director", "player", "player", "player"])
+        self.assertTrue(result.is_successful())
+        players = game_engine.game_state.players
+        self.assertEqual([player.player_initials for player in players], ["DWB", "CJL", "BDB", "BSB"])
+        self.assertEqual([player.number for player in players], [0, 1, 2, 3])
+        self.assertIs(players[0].player_role, PlayerRole.DIRECTOR)
+        deal_size = game_engine.stories_game.deal_size
+        self.assertTrue(all(player.story_card_hand.cards.size() == deal_size for player in players))
+        numbers = [card.number for player in players for card in player.story_card_hand.cards]
+        self.assertEqual(len(set(numbers)), len(numbers))
+
+    def test_story_version(self):
+        print("\ntest_story_version ======================")
+        player = self.game_engine.game_state.current_player
+        initials = player.player_initials
+        story = player.story_card_hand.my_story_cards
+        for card in [card for card in player.story_card_hand.cards if card.story_element][:2]:
+            player.story_card_hand.play_card(card.number)
+        version = story.version
+        self.assertGreaterEqual(version, 2)
+        result = self.game_engine.read(True, initials, display_format="text")
+        self.assertIs(self.game_engine.read(True, initials, display_format="text").message, result.message)
+        self.assertIs(self.game_engine.read(True, initials, display_format="dict").properties, result.properties)
+        self.assertEqual(self.game_engine.read(False, initials, display_format="text").message, story.to_string(False, self.game_engine.stories_game.story_card_deck.alias))
+        # publish gives the read properties to the database as a copy, re_read uses the published story until it changes
+        published = self.game_engine.publish(True, initials, display_format="dict")
+        self.assertNotIn("game_id", result.properties)
+        self.assertEqual(published.properties["game_id"], self.game_engine.game_id)
+        self.assertEqual(self.game_engine.re_read(self.game_engine.game_id, initials).message, story.to_string(False, self.game_engine.stories_game.story_card_deck.alias))
+        card = next(card for card in player.story_card_hand.cards if card.story_element)
+        player.story_card_hand.play_card(card.number)
+        self.assertGreater(story.version, version)
+        self.assertIsNone(story.rendering(("published", self.game_engine.game_id, initials, self.game_engine.stories_game.story_card_deck.alias)))
+        self.assertIn(card.render(self.game_engine.stories_game.story_card_deck.alias), self.game_engine.read(True, initials, display_format="text").message)
+        restored = GameSnapshot.loads(GameSnapshot.dumps(self.game_engine))
+        self.assertEqual(restored.game_state.current_player.story_card_hand.my_story_cards.version, story.version)
+
+    def test_status_version(self):
+        print("\ntest_status_version =====================")
+        game_state = self.game_engine.game_state
+        etag = game_state.etag()
+        version = game_state.version
+        self.assertEqual(game_state.etag(), etag)
+        self.assertEqual(game_state.changes_since(version), {"version" : version, "since" : version})
+        self.game_engine.next()
+        game_state.players[2].points += 5
+        self.assertEqual(game_state.changed(game_state.players[2]), version + 2)
+        self.assertNotEqual(game_state.etag(), etag)
+        changes = game_state.changes_since(version)
+        print(changes)
+        self.assertEqual(changes["current_player_number"], game_state.current_player_number)
+        self.assertEqual([player["initials"] for player in changes["players"]], [game_state.players[2].player_initials])
+        self.assertEqual(game_state.changes_since(version + 1), {"version" : version + 2, "since" : version + 1, "players" : changes["players"]})
+        self.assertIsNone(game_state.changes_since(version + 3))
+        # a restored game starts a new epoch, the changes before it was saved are not known
+        restored = GameSnapshot.loads(GameSnapshot.dumps(self.game_engine)).game_state
+        self.assertNotEqual(restored.etag(), game_state.etag())
+        self.assertGreater(restored.version, game_state.version)
+        self.assertIsNone(restored.changes_since(version))
+        self.assertEqual(restored.to_dict()["players"], game_state.to_dict()["players"])
+
+    def test_story_changes(self):
+        print("\ntest_story_changes ======================")
+        player = self.game_engine.game_state.current_player
+        initials = player.player_initials
+        story = player.story_card_hand.my_story_cards
+        cards = self.game_engine.stories_game.card_catalog.cards
+        story.add_cards([cards[n] for n in (10, 100, 200)])
+        etag = self.game_engine.story_etag(initials)
+        version = story.version
+        self.assertEqual(self.game_engine.story_etag(initials), etag)
+        story.add_card(cards[300])
+        story.replace_card(0, cards[20])
+        changes = self.game_engine.read(True, initials, display_format="dict", since=version).properties
+        print(changes)
+        self.assertEqual([card["line"] for card in changes["cards"]], [0, 3])
+        self.assertEqual(changes["cards"][1]["number"], 300)
+        self.assertEqual(changes["size"], 4)
+        self.assertNotEqual(self.game_engine.story_etag(initials), etag)
+        version = story.version
+        story.insert_card(1, cards[30])
+        story.remove(-1)
+        changes = story.changes_since(version)
+        self.assertEqual([card["line"] for card in changes["cards"]], [1, 2, 3])
+        self.assertEqual(changes["size"], 4)
+        self.assertEqual(story.changes_since(story.version)["cards"], [])
+        self.assertIsNone(self.game_engine.read(True, initials, display_format="dict", since=story.version + 1).properties.get("since"))
+
+    def test_invalid_snapshot(self):
+        print("\ntest_invalid_snapshot ===================")
+        snapshot = GameSnapshot.dumps(self.game_engine)
+        self.assertRaises(ValueError, GameSnapshot.loads, b"not a snapshot")
+        self.assertRaises(ValueError, GameSnapshot.loads, b"XXXX" + snapshot[4:])
+
+    def test_restore_in_another_process(self):
+        print("\ntest_restore_in_another_process =========")
+        snapshot = GameSnapshot.dumps(self.game_engine)
+        # a process that loaded another genre's catalog first
+        CardCatalog.invalidate()
+        CardCatalog._superseded.clear()
+        CardCatalog.get_catalog("text", "noir", "test")
+        restored = GameSnapshot.loads(snapshot)
+        self.assertIs(restored.stories_game.card_catalog, CardCatalog.get_catalog("text", "horror", "test"))
+        self.assertEqual(self.hands(restored), self.hands(self.game_engine))
+
+    def test_other_format(self):
+        print("\ntest_other_format =======================")
+        snapshot = GameSnapshot.dumps(self.game_engine)
+        self.assertRaises(ValueError, GameSnapshot.loads, GameSnapshot._HEADER.pack(GameSnapshot.MAGIC, GameSnapshot.FORMAT_VERSION + 1, 0) + snapshot[8:])
+        # a payload can't refer to classes
+        source, genre, game_parameters_type, version, alias, objects, root = pickle.loads(snapshot[8:])
+        payload = pickle.dumps((source, genre, game_parameters_type, version, alias, [("GameState", {"_x" : StoryCard})], 0), 4)
+        self.assertRaises(ValueError, GameSnapshot.loads, snapshot[:8] + payload)
+
+    def test_save_load(self):
+        print("\ntest_save_load ==========================")
+        game_id = self.game_engine.game_id
+        result = self.game_engine.save(how="snapshot")
+        print(result.message)
+        self.assertTrue(result.is_successful())
+        game_engine = StoriesGameEngine(installationId="GameSnapshotTest")
+        try:
+            result = game_engine.load(game_id, source="text")
+            self.assertTrue(result.is_successful())
+            self.assertEqual(game_engine.game_id, game_id)
+            self.assertEqual(self.hands(game_engine), self.hands(self.game_engine))
+        finally:
+            os.remove(f"{self.game_engine._game_filename_base}.snapshot")
+        self.assertFalse(StoriesGameEngine(installationId="GameSnapshotTest").load(game_id, source="text").is_successful())
+
+if __name__ == '__main__':
+    unittest.main()
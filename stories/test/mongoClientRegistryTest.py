@@ -0,0 +1,98 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+import unittest
+from game.mongoClientRegistry import MongoClientRegistry, PoolMetrics
+from game.cardPack import CardPack
+from game.dataManager import DataManager
+from game.environment import Environment
+from game.gameConstants import GenreType, CardType
+from game.storyCardLoader import StoryCardLoader
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+@unittest.skipIf(mongomock is None, "mongomock is not installed")
+class MongoClientRegistryTest(unittest.TestCase):
+
+    def setUp(self):
+        print("\nSetUp the next test")
+        unittest.TestCase.setUp(self)
+        config = {"DB_URL" : "mongodb://localhost:27017/", "DB_NAME" : "stories", "DB_NAME_GENRES" : "genres", "DB_NAME_HISTORY" : "history"}
+        MongoClientRegistry.configure(client_factory=mongomock.MongoClient, config=config, maxPoolSize=10)
+
+    def tearDown(self):
+        unittest.TestCase.tearDown(self)
+        MongoClientRegistry.close()
+
+    def test_shared_client(self):
+        print("\ntest_shared_client ======================")
+        client = MongoClientRegistry.get_client()
+        self.assertIs(client, MongoClientRegistry.get_client("mongodb://localhost:27017/"))
+        self.assertIs(MongoClientRegistry.get_database("DB_NAME").client, client)
+        self.assertEqual(MongoClientRegistry.get_database("DB_NAME_GENRES").name, "genres")
+        self.assertEqual(MongoClientRegistry.get_database("scratch").name, "scratch")
+
+    def test_collections(self):
+        print("\ntest_collections ========================")
+        players = MongoClientRegistry.get_collection("DB_NAME", "players")
+        players.insert_one({"initials" : "DWB", "name" : "Don"})
+        doc = MongoClientRegistry.get_collection("DB_NAME", "players").find_one({"initials" : "DWB"})
+        self.assertEqual(doc["name"], "Don")
+
+    def test_close(self):
+        print("\ntest_close ==============================")
+        client = MongoClientRegistry.get_client()
+        self.assertEqual(len(MongoClientRegistry.get_pool_metrics()), 1)
+        MongoClientRegistry.close()
+        self.assertEqual(len(MongoClientRegistry.get_pool_metrics()), 0)
+        self.assertIsNot(MongoClientRegistry.get_client(), client)
+
+    def test_load_cards(self):
+        print("\ntest_load_cards =========================")
+        resource_folder = Environment.get_environment().get_resource_folder()
+        genres = MongoClientRegistry.get_database("DB_NAME_GENRES")["horror"]
+        for card_type,path in CardPack.source_paths(GenreType.HORROR, resource_folder).items():
+            cards = [{"line" : line, "content" : text.removesuffix("\n")} for line,text in enumerate(CardPack.read_story_file(path), 1)]
+            genres.insert_one({"cardType" : card_type.value, "cards" : cards})
+        data_manager = DataManager("text", "test", "horror")
+        data_manager.load_parameters("text", "test")
+        data_manager.load_story_card_template("text", GenreType.HORROR, "test")
+        def load(source:str, sample:bool)->StoryCardLoader:
+            loader = StoryCardLoader(source, GenreType.HORROR, data_manager.game_parameters, resource_folder, data_manager.story_card_template, sample=sample)
+            result = loader.load_cards()
+            self.assertEqual(result.return_code, 0, result.message)
+            return loader
+        text_loader = load("text", False)
+        mongo_loader = load("mongo", False)
+        self.assertEqual([card.text for card in mongo_loader.deck_cards], [card.text for card in text_loader.deck_cards])
+        sampled = load("mongo", True)
+        for card_type in sampled.card_types:
+            if card_type["card_type"] != CardType.ACTION.value:
+                count = sum(1 for card in sampled.deck_cards if card.card_type.value == card_type["card_type"])
+                self.assertEqual(count, card_type["maximum_count"])
+        texts = set(card.text for card in text_loader.deck_cards)
+        self.assertTrue(all(card.text in texts for card in sampled.deck_cards))
+
+    def test_pool_metrics(self):
+        print("\ntest_pool_metrics =======================")
+        metrics = PoolMetrics()
+        for _ in range(3):
+            metrics.connection_check_out_started(None)
+            metrics.connection_checked_out(None)
+        metrics.connection_checked_in(None)
+        metrics.connection_check_out_started(None)
+        metrics.connection_check_out_failed(None)
+        values = metrics.to_dict()
+        print(values)
+        self.assertEqual(values["checked_out"], 2)
+        self.assertEqual(values["max_checked_out"], 3)
+        self.assertEqual(values["checkouts"], 3)
+        self.assertEqual(values["checkout_failures"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
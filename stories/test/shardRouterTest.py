@@ -0,0 +1,98 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+import unittest, asyncio, tempfile, json, time
+from server.shardRouter import HashRing, LocalCoordinator, StaticCoordinator, ShardRouter, ShardRoutingMiddleware
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+class ShardRouterTest(unittest.TestCase):
+
+    def setUp(self):
+        print("\nSetUp the next test")
+        unittest.TestCase.setUp(self)
+        self.game_ids = [f"test_{n}" for n in range(4000)]
+
+    def test_hash_ring(self):
+        print("\ntest_hash_ring ==========================")
+        ring = HashRing(["shard0", "shard1", "shard2", "shard3"])
+        owners = [ring.owner(game_id) for game_id in self.game_ids]
+        counts = {shard_id : owners.count(shard_id) for shard_id in ring.shard_ids}
+        print(counts)
+        self.assertTrue(all(600 < count < 1400 for count in counts.values()))
+        # adding a shard only moves games to the new shard
+        ring5 = HashRing(ring.shard_ids + ["shard4"])
+        moved = [(before, ring5.owner(game_id)) for game_id,before in zip(self.game_ids, owners) if ring5.owner(game_id) != before]
+        self.assertTrue(all(after == "shard4" for _,after in moved))
+        self.assertLess(len(moved), len(self.game_ids) * 0.35)
+
+    def test_local_coordinator(self):
+        print("\ntest_local_coordinator ==================")
+        with tempfile.TemporaryDirectory() as folder:
+            routers = [ShardRouter(f"shard{n}", f"http://localhost:{9000+n}", LocalCoordinator(folder)) for n in range(3)]
+            for router in routers:
+                router.register()
+            for router in routers[1:]:
+                router.refresh()    # they registered before the later shards
+            moved = routers[0].refresh(self.game_ids)
+            self.assertEqual(len(routers[0].members), 3)
+            self.assertEqual(set(moved), set(game_id for game_id in self.game_ids if routers[0].owner(game_id) != "shard0"))
+            game_id = routers[1].new_game_id("ShardRouterTest")
+            self.assertTrue(routers[1].is_local(game_id))
+            self.assertTrue(all(router.owner(game_id) == "shard1" for router in routers))
+            routers[2].unregister()
+            routers[0].refresh()
+            self.assertEqual(sorted(routers[0].members), ["shard0", "shard1"])
+            coordinator = LocalCoordinator(folder, ttl=0.01)
+            time.sleep(0.02)
+            self.assertEqual(coordinator.members(), {})
+
+    @unittest.skipIf(httpx is None, "httpx is not installed")
+    def test_forwarding(self):
+        print("\ntest_forwarding =========================")
+        shards = {"shard0" : "http://shard0", "shard1" : "http://shard1"}
+        routers = {shard_id : ShardRouter(shard_id, url, StaticCoordinator(shards)) for shard_id,url in shards.items()}
+        for router in routers.values():
+            router.refresh()
+
+        def shard_app(shard_id:str):
+            async def app(scope, receive, send):
+                message = await receive()
+                body = json.dumps({"shard" : shard_id, "path" : scope["path"], "body" : message.get("body", b"").decode()}).encode()
+                await send({"type" : "http.response.start", "status" : 200, "headers" : [(b"content-type", b"application/json")]})
+                await send({"type" : "http.response.body", "body" : body})
+            return app
+
+        async def run():
+            inner = {shard_id : shard_app(shard_id) for shard_id in shards}
+            mounts = {f"{url}" : httpx.ASGITransport(app=inner[shard_id]) for shard_id,url in shards.items()}
+            client = httpx.AsyncClient(mounts=mounts)
+            front = ShardRoutingMiddleware(inner["shard0"], routers["shard0"], client=client)
+            game_id = routers["shard1"].new_game_id("ShardRouterTest")
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=front), base_url="http://shard0") as c:
+                status = (await c.get(f"/status/{game_id}")).json()
+                played = (await c.post("/play/", json={"game_id" : game_id, "initials" : "DWB", "card_number" : "1"})).json()
+                added = (await c.post("/add_players/", json=[{"game_id" : game_id, "initials" : "CJL"}, {"game_id" : game_id, "initials" : "BDB"}])).json()
+                local = (await c.get(f"/status/{routers['shard0'].new_game_id('ShardRouterTest')}")).json()
+                events = await c.get(f"/events/{game_id}?offset=3")    # event streams are redirected, not forwarded
+            await client.aclose()
+            return status, played, added, local, events
+
+        status, played, added, local, events = asyncio.run(run())
+        self.assertEqual(status["shard"], "shard1")
+        self.assertEqual(played["shard"], "shard1")
+        self.assertIn("card_number", played["body"])
+        self.assertEqual(added["shard"], "shard1")    # routed on the game_id of the first player
+        self.assertEqual(local["shard"], "shard0")
+        self.assertEqual(routers["shard0"].stats()["forwarded"], 3)
+        self.assertEqual(events.status_code, 307)
+        self.assertTrue(events.headers["location"].startswith("http://shard1/events/"))
+        self.assertTrue(events.headers["location"].endswith("?offset=3"))
+        self.assertEqual(routers["shard0"].stats()["redirected"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,7 +2,31 @@ from __future__ import absolute_import  # multi-line and relative/absolute impor
 
 
 __all__ = [
-    'renumber'
+    'commandBenchmark',
+    'drawBenchmark',
+    'handBenchmark',
+    'loadTest',
+    'memoryBenchmark',
+    'mongoLoadBenchmark',
+    'packBenchmark',
+    'renderBenchmark',
+    'renumber',
+    'responseBenchmark',
+    'serializerBenchmark',
+    'shardLauncher',
+    'snapshotBenchmark'
 ]
 
+from .commandBenchmark import CommandBenchmark
+from .drawBenchmark import DrawBenchmark
+from .handBenchmark import HandBenchmark
+from .loadTest import LoadTest
+from .memoryBenchmark import MemoryBenchmark
+from .mongoLoadBenchmark import MongoLoadBenchmark
+from .packBenchmark import PackBenchmark
+from .renderBenchmark import RenderBenchmark
 from .renumber import Renumber
+from .responseBenchmark import ResponseBenchmark
+from .serializerBenchmark import SerializerBenchmark
+from .shardLauncher import ShardLauncher
+from .snapshotBenchmark import SnapshotBenchmark
@@ -0,0 +1,67 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+
+import argparse
+import json
+import time
+from typing import Callable, List
+from game.storiesGameEngine import StoriesGameEngine
+from game.gameEngineCommands import GameEngineCommands
+from game.commandRegistry import CommandRegistry
+
+class CommandBenchmark(object):
+    """
+        Compares running game commands with the CommandRegistry against the previous implementation,
+        which built a Python expression with GameEngineCommands.parse_command_string() and ran it with eval().
+        Reports commands per second for dispatch only (parsing and argument conversion, or parsing and compiling)
+        and for dispatch plus running the command.
+        Run from the stories folder: python -m util.commandBenchmark
+    """
+    COMMANDS = ["show", "game_status 0", "info DWB", "status DWB", "ln hand DWB", "lnj hand CJL", "team_info", "help draw"]
+
+    def __init__(self, iterations:int=2000, commands:List[str]=None):
+        self.iterations = iterations
+        self.commands = commands if commands is not None else CommandBenchmark.COMMANDS
+
+    def create_game(self)->StoriesGameEngine:
+        game_engine = StoriesGameEngine(installationId="CommandBenchmark")
+        game_engine.create("CommandBenchmark", "horror", 0, "individual", "text", "test")
+        for name,initials in [("Don","DWB"), ("Cheryl","CJL")]:
+            game_engine.execute_command(f"add player {name} {initials} {initials.lower()} {initials}@stories", aplayer=None)
+        game_engine.start(what="game")
+        return game_engine
+
+    def commands_per_second(self, fn:Callable)->float:
+        start = time.perf_counter()
+        for _ in range(self.iterations):
+            for command in self.commands:
+                fn(command)
+        return round(self.iterations * len(self.commands) / (time.perf_counter() - start))
+
+    def run(self)->dict:
+        game_engine = self.create_game()
+        registry = CommandRegistry.get_registry(StoriesGameEngine)
+        namespace = {"game_engine" : game_engine}
+        eval_command = lambda command: eval("game_engine." + GameEngineCommands.parse_command_string(command, []).message, namespace)
+        results = {"commands" : self.commands, "iterations" : self.iterations,
+                   "dispatch_eval" : self.commands_per_second(lambda command: compile("game_engine." + GameEngineCommands.parse_command_string(command, []).message, "<command>", "eval")),
+                   "dispatch_registry" : self.commands_per_second(lambda command: registry.bind(command)),
+                   "execute_eval" : self.commands_per_second(eval_command),
+                   "execute_registry" : self.commands_per_second(lambda command: registry.execute(game_engine, command))}
+        results["dispatch_speedup"] = round(results["dispatch_registry"] / results["dispatch_eval"], 1)
+        results["execute_speedup"] = round(results["execute_registry"] / results["execute_eval"], 2)
+        results["profile"] = registry.stats()
+        return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare command dispatch with eval() and the CommandRegistry")
+    parser.add_argument("--iterations", help="Number of times to run the commands", type=int, default=2000)
+    args = parser.parse_args()
+    benchmark = CommandBenchmark(args.iterations)
+    print(json.dumps(benchmark.run(), indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+
+import argparse
+import copy
+import json
+import random
+import time
+from typing import List
+from game.cardCatalog import CardCatalog
+from game.cardDeck import CardDeck
+from game.gameConstants import CardType
+from game.gameUtils import GameUtils
+from game.gameRandom import GameRandom
+
+class RejectionDraw(object):
+    """
+        The CardDeck.draw_new algorithm before per-type piles: walk a shuffled permutation of the whole deck,
+        throw away the cards of omitted types, and reshuffle the whole deck when the end is reached.
+    """
+
+    def __init__(self, deck:CardDeck):
+        self.deck_cards = deck.deck_cards
+        self.cards_index = GameUtils.shuffle(len(self.deck_cards))
+        self.next_index = 0
+
+    def draw_new(self, types_to_omit:List[CardType]):
+        next_card = None
+        while next_card is None:
+            if self.next_index < len(self.cards_index):
+                next_card = self.deck_cards[self.cards_index[self.next_index]]
+                self.next_index += 1
+                if next_card.card_type in types_to_omit:
+                    next_card = None
+            else:
+                self.next_index = 0
+                self.cards_index = GameUtils.shuffle(len(self.deck_cards))
+        return next_card
+
+class DrawBenchmark(object):
+    """
+        Compares CardDeck.draw_new with the rejection draw it replaced, on a deck made from copies of a catalog's cards.
+        Each scenario omits more card types, the last two leave only the Closing or the Title cards to draw.
+        Times are in microseconds per draw.
+        It also times a shuffle of the whole deck with the random module, as GameUtils.shuffle did before GameRandom,
+        and with the game's GameRandom.
+        Run from the stories folder: python -m util.drawBenchmark --copies 50
+    """
+    SCENARIOS = {"no_omission" : [],
+                 "title_opening" : [CardType.TITLE, CardType.OPENING],
+                 "closing_only" : [CardType.TITLE, CardType.OPENING, CardType.OPENING_STORY, CardType.STORY, CardType.ACTION],
+                 "title_only" : [CardType.OPENING, CardType.OPENING_STORY, CardType.STORY, CardType.CLOSING, CardType.ACTION]}
+
+    def __init__(self, copies:int=50, draws:int=20000, genre:str="horror", source:str="text", game_parameters_type:str="test"):
+        self.copies = copies
+        self.draws = draws
+        self.genre = genre
+        self.source = source
+        self.game_parameters_type = game_parameters_type
+
+    def create_deck(self)->CardDeck:
+        """Creates a deck with copies of every card of the catalog
+        """
+        catalog = CardCatalog.get_catalog(self.source, self.genre, self.game_parameters_type)
+        cards = []
+        for _ in range(self.copies):
+            for card in catalog.cards:
+                card = card.copy()
+                card.number = len(cards)
+                cards.append(card)
+        template = copy.deepcopy(catalog.story_card_template)
+        for card_type in template["card_types"]:
+            card_type["maximum_count"] = len(cards)
+        large_catalog = CardCatalog(catalog.source, catalog.genre, catalog.game_parameters_type, 0, {}, template, cards)
+        return large_catalog.new_card_deck()
+
+    def time_draws(self, draw, types_to_omit:List[CardType])->float:
+        start = time.perf_counter()
+        for _ in range(self.draws):
+            draw(types_to_omit)
+        return round((time.perf_counter() - start) * 1e6 / self.draws, 2)
+
+    def time_shuffles(self, size:int, repeat:int=200)->dict:
+        """Returns: the microseconds per shuffle of size deck indexes
+        """
+        rng = GameRandom()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            random.sample(list(range(0, size)), size)
+        sample_us = (time.perf_counter() - start) * 1e6 / repeat
+        start = time.perf_counter()
+        for _ in range(repeat):
+            rng.permutation(size)
+        permutation_us = (time.perf_counter() - start) * 1e6 / repeat
+        return {"numpy" : rng.numpy, "sample_us" : round(sample_us, 2), "permutation_us" : round(permutation_us, 2), \
+                "speedup" : round(sample_us / permutation_us, 1)}
+
+    def run(self)->dict:
+        deck = self.create_deck()
+        results = {"deck_size" : deck.size(), "card_type_counts" : deck.card_type_counts, "draws" : self.draws}
+        results["shuffle"] = self.time_shuffles(deck.size())
+        for name,types_to_omit in DrawBenchmark.SCENARIOS.items():
+            deck = self.create_deck()
+            rejection = RejectionDraw(deck)
+            results[name] = {"rejection_us" : self.time_draws(rejection.draw_new, types_to_omit),
+                             "draw_new_us" : self.time_draws(deck.draw_new, types_to_omit)}
+            results[name]["speedup"] = round(results[name]["rejection_us"] / results[name]["draw_new_us"], 1)
+        return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress test CardDeck.draw_new with large decks and omitted card types")
+    parser.add_argument("--copies", help="Number of copies of the catalog cards in the deck", type=int, default=50)
+    parser.add_argument("--draws", help="Number of timed draws per scenario", type=int, default=20000)
+    parser.add_argument("--genre", help="Story genre", type=str, choices=["horror","romance","noir"], default="horror")
+    args = parser.parse_args()
+    benchmark = DrawBenchmark(args.copies, args.draws, args.genre)
+    print(json.dumps(benchmark.run(), indent=2))
+
+if __name__ == '__main__':
+    main()
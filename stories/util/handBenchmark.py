@@ -0,0 +1,103 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+
+import argparse
+import json
+import random
+import time
+from typing import List
+from game.cardCatalog import CardCatalog
+from game.storyCard import StoryCard
+from game.storyCardList import StoryCardList
+
+class LinearStoryCardList(StoryCardList):
+    """
+        The StoryCardList lookups before the card number index: each one scans the list.
+    """
+
+    def find_card(self, card_number:int)->StoryCard|None:
+        return self._cards[self.index_of(card_number)] if self.card_exists(card_number) else None
+
+    def card_exists(self, card_number:int)->bool:
+        for card in self._cards:
+            if card.number == card_number:return True
+        return False
+
+    def index_of(self, card_number:int)->int:
+        ind = -1
+        for i in range(len(self.cards)):
+            if card_number == self._cards[i].number:
+                ind = i
+                break
+        return ind
+
+    def discard(self, card_number:int)->StoryCard:
+        card_ind = self.index_of(card_number)
+        card = None
+        if card_ind >= 0:
+            card = self._cards[card_ind]
+            del self._cards[card_ind]
+        return card
+
+    def add_card(self, card:StoryCard):
+        self._cards.append(card)
+
+class HandBenchmark(object):
+    """
+        Compares the indexed StoryCardList with linear scans on large hands.
+        Each move looks up a random card of the hand the way the play and pass commands do
+        (card_exists, index_of and find_card), then discards it and adds it back to the end of the hand.
+        Times are in microseconds per move.
+        Run from the stories folder: python -m util.handBenchmark --sizes 10,100,1000
+    """
+
+    def __init__(self, sizes:List[int]=[10, 100, 1000], moves:int=20000, genre:str="horror"):
+        self.sizes = sizes
+        self.moves = moves
+        self.genre = genre
+
+    def create_cards(self, size:int)->List[StoryCard]:
+        catalog = CardCatalog.get_catalog("text", self.genre, "test")
+        cards = []
+        while len(cards) < size:
+            card = catalog.cards[len(cards) % catalog.size()].copy()
+            card.number = len(cards)
+            cards.append(card)
+        return cards
+
+    def time_moves(self, cards:StoryCardList, numbers:List[int])->float:
+        start = time.perf_counter()
+        for number in numbers:
+            if cards.card_exists(number) and cards.index_of(number) >= 0:
+                card = cards.find_card(number)
+                cards.discard(number)
+                cards.add_card(card)
+        return round((time.perf_counter() - start) * 1e6 / len(numbers), 2)
+
+    def run(self)->dict:
+        results = {"moves" : self.moves}
+        for size in self.sizes:
+            hand = self.create_cards(size)
+            numbers = [random.randrange(size) for _ in range(self.moves)]
+            linear = LinearStoryCardList()
+            linear.add_cards(hand)
+            indexed = StoryCardList()
+            indexed.add_cards(hand)
+            results[size] = {"linear_us" : self.time_moves(linear, numbers), "indexed_us" : self.time_moves(indexed, numbers)}
+            results[size]["speedup"] = round(results[size]["linear_us"] / results[size]["indexed_us"], 1)
+        return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare StoryCardList lookups by card number on large hands")
+    parser.add_argument("--sizes", help="Comma-separated hand sizes", type=str, default="10,100,1000")
+    parser.add_argument("--moves", help="Number of timed moves per hand size", type=int, default=20000)
+    parser.add_argument("--genre", help="Story genre", type=str, choices=["horror","romance","noir"], default="horror")
+    args = parser.parse_args()
+    benchmark = HandBenchmark([int(size) for size in args.sizes.split(",")], args.moves, args.genre)
+    print(json.dumps(benchmark.run(), indent=2))
+
+if __name__ == '__main__':
+    main()
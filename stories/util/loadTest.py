@@ -0,0 +1,93 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+
+import argparse
+import json
+import time
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import List
+
+class LoadTest(object):
+    """
+        A simple load test for the stories server. Each simulated session creates a game,
+        adds players, gets player info, game status and the current story, then ends the game.
+        Sessions run concurrently and the throughput and latencies are reported.
+        Run against a server started with, for example: uvicorn app:app --workers 1
+        or against several shards (see ShardLauncher) by giving a comma-separated list of URLs,
+        sessions are spread over the shards.
+    """
+
+    def __init__(self, url:str, initials:List[str], sessions:int, concurrency:int, genre:str="horror", game_parameters_type:str="test"):
+        self.urls = [u.strip().rstrip("/") for u in url.split(",")]
+        self.initials = initials
+        self.sessions = sessions
+        self.concurrency = concurrency
+        self.genre = genre
+        self.game_parameters_type = game_parameters_type
+        self.latencies:List[float] = []    # request latencies in seconds
+        self.errors = 0
+        self._lock = Lock()
+
+    def request(self, method:str, path:str, body:dict=None, n:int=0)->dict|None:
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        req = urllib.request.Request(f"{self.urls[n % len(self.urls)]}{path}", data=data, method=method, headers={"Content-Type" : "application/json"})
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=60) as response:
+                content = json.loads(response.read() or b"null")
+        except (urllib.error.URLError, ValueError):
+            content = None
+            with self._lock:
+                self.errors += 1
+        with self._lock:
+            self.latencies.append(time.perf_counter() - start)
+        return content
+
+    def session(self, n:int):
+        creator = self.initials[n % len(self.initials)]
+        game_info = {"installation_id" : f"load{n}", "genre" : self.genre, "gameParametersType" : self.game_parameters_type,
+                     "playMode" : "individual", "playerId" : creator, "playerRole" : "player"}
+        game = self.request("POST", "/create/", game_info, n)
+        if game is None or not game.get("game_id"):
+            return
+        game_id = game["game_id"]
+        for initials in self.initials:
+            if initials != creator:
+                self.request("POST", "/add/", {"game_id" : game_id, "playerId" : initials, "playerRole" : "player"}, n)
+            self.request("GET", f"/info/{initials}", n=n)
+        self.request("GET", f"/status/{game_id}", n=n)
+        self.request("GET", f"/read/{game_id}/{creator}", n=n)
+        self.request("POST", "/end/", {"game_id" : game_id}, n)
+
+    def run(self)->dict:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            list(executor.map(self.session, range(self.sessions)))
+        elapsed = time.perf_counter() - start
+        latencies = sorted(self.latencies)
+        nrequests = len(latencies)
+        percentile = lambda p: round(latencies[min(nrequests-1, int(p * nrequests))] * 1000, 2) if nrequests > 0 else 0
+        return {"sessions" : self.sessions, "concurrency" : self.concurrency, "requests" : nrequests, "errors" : self.errors,
+                "elapsed_seconds" : round(elapsed, 3), "requests_per_second" : round(nrequests / elapsed, 1),
+                "p50_ms" : percentile(0.50), "p95_ms" : percentile(0.95), "p99_ms" : percentile(0.99)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the stories server")
+    parser.add_argument("--url", help="Server URL, or comma-separated shard URLs", type=str, default="http://localhost:8000")
+    parser.add_argument("--players", help="Comma-separated initials of existing players", type=str, required=True)
+    parser.add_argument("--sessions", help="Number of games to play", type=int, default=200)
+    parser.add_argument("--concurrency", help="Number of concurrent sessions", type=int, default=50)
+    parser.add_argument("--genre", help="Story genre", type=str, choices=["horror","romance","noir"], default="horror")
+    parser.add_argument("--params", help="Game parameters type", type=str, choices=["test","prod","custom"], default="test")
+    args = parser.parse_args()
+    load_test = LoadTest(args.url, args.players.split(","), args.sessions, args.concurrency, args.genre, args.params)
+    print(json.dumps(load_test.run(), indent=2))
+
+if __name__ == '__main__':
+    main()
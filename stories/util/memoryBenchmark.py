@@ -0,0 +1,72 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+
+import argparse
+import gc
+import json
+import tracemalloc
+from typing import List
+from game.storiesGameEngine import StoriesGameEngine
+
+class MemoryBenchmark(object):
+    """
+        Measures the memory used by each live game with tracemalloc.
+        The card catalog is loaded first, then a number of games are created with players and cards drawn,
+        and the memory allocated while creating them is divided by the number of games.
+        Each player's hand is listed once so that the rendered card texts are included.
+        With --alias each game uses its own character names, which are replaced when its cards are rendered.
+        Run from the stories folder: python -m util.memoryBenchmark --games 200
+    """
+
+    def __init__(self, ngames:int=200, nplayers:int=4, ndraws:int=10, genre:str="horror", alias:bool=False):
+        self.ngames = ngames
+        self.nplayers = nplayers
+        self.ndraws = ndraws
+        self.genre = genre
+        self.alias = alias
+
+    def create_game(self, n:int)->StoriesGameEngine:
+        game_engine = StoriesGameEngine(installationId="MemoryBenchmark")
+        game_engine.create("MemoryBenchmark", self.genre, 0, "individual", "text", "test")
+        for p in range(self.nplayers):
+            game_engine.execute_command(f"add player Player{p} P{p:02d} p{p:02d} p{p:02d}@stories", aplayer=None)
+        if self.alias:
+            game_engine.stories_game.story_card_deck.character_alias = \
+                {"Michael" : f"Mike{n}", "Nick" : f"Nico{n}", "Samantha" : f"Sam{n}", "Vivian" : f"Viv{n}"}
+        game_engine.start(what="game")
+        for _ in range(self.ndraws):
+            game_engine.execute_command("draw new", aplayer=None)
+            game_engine.execute_command("next", aplayer=None)
+        for p in range(self.nplayers):
+            game_engine.lnj(what='hand', initials=f"P{p:02d}", how='numbered')
+        return game_engine
+
+    def run(self)->dict:
+        self.create_game(-1)    # loads the catalog
+        gc.collect()
+        tracemalloc.start()
+        start, _ = tracemalloc.get_traced_memory()
+        games:List[StoriesGameEngine] = [self.create_game(n) for n in range(self.ngames)]
+        gc.collect()
+        end, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        deck = games[0].stories_game.story_card_deck
+        return {"games" : len(games), "players" : self.nplayers, "deck_cards" : deck.size(), "alias" : self.alias,
+                "bytes_per_game" : (end - start) // self.ngames}
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the memory used by each live game")
+    parser.add_argument("--games", help="Number of games", type=int, default=200)
+    parser.add_argument("--players", help="Number of players per game", type=int, default=4)
+    parser.add_argument("--draws", help="Number of cards drawn in each game", type=int, default=10)
+    parser.add_argument("--genre", help="Story genre", type=str, choices=["horror","romance","noir"], default="horror")
+    parser.add_argument("--alias", help="Give each game its own character names", action="store_true")
+    args = parser.parse_args()
+    benchmark = MemoryBenchmark(args.games, args.players, args.draws, args.genre, args.alias)
+    print(json.dumps(benchmark.run(), indent=2))
+
+if __name__ == '__main__':
+    main()
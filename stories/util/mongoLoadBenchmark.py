@@ -0,0 +1,85 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+
+import argparse
+import json
+import time
+from game.cardPack import CardPack
+from game.dataManager import DataManager
+from game.environment import Environment
+from game.gameConstants import GenreType, CardType
+from game.mongoClientRegistry import MongoClientRegistry
+from game.storyCardLoader import StoryCardLoader
+
+class MongoLoadBenchmark(object):
+    """
+        Compares loading a genre's story cards from MongoDB with a find_one query for each CardType
+        (the way StoryCardLoader did) against the single aggregation of StoryCardLoader.find_card_contents().
+        The genre collection of a scratch database (default "genres_benchmark") is seeded from the genre text files
+        and dropped when done. Requires a MongoDB server at --url.
+        Run from the stories folder: python -m util.mongoLoadBenchmark --genre horror --url mongodb://localhost:27017/
+    """
+
+    def __init__(self, genre:str="horror", db_url:str="mongodb://localhost:27017/", db_name:str="genres_benchmark", repeat:int=50):
+        self.genre = GenreType[genre.upper()]
+        self.db_url = db_url
+        self.db_name = db_name
+        self.repeat = repeat
+        self.resource_folder = Environment.get_environment().get_resource_folder()
+
+    def seed(self):
+        collection = MongoClientRegistry.get_database(self.db_name, self.db_url)[self.genre.value]
+        collection.drop()
+        for card_type,path in CardPack.source_paths(self.genre, self.resource_folder).items():
+            cards = [{"line" : line, "content" : text.removesuffix("\n")} for line,text in enumerate(CardPack.read_story_file(path), 1)]
+            collection.insert_one({"cardType" : card_type.value, "cards" : cards})
+        return collection
+
+    def find_one_per_type(self, collection)->int:
+        count = 0
+        for ct in CardType:
+            doc = collection.find_one({"cardType" : ct.value})
+            if doc is not None:
+                count += len([card["content"] for card in doc["cards"]])
+        return count
+
+    def time_ms(self, fn)->float:
+        start = time.perf_counter()
+        for _ in range(self.repeat):
+            fn()
+        return round((time.perf_counter() - start) * 1e3 / self.repeat, 3)
+
+    def run(self)->dict:
+        results = {"genre" : self.genre.value, "repeat" : self.repeat}
+        try:
+            MongoClientRegistry.get_client(self.db_url).admin.command("ping")
+            collection = self.seed()
+        except Exception as ex:
+            results["error"] = f"MongoDB is not available: {str(ex)}"
+            return results
+        data_manager = DataManager("text", "test", self.genre.value)
+        data_manager.load_parameters("text", "test")
+        data_manager.load_story_card_template("text", self.genre, "test")
+        loader = StoryCardLoader("mongo", self.genre, data_manager.game_parameters, self.resource_folder, data_manager.story_card_template, sample=False)
+        try:
+            results["find_one_ms"] = self.time_ms(lambda: self.find_one_per_type(collection))
+            results["aggregate_ms"] = self.time_ms(lambda: loader.find_card_contents(collection))
+        finally:
+            collection.drop()
+        return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per card type queries with a single aggregation for loading story cards from MongoDB")
+    parser.add_argument("--genre", help="Story genre", type=str, choices=["horror","romance","noir"], default="horror")
+    parser.add_argument("--url", help="MongoDB URL", type=str, default="mongodb://localhost:27017/")
+    parser.add_argument("--db", help="Scratch database name", type=str, default="genres_benchmark")
+    parser.add_argument("--repeat", help="Number of timed loads", type=int, default=50)
+    args = parser.parse_args()
+    benchmark = MongoLoadBenchmark(args.genre, args.url, args.db, args.repeat)
+    print(json.dumps(benchmark.run(), indent=2))
+
+if __name__ == '__main__':
+    main()
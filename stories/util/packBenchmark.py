@@ -0,0 +1,85 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+
+import argparse
+import json
+import time
+from game.cardCatalog import CardCatalog
+from game.cardPack import CardPack
+from game.dataManager import DataManager
+from game.environment import Environment
+from game.gameConstants import GenreType, GameParametersType
+from game.storyCardLoader import StoryCardLoader
+
+class PackBenchmark(object):
+    """
+        Compares loading the story cards of a genre from the text files, the compiled CardPack and MongoDB.
+        "startup_ms" is the time to load a CardCatalog, which is done once per process.
+        "game_load_ms" is the time for a StoryCardLoader to load a random sample of the cards, as each game did before CardCatalog.
+        The pack is built first if it is missing or stale. Mongo is skipped if the database is not available.
+        Run from the stories folder: python -m util.packBenchmark --genre horror
+    """
+
+    def __init__(self, genre:str="horror", game_parameters_type:str="test", repeat:int=20):
+        self.genre = GenreType[genre.upper()]
+        self.game_parameters_type = game_parameters_type
+        self.repeat = repeat
+        self.resource_folder = Environment.get_environment().get_resource_folder()
+
+    def time_source(self, source:str, use_pack:bool)->dict:
+        data_source = "text" if source == "pack" else source
+        data_manager = DataManager(data_source, self.game_parameters_type, self.genre.value)
+        if not data_manager.active:
+            return {"error" : f"{source} is not available"}
+        data_manager.load_parameters(data_source, self.game_parameters_type)
+        data_manager.load_story_card_template(data_source, self.genre, self.game_parameters_type)
+        game_parameters = data_manager.game_parameters
+        template = data_manager.story_card_template
+        def load(sample:bool)->StoryCardLoader:
+            loader = StoryCardLoader(data_source, self.genre, game_parameters, self.resource_folder, template, sample=sample, use_pack=use_pack)
+            loader.load_cards()
+            return loader
+        start = time.perf_counter()
+        for _ in range(self.repeat):
+            loader = load(False)
+            catalog = CardCatalog(data_source, self.genre, GameParametersType[self.game_parameters_type.upper()], 0, \
+                                  game_parameters.game_parameters, template, loader.deck_cards)
+        startup_ms = (time.perf_counter() - start) * 1e3 / self.repeat
+        start = time.perf_counter()
+        for _ in range(self.repeat):
+            load(True)
+        game_load_ms = (time.perf_counter() - start) * 1e3 / self.repeat
+        return {"cards" : catalog.size(), "startup_ms" : round(startup_ms, 3), "game_load_ms" : round(game_load_ms, 3)}
+
+    def run(self)->dict:
+        pack = CardPack.open(self.genre, self.resource_folder)
+        if pack is None:
+            print(CardPack.build(self.genre, self.resource_folder).message)
+        else:
+            pack.close()
+        results = {"genre" : self.genre.value, "repeat" : self.repeat}
+        results["text"] = self.time_source("text", use_pack=False)
+        results["pack"] = self.time_source("pack", use_pack=True)
+        try:
+            results["mongo"] = self.time_source("mongo", use_pack=False)
+        except Exception as ex:
+            results["mongo"] = {"error" : str(ex)}
+        if "error" not in results["text"]:
+            for source in ("pack", "mongo"):
+                if "error" not in results[source]:
+                    results[source]["startup_speedup"] = round(results["text"]["startup_ms"] / results[source]["startup_ms"], 1)
+        return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare loading story cards from text files, card packs and MongoDB")
+    parser.add_argument("--genre", help="Story genre", type=str, choices=["horror","romance","noir"], default="horror")
+    parser.add_argument("--repeat", help="Number of timed loads per source", type=int, default=20)
+    args = parser.parse_args()
+    benchmark = PackBenchmark(args.genre, repeat=args.repeat)
+    print(json.dumps(benchmark.run(), indent=2))
+
+if __name__ == '__main__':
+    main()
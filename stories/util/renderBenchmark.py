@@ -0,0 +1,146 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+
+import argparse
+import json
+import time
+from typing import Callable, List
+from game.cardCatalog import CardCatalog
+from game.cardRenderer import CardRenderer
+from game.gameEngineCommands import GameEngineCommands
+from game.storyCard import StoryCard
+from game.storyCardList import StoryCardList
+
+class RenderBenchmark(object):
+    """
+        Compares rendering a deck listing and a story by string concatenation in a loop,
+        the way the list, show, read and re_read commands did, with CardRenderer.
+        The deck is rendered as numbered text (list and show deck) and as JSON, the story as text, numbered text
+        and from its published dict (re_read). Times are the best of 5 batches, in microseconds per rendering.
+        Note that CPython appends in place for card_text = card_text + ..., so those loops were not quadratic,
+        the f"{message}..." loops of show and re_read copy the whole message for every card.
+        Run from the stories folder: python -m util.renderBenchmark --deck 200 --story 40
+    """
+
+    def __init__(self, deck_size:int=200, story_size:int=40, repeat:int=2000, genre:str="horror"):
+        self.deck_size = deck_size
+        self.story_size = story_size
+        self.repeat = repeat
+        self.genre = genre
+
+    def create_cards(self, size:int)->List[StoryCard]:
+        catalog = CardCatalog.get_catalog("text", self.genre, "test")
+        cards = []
+        while len(cards) < size:
+            card = catalog.cards[len(cards) % catalog.size()].copy()
+            card.number = len(cards)
+            cards.append(card)
+        return cards
+
+    @staticmethod
+    def concat_numbered(cards:List[StoryCard], last_drawn:int)->str:
+        card_text = ""
+        n = 1
+        for card in cards:
+            tag = "*" if card.number == last_drawn else ""
+            card_text = card_text + f"{tag}{n}. {card.card_type.value}:\t{card.number}. {card.render()}"
+            n += 1
+        return card_text
+
+    @staticmethod
+    def concat_show(lines:List[str])->str:
+        message = ""
+        n = 1
+        for line in lines:
+            message = f"{message}{n}. {line}"
+            n += 1
+        return message
+
+    @staticmethod
+    def concat_json(cards:List[StoryCard], last_drawn:int)->str:
+        cards_list = []
+        n = 1
+        for story_card in cards:
+            tag = "*" if story_card.number == last_drawn else " "
+            card_text = f"{tag}{n}. {story_card.card_type.value}: {story_card.number}. {story_card.render()}"
+            cards_list.append(card_text.strip())
+            n += 1
+        return json.dumps({"cards" : cards_list})
+
+    @staticmethod
+    def concat_story(cards:List[StoryCard])->str:
+        card_text = ""
+        for card in cards:
+            card_text = card_text + f"{card.card_type.value}:\t{card.number}. {card.render()}"
+        return card_text
+
+    @staticmethod
+    def concat_numbered_story(cards:List[StoryCard])->str:
+        card_text_list = []
+        n = 0
+        for card in cards:
+            card_text_list.append(f"{n}. ({card.card_type.value}) {card.number}. {card.render()}")
+            n += 1
+        return "".join(card_text_list)
+
+    @staticmethod
+    def concat_re_read(cards:List[dict])->str:
+        message = ""
+        for card in cards:
+            message = f'{message}{card["text"]}'
+        return message
+
+    def time_us(self, render:Callable[[], str], batches:int=5)->float:
+        """Returns: the best time of a number of batches of repeat / batches renderings
+        """
+        count = max(1, self.repeat // batches)
+        best = None
+        for _ in range(batches):
+            start = time.perf_counter()
+            for _ in range(count):
+                render()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return round(best * 1e6 / count, 2)
+
+    def compare(self, concatenated:Callable[[], str], rendered:Callable[[], str], as_json:bool=False)->dict:
+        if as_json:    # GameSerializer writes compact JSON
+            assert json.loads(concatenated()) == json.loads(rendered())
+        else:
+            assert concatenated() == rendered()
+        result = {"concat_us" : self.time_us(concatenated), "renderer_us" : self.time_us(rendered)}
+        result["speedup"] = round(result["concat_us"] / result["renderer_us"], 2)
+        return result
+
+    def run(self)->dict:
+        deck = self.create_cards(self.deck_size)
+        last_drawn = deck[-1].number
+        story = StoryCardList()
+        story.add_cards(self.create_cards(self.story_size))
+        results = {"deck" : self.deck_size, "story" : self.story_size, "repeat" : self.repeat}
+        story_dict = story.to_dict()["cards"]
+        results["list_numbered"] = self.compare(lambda: RenderBenchmark.concat_numbered(deck, last_drawn), \
+                                                lambda: CardRenderer.numbered((card.to_line() for card in deck), tags=("*" if card.number == last_drawn else "" for card in deck)))
+        results["show_deck"] = self.compare(lambda: RenderBenchmark.concat_show([f"{card.card_type.value}:\t{card.number}. {card.render()}" for card in deck]), lambda: CardRenderer.numbered(card.to_line() for card in deck))
+        results["deck_json"] = self.compare(lambda: RenderBenchmark.concat_json(deck, last_drawn), \
+                                            lambda: GameEngineCommands.to_JSON(deck, last_drawn), as_json=True)
+        results["story_text"] = self.compare(lambda: RenderBenchmark.concat_story(story.cards), lambda: str(story))
+        results["story_numbered"] = self.compare(lambda: RenderBenchmark.concat_numbered_story(story.cards), lambda: story.to_string(numbered=True))
+        results["re_read"] = self.compare(lambda: RenderBenchmark.concat_re_read(story_dict), lambda: CardRenderer.text(card["text"] for card in story_dict))
+        return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare rendering card listings and stories by concatenation with CardRenderer")
+    parser.add_argument("--deck", help="Number of cards in the deck listing", type=int, default=200)
+    parser.add_argument("--story", help="Number of lines in the story", type=int, default=40)
+    parser.add_argument("--repeat", help="Number of timed renderings", type=int, default=2000)
+    parser.add_argument("--genre", help="Story genre", type=str, choices=["horror","romance","noir"], default="horror")
+    args = parser.parse_args()
+    benchmark = RenderBenchmark(args.deck, args.story, args.repeat, args.genre)
+    print(json.dumps(benchmark.run(), indent=2))
+
+if __name__ == '__main__':
+    main()
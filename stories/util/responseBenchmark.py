@@ -0,0 +1,84 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+
+import argparse
+import json
+import time
+from typing import Callable
+from fastapi.encoders import jsonable_encoder
+from game.storiesGameEngine import StoriesGameEngine
+from game.gameSerializer import GameSerializer, orjson
+
+class ResponseBenchmark(object):
+    """
+        Compares building the /status and /list responses from a JSON string result, parsed and
+        serialized again by FastAPI, with the dict result serialized once.
+        A text source game is created, players are added and cards drawn, then each path is timed
+        over a number of iterations. Times are in microseconds.
+        Run from the stories folder: python -m util.responseBenchmark
+    """
+
+    def __init__(self, nplayers:int=4, ndraws:int=20, iterations:int=2000, genre:str="horror"):
+        self.nplayers = nplayers
+        self.ndraws = ndraws
+        self.iterations = iterations
+        self.genre = genre
+
+    def create_game(self)->StoriesGameEngine:
+        game_engine = StoriesGameEngine(installationId="ResponseBenchmark")
+        game_engine.create("ResponseBenchmark", self.genre, 0, "individual", "text", "test")
+        for n in range(self.nplayers):
+            game_engine.execute_command(f"add player Player{n} P{n:02d} p{n:02d} p{n:02d}@stories", aplayer=None)
+        game_engine.start(what="game")
+        for _ in range(self.ndraws):
+            game_engine.execute_command("draw new", aplayer=None)
+            game_engine.execute_command("next", aplayer=None)
+        return game_engine
+
+    @staticmethod
+    def render_json(content)->bytes:
+        """The FastAPI default: jsonable_encoder then JSONResponse.render
+        """
+        return json.dumps(jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+    @staticmethod
+    def render_once(content)->bytes:
+        return GameSerializer.dumpb(content)
+
+    def time_it(self, fn:Callable)->float:
+        """Returns: the average time of fn() in microseconds
+        """
+        start = time.perf_counter()
+        for _ in range(self.iterations):
+            fn()
+        return round((time.perf_counter() - start) * 1e6 / self.iterations, 1)
+
+    def run(self)->dict:
+        game_engine = self.create_game()
+        initials = game_engine.game_state.players[0].player_initials
+        status_before = lambda: ResponseBenchmark.render_json(json.loads(game_engine.game_status(indent=0).message))
+        status_after = lambda: ResponseBenchmark.render_once(game_engine.game_status(display_format="dict").properties)
+        list_before = lambda: ResponseBenchmark.render_json(json.loads(game_engine.lnj("hand", initials, "numbered").message))
+        list_after = lambda: ResponseBenchmark.render_once(game_engine.list("hand", initials, "numbered", display_format="dict").properties)
+        assert json.loads(status_before()) == json.loads(status_after()) and json.loads(list_before()) == json.loads(list_after())
+        results = {"players" : self.nplayers, "iterations" : self.iterations, "encoder" : "orjson" if orjson is not None else "json"}
+        for name,before,after in (("status", status_before, status_after), ("list", list_before, list_after)):
+            results[name] = {"before_us" : self.time_it(before), "after_us" : self.time_it(after)}
+            results[name]["speedup"] = round(results[name]["before_us"] / results[name]["after_us"], 1)
+        return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare JSON string and dict game command results in the server")
+    parser.add_argument("--players", help="Number of players", type=int, default=4)
+    parser.add_argument("--draws", help="Number of cards drawn before timing", type=int, default=20)
+    parser.add_argument("--iterations", help="Number of timed responses", type=int, default=2000)
+    parser.add_argument("--genre", help="Story genre", type=str, choices=["horror","romance","noir"], default="horror")
+    args = parser.parse_args()
+    benchmark = ResponseBenchmark(args.players, args.draws, args.iterations, args.genre)
+    print(json.dumps(benchmark.run(), indent=2))
+
+if __name__ == '__main__':
+    main()
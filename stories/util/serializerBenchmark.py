@@ -0,0 +1,86 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+
+import argparse
+import json
+import time
+from typing import Callable
+from game.storiesGameEngine import StoriesGameEngine
+from game.commandResult import CommandResult
+from game.gameSerializer import GameSerializer, orjson
+
+class SerializerBenchmark(object):
+    """
+        Compares the jsonpickle repr() of game objects with the GameSerializer summary repr(),
+        and json.dumps of their to_dict() with GameSerializer.dumps, which uses orjson if it is installed.
+        A text source game is created, players are added and cards played, then each is timed
+        over a number of iterations. Times are in microseconds.
+        Run from the stories folder: python -m util.serializerBenchmark
+    """
+
+    def __init__(self, nplayers:int=4, nplays:int=10, iterations:int=1000, genre:str="horror"):
+        self.nplayers = nplayers
+        self.nplays = nplays
+        self.iterations = iterations
+        self.genre = genre
+
+    def create_game(self)->StoriesGameEngine:
+        game_engine = StoriesGameEngine(installationId="SerializerBenchmark")
+        game_engine.create("SerializerBenchmark", self.genre, 0, "individual", "text", "test")
+        for n in range(self.nplayers):
+            game_engine.execute_command(f"add player Player{n} P{n:02d} p{n:02d} p{n:02d}@stories", aplayer=None)
+        game_engine.start(what="game")
+        for _ in range(self.nplays):
+            game_engine.execute_command("play_type story", aplayer=None)
+        return game_engine
+
+    def time_it(self, fn:Callable)->float:
+        """Returns: the best average time of fn() in microseconds of 5 batches
+        """
+        count = max(1, self.iterations // 5)
+        best = None
+        for _ in range(5):
+            start = time.perf_counter()
+            for _ in range(count):
+                fn()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return round(best * 1e6 / count, 2)
+
+    def compare(self, before:Callable, after:Callable)->dict:
+        result = {"before_us" : self.time_it(before), "after_us" : self.time_it(after)}
+        result["speedup"] = round(result["before_us"] / result["after_us"], 1)
+        return result
+
+    def run(self)->dict:
+        game_engine = self.create_game()
+        game_state = game_engine.game_state
+        player = game_state.players[0]
+        story = player.story_card_hand.my_story_cards
+        command_result = CommandResult(CommandResult.SUCCESS, "P00 played card# 12.", properties={"playerId" : player.player_initials})
+        results = {"players" : self.nplayers, "story" : story.size(), "iterations" : self.iterations, "encoder" : "orjson" if orjson is not None else "json"}
+        for name,obj in (("player", player), ("game_state", game_state), ("command_result", command_result)):
+            results[f"repr_{name}"] = self.compare(obj.json_pickle, lambda: repr(obj))
+        status = game_state.to_dict()
+        story_dict = story.to_dict()
+        assert json.loads(json.dumps(status, indent=2)) == GameSerializer.loads(game_state.to_JSON())
+        results["status_json"] = self.compare(lambda: json.dumps(game_state.to_dict(), indent=2), lambda: game_state.to_JSON())
+        results["story_json"] = self.compare(lambda: json.dumps(story_dict, indent=2), lambda: GameSerializer.dumps(story_dict, indent=2))
+        results["command_result_json"] = self.compare(lambda: json.dumps(command_result.to_dict()), command_result.to_JSON)
+        return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare jsonpickle and json with GameSerializer for game objects")
+    parser.add_argument("--players", help="Number of players", type=int, default=4)
+    parser.add_argument("--plays", help="Number of story cards played before timing", type=int, default=10)
+    parser.add_argument("--iterations", help="Number of timed serializations", type=int, default=1000)
+    parser.add_argument("--genre", help="Story genre", type=str, choices=["horror","romance","noir"], default="horror")
+    args = parser.parse_args()
+    benchmark = SerializerBenchmark(args.players, args.plays, args.iterations, args.genre)
+    print(json.dumps(benchmark.run(), indent=2))
+
+if __name__ == '__main__':
+    main()
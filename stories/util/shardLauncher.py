@@ -0,0 +1,63 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+from typing import List
+
+class ShardLauncher(object):
+    """
+        Runs the stories server as several shards on one host, one uvicorn process per shard on consecutive ports.
+        The shards use a LocalCoordinator folder to find each other. Games are owned by the shard their
+        game_id hashes to, and any shard accepts any request, so clients or a load balancer can use
+        any of the ports. Set GAME_SNAPSHOT_STORE=mongo in .env so that games can move between shards.
+        Run from the stories folder: python -m util.shardLauncher --shards 4
+    """
+
+    def __init__(self, shards:int, host:str="127.0.0.1", base_port:int=9000, folder:str=None):
+        self.shards = shards
+        self.host = host
+        self.base_port = base_port
+        self.folder = folder if folder is not None else tempfile.mkdtemp(prefix="stories_shards_")
+        self.processes:List[subprocess.Popen] = []
+
+    def urls(self)->List[str]:
+        return [f"http://{self.host}:{self.base_port + n}" for n in range(self.shards)]
+
+    def start(self):
+        for n,url in enumerate(self.urls()):
+            env = dict(os.environ, GAME_SHARD_ID=f"shard{n}", GAME_SHARD_URL=url, GAME_SHARD_COORDINATOR="local", GAME_SHARD_LOCATION=self.folder)
+            command = [sys.executable, "-m", "uvicorn", "app:app", "--host", self.host, "--port", str(self.base_port + n)]
+            self.processes.append(subprocess.Popen(command, env=env))
+
+    def stop(self):
+        for process in self.processes:
+            process.send_signal(signal.SIGINT)
+        for process in self.processes:
+            process.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the stories server as several shards")
+    parser.add_argument("--shards", help="Number of shard processes", type=int, default=os.cpu_count())
+    parser.add_argument("--host", help="Host address", type=str, default="127.0.0.1")
+    parser.add_argument("--port", help="Port of the first shard", type=int, default=9000)
+    parser.add_argument("--folder", help="LocalCoordinator folder", type=str, default=None)
+    args = parser.parse_args()
+    launcher = ShardLauncher(args.shards, args.host, args.port, args.folder)
+    launcher.start()
+    print(f"Shards: {','.join(launcher.urls())}")
+    try:
+        for process in launcher.processes:
+            process.wait()
+    except KeyboardInterrupt:
+        launcher.stop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+'''
+Created on Oct 18, 2026
+
+@author: don_bacon
+'''
+
+import argparse
+import json
+import time
+import jsonpickle
+from typing import Callable
+from game.storiesGameEngine import StoriesGameEngine
+from game.gameSnapshot import GameSnapshot
+
+class SnapshotBenchmark(object):
+    """
+        Compares saving and restoring a game with GameSnapshot against jsonpickle.
+        A text source game is created, players are added and a few cards drawn,
+        then each format is timed over a number of iterations. Sizes are in bytes, times in microseconds.
+        Run from the stories folder: python -m util.snapshotBenchmark
+    """
+
+    def __init__(self, nplayers:int=4, ndraws:int=10, iterations:int=200, genre:str="horror"):
+        self.nplayers = nplayers
+        self.ndraws = ndraws
+        self.iterations = iterations
+        self.genre = genre
+
+    def create_game(self)->StoriesGameEngine:
+        game_engine = StoriesGameEngine(installationId="SnapshotBenchmark")
+        game_engine.create("SnapshotBenchmark", self.genre, 0, "individual", "text", "test")
+        for n in range(self.nplayers):
+            game_engine.execute_command(f"add player Player{n} P{n:02d} p{n:02d} p{n:02d}@stories", aplayer=None)
+        game_engine.start(what="game")
+        for _ in range(self.ndraws):
+            game_engine.execute_command("draw new", aplayer=None)
+            game_engine.execute_command("next", aplayer=None)
+        return game_engine
+
+    def time_it(self, fn:Callable)->float:
+        """Returns: the average time of fn() in microseconds
+        """
+        start = time.perf_counter()
+        for _ in range(self.iterations):
+            fn()
+        return round((time.perf_counter() - start) * 1e6 / self.iterations, 1)
+
+    def run(self)->dict:
+        game_engine = self.create_game()
+        snapshot = GameSnapshot.dumps(game_engine)
+        pickled = jsonpickle.encode(game_engine)
+        results = {"players" : self.nplayers, "iterations" : self.iterations,
+                   "snapshot" : {"bytes" : len(snapshot),
+                                 "save_us" : self.time_it(lambda: GameSnapshot.dumps(game_engine)),
+                                 "load_us" : self.time_it(lambda: GameSnapshot.loads(snapshot))},
+                   "jsonpickle" : {"bytes" : len(pickled.encode("utf-8")),
+                                   "save_us" : self.time_it(lambda: jsonpickle.encode(game_engine)),
+                                   "load_us" : self.time_it(lambda: jsonpickle.decode(pickled))}}
+        results["size_ratio"] = round(results["jsonpickle"]["bytes"] / results["snapshot"]["bytes"], 1)
+        results["save_speedup"] = round(results["jsonpickle"]["save_us"] / results["snapshot"]["save_us"], 1)
+        results["load_speedup"] = round(results["jsonpickle"]["load_us"] / results["snapshot"]["load_us"], 1)
+        return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare GameSnapshot with jsonpickle")
+    parser.add_argument("--players", help="Number of players", type=int, default=4)
+    parser.add_argument("--draws", help="Number of cards drawn before saving", type=int, default=10)
+    parser.add_argument("--iterations", help="Number of timed saves and loads", type=int, default=200)
+    parser.add_argument("--genre", help="Story genre", type=str, choices=["horror","romance","noir"], default="horror")
+    args = parser.parse_args()
+    benchmark = SnapshotBenchmark(args.players, args.draws, args.iterations, args.genre)
+    print(json.dumps(benchmark.run(), indent=2))
+
+if __name__ == '__main__':
+    main()